@@ -0,0 +1,83 @@
+/**
+ * parse-jwt-token-optimized.js
+ *
+ * Drop-in replacement for parse-jwt-token.js, selected with
+ * `generate_proxy.py --jwt-parser optimized`. Sets the same jwt.* variables
+ * with less work per request:
+ *   - claims decoded on a previous request are read from jwt.cached.claims
+ *     (LC-JWT-Claims, keyed by the token signature) instead of re-parsing
+ *   - padding is looked up instead of appended in a loop
+ *   - the UTF-8 fix-up (decodeURIComponent/escape) only runs for non-ASCII payloads
+ *   - every variable is set exactly once and nothing is printed
+ *
+ * On a cache miss the derived claim variables are written to jwt.claims.cache
+ * for PC-JWT-Claims to store. Expiry is always evaluated against the current time.
+ */
+
+var PADDING = ["", "===", "==", "="];
+var NON_ASCII = /[\x80-\xff]/;
+
+var token = context.getVariable("jwt.token");
+
+if (!token) {
+    context.setVariable("jwt.valid", false);
+    context.setVariable("jwt.error", "No token provided");
+} else {
+    try {
+        var out = null;
+        var cached = context.getVariable("jwt.cached.claims");
+
+        if (cached) {
+            out = JSON.parse(cached);
+        } else {
+            var parts = token.split(".");
+            if (parts.length !== 3) {
+                throw new Error("Invalid JWT format");
+            }
+
+            // base64url -> base64 with precomputed padding
+            var payload = parts[1].replace(/-/g, "+").replace(/_/g, "/");
+            var decoded = atob(payload + PADDING[payload.length & 3]);
+            if (NON_ASCII.test(decoded)) {
+                decoded = decodeURIComponent(escape(decoded));
+            }
+            var claims = JSON.parse(decoded);
+
+            var sub = claims.sub;
+            out = {
+                "jwt.sub": sub || "",
+                "jwt.username": claims.username || claims.user_name || sub || "",
+                "jwt.client_id": claims.client_id || claims.azp || "",
+                "jwt.iss": claims.iss || "",
+                "jwt.exp": claims.exp || 0,
+                "jwt.iat": claims.iat || 0
+            };
+            if (claims.scope) {
+                out["jwt.scope"] = claims.scope;
+            }
+            if (claims.roles) {
+                out["jwt.roles"] = JSON.stringify(claims.roles);
+            }
+            if (claims.is_using_rbac !== undefined) {
+                out["jwt.is_using_rbac"] = claims.is_using_rbac;
+            }
+            context.setVariable("jwt.claims.cache", JSON.stringify(out));
+        }
+
+        for (var key in out) {
+            context.setVariable(key, out[key]);
+        }
+
+        var exp = out["jwt.exp"];
+        var expired = !!exp && exp < Math.floor(Date.now() / 1000);
+        context.setVariable("jwt.expired", expired);
+        context.setVariable("jwt.valid", !expired);
+        if (expired) {
+            context.setVariable("jwt.error", "Token expired");
+        }
+
+    } catch (e) {
+        context.setVariable("jwt.valid", false);
+        context.setVariable("jwt.error", "Failed to parse JWT: " + e.message);
+    }
+}
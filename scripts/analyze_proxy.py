@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Cropwise Unified Platform - Policy Cost Analyzer
+
+Prints the estimated per-request policy cost of an apiproxy directory and
+flags redundant or mergeable steps on the critical path.
+
+Usage:
+    python scripts/analyze_proxy.py
+    python scripts/analyze_proxy.py --apiproxy ./dist/bundle/apiproxy
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+from utils.policy_analyzer import PolicyCostAnalyzer
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Analyze policy execution cost of the Cropwise Unified Platform proxy'
+    )
+    parser.add_argument(
+        '--apiproxy', '-a',
+        default=str(Path(__file__).parent.parent / "apiproxy"),
+        help='Path to the apiproxy directory (default: repository apiproxy/)'
+    )
+    
+    args = parser.parse_args()
+    
+    analyzer = PolicyCostAnalyzer(args.apiproxy)
+    report = analyzer.analyze()
+    analyzer.print_report(report)
+    
+    sys.exit(1 if report.errors else 0)
+
+
+if __name__ == "__main__":
+    main()
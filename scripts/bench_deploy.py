@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Cropwise Unified Platform - Deploy Pipeline Benchmark
+
+Runs the deploy tooling against a local Apigee management API emulator and
+reports end-to-end pipeline timing and the management calls it made. The
+emulator's latency, failure rate and deployment READY delay are configurable
+and seeded, so runs are reproducible in CI.
+
+Usage:
+    python scripts/bench_deploy.py --iterations 5
+    python scripts/bench_deploy.py --tool deploy --ready-delay 3 --latency-ms 50
+    python scripts/bench_deploy.py --error-rate 0.05 --seed 42 --output ./dist
+    python scripts/bench_deploy.py --serve --port 8085    # emulator only
+"""
+
+import sys
+import json
+import time
+import argparse
+import statistics
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from utils.apigee_emulator import ApigeeEmulator, EmulatorSettings
+
+
+BASE_DIR = Path(__file__).parent.parent
+
+
+def run_deploy_proxy(emulator: ApigeeEmulator, env: str, bundle: str, poll_interval: float) -> dict:
+    """One ProxyDeployer.full_deploy run (deploy_proxy.py)."""
+    # Imported here so --serve works without requests/google-auth installed
+    from deploy_proxy import ProxyDeployer
+
+    deployer = ProxyDeployer(env=env, base_url=emulator.base_url, token='emulator')
+    return deployer.full_deploy(bundle, wait=True, timeout=120, poll_interval=poll_interval)
+
+
+def run_deploy(emulator: ApigeeEmulator, env: str, bundle: str, poll_interval: float) -> dict:
+    """One ApigeeDeployer.full_deploy run (deploy.py)."""
+    from deploy import ApigeeDeployer
+
+    deployer = ApigeeDeployer(
+        env=env,
+        organization='emulator-org',
+        token='emulator',
+        base_url=emulator.base_url,
+        poll_interval=poll_interval
+    )
+    return deployer.full_deploy(wait=True, override=True)
+
+
+TOOLS = {
+    'deploy_proxy': run_deploy_proxy,
+    'deploy': run_deploy,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the deploy tooling against a local Apigee API emulator'
+    )
+    parser.add_argument(
+        '--tool',
+        choices=sorted(TOOLS),
+        default='deploy_proxy',
+        help='Deploy script to exercise (default: deploy_proxy)'
+    )
+    parser.add_argument(
+        '--env', '-e',
+        choices=['dev', 'qa', 'prod'],
+        default='dev',
+        help='Target environment (default: dev)'
+    )
+    parser.add_argument(
+        '--bundle', '-b',
+        default=None,
+        help='Bundle ZIP for deploy_proxy (default: generate one)'
+    )
+    parser.add_argument(
+        '--iterations', '-n',
+        type=int,
+        default=3,
+        help='Number of full deploys (default: 3)'
+    )
+    parser.add_argument(
+        '--poll-interval',
+        type=float,
+        default=0.2,
+        help='Deployment status poll interval in seconds (default: 0.2)'
+    )
+    parser.add_argument(
+        '--latency-ms',
+        type=float,
+        default=0.0,
+        help='Emulated latency per management call'
+    )
+    parser.add_argument(
+        '--jitter-ms',
+        type=float,
+        default=0.0,
+        help='Uniform jitter added to the emulated latency'
+    )
+    parser.add_argument(
+        '--error-rate',
+        type=float,
+        default=0.0,
+        help='Fraction of management calls that fail'
+    )
+    parser.add_argument(
+        '--error-status',
+        type=int,
+        default=503,
+        help='HTTP status of injected failures (default: 503)'
+    )
+    parser.add_argument(
+        '--ready-delay',
+        type=float,
+        default=1.0,
+        help='Seconds until a deployment reports READY (default: 1.0)'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=0,
+        help='Random seed for latency and failure injection'
+    )
+    parser.add_argument(
+        '--serve',
+        action='store_true',
+        help='Only run the emulator until interrupted'
+    )
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=0,
+        help='Emulator port (default: any free port)'
+    )
+    parser.add_argument(
+        '--output', '-o',
+        default=None,
+        help='Directory to save JSON results'
+    )
+    
+    args = parser.parse_args()
+
+    settings = EmulatorSettings(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        ready_delay_s=args.ready_delay,
+        seed=args.seed
+    )
+
+    with ApigeeEmulator(settings, port=args.port) as emulator:
+        print(f"\n🧪 Apigee API emulator: {emulator.base_url}")
+
+        if args.serve:
+            print("   Press Ctrl+C to stop")
+            try:
+                while True:
+                    time.sleep(1)
+            except KeyboardInterrupt:
+                pass
+            print(json.dumps(emulator.stats(), indent=2))
+            return
+
+        bundle = args.bundle
+        if args.tool == 'deploy_proxy' and not bundle:
+            from generate_proxy import ProxyGenerator
+            bundle = ProxyGenerator(str(BASE_DIR), args.env).generate(tempfile.mkdtemp())
+
+        durations = []
+        failures = []
+        for i in range(args.iterations):
+            start = time.perf_counter()
+            try:
+                result = TOOLS[args.tool](emulator, args.env, bundle, args.poll_interval)
+                if not result.get('success'):
+                    failures.append(f"iteration {i + 1}: not ready")
+            except Exception as e:
+                failures.append(f"iteration {i + 1}: {e}")
+            durations.append(time.perf_counter() - start)
+
+        summary = {
+            "tool": args.tool,
+            "iterations": args.iterations,
+            "failures": failures,
+            "mean_s": round(statistics.mean(durations), 3),
+            "min_s": round(min(durations), 3),
+            "max_s": round(max(durations), 3),
+            "settings": vars(settings),
+            "emulator": emulator.stats()
+        }
+
+    print(f"\n⏱️  {args.tool}: {args.iterations} deploys, mean {summary['mean_s']}s "
+          f"(min {summary['min_s']}s, max {summary['max_s']}s), failures: {len(failures)}")
+    for failure in failures:
+        print(f"  ❌ {failure}")
+    print(f"  Management calls: {summary['emulator']['requests']} "
+          f"(injected failures: {summary['emulator']['injected_failures']})")
+    for route, stats in summary['emulator']['routes'].items():
+        print(f"    • {route}: {stats['count']} calls, mean {stats['mean_ms']}ms")
+
+    if args.output:
+        output_dir = Path(args.output)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        output_file = output_dir / f"deploy-benchmark-{timestamp}.json"
+        with open(output_file, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"\n📄 Results saved: {output_file}")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Cropwise Unified Platform - JavaScript Policy Benchmark
+
+Runs the proxy's JavaScript policy resources locally through the JS harness
+with generated tokens and request paths, and reports per-invocation execution
+time and the output variables they produce.
+
+Usage:
+    python scripts/bench_js_policies.py
+    python scripts/bench_js_policies.py --script parse-jwt-token.js --count 10000
+    python scripts/bench_js_policies.py --engine node --samples 5 --output ./dist
+"""
+
+import sys
+import json
+import argparse
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from utils.js_harness import (
+    JSPolicyHarness, summarize, generate_jwt_inputs, generate_route_inputs
+)
+
+
+JSC_DIR = Path(__file__).parent.parent / "apiproxy" / "resources" / "jsc"
+
+# Input generator for each known policy script
+INPUT_GENERATORS = {
+    'parse-jwt-token.js': generate_jwt_inputs,
+    'parse-jwt-token-optimized.js': generate_jwt_inputs,
+    'handle-readonly-routes.js': generate_route_inputs,
+}
+
+
+def benchmark_script(harness: JSPolicyHarness, script: Path, count: int, warmup: int, seed: int):
+    """Benchmark one script and return (summary, invocations, inputs)."""
+    generator = INPUT_GENERATORS.get(script.name, generate_route_inputs)
+    inputs = generator(count, seed=seed)
+    name = harness.load(script)
+    
+    # Warm up the engine's JIT before measuring
+    if warmup:
+        harness.run_batch(name, inputs[:warmup])
+    
+    invocations = harness.run_batch(name, inputs)
+    return summarize(invocations), invocations, inputs
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark Cropwise proxy JavaScript policies locally'
+    )
+    parser.add_argument(
+        '--script', '-s',
+        action='append',
+        help='Script file name in apiproxy/resources/jsc (default: all)'
+    )
+    parser.add_argument(
+        '--count', '-n',
+        type=int,
+        default=5000,
+        help='Invocations per script (default: 5000)'
+    )
+    parser.add_argument(
+        '--warmup', '-w',
+        type=int,
+        default=500,
+        help='Warm-up invocations per script (default: 500)'
+    )
+    parser.add_argument(
+        '--engine', '-e',
+        choices=['auto', 'node', 'mini_racer'],
+        default='auto',
+        help='JavaScript engine (default: auto)'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=0,
+        help='Random seed for generated inputs'
+    )
+    parser.add_argument(
+        '--samples',
+        type=int,
+        default=3,
+        help='Number of sample outputs to print per script'
+    )
+    parser.add_argument(
+        '--output', '-o',
+        default=None,
+        help='Directory to save JSON results'
+    )
+    
+    args = parser.parse_args()
+    
+    scripts = [JSC_DIR / s for s in args.script] if args.script else sorted(JSC_DIR.glob("*.js"))
+    results = {}
+    
+    try:
+        with JSPolicyHarness(engine=args.engine) as harness:
+            print(f"\n⚙️  Engine: {harness.engine}")
+            for script in scripts:
+                summary, invocations, inputs = benchmark_script(
+                    harness, script, args.count, args.warmup, args.seed
+                )
+                output_keys = Counter(
+                    ",".join(sorted(i.variables)) for i in invocations
+                )
+                results[script.name] = {
+                    "summary": summary,
+                    "output_variable_sets": dict(output_keys.most_common()),
+                    "errors": Counter(i.error for i in invocations if i.error).most_common(5)
+                }
+                
+                print(f"\n📜 {script.name}")
+                print(f"  Invocations: {summary['count']}  (uncaught errors: {summary['errors']})")
+                print(f"  Mean: {summary['mean_us']}µs  p50: {summary['p50_us']}µs  "
+                      f"p95: {summary['p95_us']}µs  p99: {summary['p99_us']}µs  max: {summary['max_us']}µs")
+                print(f"  Distinct output variable sets: {len(output_keys)}")
+                for inv, variables in list(zip(invocations, inputs))[:args.samples]:
+                    print(f"  • in={json.dumps(variables)[:80]}")
+                    print(f"    out={json.dumps(inv.variables)[:160]}")
+    except RuntimeError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    
+    if args.output:
+        output_dir = Path(args.output)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        output_file = output_dir / f"js-benchmark-{timestamp}.json"
+        with open(output_file, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📄 Results saved: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Cropwise Unified Platform - Payload Size Benchmark
+
+Sends request and response bodies across a size sweep (1KB to 50MB) with
+buffered and streaming clients, against a buffered route and a streaming
+route, and reports time to first byte, throughput and the client's peak
+memory per size. Use it to pick the size above which routes should stream
+and to confirm RF-PayloadTooLarge rejects oversized buffered uploads.
+
+--mode local runs the bundle on a local gateway worker in front of a
+payload stub process, so no deployment is needed; the local gateway buffers
+every message, so only the deployed proxy (--mode proxy) shows the
+server-side streaming difference.
+
+Usage:
+    python scripts/bench_payloads.py --mode local --sizes 1KB,1MB,10MB
+    python scripts/bench_payloads.py --env dev --token $TOKEN --directions download --repeat 5
+    python scripts/bench_payloads.py --base-url http://127.0.0.1:8080/cropwise-unified-platform --output ./results
+"""
+
+import sys
+import json
+import argparse
+from contextlib import ExitStack
+from datetime import datetime
+from pathlib import Path
+
+from utils.config_model import load_config
+from utils.local_gateway import GatewaySettings, GatewayWorkers, ProxyBundle
+from utils.payload_bench import DEFAULT_SIZES, DIRECTIONS, MODES, PayloadBackendProcess, PayloadBench, parse_size
+from utils.token_pool import TokenPool
+
+
+BASE_DIR = Path(__file__).parent.parent
+
+
+def print_result(result: dict) -> None:
+    if 'total_ms' not in result:
+        print(f"  {result['direction']:<9} {result['size_label']:>6} {result['mode']:<10} ❌ {result['statuses']}")
+        return
+    statuses = ', '.join(f"{status}×{count}" for status, count in result['statuses'].items())
+    icon = '✅' if set(result['statuses']) == {'200'} else '⚠️ '
+    print(f"  {result['direction']:<9} {result['size_label']:>6} {result['mode']:<10} {icon} "
+          f"TTFB {result['ttfb_ms']:>9.1f}ms  total {result['total_ms']:>9.1f}ms  "
+          f"{result['throughput_mbps']:>8.1f} MB/s  peak {result['peak_memory_mb']:>7.2f} MB  [{statuses}]")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark buffered vs streaming transfers across payload sizes'
+    )
+    parser.add_argument(
+        '--mode', '-m',
+        choices=['proxy', 'local'],
+        default='proxy',
+        help='Deployed proxy, or the bundle on a local gateway with a payload stub (default: proxy)'
+    )
+    parser.add_argument(
+        '--bundle', '-b',
+        default=str(BASE_DIR / 'apiproxy'),
+        help='Bundle ZIP or apiproxy directory for --mode local (default: ./apiproxy)'
+    )
+    parser.add_argument(
+        '--env', '-e',
+        default='dev',
+        choices=['dev', 'qa', 'prod'],
+        help='Environment whose proxy URL is used without --base-url (default: dev)'
+    )
+    parser.add_argument(
+        '--base-url',
+        default=None,
+        help='Proxy or gateway URL including the base path'
+    )
+    parser.add_argument(
+        '--token', '-t',
+        default=None,
+        help='Bearer token (default: signed from --token-fixtures)'
+    )
+    parser.add_argument(
+        '--token-fixtures',
+        default=str(BASE_DIR / 'tests' / 'fixtures' / 'test_tokens.json'),
+        help='Token fixtures used to sign a token without --token (default: tests/fixtures/test_tokens.json)'
+    )
+    parser.add_argument(
+        '--sizes', '-s',
+        default=','.join(DEFAULT_SIZES),
+        help=f"Comma-separated payload sizes (default: {','.join(DEFAULT_SIZES)})"
+    )
+    parser.add_argument(
+        '--directions',
+        default=','.join(DIRECTIONS),
+        help='download (response bodies), upload (request bodies) or both (default: download,upload)'
+    )
+    parser.add_argument(
+        '--modes',
+        default=','.join(MODES),
+        help='buffered, streaming or both (default: buffered,streaming)'
+    )
+    parser.add_argument(
+        '--buffered-path',
+        default='/v2/accounts/ids',
+        help='Route the proxy buffers (default: /v2/accounts/ids)'
+    )
+    parser.add_argument(
+        '--streaming-path',
+        default='/remote-sensing/v1/imagery',
+        help='Route with streaming enabled (default: /remote-sensing/v1/imagery)'
+    )
+    parser.add_argument(
+        '--repeat', '-r',
+        type=int,
+        default=3,
+        help='Transfers per size and mode; medians are reported (default: 3)'
+    )
+    parser.add_argument(
+        '--no-memory',
+        action='store_true',
+        help='Skip tracemalloc peak memory tracking'
+    )
+    parser.add_argument(
+        '--config', '-c',
+        default=None,
+        help='Path to environments.json configuration file'
+    )
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=300.0,
+        help='Per-request timeout in seconds (default: 300)'
+    )
+    parser.add_argument(
+        '--insecure',
+        action='store_true',
+        help='Do not verify TLS certificates'
+    )
+    parser.add_argument(
+        '--output', '-o',
+        default=None,
+        help='Directory to save the JSON report'
+    )
+
+    args = parser.parse_args()
+
+    try:
+        sizes = [parse_size(size) for size in args.sizes.split(',') if size.strip()]
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+    directions = [d.strip() for d in args.directions.split(',') if d.strip()]
+    modes = [m.strip() for m in args.modes.split(',') if m.strip()]
+    unknown = set(directions) - set(DIRECTIONS) | set(modes) - set(MODES)
+    if unknown:
+        print(f"❌ Unknown direction or mode: {', '.join(sorted(unknown))}")
+        sys.exit(2)
+
+    token = args.token
+    if not token:
+        token = TokenPool.from_fixtures(args.token_fixtures).get()
+
+    with ExitStack() as stack:
+        if args.mode == 'local':
+            # Backend and gateway run in child processes so they stay out of the client's memory peak
+            backend = stack.enter_context(PayloadBackendProcess())
+            bundle = ProxyBundle.load(args.bundle)
+            gateway = GatewayWorkers(
+                args.bundle, GatewaySettings(env=args.env, target_url=backend.url), workers=1, in_process=False
+            )
+            gateway.start()
+            stack.callback(gateway.stop)
+            base_url = gateway.url + bundle.proxy_endpoints['default'].base_path
+        else:
+            env_config = load_config(environments_path=args.config).env(args.env)
+            base_url = args.base_url or (
+                f"https://{env_config['apigee_org']}-{env_config['apigee_env']}.apigee.net{env_config['base_path']}"
+            )
+
+        bench = PayloadBench(
+            base_url,
+            {'buffered': args.buffered_path, 'streaming': args.streaming_path},
+            headers={'Authorization': f'Bearer {token}'},
+            timeout=args.timeout,
+            verify_tls=not args.insecure,
+            track_memory=not args.no_memory
+        )
+        stack.callback(bench.close)
+
+        print(f"\n📦 Payload sweep against {base_url} ({args.mode})")
+        print(f"   buffered: {args.buffered_path}   streaming: {args.streaming_path}   repeat: {args.repeat}\n")
+        try:
+            results = bench.sweep(sizes, modes, directions, repeat=args.repeat, on_result=print_result)
+        except KeyboardInterrupt:
+            print("\n⏹️  Interrupted")
+            sys.exit(130)
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "mode": args.mode,
+        "base_url": base_url,
+        "paths": {"buffered": args.buffered_path, "streaming": args.streaming_path},
+        "repeat": args.repeat,
+        "results": results,
+    }
+
+    if args.output:
+        output_dir = Path(args.output)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        output_file = output_dir / f"payload-bench-{timestamp}.json"
+        with open(output_file, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Report saved: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Cropwise Unified Platform - Unified CLI (cropwise-apigee)
+
+Single entry point for the platform scripts. Each subcommand loads only its
+own script, and the scripts load requests, the Google auth stack, jwt and
+colorama on first use, so `--help`, `--dry-run` and `--bundle-only` runs
+start in a fraction of the time. Arguments after the subcommand are passed
+through unchanged.
+
+--bench-startup measures the cold import time of each subcommand in fresh
+interpreters and fails if it exceeds the budget or if a subcommand loads a
+heavy dependency at import time. CI runs it to catch startup regressions.
+
+Usage:
+    python scripts/cropwise_apigee.py generate --env dev --validate
+    python scripts/cropwise_apigee.py deploy --env dev --bundle-only
+    python scripts/cropwise_apigee.py test --env qa --test-suite smoke
+    python scripts/cropwise_apigee.py latency --mode local
+    python scripts/cropwise_apigee.py analyze --bundle ./dist/bundle.zip
+    python scripts/cropwise_apigee.py --bench-startup --budget-ms 150
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+import importlib.util
+from datetime import datetime
+from pathlib import Path
+
+
+PROG = 'cropwise-apigee'
+SCRIPTS_DIR = Path(__file__).parent
+BASE_DIR = SCRIPTS_DIR.parent
+
+# Subcommand: (script path relative to the repository, summary)
+COMMANDS = {
+    'generate': ('scripts/generate_proxy.py', 'Generate an environment-specific proxy bundle'),
+    'deploy': ('scripts/deploy.py', 'Bundle, upload and deploy the proxy (gcloud or --token)'),
+    'deploy-bundle': ('scripts/deploy_proxy.py', 'Upload and deploy an existing bundle with service account credentials'),
+    'test': ('scripts/test_proxy.py', 'Run the functional test suites against a deployed proxy'),
+    'latency': ('tests/network-latency-test.py', 'Compare proxy and direct target latency'),
+    'analyze': ('scripts/analyze_proxy.py', 'Estimate per-policy cost of a proxy bundle'),
+    'gateway': ('scripts/run_gateway.py', 'Run the proxy bundle on the local gateway'),
+    'stub-backend': ('scripts/stub_backend.py', 'Serve a stub backend with configurable latency'),
+    'syslog-sink': ('scripts/syslog_sink.py', 'Collect and analyze FC-Syng-Logging syslog traffic'),
+    'replay-logs': ('scripts/replay_logs.py', 'Replay production logs against the proxy, gateway or target'),
+    'replay-jwt': ('scripts/replay_jwt.py', 'Replay captured JWTs through the reference parser'),
+    'simulate-rate-limits': ('scripts/simulate_rate_limits.py', 'Simulate rate-limit tiers against a request trace'),
+    'kvm-sync': ('scripts/kvm_sync.py', 'Sync a KVM to a desired-state file'),
+    'kvm-snapshot': ('scripts/kvm_snapshot.py', 'Export a KVM to a local snapshot and query it'),
+    'user-load': ('scripts/user_load.py', 'Generate synthetic users and drive Zipfian load for KVM cardinality tests'),
+    'bench-payloads': ('scripts/bench_payloads.py', 'Benchmark buffered vs streaming transfers across payload sizes'),
+    'bench-deploy': ('scripts/bench_deploy.py', 'Benchmark the deploy pipeline against the emulator'),
+    'bench-js': ('scripts/bench_js_policies.py', 'Benchmark the JavaScript policies'),
+}
+
+# Modules a subcommand must not load at import time (they are loaded lazily)
+HEAVY_MODULES = ('requests', 'urllib3', 'google.auth', 'google.oauth2', 'jwt', 'colorama')
+
+# Subcommands whose scripts need a heavy module before main() runs
+EAGER_COMMANDS = {'latency'}
+
+
+def _module_name(script: str) -> str:
+    return Path(script).stem.replace('-', '_')
+
+
+def load_command(command: str):
+    """Import the script module behind a subcommand."""
+    script, _ = COMMANDS[command]
+    if str(SCRIPTS_DIR) not in sys.path:
+        sys.path.insert(0, str(SCRIPTS_DIR))
+    name = _module_name(script)
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, BASE_DIR / script)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+def run_command(command: str, argv: list) -> int:
+    """Run a subcommand's main() with argv as its command line."""
+    module = load_command(command)
+    saved_argv = sys.argv
+    sys.argv = [f"{PROG} {command}", *argv]
+    try:
+        result = module.main()
+    finally:
+        sys.argv = saved_argv
+    return result if isinstance(result, int) else 0
+
+
+def measure_startup(command: str, python: str = sys.executable) -> dict:
+    """Cold import of one subcommand in a fresh interpreter (-X importtime)."""
+    code = (
+        "import sys, time; sys.path.insert(0, %r); import cropwise_apigee; start = time.perf_counter(); "
+        "cropwise_apigee.load_command(%r); print((time.perf_counter() - start) * 1000)"
+        % (str(SCRIPTS_DIR), command)
+    )
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    proc = subprocess.run(
+        [python, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, cwd=str(BASE_DIR), env=env
+    )
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"}
+
+    imported = set()
+    for line in proc.stderr.splitlines():
+        if line.startswith('import time:') and not line.rstrip().endswith('package'):
+            imported.add(line.rsplit('|', 1)[1].strip())
+    return {
+        "import_ms": round(float(proc.stdout.strip().splitlines()[-1]), 1),
+        "modules": len(imported),
+        "heavy_modules": sorted(name for name in imported if name in HEAVY_MODULES),
+    }
+
+
+def bench_startup(commands: list, runs: int, budget_ms: float) -> dict:
+    """Median cold import time per subcommand, checked against the budget."""
+    results = {}
+    for command in commands:
+        samples = [measure_startup(command) for _ in range(runs)]
+        errors = [s['error'] for s in samples if 'error' in s]
+        if errors:
+            results[command] = {"ok": False, "error": errors[0]}
+            continue
+        times = sorted(s['import_ms'] for s in samples)
+        median = times[len(times) // 2]
+        heavy = samples[0]['heavy_modules'] if command not in EAGER_COMMANDS else []
+        results[command] = {
+            "ok": median <= budget_ms and not heavy,
+            "median_ms": median,
+            "max_ms": times[-1],
+            "modules": samples[0]['modules'],
+            "heavy_modules": heavy,
+        }
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "runs": runs,
+        "budget_ms": budget_ms,
+        "passed": all(r['ok'] for r in results.values()),
+        "commands": results,
+    }
+
+
+def print_bench(report: dict) -> None:
+    print(f"\n⏱️  Cold import per subcommand (median of {report['runs']}, budget {report['budget_ms']:g}ms)")
+    for command, result in report['commands'].items():
+        icon = "✅" if result['ok'] else "❌"
+        if 'error' in result:
+            print(f"  {icon} {command:<22} {result['error']}")
+            continue
+        line = f"  {icon} {command:<22} {result['median_ms']:7.1f}ms  ({result['modules']} modules)"
+        if result['heavy_modules']:
+            line += f"  loads {', '.join(result['heavy_modules'])} at import"
+        print(line)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    commands = "\n".join(f"  {name:<22} {summary}" for name, (_, summary) in COMMANDS.items())
+    parser = argparse.ArgumentParser(
+        prog=PROG,
+        description='Cropwise Unified Platform tools',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"commands:\n{commands}\n\nRun '{PROG} <command> --help' for command options."
+    )
+    parser.add_argument(
+        'command',
+        nargs='?',
+        choices=list(COMMANDS),
+        metavar='command',
+        help='Subcommand to run (see below)'
+    )
+    parser.add_argument(
+        '--bench-startup',
+        action='store_true',
+        help='Measure the cold import time of each subcommand and fail over budget'
+    )
+    parser.add_argument(
+        '--budget-ms',
+        type=float,
+        default=150.0,
+        help='Startup budget per subcommand for --bench-startup (default: 150)'
+    )
+    parser.add_argument(
+        '--runs',
+        type=int,
+        default=3,
+        help='Fresh interpreters per subcommand for --bench-startup (default: 3)'
+    )
+    parser.add_argument(
+        '--output', '-o',
+        default=None,
+        help='Directory to save the --bench-startup report'
+    )
+    return parser
+
+
+def main(argv: list = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+
+    # Everything after the subcommand belongs to it, including --help
+    split = next((i for i, arg in enumerate(argv) if arg in COMMANDS), len(argv))
+    args = build_parser().parse_args(argv[:split + 1])
+
+    if args.bench_startup:
+        commands = [args.command] if args.command else list(COMMANDS)
+        report = bench_startup(commands, max(1, args.runs), args.budget_ms)
+        print_bench(report)
+        if args.output:
+            output_dir = Path(args.output)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+            output_file = output_dir / f"startup-bench-{timestamp}.json"
+            with open(output_file, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"\n📄 Report saved: {output_file}")
+        return 0 if report['passed'] else 1
+
+    if not args.command:
+        build_parser().print_help()
+        return 2
+
+    return run_command(args.command, argv[split + 1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
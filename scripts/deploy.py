@@ -35,12 +35,10 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional, Tuple
 
-try:
-    import requests
-except ImportError:
-    print("❌ Error: 'requests' library not found")
-    print("Install with: pip install requests")
-    sys.exit(1)
+from utils.lazy_import import lazy_import
+
+# Loaded on first use so --help, --dry-run and --bundle-only start fast
+requests = lazy_import('requests', install_hint='pip install requests')
 
 
 # ANSI Colors
@@ -96,11 +94,20 @@ class ApigeeDeployer:
         'prod': 'default-prod'
     }
     
-    def __init__(self, env: str, organization: str = None, token: str = None):
+    def __init__(
+        self,
+        env: str,
+        organization: str = None,
+        token: str = None,
+        base_url: str = None,
+        poll_interval: float = 2
+    ):
         self.env = env
         self.apigee_env = self.ENV_MAP.get(env, 'default-dev')  # Map to actual Apigee env
         self.organization = organization or self.DEFAULT_ORG
         self.token = token
+        self.base_url = (base_url or os.getenv('APIGEE_BASE_URL') or self.BASE_URL).rstrip('/')
+        self.poll_interval = poll_interval
         self.base_dir = Path(__file__).parent.parent
         self.apiproxy_dir = self.base_dir / "apiproxy"
         self.dist_dir = self.base_dir / "dist"
@@ -232,7 +239,7 @@ class ApigeeDeployer:
         print_info("Uploading proxy bundle to Apigee X...")
         
         url = (
-            f"{self.BASE_URL}/organizations/{self.organization}/apis"
+            f"{self.base_url}/organizations/{self.organization}/apis"
             f"?action=import&name={self.PROXY_NAME}"
         )
         
@@ -274,7 +281,7 @@ class ApigeeDeployer:
         print_info(f"Deploying revision {revision} to {self.apigee_env}...")
         
         url = (
-            f"{self.BASE_URL}/organizations/{self.organization}/"
+            f"{self.base_url}/organizations/{self.organization}/"
             f"environments/{self.apigee_env}/apis/{self.PROXY_NAME}/"
             f"revisions/{revision}/deployments"
         )
@@ -312,7 +319,7 @@ class ApigeeDeployer:
         print_info("Checking deployment status...")
         
         url = (
-            f"{self.BASE_URL}/organizations/{self.organization}/"
+            f"{self.base_url}/organizations/{self.organization}/"
             f"environments/{self.apigee_env}/apis/{self.PROXY_NAME}/"
             f"revisions/{revision}/deployments"
         )
@@ -323,10 +330,10 @@ class ApigeeDeployer:
         
         start_time = time.time()
         attempt = 0
-        max_attempts = timeout // 2  # Check every 2 seconds
+        max_attempts = max(1, int(timeout / self.poll_interval))
         
         while attempt < max_attempts:
-            time.sleep(2)
+            time.sleep(self.poll_interval)
             attempt += 1
             elapsed = int(time.time() - start_time)
             
@@ -341,10 +348,11 @@ class ApigeeDeployer:
                     data = response.json()
                     state = data.get('state', 'unknown')
                     
-                    if state == 'deployed':
+                    # Apigee X reports READY; 'deployed' is the Apigee Edge equivalent
+                    if state in ['READY', 'deployed']:
                         print_success("  ✓ Deployment is READY!")
                         return True
-                    elif state in ['error', 'failed']:
+                    elif state in ['ERROR', 'error', 'failed']:
                         print_error(f"  ✗ Deployment FAILED with state: {state}")
                         return False
                     else:
@@ -362,7 +370,7 @@ class ApigeeDeployer:
     def get_current_deployment(self) -> Optional[Dict[str, Any]]:
         """Get current deployment information"""
         url = (
-            f"{self.BASE_URL}/organizations/{self.organization}/"
+            f"{self.base_url}/organizations/{self.organization}/"
             f"environments/{self.apigee_env}/apis/{self.PROXY_NAME}/deployments"
         )
         
@@ -378,7 +386,13 @@ class ApigeeDeployer:
         except:
             return None
     
-    def full_deploy(self, wait: bool = True, bundle_only: bool = False, override: bool = False) -> Dict[str, Any]:
+    def full_deploy(
+        self,
+        wait: bool = True,
+        bundle_only: bool = False,
+        override: bool = False,
+        timeout: int = 120
+    ) -> Dict[str, Any]:
         """Execute full deployment workflow"""
         result = {
             'proxy_name': self.PROXY_NAME,
@@ -417,7 +431,7 @@ class ApigeeDeployer:
             
             # Step 4: Wait for deployment
             if wait:
-                ready = self.check_deployment_status(revision)
+                ready = self.check_deployment_status(revision, timeout=timeout)
                 result['ready'] = ready
                 result['success'] = ready
             else:
@@ -514,6 +528,18 @@ Examples:
         help='Override existing deployment'
     )
     
+    parser.add_argument(
+        '--base-url',
+        help='Management API base URL, e.g. a local emulator (default: APIGEE_BASE_URL or Apigee X)'
+    )
+    
+    parser.add_argument(
+        '--poll-interval',
+        type=float,
+        default=2,
+        help='Seconds between deployment status checks (default: 2)'
+    )
+    
     args = parser.parse_args()
     
     # Print header
@@ -528,7 +554,9 @@ Examples:
         deployer = ApigeeDeployer(
             env=args.env,
             organization=args.org,
-            token=args.token
+            token=args.token,
+            base_url=args.base_url,
+            poll_interval=args.poll_interval
         )
         
         # Check prerequisites
@@ -554,7 +582,8 @@ Examples:
         result = deployer.full_deploy(
             wait=not args.no_wait,
             bundle_only=args.bundle_only,
-            override=args.override
+            override=args.override,
+            timeout=args.timeout
         )
         
         # Print summary
@@ -15,14 +15,14 @@ import sys
 import json
 import time
 import argparse
-import requests
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, Optional, Tuple
 
-from google.auth import default
-from google.auth.transport.requests import Request
-from google.oauth2 import service_account
+from utils.config_model import load_config
+from utils.lazy_import import lazy_import
+
+requests = lazy_import('requests')
 
 
 class ApigeeXClient:
@@ -30,13 +30,25 @@ class ApigeeXClient:
     
     BASE_URL = "https://apigee.googleapis.com/v1"
     
-    def __init__(self, org: str, credentials_path: str = None):
+    def __init__(
+        self,
+        org: str,
+        credentials_path: str = None,
+        base_url: str = None,
+        token: str = None
+    ):
         self.org = org
-        self.credentials = self._get_credentials(credentials_path)
+        self.base_url = (base_url or os.getenv('APIGEE_BASE_URL') or self.BASE_URL).rstrip('/')
+        self.token = token
+        self.credentials = None if token else self._get_credentials(credentials_path)
         self.session = requests.Session()
     
     def _get_credentials(self, credentials_path: str = None):
         """Get Google Cloud credentials."""
+        # Imported here: the Google auth stack is slow to load and unused with a token
+        from google.auth import default
+        from google.oauth2 import service_account
+        
         if credentials_path:
             credentials = service_account.Credentials.from_service_account_file(
                 credentials_path,
@@ -50,13 +62,16 @@ class ApigeeXClient:
     
     def _get_auth_header(self) -> Dict[str, str]:
         """Get authorization header with fresh token."""
+        if self.token:
+            return {"Authorization": f"Bearer {self.token}"}
         if not self.credentials.valid:
+            from google.auth.transport.requests import Request
             self.credentials.refresh(Request())
         return {"Authorization": f"Bearer {self.credentials.token}"}
     
-    def _make_request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+    def _make_request(self, method: str, endpoint: str, **kwargs) -> 'requests.Response':
         """Make authenticated request to Apigee API."""
-        url = f"{self.BASE_URL}/{endpoint}"
+        url = f"{self.base_url}/{endpoint}"
         headers = self._get_auth_header()
         headers.update(kwargs.pop('headers', {}))
         
@@ -143,13 +158,51 @@ class ApigeeXClient:
         response = self._make_request('DELETE', endpoint)
         return response.status_code in [200, 204]
     
+    def get_target_server(self, env: str, name: str) -> Optional[Dict[str, Any]]:
+        """Get a TargetServer (None if it does not exist)."""
+        endpoint = f"organizations/{self.org}/environments/{env}/targetservers/{name}"
+        response = self._make_request('GET', endpoint)
+        
+        if response.status_code == 200:
+            return response.json()
+        elif response.status_code == 404:
+            return None
+        else:
+            raise RuntimeError(
+                f"Failed to get target server: {response.status_code} - {response.text}"
+            )
+    
+    def put_target_server(self, env: str, server: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Create a TargetServer or update it when it differs.
+        
+        Returns:
+            ('created' | 'updated' | 'unchanged', the TargetServer)
+        """
+        existing = self.get_target_server(env, server['name'])
+        if existing is not None and all(existing.get(key) == value for key, value in server.items()):
+            return 'unchanged', existing
+        
+        endpoint = f"organizations/{self.org}/environments/{env}/targetservers"
+        if existing is None:
+            response = self._make_request('POST', endpoint, json=server)
+        else:
+            response = self._make_request('PUT', f"{endpoint}/{server['name']}", json=server)
+        
+        if response.status_code in [200, 201]:
+            return ('created' if existing is None else 'updated'), response.json()
+        else:
+            raise RuntimeError(
+                f"Failed to save target server: {response.status_code} - {response.text}"
+            )
+    
     def wait_for_deployment(
         self,
         proxy_name: str,
         revision: str,
         env: str,
         timeout: int = 120,
-        interval: int = 5
+        interval: float = 5
     ) -> bool:
         """Wait for deployment to complete."""
         start_time = time.time()
@@ -179,27 +232,25 @@ class ProxyDeployer:
     
     PROXY_NAME = "cropwise-unified-platform"
     
-    def __init__(self, env: str, config_path: str = None, credentials_path: str = None):
+    def __init__(
+        self,
+        env: str,
+        config_path: str = None,
+        credentials_path: str = None,
+        base_url: str = None,
+        token: str = None
+    ):
         self.env = env
-        self.config = self._load_config(config_path)
-        self.env_config = self.config["environments"].get(env)
-        
-        if not self.env_config:
-            raise ValueError(f"Environment '{env}' not found in configuration")
+        self.config = load_config(environments_path=config_path)
+        self.env_config = self.config.env(env)
         
         self.client = ApigeeXClient(
             org=self.env_config['apigee_org'],
-            credentials_path=credentials_path
+            credentials_path=credentials_path,
+            base_url=base_url,
+            token=token
         )
     
-    def _load_config(self, config_path: str = None) -> Dict[str, Any]:
-        """Load configuration from file."""
-        path = Path(config_path) if config_path else (
-            Path(__file__).parent.parent / "config" / "environments.json"
-        )
-        with open(path, 'r') as f:
-            return json.load(f)
-    
     def upload(self, bundle_path: str) -> Tuple[str, str]:
         """Upload the proxy bundle."""
         print(f"\n📦 Uploading proxy bundle: {bundle_path}")
@@ -210,6 +261,20 @@ class ProxyDeployer:
         print(f"  ✅ Uploaded successfully - Revision: {revision}")
         return self.PROXY_NAME, revision
     
+    def sync_target_servers(self) -> Dict[str, str]:
+        """Create or update the environment's TargetServers from backend_servers."""
+        env = self.env_config['apigee_env']
+        protocol = self.env_config.get('backend_protocol', 'https')
+        servers = [server.target_server(protocol) for server in self.env_config.backend_servers]
+        
+        print(f"\n🖥️  Syncing {len(servers)} target servers in {env}...")
+        actions = {}
+        for server in servers:
+            action, _ = self.client.put_target_server(env, server)
+            actions[server['name']] = action
+            print(f"  ✅ {server['name']} ({server['host']}:{server['port']}): {action}")
+        return actions
+    
     def deploy(self, revision: str, undeploy_existing: bool = True) -> Dict[str, Any]:
         """Deploy the proxy revision to the environment."""
         env = self.env_config['apigee_env']
@@ -231,7 +296,7 @@ class ProxyDeployer:
         
         return result
     
-    def wait_for_ready(self, revision: str, timeout: int = 120) -> bool:
+    def wait_for_ready(self, revision: str, timeout: int = 120, poll_interval: float = 5) -> bool:
         """Wait for deployment to be ready."""
         env = self.env_config['apigee_env']
         
@@ -242,7 +307,8 @@ class ProxyDeployer:
                 self.PROXY_NAME,
                 revision,
                 env,
-                timeout=timeout
+                timeout=timeout,
+                interval=poll_interval
             )
             print(f"  ✅ Deployment is READY!")
             return True
@@ -259,7 +325,8 @@ class ProxyDeployer:
         self,
         bundle_path: str,
         wait: bool = True,
-        timeout: int = 120
+        timeout: int = 120,
+        poll_interval: float = 5
     ) -> Dict[str, Any]:
         """Perform full deployment: upload, deploy, and optionally wait."""
         
@@ -271,6 +338,10 @@ class ProxyDeployer:
         }
         
         try:
+            # Load-balanced bundles reference TargetServers that must exist first
+            if self.env_config.backend_servers:
+                result['target_servers'] = self.sync_target_servers()
+            
             # Upload
             _, revision = self.upload(bundle_path)
             result['revision'] = revision
@@ -281,7 +352,7 @@ class ProxyDeployer:
             
             # Wait
             if wait:
-                ready = self.wait_for_ready(revision, timeout)
+                ready = self.wait_for_ready(revision, timeout, poll_interval)
                 result['ready'] = ready
                 result['success'] = ready
             else:
@@ -351,6 +422,16 @@ def main():
         default=None,
         help='Path to service account credentials JSON'
     )
+    parser.add_argument(
+        '--base-url',
+        default=None,
+        help='Management API base URL, e.g. a local emulator (default: APIGEE_BASE_URL or Apigee X)'
+    )
+    parser.add_argument(
+        '--token',
+        default=None,
+        help='Access token to use instead of Google credentials'
+    )
     parser.add_argument(
         '--status', '-s',
         action='store_true',
@@ -369,7 +450,9 @@ def main():
         deployer = ProxyDeployer(
             env=args.env,
             config_path=args.config,
-            credentials_path=args.credentials
+            credentials_path=args.credentials,
+            base_url=args.base_url,
+            token=args.token
         )
         
         if args.status:
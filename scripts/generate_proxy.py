@@ -9,9 +9,12 @@ Usage:
     python scripts/generate_proxy.py --env dev
     python scripts/generate_proxy.py --env qa --output ./dist
     python scripts/generate_proxy.py --env prod --validate
+    python scripts/generate_proxy.py --env prod --jwt-parser optimized
+    python scripts/generate_proxy.py --env prod --route-traffic logs/prod.log.gz --route-report ./dist/routes.json
 """
 
 import os
+import re
 import sys
 import json
 import shutil
@@ -20,27 +23,64 @@ import argparse
 import xml.etree.ElementTree as ET
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit
+
+from utils.config_model import load_config
+from utils.policy_analyzer import PolicyCostAnalyzer
+from utils.policy_templates import (
+    extract_variables_policy, lookup_cache_policy, populate_cache_policy,
+    write_policy, find_step, and_condition, insert_steps, register_policies, make_route_rule,
+    make_load_balancer, make_health_monitor
+)
+from utils.route_compiler import RouteCompiler, RouteTable, load_traffic, read_only_condition
+
+
+# JavaScript resource used by JS-Parse-JWT-Token for each parser variant
+JWT_PARSER_SCRIPTS = {
+    'standard': 'parse-jwt-token.js',
+    'optimized': 'parse-jwt-token-optimized.js',
+}
+
+DEFAULT_CACHE_TTL_SECONDS = 300
+
+# Limit reported by RF-PayloadTooLarge as shipped (30 MB buffered)
+DEFAULT_MAX_PAYLOAD_BYTES = 31457280
+MB = 1024 * 1024
 
 
 class ProxyGenerator:
     """Generates Apigee X proxy bundles with environment-specific configurations."""
     
-    def __init__(self, base_dir: str, env: str, config_path: str = None):
+    def __init__(
+        self,
+        base_dir: str,
+        env: str,
+        config_path: str = None,
+        jwt_parser: str = 'standard',
+        cache_rate_limits: bool = False,
+        route_traffic: Dict[str, int] = None,
+        read_replica: bool = False
+    ):
         self.base_dir = Path(base_dir)
         self.env = env
         self.config_path = config_path or self.base_dir / "config" / "environments.json"
         self.apiproxy_dir = self.base_dir / "apiproxy"
-        self.config = self._load_config()
-        self.env_config = self.config["environments"].get(env)
+        self.config = load_config(self.base_dir / "config", environments_path=self.config_path)
+        self.env_config = self.config.env(env)
         
-        if not self.env_config:
-            raise ValueError(f"Environment '{env}' not found in configuration")
+        if jwt_parser not in JWT_PARSER_SCRIPTS:
+            raise ValueError(f"Unknown JWT parser '{jwt_parser}'")
+        self.jwt_parser = jwt_parser
+        self.cache_rate_limits = cache_rate_limits
+        self.route_traffic = route_traffic or {}
+        self.read_replica = read_replica
+        self.route_table: Optional[RouteTable] = None
+        self.policies_config = self.config.policies
     
-    def _load_config(self) -> Dict[str, Any]:
-        """Load environment configuration from JSON file."""
-        with open(self.config_path, 'r') as f:
-            return json.load(f)
+    def _cache_settings(self, policy_name: str) -> Dict[str, Any]:
+        """Cache settings configured for a policy in policies.json."""
+        return self.policies_config.get(policy_name, {}).get('cache', {})
     
     def _update_target_endpoint(self, target_file: Path, temp_dir: Path) -> None:
         """Update target endpoint with environment-specific backend settings."""
@@ -50,9 +90,11 @@ class ProxyGenerator:
         # Update HTTPTargetConnection
         http_target = root.find('.//HTTPTargetConnection')
         if http_target is not None:
-            # Update URL
+            # Load-balanced TargetServers replace the single URL
             url_elem = http_target.find('URL')
-            if url_elem is not None:
+            if self.env_config.backend_servers:
+                self._apply_load_balancer(http_target)
+            elif url_elem is not None:
                 protocol = self.env_config.get('backend_protocol', 'https')
                 host = self.env_config['backend_host']
                 port = self.env_config.get('backend_port', 443)
@@ -68,8 +110,42 @@ class ProxyGenerator:
         # Write updated file
         output_file = temp_dir / "targets" / target_file.name
         output_file.parent.mkdir(parents=True, exist_ok=True)
+        if self.env_config.backend_servers:
+            ET.indent(tree, space='    ')
         tree.write(output_file, encoding='UTF-8', xml_declaration=True)
     
+    def _apply_load_balancer(self, http_target: ET.Element) -> None:
+        """Replace the target URL with a <LoadBalancer> over backend_servers and a <HealthMonitor>."""
+        servers = self.env_config.backend_servers
+        settings = self.env_config.load_balancer
+        balancer = make_load_balancer(
+            [(server.name, server.weight) for server in servers],
+            settings.algorithm,
+            settings.max_failures
+        )
+        children = list(http_target)
+        url_elem = http_target.find('URL')
+        position = children.index(url_elem) if url_elem is not None else 0
+        for tag in ('URL', 'LoadBalancer', 'HealthMonitor'):
+            for elem in http_target.findall(tag):
+                http_target.remove(elem)
+        http_target.insert(position, balancer)
+        
+        monitor = settings.health_monitor
+        if monitor is not None:
+            http_target.append(make_health_monitor(
+                monitor.path,
+                servers[0].port,
+                monitor.interval_seconds,
+                monitor.timeout_seconds,
+                monitor.success_codes
+            ))
+    
+    def target_servers(self) -> List[Dict[str, Any]]:
+        """TargetServer definitions the environment needs before the bundle deploys."""
+        protocol = self.env_config.get('backend_protocol', 'https')
+        return [server.target_server(protocol) for server in self.env_config.backend_servers]
+    
     def _update_proxy_endpoint(self, proxy_file: Path, temp_dir: Path) -> None:
         """Update proxy endpoint with environment-specific settings."""
         tree = ET.parse(proxy_file)
@@ -158,6 +234,249 @@ class ProxyGenerator:
                 
                 tree.write(temp_dir / xml_file.name, encoding='UTF-8', xml_declaration=True)
     
+    def _add_generated_steps(
+        self,
+        temp_dir: Path,
+        policies: list,
+        anchor: str,
+        before: list = (),
+        after: list = (),
+        anchor_clause: str = None
+    ) -> None:
+        """Write generated policies and wire their steps around an existing PreFlow step."""
+        for policy in policies:
+            write_policy(policy, temp_dir / "policies")
+        
+        proxy_file = temp_dir / "proxies" / "default.xml"
+        tree = ET.parse(proxy_file)
+        request = tree.getroot().find('./PreFlow/Request')
+        if request is None or not insert_steps(request, anchor, before, after):
+            raise ValueError(f"Step '{anchor}' not found in the default PreFlow")
+        if anchor_clause:
+            and_condition(find_step(request, anchor), anchor_clause)
+        ET.indent(tree, space='    ')
+        tree.write(proxy_file, encoding='UTF-8', xml_declaration=True)
+        
+        for descriptor_file in temp_dir.glob("*.xml"):
+            tree = ET.parse(descriptor_file)
+            register_policies(tree.getroot(), (p.get('name') for p in policies))
+            tree.write(descriptor_file, encoding='UTF-8', xml_declaration=True)
+    
+    def _apply_jwt_parser(self, temp_dir: Path) -> None:
+        """Switch JS-Parse-JWT-Token to the selected parser and add its claims cache."""
+        if self.jwt_parser == 'standard':
+            return
+        
+        policy_file = temp_dir / "policies" / "JS-Parse-JWT-Token.xml"
+        tree = ET.parse(policy_file)
+        tree.getroot().find('ResourceURL').text = f"jsc://{JWT_PARSER_SCRIPTS[self.jwt_parser]}"
+        tree.write(policy_file, encoding='UTF-8', xml_declaration=True)
+        
+        # Decoded claims are cached under the token signature
+        cache = self._cache_settings('JS-Parse-JWT-Token')
+        ttl = cache.get('ttl_seconds', DEFAULT_CACHE_TTL_SECONDS)
+        resource = cache.get('cache_resource')
+        self._add_generated_steps(
+            temp_dir,
+            [
+                extract_variables_policy(
+                    'EV-Extract-JWT-Signature', 'jwt.token',
+                    '{header}.{payload}.{signature}', 'jwt'
+                ),
+                lookup_cache_policy(
+                    'LC-JWT-Claims', 'jwt.signature', 'jwt.cached.claims',
+                    prefix='jwt-claims', cache_resource=resource
+                ),
+                populate_cache_policy(
+                    'PC-JWT-Claims', 'jwt.signature', 'jwt.claims.cache', ttl,
+                    prefix='jwt-claims', cache_resource=resource
+                ),
+            ],
+            anchor='JS-Parse-JWT-Token',
+            before=[
+                ('EV-Extract-JWT-Signature', '(jwt.token != null)'),
+                ('LC-JWT-Claims', '(jwt.signature != null)'),
+            ],
+            after=[
+                ('PC-JWT-Claims', '(jwt.claims.cache != null)'),
+            ]
+        )
+    
+    def _apply_rate_limit_cache(self, temp_dir: Path) -> None:
+        """Serve KVM-Get-User-Rate-Limit from a cache, reading the KVM only on a miss."""
+        cache = self._cache_settings('KVM-Get-User-Rate-Limit')
+        ttl = cache.get('ttl_seconds', DEFAULT_CACHE_TTL_SECONDS)
+        resource = cache.get('cache_resource')
+        miss = '(lookupcache.LC-User-Rate-Limit.cachehit = false)'
+        self._add_generated_steps(
+            temp_dir,
+            [
+                lookup_cache_policy(
+                    'LC-User-Rate-Limit', 'jwt.username', 'user.rate.limit.type',
+                    prefix='user-rate-limit', cache_resource=resource
+                ),
+                populate_cache_policy(
+                    'PC-User-Rate-Limit', 'jwt.username', 'user.rate.limit.type', ttl,
+                    prefix='user-rate-limit', cache_resource=resource
+                ),
+            ],
+            anchor='KVM-Get-User-Rate-Limit',
+            before=[
+                ('LC-User-Rate-Limit', '(jwt.valid = true) and (jwt.username != null)'),
+            ],
+            after=[
+                ('PC-User-Rate-Limit', f'{miss} and (user.rate.limit.type != null)'),
+            ],
+            anchor_clause=miss
+        )
+    
+    def _payload_limit_policy(self, temp_dir: Path, limit: int) -> str:
+        """Name of the RF-PayloadTooLarge variant reporting `limit`, writing it if needed."""
+        if limit == DEFAULT_MAX_PAYLOAD_BYTES:
+            return 'RF-PayloadTooLarge'
+        name = f"RF-PayloadTooLarge-{limit // MB}MB" if limit % MB == 0 else f"RF-PayloadTooLarge-{limit}B"
+        policy = ET.parse(self.apiproxy_dir / "policies" / "RF-PayloadTooLarge.xml").getroot()
+        policy.set('name', name)
+        policy.find('DisplayName').text = name
+        payload = policy.find('.//Payload')
+        payload.text = re.sub(r'("max_size_bytes":\s*)\d+', rf'\g<1>{limit}', payload.text)
+        payload.text = re.sub(r'("max_size(?:_buffered)?_mb":\s*)\d+', rf'\g<1>{limit / MB:g}', payload.text)
+        write_policy(policy, temp_dir / "policies")
+        return name
+    
+    def _rewrite_policy_names(self, policies_dir: Path) -> List[str]:
+        """AssignMessage policies that set the target path."""
+        names = []
+        for policy_file in policies_dir.glob("*.xml"):
+            root = ET.parse(policy_file).getroot()
+            if root.tag == 'AssignMessage' and root.find('./Set/Path') is not None:
+                names.append(root.get('name', policy_file.stem))
+        return names
+    
+    def _compile_routes(self, temp_dir: Path) -> RouteTable:
+        """
+        Replace the proxy endpoint's conditional flows with the route table
+        compiled from endpoints.json (see utils.route_compiler), including
+        route-scoped streaming and payload limits. Rewrites from path_rewrites
+        are generated only when compile_path_rewrites is set; otherwise each
+        route keeps the hand-written flow's rewrite steps and backend path.
+        
+        The result is checked with the policy analyzer: streaming routes must
+        not run body-inspecting policies.
+        """
+        proxy_file = temp_dir / "proxies" / "default.xml"
+        tree = ET.parse(proxy_file)
+        flows = tree.getroot().find('Flows')
+        if flows is None:
+            flows = ET.SubElement(tree.getroot(), 'Flows')
+        
+        # Generated rewrites change the backend paths, so they wait for compile_path_rewrites
+        compiler = RouteCompiler(
+            self.config.path_mappings,
+            self.config.path_rewrites() if self.config.compile_path_rewrites else {},
+            flows.findall('Flow'),
+            rewrite_policies=self._rewrite_policy_names(temp_dir / "policies"),
+            traffic=self.route_traffic,
+            limit_policy=lambda limit: self._payload_limit_policy(temp_dir, limit)
+        )
+        table = compiler.compile()
+        for policy in table.policies:
+            write_policy(policy, temp_dir / "policies")
+        for flow in list(flows):
+            flows.remove(flow)
+        flows.extend(table.flows)
+        ET.indent(tree, space='    ')
+        tree.write(proxy_file, encoding='UTF-8', xml_declaration=True)
+        
+        for descriptor_file in temp_dir.glob("*.xml"):
+            descriptor = ET.parse(descriptor_file)
+            register_policies(descriptor.getroot(), table.step_policies)
+            descriptor.write(descriptor_file, encoding='UTF-8', xml_declaration=True)
+        
+        errors = [finding.message for finding in PolicyCostAnalyzer(temp_dir).analyze().errors]
+        if errors:
+            raise ValueError("Invalid route table:\n    " + "\n    ".join(errors))
+        compiler.print_report(table)
+        return table
+    
+    def _read_replica_enabled(self) -> bool:
+        """
+        Whether read_only_routes are routed for this bundle: only when the
+        environment sets the replica's own host (e.g. read_replica_host) or
+        the generator was asked to, so no environment starts sending reads
+        to a replica it has not provisioned.
+        """
+        routes = self.config.read_only_routes
+        if routes is None:
+            return False
+        return self.read_replica or bool(self.config.endpoints[routes.target].own_host(self.env_config))
+    
+    def _add_read_replica(self, temp_dir: Path) -> Optional[str]:
+        """
+        Route read_only_routes from endpoints.json to their read-replica target.
+        
+        The target endpoint is derived from the generated default target with
+        the replica's URL, and a conditional RouteRule (see
+        utils.route_compiler.read_only_condition) goes ahead of the default
+        one, so no JavaScript runs to pick the target.
+        
+        Returns:
+            The RouteRule condition, or None when no read-only routes are configured
+        """
+        routes = self.config.read_only_routes
+        if routes is None:
+            return None
+        endpoint = self.config.endpoints[routes.target]
+        
+        target_file = temp_dir / "targets" / f"{routes.target}.xml"
+        if not target_file.exists():
+            tree = ET.parse(temp_dir / "targets" / "default.xml")
+            root = tree.getroot()
+            root.set('name', routes.target)
+            description = root.find('Description')
+            if description is not None and endpoint.description:
+                description.text = endpoint.description
+            http_target = root.find('HTTPTargetConnection')
+            if http_target is not None and http_target.find('LoadBalancer') is not None:
+                if endpoint.own_host(self.env_config):
+                    # Separate replica host: a plain URL instead of the primary's servers
+                    for tag in ('LoadBalancer', 'HealthMonitor'):
+                        for elem in http_target.findall(tag):
+                            http_target.remove(elem)
+                    ET.SubElement(http_target, 'URL').text = endpoint.url(self.env_config)
+                else:
+                    # Same servers, replica path (e.g. /read-only)
+                    ET.SubElement(http_target, 'Path').text = urlsplit(endpoint.url(self.env_config)).path or '/'
+            elif http_target is not None and http_target.find('URL') is not None:
+                http_target.find('URL').text = endpoint.url(self.env_config)
+            ET.indent(tree, space='    ')
+            tree.write(target_file, encoding='UTF-8', xml_declaration=True)
+        
+        condition = read_only_condition(routes)
+        proxy_file = temp_dir / "proxies" / "default.xml"
+        tree = ET.parse(proxy_file)
+        root = tree.getroot()
+        rules = root.findall('RouteRule')
+        for rule in rules:
+            if rule.get('name') == routes.target:
+                root.remove(rule)
+        rules = [rule for rule in rules if rule.get('name') != routes.target]
+        position = list(root).index(rules[0]) if rules else len(root)
+        root.insert(position, make_route_rule(routes.target, routes.target, condition))
+        ET.indent(tree, space='    ')
+        tree.write(proxy_file, encoding='UTF-8', xml_declaration=True)
+        
+        for descriptor_file in temp_dir.glob("*.xml"):
+            descriptor = ET.parse(descriptor_file)
+            targets = descriptor.getroot().find('TargetEndpoints')
+            if targets is None:
+                targets = ET.SubElement(descriptor.getroot(), 'TargetEndpoints')
+            if routes.target not in {t.text for t in targets.findall('TargetEndpoint')}:
+                ET.SubElement(targets, 'TargetEndpoint').text = routes.target
+                ET.indent(descriptor, space='    ')
+            descriptor.write(descriptor_file, encoding='UTF-8', xml_declaration=True)
+        return condition
+    
     def validate(self) -> bool:
         """Validate the proxy structure and configuration."""
         errors = []
@@ -183,11 +502,20 @@ class ProxyGenerator:
                 errors.append(f"Missing required policy: {policy}")
         
         # Validate XML syntax
+        xml_valid = True
         for xml_file in self.apiproxy_dir.rglob("*.xml"):
             try:
                 ET.parse(xml_file)
             except ET.ParseError as e:
                 errors.append(f"Invalid XML in {xml_file.name}: {e}")
+                xml_valid = False
+        
+        # Analyze policy execution cost on the request critical path
+        if xml_valid and all((self.apiproxy_dir / d).exists() for d in required_dirs):
+            analyzer = PolicyCostAnalyzer(self.apiproxy_dir)
+            report = analyzer.analyze()
+            analyzer.print_report(report)
+            errors.extend(finding.message for finding in report.errors)
         
         if errors:
             print("Validation Errors:")
@@ -236,6 +564,28 @@ class ProxyGenerator:
             print("  → Copying resources...")
             self._copy_resources(temp_dir)
             
+            # Route table from endpoints.json
+            print("  → Compiling routes from endpoints.json...")
+            self.route_table = self._compile_routes(temp_dir)
+            if self._read_replica_enabled():
+                print(f"  → Routing read-only requests to {self.config.read_only_routes.target}...")
+                self._add_read_replica(temp_dir)
+            
+            # Apply optional policy variants
+            if self.jwt_parser != 'standard':
+                print(f"  → Applying {self.jwt_parser} JWT parser with claims cache...")
+                self._apply_jwt_parser(temp_dir)
+            if self.cache_rate_limits:
+                print("  → Adding rate-limit cache in front of the KVM lookup...")
+                self._apply_rate_limit_cache(temp_dir)
+            
+            # TargetServers live in the environment, not the bundle
+            if self.env_config.backend_servers:
+                servers_path = output_path / f"{bundle_name}-targetservers.json"
+                with open(servers_path, 'w') as f:
+                    json.dump(self.target_servers(), f, indent=2)
+                print(f"  → Target servers ({self.env_config.load_balancer.algorithm}): {servers_path}")
+            
             # Create ZIP bundle
             zip_path = output_path / f"{bundle_name}.zip"
             print(f"  → Creating bundle: {zip_path}")
@@ -284,6 +634,32 @@ def main():
         default=None,
         help='Path to environments.json configuration file'
     )
+    parser.add_argument(
+        '--jwt-parser',
+        choices=sorted(JWT_PARSER_SCRIPTS),
+        default='standard',
+        help='JWT parsing script variant (optimized adds a claims cache)'
+    )
+    parser.add_argument(
+        '--cache-rate-limits',
+        action='store_true',
+        help='Cache user rate-limit KVM lookups (TTL from config/policies.json)'
+    )
+    parser.add_argument(
+        '--route-traffic',
+        default=None,
+        help='Request counts per path (JSON, syslog_sink report or FC-Syng-Logging log) to order flows busiest first'
+    )
+    parser.add_argument(
+        '--read-replica',
+        action='store_true',
+        help='Route read_only_routes to their replica target even if the environment sets no replica host'
+    )
+    parser.add_argument(
+        '--route-report',
+        default=None,
+        help='Write the compiled route table as JSON to this file'
+    )
     
     args = parser.parse_args()
     
@@ -291,10 +667,19 @@ def main():
     base_dir = Path(__file__).parent.parent
     
     try:
+        route_traffic = None
+        if args.route_traffic:
+            base_path = load_config(base_dir / "config", environments_path=args.config).env(args.env).get('base_path', '')
+            route_traffic = load_traffic(args.route_traffic, base_path)
+        
         generator = ProxyGenerator(
             base_dir=str(base_dir),
             env=args.env,
-            config_path=args.config
+            config_path=args.config,
+            jwt_parser=args.jwt_parser,
+            cache_rate_limits=args.cache_rate_limits,
+            route_traffic=route_traffic,
+            read_replica=args.read_replica
         )
         
         if args.validate:
@@ -302,6 +687,11 @@ def main():
                 sys.exit(1)
         
         bundle_path = generator.generate(args.output)
+        if args.route_report:
+            Path(args.route_report).parent.mkdir(parents=True, exist_ok=True)
+            with open(args.route_report, 'w') as f:
+                json.dump(generator.route_table.to_dict(), f, indent=2)
+            print(f"📄 Route table saved: {args.route_report}")
         print(f"\nBundle ready for deployment: {bundle_path}")
         
     except Exception as e:
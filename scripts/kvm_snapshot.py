@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Cropwise Unified Platform - KVM Snapshot
+
+Exports a KVM (default: user-rate-limits) page by page into a compact local
+snapshot (sorted key file plus sparse index), then answers point lookups and
+tier-distribution stats from the snapshot without re-downloading. Snapshots
+can be passed to simulate_rate_limits.py --kvm, run_gateway.py --kvm-store
+and kvm_sync.py --desired.
+
+Usage:
+    python scripts/kvm_snapshot.py --env prod --export
+    python scripts/kvm_snapshot.py --env prod --get grower@syngenta.com --get agronomist@syngenta.com
+    python scripts/kvm_snapshot.py --env dev --from-file user-rate-limits.csv --stats
+    python scripts/kvm_snapshot.py --snapshot ./dist/kvm/prod-user-rate-limits.kvs --stats --group-readonly
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+from utils.config_model import load_config
+from utils.kvm_snapshot import KvmSnapshot, export_snapshot, is_snapshot, write_snapshot
+
+
+BASE_DIR = Path(__file__).parent.parent
+KVM_NAME = 'user-rate-limits'
+
+
+def print_stats(stats: dict) -> None:
+    print(f"\n📊 {stats['kvm'] or 'KVM'} ({stats['env'] or '-'}): {stats['entries']} entries, "
+          f"{stats['bytes']} bytes, created {stats['created']}")
+    for value, info in stats['values'].items():
+        bar = '█' * max(1, round(info['fraction'] * 40)) if info['count'] else ''
+        print(f"    {value:<24} {info['count']:>9} {info['fraction'] * 100:6.2f}% {bar}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Export a KVM to a local snapshot and query it'
+    )
+    parser.add_argument(
+        '--env', '-e',
+        choices=['dev', 'qa', 'prod'],
+        default='dev',
+        help='Environment (default: dev)'
+    )
+    parser.add_argument(
+        '--kvm', '-k',
+        default=KVM_NAME,
+        help=f'KVM name (default: {KVM_NAME})'
+    )
+    parser.add_argument(
+        '--snapshot', '-s',
+        default=None,
+        help='Snapshot path (default: dist/kvm/<env>-<kvm>.kvs)'
+    )
+    parser.add_argument(
+        '--export',
+        action='store_true',
+        help='Download the KVM from the management API into the snapshot'
+    )
+    parser.add_argument(
+        '--from-file',
+        default=None,
+        help='Build the snapshot from a CSV/JSON entries file instead of exporting'
+    )
+    parser.add_argument(
+        '--get', '-g',
+        action='append',
+        default=[],
+        metavar='KEY',
+        help='Look up a key in the snapshot (repeatable)'
+    )
+    parser.add_argument(
+        '--stats',
+        action='store_true',
+        help='Show the value (tier) distribution (default when nothing else is requested)'
+    )
+    parser.add_argument(
+        '--group-readonly',
+        action='store_true',
+        help='Count readonly-* tiers under their base tier in --stats'
+    )
+    parser.add_argument(
+        '--page-size',
+        type=int,
+        default=1000,
+        help='Entries per page when exporting (default: 1000)'
+    )
+    parser.add_argument(
+        '--config', '-c',
+        default=None,
+        help='Path to environments.json configuration file'
+    )
+    parser.add_argument(
+        '--credentials',
+        default=None,
+        help='Path to service account credentials JSON'
+    )
+    parser.add_argument(
+        '--base-url',
+        default=None,
+        help='Management API base URL, e.g. a local emulator (default: APIGEE_BASE_URL or Apigee X)'
+    )
+    parser.add_argument(
+        '--token',
+        default=None,
+        help='Access token to use instead of Google credentials'
+    )
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Print stats and lookups as JSON'
+    )
+
+    args = parser.parse_args()
+
+    snapshot_path = args.snapshot or str(BASE_DIR / 'dist' / 'kvm' / f"{args.env}-{args.kvm}.kvs")
+
+    try:
+        if args.export:
+            from utils.apigee_client import ApigeeClient
+
+            env_config = load_config(environments_path=args.config).env(args.env)
+            client = ApigeeClient(
+                org=env_config['apigee_org'],
+                credentials_path=args.credentials,
+                base_url=args.base_url,
+                token=args.token
+            )
+            print(f"\n📥 Exporting {args.kvm} from {env_config['apigee_env']} to {snapshot_path}")
+            snapshot = export_snapshot(
+                client, env_config['apigee_env'], args.kvm, snapshot_path, args.page_size,
+                on_progress=lambda count: print(f"\r   {count} entries", end='', flush=True)
+            )
+            print()
+        elif args.from_file:
+            from utils.kvm_sync import load_entries
+
+            snapshot = write_snapshot(snapshot_path, load_entries(args.from_file, args.kvm), kvm_name=args.kvm, env=args.env)
+            print(f"\n📦 Wrote {len(snapshot)} entries to {snapshot_path}")
+        elif is_snapshot(snapshot_path):
+            snapshot = KvmSnapshot.open(snapshot_path)
+        else:
+            print(f"❌ No snapshot at {snapshot_path}; run with --export or --from-file first")
+            sys.exit(1)
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+
+    lookups = {key: snapshot.get(key) for key in args.get}
+    stats = snapshot.stats(args.group_readonly) if args.stats or not args.get else None
+
+    if args.json:
+        print(json.dumps({k: v for k, v in (("lookups", lookups), ("stats", stats)) if v}, indent=2))
+        return
+    for key, value in lookups.items():
+        print(f"  {key}: {value if value is not None else '(not set - default tier)'}")
+    if stats:
+        print_stats(stats)
+
+
+if __name__ == "__main__":
+    main()
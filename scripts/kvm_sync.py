@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Cropwise Unified Platform - KVM Sync
+
+Syncs a KVM (default: user-rate-limits) to a desired-state CSV/JSON file:
+fetches the current entries, diffs them and applies creates, updates and,
+with --prune, deletes concurrently with rate-limit-aware pacing. Progress is
+checkpointed per batch; re-running the same command resumes an interrupted
+sync without re-fetching the map.
+
+Usage:
+    python scripts/kvm_sync.py --env dev --desired user-rate-limits.csv --dry-run
+    python scripts/kvm_sync.py --env prod --desired user-rate-limits.csv --prune --concurrency 32
+    python scripts/kvm_sync.py --env dev --desired kvm.json --base-url http://127.0.0.1:8090/v1 --token test
+
+Desired-state CSV:
+    user,tier
+    grower@syngenta.com,high-rate
+    agronomist@syngenta.com,readonly-low-rate
+"""
+
+import sys
+import json
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+from utils.apigee_client import ApigeeClient
+from utils.config_model import load_config
+from utils.kvm_sync import KVM_NAME, KvmSync, diff_entries, load_entries
+
+
+BASE_DIR = Path(__file__).parent.parent
+
+
+def print_progress(done: int, total: int, result) -> None:
+    print(f"\r  [{done}/{total}] created {result.created}, updated {result.updated}, "
+          f"deleted {result.deleted}, failed {len(result.failed)}, throttled {result.throttled}, "
+          f"rate {result.final_rate:.1f}/s", end='', flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Sync an Apigee KVM to a desired-state file'
+    )
+    parser.add_argument(
+        '--env', '-e',
+        required=True,
+        choices=['dev', 'qa', 'prod'],
+        help='Target environment'
+    )
+    parser.add_argument(
+        '--desired', '-d',
+        required=True,
+        help='Desired entries: CSV (key,value), JSON (KVM store, {key: value} or keyValueEntries) or a .kvs snapshot'
+    )
+    parser.add_argument(
+        '--kvm', '-k',
+        default=KVM_NAME,
+        help=f'KVM name (default: {KVM_NAME})'
+    )
+    parser.add_argument(
+        '--prune',
+        action='store_true',
+        help='Delete entries that are not in the desired state'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Show the diff without applying it'
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=16,
+        help='Concurrent entry calls (default: 16)'
+    )
+    parser.add_argument(
+        '--max-rps',
+        type=float,
+        default=50.0,
+        help='Maximum entry calls per second; halved on 429 (default: 50)'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=500,
+        help='Operations per checkpointed batch (default: 500)'
+    )
+    parser.add_argument(
+        '--page-size',
+        type=int,
+        default=1000,
+        help='Entries per page when fetching the current state (default: 1000)'
+    )
+    parser.add_argument(
+        '--checkpoint',
+        default=None,
+        help='Checkpoint directory (default: dist/kvm-sync-<env>-<kvm>)'
+    )
+    parser.add_argument(
+        '--config', '-c',
+        default=None,
+        help='Path to environments.json configuration file'
+    )
+    parser.add_argument(
+        '--credentials',
+        default=None,
+        help='Path to service account credentials JSON'
+    )
+    parser.add_argument(
+        '--base-url',
+        default=None,
+        help='Management API base URL, e.g. a local emulator (default: APIGEE_BASE_URL or Apigee X)'
+    )
+    parser.add_argument(
+        '--token',
+        default=None,
+        help='Access token to use instead of Google credentials'
+    )
+    parser.add_argument(
+        '--output', '-o',
+        default=None,
+        help='Directory to save the sync result'
+    )
+
+    args = parser.parse_args()
+
+    env_config = load_config(environments_path=args.config).env(args.env)
+
+    try:
+        desired = load_entries(args.desired, args.kvm)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Failed to read desired state: {e}")
+        sys.exit(1)
+
+    checkpoint = args.checkpoint or str(BASE_DIR / 'dist' / f"kvm-sync-{args.env}-{args.kvm}")
+    try:
+        client = ApigeeClient(
+            org=env_config['apigee_org'],
+            credentials_path=args.credentials,
+            base_url=args.base_url,
+            token=args.token
+        )
+        sync = KvmSync(
+            client,
+            env_config['apigee_env'],
+            args.kvm,
+            concurrency=args.concurrency,
+            max_rps=args.max_rps,
+            batch_size=args.batch_size,
+            checkpoint_dir=None if args.dry_run else checkpoint,
+            progress=print_progress
+        )
+
+        print(f"\n🔑 Syncing KVM {args.kvm} in {env_config['apigee_env']} to {len(desired)} entries from {args.desired}")
+        exists = client.get_kvm(env_config['apigee_env'], args.kvm) is not None
+        if not exists and not args.dry_run:
+            client.create_kvm(env_config['apigee_env'], args.kvm)
+            print(f"   Created KVM {args.kvm}")
+
+        if exists or not args.dry_run:
+            operations = sync.plan(
+                desired,
+                prune=args.prune,
+                page_size=args.page_size,
+                on_page=lambda count: print(f"\r   Fetched {count} current entries", end='', flush=True)
+            )
+        else:
+            print(f"   KVM {args.kvm} does not exist; it would be created")
+            operations = diff_entries({}, desired)
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+
+    counts = {op: sum(1 for o in operations if o.op == op) for op in ('create', 'update', 'delete')}
+    if sync.resumed:
+        print(f"\n   ⏯️  Resuming from checkpoint: {sync.resumed} operations already applied")
+    print(f"\n📋 Plan: {counts['create']} creates, {counts['update']} updates, {counts['delete']} deletes")
+
+    if args.dry_run:
+        for op in operations[:20]:
+            print(f"    • {op.op:<6} {op.key}" + (f" = {op.value}" if op.value is not None else ""))
+        if len(operations) > 20:
+            print(f"    ... {len(operations) - 20} more")
+        return
+    if not operations:
+        print("\n✅ KVM already in sync")
+        return
+
+    try:
+        result = sync.apply(operations)
+    except KeyboardInterrupt:
+        print(f"\n⏹️  Interrupted; re-run the same command to resume from {checkpoint}")
+        sys.exit(130)
+
+    summary = result.to_dict()
+    print(f"\n\n📊 Applied {result.applied} operations in {summary['elapsed_s']}s "
+          f"({summary['calls_per_s']}/s), {result.retries} retries, {result.throttled} throttled")
+    if result.failed:
+        print(f"❌ {len(result.failed)} operations failed; re-run to retry them (checkpoint: {checkpoint})")
+        for op, key, error in result.failed[:10]:
+            print(f"    • {op} {key}: {error}")
+
+    if args.output:
+        output_dir = Path(args.output)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        output_file = output_dir / f"kvm-sync-{args.env}-{timestamp}.json"
+        with open(output_file, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"\n📄 Result saved: {output_file}")
+
+    if result.failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
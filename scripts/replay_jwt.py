@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Cropwise Unified Platform - JWT Replay
+
+Replays a file of captured tokens through the Python reference of
+parse-jwt-token.js and summarizes the variables the proxy would have set:
+valid/expired/error counts, error messages and the busiest users and clients.
+
+Each line of the input may be a raw token, ``Bearer <token>`` or a full
+``Authorization: Bearer <token>`` header. Gzip files are read transparently.
+
+Usage:
+    python scripts/replay_jwt.py --input tokens.txt
+    python scripts/replay_jwt.py --input access-2026-01-31.log.gz --now 1769900000
+    python scripts/replay_jwt.py --input tokens.txt --top 20 --output ./dist
+"""
+
+import sys
+import gzip
+import json
+import time
+import argparse
+from collections import Counter
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, Optional
+
+from utils.jwt_reference import parse_jwt_batch
+
+
+def extract_token(line: str) -> Optional[str]:
+    """Pull the token out of a raw token, Bearer value or Authorization header line."""
+    line = line.strip()
+    if not line:
+        return None
+    if line.lower().startswith('authorization:'):
+        line = line.split(':', 1)[1].strip()
+    if line.lower().startswith('bearer '):
+        line = line[7:].strip()
+    return line
+
+
+def iter_tokens(path: Path) -> Iterator[Optional[str]]:
+    """Stream tokens from a (optionally gzip-compressed) file."""
+    opener = gzip.open if path.suffix == '.gz' else open
+    with opener(path, 'rt', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            if line.strip():
+                yield extract_token(line)
+
+
+def replay(tokens: Iterator[Optional[str]], now: float = None, chunk_size: int = 50000) -> dict:
+    """Parse tokens in chunks and aggregate the resulting flow variables."""
+    now = time.time() if now is None else now
+    totals = Counter()
+    errors = Counter()
+    users = Counter()
+    clients = Counter()
+
+    start = time.perf_counter()
+    while True:
+        chunk = list(islice(tokens, chunk_size))
+        if not chunk:
+            break
+        for variables in parse_jwt_batch(chunk, now=now):
+            totals['tokens'] += 1
+            if variables.get('jwt.valid'):
+                totals['valid'] += 1
+            elif variables.get('jwt.expired'):
+                totals['expired'] += 1
+            else:
+                totals['errors'] += 1
+                errors[variables.get('jwt.error')] += 1
+            if variables.get('jwt.username'):
+                users[variables['jwt.username']] += 1
+            if variables.get('jwt.client_id'):
+                clients[variables['jwt.client_id']] += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "tokens": totals['tokens'],
+        "valid": totals['valid'],
+        "expired": totals['expired'],
+        "errors": totals['errors'],
+        "error_messages": dict(errors.most_common()),
+        "unique_users": len(users),
+        "unique_clients": len(clients),
+        "top_users": users.most_common(),
+        "top_clients": clients.most_common(),
+        "elapsed_seconds": round(elapsed, 3),
+        "tokens_per_second": round(totals['tokens'] / elapsed) if elapsed > 0 else 0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Replay captured JWTs through the parse-jwt-token.js reference'
+    )
+    parser.add_argument(
+        '--input', '-i',
+        required=True,
+        help='File with one token or Authorization header per line (.gz supported)'
+    )
+    parser.add_argument(
+        '--now',
+        type=float,
+        default=None,
+        help='Epoch seconds used for the expiry check (default: current time)'
+    )
+    parser.add_argument(
+        '--top',
+        type=int,
+        default=10,
+        help='Number of top users/clients to show (default: 10)'
+    )
+    parser.add_argument(
+        '--output', '-o',
+        default=None,
+        help='Directory to save JSON results'
+    )
+
+    args = parser.parse_args()
+
+    input_path = Path(args.input)
+    if not input_path.exists():
+        print(f"❌ Error: input file not found: {input_path}")
+        sys.exit(1)
+
+    summary = replay(iter_tokens(input_path), now=args.now)
+    summary['top_users'] = summary['top_users'][:args.top]
+    summary['top_clients'] = summary['top_clients'][:args.top]
+
+    print(f"\n🔑 Replayed {summary['tokens']} tokens in {summary['elapsed_seconds']}s "
+          f"({summary['tokens_per_second']} tokens/s)")
+    print(f"  Valid: {summary['valid']}  Expired: {summary['expired']}  Errors: {summary['errors']}")
+    for message, count in list(summary['error_messages'].items())[:args.top]:
+        print(f"    • {message}: {count}")
+    print(f"  Unique users: {summary['unique_users']}  Unique clients: {summary['unique_clients']}")
+    print("  Top users:")
+    for user, count in summary['top_users']:
+        print(f"    • {user}: {count}")
+    print("  Top clients:")
+    for client, count in summary['top_clients']:
+        print(f"    • {client}: {count}")
+
+    if args.output:
+        output_dir = Path(args.output)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        output_file = output_dir / f"jwt-replay-{timestamp}.json"
+        with open(output_file, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"\n📄 Results saved: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
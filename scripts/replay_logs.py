@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Cropwise Unified Platform - Log Replay
+
+Replays the request mix from FC-Syng-Logging logs (plain or gzip) with the
+original inter-arrival timing, or compressed N× with --speed, against the
+deployed proxy, the local gateway or the direct target, and compares the
+replayed latency and statuses with what was logged.
+
+Usage:
+    python scripts/replay_logs.py --file ./logs/platform-2026-02-02.log.gz --mode proxy --env dev
+    python scripts/replay_logs.py --file capture.log.gz --mode gateway --speed 10 --synthesize-tokens
+    python scripts/replay_logs.py --file capture.log --mode target --speed 0 --max-in-flight 64
+    python scripts/replay_logs.py --file capture.log --mode gateway --methods GET,HEAD,POST,PUT,DELETE
+    python scripts/replay_logs.py --file capture.log --mode gateway --token-pool tests/fixtures/test_tokens.json --pool-users 500
+    python scripts/replay_logs.py --file capture.log --base-url http://127.0.0.1:8080/cropwise-unified-platform
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+from utils.config_model import EnvironmentConfig, load_config
+from utils.js_harness import encode_unsigned_jwt
+from utils.log_replay import DEFAULT_METHODS, REPLAY_MODES, LogReplayer, iter_replay_events
+from utils.syslog_sink import iter_log_lines
+from utils.token_pool import TokenPool
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+BASE_DIR = Path(__file__).parent.parent
+
+
+def default_base_url(mode: str, env_config: EnvironmentConfig) -> str:
+    """Base URL for a replay mode, derived from environments.json."""
+    if mode == 'proxy':
+        # Same hostname pattern as test_proxy.py
+        return f"https://{env_config['apigee_org']}-{env_config['apigee_env']}.apigee.net{env_config['base_path']}"
+    if mode == 'gateway':
+        return f"http://127.0.0.1:8080{env_config['base_path']}"
+    return f"{env_config['backend_protocol']}://{env_config['backend_host']}:{env_config['backend_port']}"
+
+
+def synthesized_tokens(ttl: int = 3600):
+    """Per-user unsigned JWTs (accepted by parse-jwt-token.js on the local gateway)."""
+    tokens = {}
+    exp = int(time.time()) + ttl
+
+    def token_for(user: str) -> str:
+        if user not in tokens:
+            tokens[user] = encode_unsigned_jwt({"user_name": user, "client_id": "log-replay", "exp": exp})
+        return tokens[user]
+
+    return token_for
+
+
+def print_report(report: dict, top: int) -> None:
+    print(f"\n📊 Sent {report['sent']} requests in {report['elapsed_s']}s "
+          f"(logged span {report['logged_span_s']}s, {report['achieved_rate_per_s']}/s, "
+          f"max in flight {report['max_in_flight']})")
+    print(f"  Statuses: {report['statuses']}  mismatches vs log: {report['status_mismatches']}")
+    if report['errors']:
+        print(f"  ❌ Errors: {report['errors']}")
+    latency = report['latency']
+    if latency.get('count'):
+        print(f"  Latency: p50 {latency['p50_ms']}ms, p95 {latency['p95_ms']}ms, p99 {latency['p99_ms']}ms")
+    lag = report['schedule_lag']
+    if lag.get('count') and lag['p95_ms'] > 10:
+        print(f"  ⚠️  Schedule lag p95 {lag['p95_ms']}ms (max {lag['max_ms']}ms): raise --max-in-flight or lower --speed")
+    for path, stats in list(report['paths'].items())[:top]:
+        replayed = stats['latency']
+        original = stats['original_latency']
+        timing = f"p50 {replayed['p50_ms']}ms p95 {replayed['p95_ms']}ms" if replayed.get('count') else "no responses"
+        if original.get('count'):
+            timing += f" (logged p50 {original['p50_ms']}ms)"
+        print(f"    • {path}: {stats['count']} {timing} {stats['statuses']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Replay FC-Syng-Logging request logs with their original timing'
+    )
+    parser.add_argument(
+        '--file', '-f',
+        required=True,
+        help='Log file to replay (plain or .gz; syslog framed or bare platform lines)'
+    )
+    parser.add_argument(
+        '--mode', '-m',
+        choices=REPLAY_MODES,
+        default='gateway',
+        help='Send to the deployed proxy, the local gateway or the direct target (default: gateway)'
+    )
+    parser.add_argument(
+        '--env', '-e',
+        choices=['dev', 'qa', 'prod'],
+        default='dev',
+        help='Environment used for default URLs and the base path (default: dev)'
+    )
+    parser.add_argument(
+        '--config', '-c',
+        default=None,
+        help='Path to environments.json configuration file'
+    )
+    parser.add_argument(
+        '--base-url', '-u',
+        default=None,
+        help='Override the URL paths are appended to (include the base path for proxy/gateway)'
+    )
+    parser.add_argument(
+        '--speed', '-s',
+        type=float,
+        default=1.0,
+        help='Time compression: 2 replays twice as fast, 0 ignores timing (default: 1)'
+    )
+    parser.add_argument(
+        '--max-in-flight',
+        type=int,
+        default=256,
+        help='Concurrent request limit (default: 256)'
+    )
+    parser.add_argument(
+        '--max-gap',
+        type=float,
+        default=None,
+        help='Cap idle gaps between logged requests to this many seconds'
+    )
+    parser.add_argument(
+        '--fallback-rate',
+        type=float,
+        default=10.0,
+        help='Requests per second for lines without a timestamp (default: 10)'
+    )
+    parser.add_argument(
+        '--methods',
+        default=','.join(DEFAULT_METHODS),
+        help='Comma-separated methods to replay; logs have no bodies, so add POST/PUT/PATCH/DELETE '
+             'only for targets where writes are safe (default: GET,HEAD)'
+    )
+    parser.add_argument(
+        '--limit', '-n',
+        type=int,
+        default=None,
+        help='Stop after this many requests'
+    )
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=30.0,
+        help='Per-request timeout in seconds (default: 30)'
+    )
+    parser.add_argument(
+        '--token',
+        default=os.environ.get('BEARER_TOKEN'),
+        help='Bearer token sent with every request (default: $BEARER_TOKEN)'
+    )
+    parser.add_argument(
+        '--synthesize-tokens',
+        action='store_true',
+        help='Send an unsigned JWT per logged user (local gateway only; exercises per-user KVM lookups)'
+    )
+    parser.add_argument(
+        '--token-pool',
+        default=None,
+        help='Token fixtures file: send pre-signed HS256 tokens of synthetic users, each logged user mapped to one'
+    )
+    parser.add_argument(
+        '--pool-users',
+        type=int,
+        default=100,
+        help='Synthetic users per token fixture for --token-pool (default: 100)'
+    )
+    parser.add_argument(
+        '--insecure',
+        action='store_true',
+        help='Do not verify TLS certificates'
+    )
+    parser.add_argument(
+        '--top',
+        type=int,
+        default=15,
+        help='Paths to show (default: 15)'
+    )
+    parser.add_argument(
+        '--output', '-o',
+        default=None,
+        help='Directory to save the JSON report'
+    )
+
+    args = parser.parse_args()
+
+    config = load_config(environments_path=args.config)
+    env_config = config.env(args.env)
+    rewrites = config.path_rewrites() if args.mode == 'target' else {}
+
+    pool = None
+    if args.token_pool:
+        pool = TokenPool.from_fixtures(args.token_pool, per_fixture=max(1, args.pool_users)).start()
+        token_for = pool.token_for
+        print(f"🔑 Signed {len(pool.users)} pool tokens in {pool.last_sign_ms:.0f}ms")
+    elif args.synthesize_tokens:
+        token_for = synthesized_tokens()
+    elif args.token:
+        token_for = lambda user: args.token
+    else:
+        token_for = None
+
+    base_url = args.base_url or default_base_url(args.mode, env_config)
+    replayer = LogReplayer(
+        base_url,
+        speed=args.speed,
+        max_in_flight=args.max_in_flight,
+        timeout=args.timeout,
+        base_path=env_config['base_path'],
+        rewrites=rewrites,
+        token_for=token_for,
+        verify_tls=not args.insecure
+    )
+
+    if not Path(args.file).exists():
+        print(f"❌ Log file not found: {args.file}")
+        sys.exit(1)
+    methods = [method.strip().upper() for method in args.methods.split(',') if method.strip()]
+    events = iter_replay_events(iter_log_lines(args.file), args.fallback_rate, args.max_gap, methods)
+
+    print(f"\n🔁 Replaying {args.file} against {base_url} ({args.mode}, "
+          f"{'unpaced' if args.speed <= 0 else f'{args.speed:g}x'}, {','.join(methods)})")
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    try:
+        asyncio.run(replayer.run(events, args.limit))
+    except KeyboardInterrupt:
+        print("\n⏹️  Interrupted")
+    finally:
+        if pool is not None:
+            pool.stop()
+
+    report = replayer.stats.report()
+    print_report(report, args.top)
+
+    if args.output:
+        output_dir = Path(args.output)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        output_file = output_dir / f"replay-report-{timestamp}.json"
+        with open(output_file, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Report saved: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
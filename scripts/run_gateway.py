@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Cropwise Unified Platform - Local Gateway
+
+Serves a proxy bundle locally, executing its policies and proxying to the
+target (usually a local stub backend), so ProxyTester and the latency tools
+can measure policy overhead and throughput before deploying.
+
+Usage:
+    python scripts/run_gateway.py --bundle ./dist/cropwise-unified-platform-dev-*.zip \\
+        --target-url http://127.0.0.1:9000 --workers 4
+    python scripts/run_gateway.py --kvm-store kvm.json --timing-headers
+    python scripts/run_gateway.py --target-server cropwise-backend-1=http://127.0.0.1:9001 \\
+        --target-server cropwise-backend-2=http://127.0.0.1:9002
+    python scripts/run_gateway.py --kvm-store dist/kvm/dev-user-rate-limits.kvs
+    python scripts/test_proxy.py --env dev --base-url http://127.0.0.1:8080/cropwise-unified-platform
+"""
+
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+from datetime import datetime
+from pathlib import Path
+
+from utils.local_gateway import JS_ENGINES, GatewaySettings, GatewayWorkers, ProxyBundle, load_kvm_store
+
+
+BASE_DIR = Path(__file__).parent.parent
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Run a proxy bundle on a local multi-worker gateway'
+    )
+    parser.add_argument(
+        '--bundle', '-b',
+        default=str(BASE_DIR / 'apiproxy'),
+        help='Bundle ZIP or apiproxy directory (default: ./apiproxy)'
+    )
+    parser.add_argument(
+        '--env', '-e',
+        choices=['dev', 'qa', 'prod'],
+        default='dev',
+        help='Value of environment.name (default: dev)'
+    )
+    parser.add_argument(
+        '--host',
+        default='127.0.0.1',
+        help='Listen address (default: 127.0.0.1)'
+    )
+    parser.add_argument(
+        '--port', '-p',
+        type=int,
+        default=8080,
+        help='Listen port (default: 8080)'
+    )
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=multiprocessing.cpu_count(),
+        help='Worker processes (default: CPU count)'
+    )
+    parser.add_argument(
+        '--target-url',
+        default=None,
+        help='Override the HTTPTargetConnection URL (e.g. a local stub backend)'
+    )
+    parser.add_argument(
+        '--target-server',
+        action='append',
+        default=[],
+        metavar='NAME=URL',
+        help='Base URL of a load-balanced TargetServer (repeatable, e.g. cropwise-backend-1=http://127.0.0.1:9001)'
+    )
+    parser.add_argument(
+        '--kvm-store',
+        default=None,
+        help='JSON file of KVM entries ({"user-rate-limits": {"user@syngenta.com": "high-rate"}}) or a KVM snapshot (.kvs)'
+    )
+    parser.add_argument(
+        '--js-engine',
+        choices=JS_ENGINES,
+        default='auto',
+        help='JavaScript execution: reference ports, node, mini_racer or auto (default: auto)'
+    )
+    parser.add_argument(
+        '--timing-headers',
+        action='store_true',
+        help='Add X-Gateway-*-Ms phase timing headers to responses'
+    )
+    parser.add_argument(
+        '--syslog',
+        default=None,
+        help='host:port of a syslog sink for MessageLogging (default: skip logging policies)'
+    )
+    parser.add_argument(
+        '--insecure',
+        action='store_true',
+        help='Do not verify target TLS certificates'
+    )
+    parser.add_argument(
+        '--output', '-o',
+        default=None,
+        help='Directory to save gateway stats on shutdown'
+    )
+
+    args = parser.parse_args()
+
+    target_servers = {}
+    for spec in args.target_server:
+        name, _, url = spec.partition('=')
+        if not name or not url:
+            print(f"❌ Invalid --target-server '{spec}', expected NAME=URL")
+            sys.exit(2)
+        target_servers[name] = url
+
+    settings = GatewaySettings(
+        env=args.env,
+        target_url=args.target_url,
+        target_servers=target_servers,
+        kvm_store=load_kvm_store(args.kvm_store),
+        js_engine=args.js_engine,
+        timing_headers=args.timing_headers,
+        syslog=args.syslog,
+        verify_tls=not args.insecure
+    )
+
+    try:
+        bundle = ProxyBundle.load(args.bundle)
+    except Exception as e:
+        print(f"❌ Failed to load bundle: {e}")
+        sys.exit(1)
+
+    workers = GatewayWorkers(args.bundle, settings, host=args.host, port=args.port, workers=args.workers)
+    workers.start()
+
+    print(f"\n🚪 Local gateway for {bundle.name} (revision {bundle.revision}), {workers.workers} workers")
+    for endpoint in bundle.proxy_endpoints.values():
+        print(f"   {workers.url}{endpoint.base_path}")
+    print(f"   Target: {args.target_url or ', '.join(t.url or ' + '.join(n for n, _ in t.servers) or '-' for t in bundle.target_endpoints.values())}")
+    print("   Press Ctrl+C to stop")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+
+    stats = workers.stop()
+    print(f"\n📊 {stats['requests']} requests, statuses: {stats['statuses']}")
+    for name, timing in stats['policies'].items():
+        print(f"    • {name}: {timing['count']} runs, mean {timing['mean_us']}µs")
+    if stats['skipped_policies']:
+        print(f"  Skipped (unsupported): {', '.join(sorted(stats['skipped_policies']))}")
+
+    if args.output:
+        output_dir = Path(args.output)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        output_file = output_dir / f"gateway-stats-{timestamp}.json"
+        with open(output_file, 'w') as f:
+            json.dump(stats, f, indent=2)
+        print(f"\n📄 Stats saved: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Cropwise Unified Platform - Rate Limit Tier Simulator
+
+Applies per-user token-bucket or sliding-window limits for the
+user-rate-limits KVM tiers to a request trace (FC-Syng-Logging logs) and
+reports the throttled fraction, throughput and queueing delay per tier.
+Use it to choose tier limits before changing the KVM in production.
+
+Tier limits default to config/policies.json (KVM-Get-User-Rate-Limit.tiers)
+and can be overridden per run.
+
+Usage:
+    python scripts/simulate_rate_limits.py --trace ./logs/platform-2026-02-02.log.gz --kvm kvm.json
+    python scripts/simulate_rate_limits.py --trace capture.log --kvm kvm.json --tier low-rate=5:20 --max-queue 0.5
+    python scripts/simulate_rate_limits.py --trace capture.log --kvm entries.json --algorithm sliding-window --speed 3
+"""
+
+import sys
+import json
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+from utils.log_replay import iter_replay_events
+from utils.rate_limit_sim import (
+    ALGORITHMS, DEFAULT_TIER, RateLimitSimulator, load_tier_map, parse_tier_limit, tier_limits_from_policies
+)
+from utils.syslog_sink import iter_log_lines
+
+
+BASE_DIR = Path(__file__).parent.parent
+
+
+def print_report(report: dict) -> None:
+    print(f"\n📊 {report['requests']} requests over {report['trace_span_s']}s ({report['algorithm']}, "
+          f"max queue {report['max_queue_s']:g}s): {report['throttled']} throttled "
+          f"({report['throttled_fraction'] * 100:.2f}%), {report['queued']} queued")
+    for name, tier in report['tiers'].items():
+        icon = "⚠️ " if tier['throttled'] else "✅"
+        print(f"\n  {icon} {name} [{tier['limit']}] - {tier['users']} users")
+        print(f"     offered {tier['offered_rate_per_s']}/s, throughput {tier['throughput_per_s']}/s "
+              f"(peak {tier['peak_throughput_per_s']}/s), throttled {tier['throttled_fraction'] * 100:.2f}%")
+        delay = tier['queue_delay']
+        if delay.get('count'):
+            print(f"     queue delay: {delay['count']} requests, p50 {delay['p50_ms']}ms, "
+                  f"p95 {delay['p95_ms']}ms, max {delay['max_ms']}ms")
+        for user, count in tier['top_throttled_users'].items():
+            print(f"       • {user}: {count} throttled")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Simulate per-user rate-limit tiers against a request trace'
+    )
+    parser.add_argument(
+        '--trace', '-t',
+        required=True,
+        help='FC-Syng-Logging log file (plain or .gz) providing users and arrival times'
+    )
+    parser.add_argument(
+        '--kvm', '-k',
+        default=None,
+        help='User-to-tier KVM export (local KVM store, {user: tier}, Apigee keyValueEntries or a .kvs snapshot)'
+    )
+    parser.add_argument(
+        '--policies',
+        default=str(BASE_DIR / 'config' / 'policies.json'),
+        help='policies.json with KVM-Get-User-Rate-Limit tiers (default: config/policies.json)'
+    )
+    parser.add_argument(
+        '--tier',
+        action='append',
+        default=[],
+        metavar='NAME=RATE[:BURST[:WINDOW]]',
+        help='Override a tier limit, e.g. low-rate=5:20 (repeatable)'
+    )
+    parser.add_argument(
+        '--algorithm', '-a',
+        choices=ALGORITHMS,
+        default='token-bucket',
+        help='Limiter model (default: token-bucket)'
+    )
+    parser.add_argument(
+        '--max-queue',
+        type=float,
+        default=0.0,
+        help='Seconds a request may wait for capacity before being throttled (default: 0)'
+    )
+    parser.add_argument(
+        '--default-tier',
+        default=DEFAULT_TIER,
+        help=f'Tier for users without a KVM entry (default: {DEFAULT_TIER})'
+    )
+    parser.add_argument(
+        '--speed', '-s',
+        type=float,
+        default=1.0,
+        help='Compress the trace timeline N× to model higher load (default: 1)'
+    )
+    parser.add_argument(
+        '--fallback-rate',
+        type=float,
+        default=10.0,
+        help='Requests per second for lines without a timestamp (default: 10)'
+    )
+    parser.add_argument(
+        '--top-users',
+        type=int,
+        default=5,
+        help='Most-throttled users to list per tier (default: 5)'
+    )
+    parser.add_argument(
+        '--output', '-o',
+        default=None,
+        help='Directory to save the JSON report'
+    )
+
+    args = parser.parse_args()
+
+    try:
+        with open(args.policies, 'r') as f:
+            limits = tier_limits_from_policies(json.load(f).get('policies', {}))
+        for override in args.tier:
+            name, sep, spec = override.partition('=')
+            if not sep:
+                raise ValueError(f"Invalid --tier '{override}', expected NAME=RATE[:BURST[:WINDOW]]")
+            limits[name] = parse_tier_limit(spec)
+        tier_map = load_tier_map(args.kvm) if args.kvm else {}
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    if not limits:
+        print("❌ No tier limits: add KVM-Get-User-Rate-Limit.tiers to policies.json or pass --tier")
+        sys.exit(1)
+    if args.speed <= 0:
+        print("❌ --speed must be positive")
+        sys.exit(1)
+
+    simulator = RateLimitSimulator(limits, tier_map, args.algorithm, args.max_queue, args.default_tier)
+    print(f"\n🚦 Simulating {len(limits)} tiers for {len(tier_map)} mapped users over {args.trace}")
+    for name, limit in sorted(limits.items()):
+        print(f"    • {name}: {limit.describe()}")
+
+    for event in iter_replay_events(iter_log_lines(args.trace), args.fallback_rate):
+        simulator.offer(event.user, event.offset_s / args.speed)
+
+    report = simulator.report(args.top_users)
+    report['speed'] = args.speed
+    print_report(report)
+
+    if args.output:
+        output_dir = Path(args.output)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        output_file = output_dir / f"rate-limit-sim-{timestamp}.json"
+        with open(output_file, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Report saved: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Cropwise Unified Platform - Stub Backend
+
+Local backend serving the paths from config/endpoints.json with configurable
+latency distributions and response sizes, so proxy overhead can be
+benchmarked without real backend variance.
+
+Usage:
+    python scripts/stub_backend.py --port 9000 --latency fixed:50
+    python scripts/stub_backend.py --latency lognormal:median=120,sigma=0.4 --size 4096
+    python scripts/stub_backend.py --latency replay:tests/latency-test/latency-results-20260202-183128.json
+    python scripts/stub_backend.py --route-config stub-routes.json --list
+
+Route config example:
+    {"/v2/accounts": {"latency": "fixed:80", "size": 2048},
+     "/remote-sensing/api": {"latency": "lognormal:median=300", "size": 1048576}}
+"""
+
+import sys
+import json
+import asyncio
+import argparse
+from pathlib import Path
+
+from utils.asynchttp import start_server
+from utils.stub_backend import build_stub
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+BASE_DIR = Path(__file__).parent.parent
+
+
+async def serve(stub, host: str, port: int) -> None:
+    server = await start_server(stub.handle, host, port)
+    print(f"\n🧩 Stub backend: http://{host}:{server.sockets[0].getsockname()[1]}")
+    print("   Press Ctrl+C to stop")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Run a local stub backend for proxy benchmarks'
+    )
+    parser.add_argument(
+        '--endpoints',
+        default=str(BASE_DIR / 'config' / 'endpoints.json'),
+        help='Endpoints config (default: config/endpoints.json)'
+    )
+    parser.add_argument(
+        '--host',
+        default='127.0.0.1',
+        help='Listen address (default: 127.0.0.1)'
+    )
+    parser.add_argument(
+        '--port', '-p',
+        type=int,
+        default=9000,
+        help='Listen port (default: 9000)'
+    )
+    parser.add_argument(
+        '--latency', '-l',
+        default='fixed:0',
+        help='Latency spec: fixed:MS, lognormal:median=MS,sigma=S or replay:FILE[#proxy] (default: fixed:0)'
+    )
+    parser.add_argument(
+        '--size', '-s',
+        type=int,
+        default=256,
+        help='Response body size in bytes (default: 256)'
+    )
+    parser.add_argument(
+        '--route-config',
+        default=None,
+        help='JSON file with per-prefix latency/size/status overrides'
+    )
+    parser.add_argument(
+        '--error-rate',
+        type=float,
+        default=0.0,
+        help='Fraction of requests answered with 503'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=None,
+        help='Random seed for latency sampling and failures'
+    )
+    parser.add_argument(
+        '--list',
+        action='store_true',
+        help='Print the route table and exit'
+    )
+
+    args = parser.parse_args()
+
+    with open(args.endpoints, 'r') as f:
+        endpoints = json.load(f)
+    overrides = None
+    if args.route_config:
+        with open(args.route_config, 'r') as f:
+            overrides = json.load(f)
+
+    try:
+        stub = build_stub(endpoints, args.latency, args.size, overrides, args.seed, args.error_rate)
+    except (ValueError, OSError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print("\n📋 Routes:")
+    for route in sorted(stub.routes, key=lambda r: r.prefix):
+        print(f"  {route.prefix:<35} {','.join(route.methods):<28} {route.latency.spec:<40} {route.size}B")
+    if args.list:
+        return
+
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    try:
+        asyncio.run(serve(stub, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+    print("\n📊 Requests per route:")
+    for prefix, stats in stub.stats().items():
+        print(f"  • {prefix}: {stats['count']} requests, {stats['errors']} errors, "
+              f"mean injected latency {stats['mean_latency_ms']}ms")
+
+
+if __name__ == "__main__":
+    main()
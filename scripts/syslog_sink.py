@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Cropwise Unified Platform - Syslog Sink
+
+Receives FC-Syng-Logging syslog traffic locally (TCP and/or UDP), or analyzes
+captured log files, and reports per-path latency percentiles, status counts
+and ingest rate.
+
+Usage:
+    python scripts/syslog_sink.py --tcp-port 5514 --udp-port 5514 --interval 5
+    python scripts/syslog_sink.py --tcp-port 5514 --record ./dist/syslog.log.gz
+    python scripts/syslog_sink.py --file ./logs/platform-2026-02-02.log.gz --top 20
+    python scripts/run_gateway.py --syslog 127.0.0.1:5514 ...
+"""
+
+import sys
+import gzip
+import json
+import asyncio
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+from utils.syslog_sink import LogAggregator, SyslogSink, analyze_lines, iter_log_lines
+
+
+def print_report(report: dict, top: int) -> None:
+    latency = report['latency']
+    print(f"\n📊 {report['records']} records in {report['elapsed_s']}s "
+          f"({report['ingest_rate_per_s']}/s, peak {report['peak_rate_per_s']}/s), "
+          f"unparsed: {report['unparsed']}")
+    print(f"  Statuses: {report['statuses']}")
+    if report['unresolved_latency']:
+        print(f"  ⚠️  {report['unresolved_latency']} records without a latency value (template did not resolve)")
+    if latency.get('count'):
+        print(f"  Latency: p50 {latency['p50_ms']}ms, p95 {latency['p95_ms']}ms, p99 {latency['p99_ms']}ms")
+    for path, stats in list(report['paths'].items())[:top]:
+        summary = stats['latency']
+        timing = f"p50 {summary['p50_ms']}ms p95 {summary['p95_ms']}ms" if summary.get('count') else "no latency"
+        print(f"    • {path}: {stats['count']} ({timing}) {stats['statuses']}")
+
+
+async def serve(sink: SyslogSink, args) -> None:
+    await sink.start(args.host, args.tcp_port, args.udp_port)
+    print(f"\n📥 Syslog sink: tcp://{args.host}:{sink.tcp_port}"
+          + (f", udp://{args.host}:{sink.udp_port}" if sink.udp_port else ""))
+    print("   Press Ctrl+C to stop")
+    try:
+        while True:
+            await asyncio.sleep(args.interval)
+            print_report(sink.aggregator.report(), args.top)
+    finally:
+        await sink.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Receive or analyze FC-Syng-Logging syslog traffic'
+    )
+    parser.add_argument(
+        '--file', '-f',
+        default=None,
+        help='Analyze a captured log file (plain or .gz) instead of listening'
+    )
+    parser.add_argument(
+        '--host',
+        default='127.0.0.1',
+        help='Listen address (default: 127.0.0.1)'
+    )
+    parser.add_argument(
+        '--tcp-port',
+        type=int,
+        default=5514,
+        help='TCP listen port (default: 5514)'
+    )
+    parser.add_argument(
+        '--udp-port',
+        type=int,
+        default=None,
+        help='Also listen for UDP syslog on this port'
+    )
+    parser.add_argument(
+        '--record',
+        default=None,
+        help='Append received lines to this file (gzip if it ends in .gz)'
+    )
+    parser.add_argument(
+        '--base-path',
+        default='/cropwise-unified-platform',
+        help='Base path stripped before grouping (default: /cropwise-unified-platform)'
+    )
+    parser.add_argument(
+        '--interval',
+        type=float,
+        default=10.0,
+        help='Seconds between live reports (default: 10)'
+    )
+    parser.add_argument(
+        '--top',
+        type=int,
+        default=15,
+        help='Paths to show (default: 15)'
+    )
+    parser.add_argument(
+        '--output', '-o',
+        default=None,
+        help='Directory to save the JSON report'
+    )
+
+    args = parser.parse_args()
+
+    if args.file:
+        try:
+            aggregator = analyze_lines(iter_log_lines(args.file), args.base_path)
+        except OSError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+    else:
+        record_to = None
+        if args.record:
+            opener = gzip.open if args.record.endswith('.gz') else open
+            record_to = opener(args.record, 'at', encoding='utf-8')
+        sink = SyslogSink(LogAggregator(args.base_path), record_to)
+        try:
+            asyncio.run(serve(sink, args))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if record_to is not None:
+                record_to.close()
+        aggregator = sink.aggregator
+
+    report = aggregator.report()
+    print_report(report, args.top)
+
+    if args.output:
+        output_dir = Path(args.output)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        output_file = output_dir / f"syslog-report-{timestamp}.json"
+        with open(output_file, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Report saved: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,17 @@
 Cropwise Unified Platform - Proxy Testing Script
 
 This script tests the deployed proxy endpoints to verify functionality.
+Test cases come from config/test_catalog.json (see utils/case_catalog.py),
+plus a generated case per path mapping and method in config/endpoints.json.
 
 Usage:
     python scripts/test_proxy.py --env dev
     python scripts/test_proxy.py --env qa --verbose
     python scripts/test_proxy.py --env prod --test-suite smoke
+    python scripts/test_proxy.py --env prod --workers 1 --timeout 60
+    python scripts/test_proxy.py --env qa --test-suite routes --shard 2/4
+    python scripts/test_proxy.py --env dev --list
+    python scripts/test_proxy.py --env qa --iterations 20 --warmup 3
 """
 
 import os
@@ -18,16 +24,19 @@ import argparse
 import base64
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
-from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from enum import Enum
 
-import requests
-import jwt
-from colorama import init, Fore, Style
+from utils.case_catalog import TestCase, load_catalog, parse_shard, select, shard
+from utils.config_model import load_config, thaw
+from utils.lazy_import import lazy_import
 
-# Initialize colorama for Windows
-init()
+# Loaded on first use so --help starts without the HTTP/JWT stack
+requests = lazy_import('requests')
+jwt = lazy_import('jwt', install_hint='pip install PyJWT')
+colorama = lazy_import('colorama')
 
 
 class TestStatus(Enum):
@@ -45,6 +54,44 @@ class TestResult:
     message: str = ""
     response_code: int = 0
     response_body: str = ""
+    p95_ms: float = 0.0
+    iterations: int = 1
+    latency_budget_ms: Optional[float] = None
+    breakdown: Dict[str, float] = field(default_factory=dict)
+    
+    @property
+    def over_budget(self) -> bool:
+        return self.latency_budget_ms is not None and self.p95_ms > self.latency_budget_ms
+
+
+# Timing headers set by AM-Add-Performance-Headers (milliseconds)
+TIMING_HEADERS = (
+    'X-Apigee-Total-Time',
+    'X-Apigee-Target-Time',
+    'X-Apigee-Proxy-Time',
+    'X-Apigee-Request-Processing',
+    'X-Apigee-Response-Processing',
+    'X-Apigee-JWT-Time',
+    'X-Apigee-KVM-Time',
+    'X-Apigee-RateLimit-Time',
+    'X-Apigee-Network-ProxyToTarget',
+)
+
+
+def latency_breakdown(headers: Dict[str, str]) -> Dict[str, float]:
+    """Numeric X-Apigee-* timings from a response (unresolved ones are skipped)."""
+    breakdown = {}
+    for name in TIMING_HEADERS:
+        try:
+            breakdown[name[len('X-Apigee-'):]] = float(headers.get(name))
+        except (TypeError, ValueError):
+            continue
+    return breakdown
+
+
+def percentile(samples: List[float], p: float) -> float:
+    """Nearest-rank percentile of sorted samples."""
+    return samples[min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))]
 
 
 class JWTGenerator:
@@ -78,28 +125,48 @@ class JWTGenerator:
 
 
 class ProxyTester:
-    """Tests Apigee X proxy endpoints."""
+    """
+    Tests Apigee X proxy endpoints.
     
-    def __init__(self, env: str, config_path: str = None, verbose: bool = False):
+    Cases are compiled once from the test catalog; a suite runs the cases
+    tagged with its name. Each test sends warmup requests, then iterations
+    measured ones, and fails if their p95 exceeds the latency budget.
+    Suites run their tests concurrently on a thread pool sharing one pooled
+    session, so a suite takes about as long as its slowest test. Each test
+    has its own timeout, and results are reported in suite order.
+    """
+    
+    def __init__(
+        self,
+        env: str,
+        config_path: str = None,
+        verbose: bool = False,
+        workers: int = 8,
+        timeout: float = 30,
+        catalog_path: str = None,
+        shard: Tuple[int, int] = None,
+        iterations: int = 1,
+        warmup: int = 0
+    ):
         self.env = env
         self.verbose = verbose
-        self.config = self._load_config(config_path)
-        self.env_config = self.config["environments"].get(env)
-        
-        if not self.env_config:
-            raise ValueError(f"Environment '{env}' not found in configuration")
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.iterations = max(1, iterations)
+        self.warmup = max(0, warmup)
+        self.config = load_config(environments_path=config_path)
+        self.env_config = self.config.env(env)
         
         self.base_url = self._get_base_url()
-        self.jwt_generator = JWTGenerator()
-        self.results: List[TestResult] = []
-    
-    def _load_config(self, config_path: str = None) -> Dict[str, Any]:
-        """Load configuration from file."""
-        path = Path(config_path) if config_path else (
-            Path(__file__).parent.parent / "config" / "environments.json"
+        self.cases, self.token_fixtures = load_catalog(
+            catalog_path or str(Path(__file__).parent.parent / "config" / "test_catalog.json"),
+            thaw(self.config.raw['endpoints']).get('path_mappings', {})
         )
-        with open(path, 'r') as f:
-            return json.load(f)
+        self.shard = shard
+        self._tokens: Dict[str, str] = {}
+        self.results: List[TestResult] = []
+        self.elapsed_ms = 0.0
+        self._session = None
     
     def _get_base_url(self) -> str:
         """Construct the base URL for testing."""
@@ -111,16 +178,33 @@ class ProxyTester:
         # Default Apigee X hostname pattern
         return f"https://{org}-{env}.apigee.net{base_path}"
     
+    @property
+    def session(self) -> 'requests.Session':
+        """Shared session with a connection pool sized for the workers."""
+        if self._session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.workers)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            self._session = session
+        return self._session
+    
+    def close(self) -> None:
+        """Close pooled connections."""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+    
     def _log(self, message: str, level: str = "INFO") -> None:
         """Log message with color."""
         colors = {
-            "INFO": Fore.CYAN,
-            "SUCCESS": Fore.GREEN,
-            "WARNING": Fore.YELLOW,
-            "ERROR": Fore.RED
+            "INFO": colorama.Fore.CYAN,
+            "SUCCESS": colorama.Fore.GREEN,
+            "WARNING": colorama.Fore.YELLOW,
+            "ERROR": colorama.Fore.RED
         }
-        color = colors.get(level, Fore.WHITE)
-        print(f"{color}{message}{Style.RESET_ALL}")
+        color = colors.get(level, colorama.Fore.WHITE)
+        print(f"{color}{message}{colorama.Style.RESET_ALL}")
     
     def _make_request(
         self,
@@ -128,8 +212,8 @@ class ProxyTester:
         path: str,
         headers: Dict[str, str] = None,
         data: Any = None,
-        timeout: int = 30
-    ) -> requests.Response:
+        timeout: float = None
+    ) -> 'requests.Response':
         """Make HTTP request to the proxy."""
         url = f"{self.base_url}{path}"
         
@@ -144,12 +228,12 @@ class ProxyTester:
         if self.verbose:
             self._log(f"  → {method} {url}", "INFO")
         
-        response = requests.request(
+        response = self.session.request(
             method=method,
             url=url,
             headers=default_headers,
-            json=data if data else None,
-            timeout=timeout,
+            json=data,
+            timeout=timeout or self.timeout,
             verify=True
         )
         
@@ -165,47 +249,60 @@ class ProxyTester:
         path: str,
         headers: Dict[str, str] = None,
         data: Any = None,
-        expected_status: int = 200,
-        validate_response: callable = None
+        expected_status: Optional[int] = 200,
+        validate_response: callable = None,
+        latency_budget_ms: float = None
     ) -> TestResult:
-        """Run a single test case."""
+        """
+        Run a single test case.
+        
+        Sends self.warmup unchecked requests, then self.iterations measured
+        ones; every measured response must pass the checks. expected_status
+        None leaves the status check to validate_response. If the p95 of
+        the measured requests exceeds latency_budget_ms the test fails with
+        the X-Apigee-* breakdown of the slowest response.
+        """
         start_time = time.time()
         
         try:
-            response = self._make_request(method, path, headers, data)
-            duration_ms = (time.time() - start_time) * 1000
+            for _ in range(self.warmup):
+                self._make_request(method, path, headers, data)
             
-            # Check status code
-            if response.status_code != expected_status:
-                return TestResult(
-                    name=name,
-                    status=TestStatus.FAILED,
-                    duration_ms=duration_ms,
-                    message=f"Expected {expected_status}, got {response.status_code}",
-                    response_code=response.status_code,
-                    response_body=response.text[:500]
-                )
-            
-            # Custom validation
-            if validate_response:
-                validation_result = validate_response(response)
-                if not validation_result[0]:
-                    return TestResult(
-                        name=name,
-                        status=TestStatus.FAILED,
-                        duration_ms=duration_ms,
-                        message=validation_result[1],
-                        response_code=response.status_code,
-                        response_body=response.text[:500]
-                    )
+            samples = []
+            for _ in range(self.iterations):
+                request_start = time.perf_counter()
+                response = self._make_request(method, path, headers, data)
+                duration_ms = (time.perf_counter() - request_start) * 1000
+                samples.append((duration_ms, response))
+                
+                failure = self._check_response(name, response, duration_ms, expected_status, validate_response)
+                if failure:
+                    return failure
             
-            return TestResult(
+            samples.sort(key=lambda sample: sample[0])
+            durations = [duration for duration, _ in samples]
+            p95_ms = percentile(durations, 95)
+            result = TestResult(
                 name=name,
                 status=TestStatus.PASSED,
-                duration_ms=duration_ms,
-                response_code=response.status_code
+                duration_ms=percentile(durations, 50),
+                response_code=samples[-1][1].status_code,
+                p95_ms=p95_ms,
+                iterations=len(samples),
+                latency_budget_ms=latency_budget_ms
             )
             
+            if result.over_budget:
+                result.status = TestStatus.FAILED
+                result.breakdown = latency_breakdown(samples[-1][1].headers)
+                timings = ", ".join(f"{key} {value:g}ms" for key, value in result.breakdown.items())
+                result.message = (
+                    f"p95 {p95_ms:.0f}ms over {latency_budget_ms:g}ms budget (n={len(samples)}); "
+                    f"slowest: {timings or 'no X-Apigee timing headers'}"
+                )
+            
+            return result
+            
         except requests.exceptions.Timeout:
             duration_ms = (time.time() - start_time) * 1000
             return TestResult(
@@ -231,237 +328,199 @@ class ProxyTester:
                 message=f"Unexpected error: {str(e)}"
             )
     
-    # ============== Test Cases ==============
-    
-    def test_health_check(self) -> TestResult:
-        """Test basic connectivity to the proxy."""
-        return self.run_test(
-            name="Health Check",
-            method="GET",
-            path="/health",
-            expected_status=200
-        )
-    
-    def test_unauthorized_request(self) -> TestResult:
-        """Test that requests without auth are handled correctly."""
-        return self.run_test(
-            name="Unauthorized Request",
-            method="GET",
-            path="/v1/users",
-            expected_status=401
-        )
-    
-    def test_authorized_request(self) -> TestResult:
-        """Test request with valid JWT token."""
-        token = self.jwt_generator.generate_token(
-            username="test.user@syngenta.com",
-            client_id="strider-ui"
-        )
-        
-        return self.run_test(
-            name="Authorized Request",
-            method="GET",
-            path="/v1/users",
-            headers={"Authorization": f"Bearer {token}"},
-            expected_status=200
-        )
-    
-    def test_invalid_path(self) -> TestResult:
-        """Test that invalid paths return 404."""
-        return self.run_test(
-            name="Invalid Path Returns 404",
-            method="GET",
-            path="/invalid/path/that/does/not/exist",
-            expected_status=404
-        )
-    
-    def test_request_id_header(self) -> TestResult:
-        """Test that x-request-id header is added to response."""
-        token = self.jwt_generator.generate_token(username="test.user@syngenta.com")
-        
-        def validate_request_id(response):
-            if 'x-request-id' in response.headers:
-                return (True, "")
-            return (False, "x-request-id header not found in response")
-        
-        return self.run_test(
-            name="Request ID Header Present",
-            method="GET",
-            path="/v1/users",
-            headers={"Authorization": f"Bearer {token}"},
-            expected_status=200,
-            validate_response=validate_request_id
-        )
-    
-    def test_rate_limit_headers(self) -> TestResult:
-        """Test that rate limit headers are present for authenticated users."""
-        token = self.jwt_generator.generate_token(
-            username="test.user@syngenta.com",
-            client_id="test-client"
-        )
+    def _check_response(
+        self,
+        name: str,
+        response: 'requests.Response',
+        duration_ms: float,
+        expected_status: Optional[int],
+        validate_response: callable
+    ) -> Optional[TestResult]:
+        """FAILED result if the response does not match, else None."""
+        # Check status code
+        if expected_status is not None and response.status_code != expected_status:
+            return TestResult(
+                name=name,
+                status=TestStatus.FAILED,
+                duration_ms=duration_ms,
+                message=f"Expected {expected_status}, got {response.status_code}",
+                response_code=response.status_code,
+                response_body=response.text[:500]
+            )
         
-        def validate_rate_limit(response):
-            headers = response.headers
-            required = ['x-ratelimit-type']
-            missing = [h for h in required if h.lower() not in [k.lower() for k in headers.keys()]]
-            
-            if missing:
-                return (False, f"Missing rate limit headers: {missing}")
-            return (True, "")
+        # Custom validation
+        if validate_response:
+            validation_result = validate_response(response)
+            if not validation_result[0]:
+                return TestResult(
+                    name=name,
+                    status=TestStatus.FAILED,
+                    duration_ms=duration_ms,
+                    message=validation_result[1],
+                    response_code=response.status_code,
+                    response_body=response.text[:500]
+                )
         
-        return self.run_test(
-            name="Rate Limit Headers Present",
-            method="GET",
-            path="/v1/users",
-            headers={"Authorization": f"Bearer {token}"},
-            expected_status=200,
-            validate_response=validate_rate_limit
-        )
+        return None
     
-    def test_remote_sensing_rewrite(self) -> TestResult:
-        """Test remote sensing URI rewrite."""
-        token = self.jwt_generator.generate_token(username="test.user@syngenta.com")
-        
-        return self.run_test(
-            name="Remote Sensing URI Rewrite",
-            method="GET",
-            path="/remote-sensing/v1/imagery",
-            headers={"Authorization": f"Bearer {token}"},
-            expected_status=200
-        )
+    # ============== Test Catalog ==============
     
-    def test_protector_alerts_special_case(self) -> TestResult:
-        """Test protector alerts special case handling."""
-        token = self.jwt_generator.generate_token(
-            username="protector.alerts.account@syngenta.com",
-            client_id="strider-ui"
-        )
-        
-        return self.run_test(
-            name="Protector Alerts Special Case",
-            method="GET",
-            path="/v2/accounts/ids",
-            headers={"Authorization": f"Bearer {token}"},
-            expected_status=200
-        )
+    def _token(self, fixture_name: str) -> str:
+        """Signed JWT for a token fixture (signed once per run)."""
+        if fixture_name not in self._tokens:
+            fixture = self.token_fixtures[fixture_name]
+            claims = dict(fixture.claims)
+            generator = JWTGenerator(fixture.secret)
+            self._tokens[fixture_name] = generator.generate_token(
+                username=claims.get('username', claims.get('sub', fixture_name)),
+                client_id=claims.get('client_id', 'test-client'),
+                custom_claims=claims
+            )
+        return self._tokens[fixture_name]
     
-    def test_content_type_passthrough(self) -> TestResult:
-        """Test that Content-Type header is passed through."""
-        token = self.jwt_generator.generate_token(username="test.user@syngenta.com")
+    def run_case(self, case: TestCase) -> TestResult:
+        """Run a compiled catalog case."""
+        headers = dict(case.headers)
+        if case.token:
+            headers["Authorization"] = f"Bearer {self._token(case.token)}"
         
         return self.run_test(
-            name="Content-Type Passthrough",
-            method="POST",
-            path="/v1/data",
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json"
-            },
-            data={"test": "data"},
-            expected_status=200
+            name=case.name,
+            method=case.method,
+            path=case.path,
+            headers=headers,
+            data=case.body,
+            expected_status=None,
+            validate_response=case.check,
+            latency_budget_ms=case.latency_budget_ms
         )
     
-    def test_error_response_format(self) -> TestResult:
-        """Test that error responses have correct JSON format."""
-        def validate_error_format(response):
-            try:
-                body = response.json()
-                if 'message' in body or 'error' in body:
-                    return (True, "")
-                return (False, "Error response missing required fields")
-            except:
-                return (False, "Error response is not valid JSON")
-        
-        return self.run_test(
-            name="Error Response Format",
-            method="GET",
-            path="/nonexistent",
-            expected_status=404,
-            validate_response=validate_error_format
-        )
+    def select_cases(self, suite: str) -> List[TestCase]:
+        """Catalog cases for a suite, restricted to this runner's shard."""
+        cases = select(self.cases, suite)
+        if self.shard:
+            cases = shard(cases, *self.shard)
+        return cases
     
     # ============== Test Suites ==============
     
+    def run_suite(self, suite: str) -> List[TestResult]:
+        """Run the catalog cases of a suite."""
+        cases = self.select_cases(suite)
+        # Sign tokens here rather than on first use in the workers
+        for fixture_name in {case.token for case in cases if case.token}:
+            self._token(fixture_name)
+        return self._run_tests(
+            [lambda case=case: self.run_case(case) for case in cases],
+            names=[case.name for case in cases]
+        )
+    
     def run_smoke_tests(self) -> List[TestResult]:
         """Run smoke test suite (quick validation)."""
         self._log("\n🔥 Running Smoke Tests...\n", "INFO")
-        
-        tests = [
-            self.test_health_check,
-            self.test_unauthorized_request,
-            self.test_invalid_path,
-        ]
-        
-        return self._run_tests(tests)
+        return self.run_suite('smoke')
     
     def run_functional_tests(self) -> List[TestResult]:
         """Run functional test suite (comprehensive)."""
         self._log("\n🧪 Running Functional Tests...\n", "INFO")
-        
-        tests = [
-            self.test_health_check,
-            self.test_unauthorized_request,
-            self.test_authorized_request,
-            self.test_invalid_path,
-            self.test_request_id_header,
-            self.test_rate_limit_headers,
-            self.test_error_response_format,
-        ]
-        
-        return self._run_tests(tests)
+        return self.run_suite('functional')
     
     def run_integration_tests(self) -> List[TestResult]:
         """Run integration test suite (includes backend interactions)."""
         self._log("\n🔗 Running Integration Tests...\n", "INFO")
-        
-        tests = [
-            self.test_health_check,
-            self.test_authorized_request,
-            self.test_remote_sensing_rewrite,
-            self.test_protector_alerts_special_case,
-            self.test_content_type_passthrough,
-        ]
-        
-        return self._run_tests(tests)
+        return self.run_suite('integration')
+    
+    def run_route_tests(self) -> List[TestResult]:
+        """Run the cases generated from endpoints.json path mappings."""
+        self._log("\n🧭 Running Route Tests...\n", "INFO")
+        return self.run_suite('routes')
+    
+    def run_route_write_tests(self) -> List[TestResult]:
+        """Run the generated cases that send write methods (never part of 'all')."""
+        self._log("\n✍️  Running Route Write Tests...\n", "INFO")
+        return self.run_suite('routes-write')
     
     def run_all_tests(self) -> List[TestResult]:
         """Run all test suites."""
         self._log("\n🚀 Running All Tests...\n", "INFO")
+        return self.run_suite('all')
+    
+    def _run_tests(self, tests: List[callable], names: List[str] = None) -> List[TestResult]:
+        """
+        Run test functions concurrently.
+        
+        names are used for tests that raise or time out instead of returning
+        a result (default: derived from the function name). Results are printed in the order of tests as soon as every earlier
+        test has finished. A test still running after self.timeout seconds
+        per request (warmup and iterations included) is reported as ERROR;
+        each request is bounded by self.timeout.
+        """
+        test_timeout = self.timeout * (self.warmup + self.iterations)
+        # Create the session (and load requests) before the workers share it
+        self.session
+        start = time.perf_counter()
+        results: List[Optional[TestResult]] = [None] * len(tests)
+        started: Dict[int, float] = {}
+        
+        def run(index: int, test_func: callable) -> TestResult:
+            started[index] = time.perf_counter()
+            try:
+                return test_func()
+            except Exception as e:
+                return TestResult(
+                    name=names[index] if names else self._test_name(test_func),
+                    status=TestStatus.ERROR,
+                    duration_ms=(time.perf_counter() - started[index]) * 1000,
+                    message=f"Unexpected error: {str(e)}"
+                )
         
-        tests = [
-            self.test_health_check,
-            self.test_unauthorized_request,
-            self.test_authorized_request,
-            self.test_invalid_path,
-            self.test_request_id_header,
-            self.test_rate_limit_headers,
-            self.test_remote_sensing_rewrite,
-            self.test_protector_alerts_special_case,
-            self.test_content_type_passthrough,
-            self.test_error_response_format,
-        ]
-        
-        return self._run_tests(tests)
-    
-    def _run_tests(self, tests: List[callable]) -> List[TestResult]:
-        """Run a list of test functions."""
-        results = []
-        
-        for test_func in tests:
-            result = test_func()
-            results.append(result)
-            self._print_result(result)
-        
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.workers, len(tests)) or 1,
+            thread_name_prefix='proxy-test'
+        )
+        pending = {executor.submit(run, i, test_func): i for i, test_func in enumerate(tests)}
+        reported = 0
+        try:
+            while pending:
+                done, _ = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[pending.pop(future)] = future.result()
+                
+                now = time.perf_counter()
+                for future, index in list(pending.items()):
+                    if index in started and now - started[index] > test_timeout:
+                        del pending[future]
+                        results[index] = TestResult(
+                            name=names[index] if names else self._test_name(tests[index]),
+                            status=TestStatus.ERROR,
+                            duration_ms=(now - started[index]) * 1000,
+                            message=f"Test exceeded {test_timeout:g}s timeout"
+                        )
+                
+                while reported < len(tests) and results[reported] is not None:
+                    self._print_result(results[reported])
+                    reported += 1
+        finally:
+            # Timed-out tests finish in the background once their request times out
+            executor.shutdown(wait=False)
+        
+        self.elapsed_ms = (time.perf_counter() - start) * 1000
         self.results = results
         return results
     
+    @staticmethod
+    def _test_name(test_func: callable) -> str:
+        """Display name for a test method that did not return a result."""
+        name = getattr(test_func, '__name__', 'test')
+        return name[len('test_'):].replace('_', ' ').title() if name.startswith('test_') else name
+    
     def _print_result(self, result: TestResult) -> None:
         """Print a single test result."""
         status_colors = {
-            TestStatus.PASSED: Fore.GREEN,
-            TestStatus.FAILED: Fore.RED,
-            TestStatus.SKIPPED: Fore.YELLOW,
-            TestStatus.ERROR: Fore.RED
+            TestStatus.PASSED: colorama.Fore.GREEN,
+            TestStatus.FAILED: colorama.Fore.RED,
+            TestStatus.SKIPPED: colorama.Fore.YELLOW,
+            TestStatus.ERROR: colorama.Fore.RED
         }
         
         status_icons = {
@@ -471,13 +530,16 @@ class ProxyTester:
             TestStatus.ERROR: "💥"
         }
         
-        color = status_colors.get(result.status, Fore.WHITE)
+        color = status_colors.get(result.status, colorama.Fore.WHITE)
         icon = status_icons.get(result.status, "❓")
         
-        print(f"  {icon} {result.name}: {color}{result.status.value}{Style.RESET_ALL} ({result.duration_ms:.0f}ms)")
+        timing = f"{result.duration_ms:.0f}ms"
+        if result.iterations > 1:
+            timing = f"p50 {result.duration_ms:.0f}ms, p95 {result.p95_ms:.0f}ms"
+        print(f"  {icon} {result.name}: {color}{result.status.value}{colorama.Style.RESET_ALL} ({timing})")
         
         if result.message and result.status != TestStatus.PASSED:
-            print(f"     └─ {Fore.YELLOW}{result.message}{Style.RESET_ALL}")
+            print(f"     └─ {colorama.Fore.YELLOW}{result.message}{colorama.Style.RESET_ALL}")
     
     def print_summary(self) -> None:
         """Print test summary."""
@@ -487,22 +549,25 @@ class ProxyTester:
         skipped = sum(1 for r in self.results if r.status == TestStatus.SKIPPED)
         total = len(self.results)
         total_time = sum(r.duration_ms for r in self.results)
+        over_budget = sum(1 for r in self.results if r.over_budget)
         
         print("\n" + "=" * 60)
         print(f"📊 Test Summary for {self.env.upper()} environment")
         print("=" * 60)
         print(f"  Total:   {total}")
-        print(f"  {Fore.GREEN}Passed:  {passed}{Style.RESET_ALL}")
-        print(f"  {Fore.RED}Failed:  {failed}{Style.RESET_ALL}")
-        print(f"  {Fore.RED}Errors:  {errors}{Style.RESET_ALL}")
-        print(f"  {Fore.YELLOW}Skipped: {skipped}{Style.RESET_ALL}")
-        print(f"  Time:    {total_time:.0f}ms")
+        print(f"  {colorama.Fore.GREEN}Passed:  {passed}{colorama.Style.RESET_ALL}")
+        print(f"  {colorama.Fore.RED}Failed:  {failed}{colorama.Style.RESET_ALL}")
+        print(f"  {colorama.Fore.RED}Errors:  {errors}{colorama.Style.RESET_ALL}")
+        print(f"  {colorama.Fore.YELLOW}Skipped: {skipped}{colorama.Style.RESET_ALL}")
+        print(f"  Time:    {self.elapsed_ms:.0f}ms ({total_time:.0f}ms across tests, {self.workers} workers)")
+        if self.iterations > 1 or over_budget:
+            print(f"  Latency: {over_budget} over budget (p95 of {self.iterations} runs, {self.warmup} warmup)")
         print("=" * 60)
         
         if failed == 0 and errors == 0:
-            print(f"\n{Fore.GREEN}✅ All tests passed!{Style.RESET_ALL}\n")
+            print(f"\n{colorama.Fore.GREEN}✅ All tests passed!{colorama.Style.RESET_ALL}\n")
         else:
-            print(f"\n{Fore.RED}❌ Some tests failed!{Style.RESET_ALL}\n")
+            print(f"\n{colorama.Fore.RED}❌ Some tests failed!{colorama.Style.RESET_ALL}\n")
     
     def save_results(self, output_dir: str = None) -> str:
         """Save test results to JSON file."""
@@ -519,6 +584,10 @@ class ProxyTester:
             "environment": self.env,
             "timestamp": datetime.now().isoformat(),
             "base_url": self.base_url,
+            "workers": self.workers,
+            "iterations": self.iterations,
+            "warmup": self.warmup,
+            "elapsed_ms": self.elapsed_ms,
             "summary": {
                 "total": len(self.results),
                 "passed": sum(1 for r in self.results if r.status == TestStatus.PASSED),
@@ -532,7 +601,10 @@ class ProxyTester:
                     "status": r.status.value,
                     "duration_ms": r.duration_ms,
                     "message": r.message,
-                    "response_code": r.response_code
+                    "response_code": r.response_code,
+                    "p95_ms": r.p95_ms,
+                    "latency_budget_ms": r.latency_budget_ms,
+                    "breakdown": r.breakdown
                 }
                 for r in self.results
             ]
@@ -557,9 +629,10 @@ def main():
     )
     parser.add_argument(
         '--test-suite', '-t',
-        choices=['smoke', 'functional', 'integration', 'all'],
+        choices=['smoke', 'functional', 'integration', 'routes', 'routes-write', 'all'],
         default='all',
-        help='Test suite to run (default: all)'
+        help='Test suite to run (default: all; routes = generated read-only path mapping cases, '
+             'routes-write = generated POST/PUT/DELETE cases when the catalog enables write_methods)'
     )
     parser.add_argument(
         '--verbose', '-v',
@@ -581,16 +654,72 @@ def main():
         default=None,
         help='Override base URL for testing'
     )
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=8,
+        help='Tests to run concurrently (default: 8, 1 = sequential)'
+    )
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=30,
+        help='Per-request timeout in seconds; tests time out after this times their request count (default: 30)'
+    )
+    parser.add_argument(
+        '--iterations', '-n',
+        type=int,
+        default=1,
+        help='Measured requests per test; p95 is checked against the latency budget (default: 1)'
+    )
+    parser.add_argument(
+        '--warmup',
+        type=int,
+        default=0,
+        help='Unmeasured requests per test before the iterations (default: 0)'
+    )
+    parser.add_argument(
+        '--catalog',
+        default=None,
+        help='Path to the test catalog (default: config/test_catalog.json)'
+    )
+    parser.add_argument(
+        '--shard',
+        default=None,
+        help='Run only shard I of N of the suite, e.g. 2/4 (for parallel CI jobs)'
+    )
+    parser.add_argument(
+        '--list',
+        action='store_true',
+        help='List the selected test cases without running them'
+    )
     
     args = parser.parse_args()
     
+    # Initialize colorama for Windows
+    colorama.init()
+    
     try:
         tester = ProxyTester(
             env=args.env,
             config_path=args.config,
-            verbose=args.verbose
+            verbose=args.verbose,
+            workers=args.workers,
+            timeout=args.timeout,
+            catalog_path=args.catalog,
+            iterations=args.iterations,
+            warmup=args.warmup,
+            shard=parse_shard(args.shard) if args.shard else None
         )
         
+        if args.list:
+            cases = tester.select_cases(args.test_suite)
+            print(f"\n📋 {len(cases)} test cases in suite '{args.test_suite}'")
+            for case in cases:
+                token = f" [{case.token}]" if case.token else ""
+                print(f"  {case.method:<6} {case.path:<40} {case.name}{token}")
+            sys.exit(0)
+        
         # Override base URL if provided
         if args.base_url:
             tester.base_url = args.base_url
@@ -602,10 +731,13 @@ def main():
             'smoke': tester.run_smoke_tests,
             'functional': tester.run_functional_tests,
             'integration': tester.run_integration_tests,
+            'routes': tester.run_route_tests,
+            'routes-write': tester.run_route_write_tests,
             'all': tester.run_all_tests
         }
         
         suite_runners[args.test_suite]()
+        tester.close()
         
         # Print summary
         tester.print_summary()
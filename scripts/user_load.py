@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Cropwise Unified Platform - Synthetic User Load
+
+Generates a population of synthetic users with a rate-limit tier
+distribution, writes the matching user-rate-limits desired-state file (for
+kvm_sync.py) and a pre-signed token per user, then drives load with a
+Zipfian user distribution. KVM-Get-User-Rate-Limit cost depends on how many
+distinct jwt.username keys are hit; the report puts the modeled rate-limit
+cache hit rate for this cardinality next to the measured latency and
+X-Apigee-KVM-Time of modeled hits and misses.
+
+Sync the KVM first (python scripts/kvm_sync.py --env dev --desired users-kvm.json),
+and sign tokens with the key the target verifies (the local gateway accepts
+the test fixtures' secret).
+
+Usage:
+    python scripts/user_load.py --users 10000 --write-kvm ./dist/users-kvm.json --model-only
+    python scripts/user_load.py --env dev --users 10000 --zipf 1.1 --requests 20000 --rate 200
+    python scripts/user_load.py --base-url http://127.0.0.1:8080/cropwise-unified-platform --tiers high-rate=10,low-rate=40,default=50
+"""
+
+import sys
+import json
+import asyncio
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+from utils.case_catalog import load_token_fixtures
+from utils.config_model import load_config
+from utils.token_pool import TokenPool
+from utils.user_population import (
+    NO_ENTRY, PopulationLoad, ZipfSampler, expected_hit_rate, generate_population,
+    parse_tier_distribution, write_desired_state
+)
+
+
+BASE_DIR = Path(__file__).parent.parent
+DEFAULT_TIERS = 'high-rate=5,medium-rate=25,low-rate=20,default=50'
+
+
+def print_population(users: list, sampler: ZipfSampler) -> None:
+    tiers = {}
+    for user in users:
+        tiers[user.tier or NO_ENTRY] = tiers.get(user.tier or NO_ENTRY, 0) + 1
+    print(f"\n👥 {len(users)} users: " + ", ".join(f"{tier} {count}" for tier, count in sorted(tiers.items())))
+    print(f"  Zipf s={sampler.s:g}: top 1% of users get {sampler.top_share(0.01) * 100:.1f}% of requests, "
+          f"top 10% get {sampler.top_share(0.10) * 100:.1f}%")
+
+
+def print_report(report: dict) -> None:
+    print(f"\n📊 Sent {report['sent']} requests in {report['elapsed_s']}s "
+          f"({report['achieved_rate_per_s']}/s) to {report['distinct_users']} distinct users")
+    print(f"  By tier: {report['requests_by_tier']}")
+    print(f"  Statuses: {report['statuses']}")
+    if report['errors']:
+        print(f"  ❌ Errors: {report['errors']}")
+    print(f"  Modeled cache hit rate: {report['modeled_hit_rate'] * 100:.1f}%")
+    for outcome in ('hit', 'miss'):
+        latency = report['latency'][outcome]
+        if not latency.get('count'):
+            continue
+        kvm = report['kvm_time'][outcome]
+        kvm_text = f", KVM p50 {kvm['p50_ms']}ms p95 {kvm['p95_ms']}ms" if kvm.get('count') else ", no X-Apigee-KVM-Time"
+        print(f"  Cache {outcome}: {latency['count']} requests, p50 {latency['p50_ms']}ms, "
+              f"p95 {latency['p95_ms']}ms{kvm_text}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Generate synthetic users and drive Zipfian load to measure KVM cardinality effects'
+    )
+    parser.add_argument(
+        '--users', '-u',
+        type=int,
+        default=1000,
+        help='Number of synthetic users (default: 1000)'
+    )
+    parser.add_argument(
+        '--tiers',
+        default=DEFAULT_TIERS,
+        help=f"Tier weights; 'default' users get no KVM entry (default: {DEFAULT_TIERS})"
+    )
+    parser.add_argument(
+        '--zipf',
+        type=float,
+        default=1.0,
+        help='Zipf exponent of user popularity; 0 = uniform (default: 1.0)'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=0,
+        help='Random seed for tiers and sampling (default: 0)'
+    )
+    parser.add_argument(
+        '--write-kvm',
+        default=None,
+        help='Write the user-rate-limits desired-state file (.json or .csv) for kvm_sync.py'
+    )
+    parser.add_argument(
+        '--write-tokens',
+        default=None,
+        help='Write {username: token} JSON for other load tools'
+    )
+    parser.add_argument(
+        '--token-fixtures',
+        default=str(BASE_DIR / 'tests' / 'fixtures' / 'test_tokens.json'),
+        help='Token fixtures file providing the signing secret (default: tests/fixtures/test_tokens.json)'
+    )
+    parser.add_argument(
+        '--requests', '-n',
+        type=int,
+        default=10000,
+        help='Requests to send (default: 10000)'
+    )
+    parser.add_argument(
+        '--rate',
+        type=float,
+        default=100.0,
+        help='Requests per second; 0 = as fast as --max-in-flight allows (default: 100)'
+    )
+    parser.add_argument(
+        '--max-in-flight',
+        type=int,
+        default=64,
+        help='Concurrent requests (default: 64)'
+    )
+    parser.add_argument(
+        '--path',
+        default='/v1/users',
+        help='Request path below the base path (default: /v1/users)'
+    )
+    parser.add_argument(
+        '--cache-ttl',
+        type=float,
+        default=None,
+        help='Rate-limit cache TTL in seconds for the hit model (default: policies.json)'
+    )
+    parser.add_argument(
+        '--model-only',
+        action='store_true',
+        help='Only report the modeled cache hit rate; send no requests'
+    )
+    parser.add_argument(
+        '--env', '-e',
+        default='dev',
+        choices=['dev', 'qa', 'prod'],
+        help='Environment whose proxy URL is used without --base-url (default: dev)'
+    )
+    parser.add_argument(
+        '--base-url',
+        default=None,
+        help='Proxy or gateway URL including the base path'
+    )
+    parser.add_argument(
+        '--config', '-c',
+        default=None,
+        help='Path to environments.json configuration file'
+    )
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=30.0,
+        help='Per-request timeout in seconds (default: 30)'
+    )
+    parser.add_argument(
+        '--insecure',
+        action='store_true',
+        help='Do not verify TLS certificates'
+    )
+    parser.add_argument(
+        '--output', '-o',
+        default=None,
+        help='Directory to save the JSON report'
+    )
+
+    args = parser.parse_args()
+
+    try:
+        distribution = parse_tier_distribution(args.tiers)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+    if args.users < 1:
+        print("❌ --users must be at least 1")
+        sys.exit(2)
+
+    config = load_config(environments_path=args.config)
+    cache_ttl = args.cache_ttl
+    if cache_ttl is None:
+        cache_ttl = float(config.policy('KVM-Get-User-Rate-Limit').get('cache', {}).get('ttl_seconds', 300))
+
+    users = generate_population(args.users, distribution, seed=args.seed)
+    print_population(users, ZipfSampler(len(users), args.zipf, args.seed))
+
+    if args.write_kvm:
+        written = write_desired_state(users, args.write_kvm)
+        print(f"\n🗝️  Wrote {written} KVM entries: {args.write_kvm}")
+
+    fixtures = load_token_fixtures(args.token_fixtures)
+    secret = next(iter(fixtures.values())).secret if fixtures else ''
+    pool = TokenPool(users, secret)
+    print(f"🔑 Signed {len(users)} tokens in {pool.last_sign_ms:.0f}ms")
+    if args.write_tokens:
+        Path(args.write_tokens).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.write_tokens, 'w') as f:
+            json.dump({user.username: pool.token_for(user.username) for user in users}, f, indent=2)
+        print(f"🔑 Wrote tokens: {args.write_tokens}")
+
+    model_rate = args.rate if args.rate > 0 else 1000.0
+    model = expected_hit_rate(users, ZipfSampler(len(users), args.zipf, args.seed), args.requests, model_rate, cache_ttl)
+    print(f"\n🧮 Modeled cache (TTL {cache_ttl:g}s, {model_rate:g}/s): hit rate {model['hit_rate'] * 100:.1f}%, "
+          f"{model['distinct_users']} distinct users, {model['no_entry_share'] * 100:.1f}% of requests without a KVM entry")
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "users": args.users,
+        "tiers": distribution,
+        "zipf": args.zipf,
+        "seed": args.seed,
+        "cache_ttl_s": cache_ttl,
+        "model": model,
+    }
+
+    if not args.model_only:
+        env_config = config.env(args.env)
+        base_url = args.base_url or (
+            f"https://{env_config['apigee_org']}-{env_config['apigee_env']}.apigee.net{env_config['base_path']}"
+        )
+        load = PopulationLoad(
+            base_url,
+            users,
+            pool,
+            ZipfSampler(len(users), args.zipf, args.seed),
+            path=args.path,
+            rate_per_s=args.rate,
+            max_in_flight=args.max_in_flight,
+            cache_ttl_seconds=cache_ttl,
+            timeout=args.timeout,
+            verify_tls=not args.insecure
+        )
+        print(f"\n🚀 Sending {args.requests} requests to {load.url} "
+              f"({'unpaced' if args.rate <= 0 else f'{args.rate:g}/s'})")
+        try:
+            report["load"] = asyncio.run(load.run(args.requests))
+        except KeyboardInterrupt:
+            print("\n⏹️  Interrupted")
+            report["load"] = load.stats.report(load.model)
+        print_report(report["load"])
+
+    if args.output:
+        output_dir = Path(args.output)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        output_file = output_dir / f"user-load-{timestamp}.json"
+        with open(output_file, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Report saved: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
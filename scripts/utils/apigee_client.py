@@ -4,13 +4,36 @@ Apigee X API Client
 Provides a Python client for interacting with Apigee X Management APIs.
 """
 
-import requests
+import os
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional
+from urllib.parse import quote
 
-from google.auth import default
-from google.auth.transport.requests import Request
-from google.oauth2 import service_account
+from .lazy_import import lazy_import
+
+requests = lazy_import('requests')
+
+
+class ApigeeApiError(RuntimeError):
+    """A failed management API call, keeping the HTTP status for retry decisions."""
+
+    def __init__(self, message: str, status_code: int, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def _api_error(action: str, response: 'requests.Response') -> ApigeeApiError:
+    retry_after = response.headers.get('Retry-After')
+    try:
+        retry_after = float(retry_after) if retry_after else None
+    except ValueError:
+        retry_after = None
+    return ApigeeApiError(
+        f"Failed to {action}: {response.status_code} - {response.text}",
+        response.status_code,
+        retry_after
+    )
 
 
 class ApigeeClient:
@@ -18,20 +41,34 @@ class ApigeeClient:
     
     BASE_URL = "https://apigee.googleapis.com/v1"
     
-    def __init__(self, org: str, credentials_path: str = None):
+    def __init__(
+        self,
+        org: str,
+        credentials_path: str = None,
+        base_url: str = None,
+        token: str = None
+    ):
         """
         Initialize the Apigee client.
         
         Args:
             org: The Apigee X organization name
             credentials_path: Optional path to service account JSON file
+            base_url: Management API base URL (default: APIGEE_BASE_URL or BASE_URL)
+            token: Optional fixed access token used instead of Google credentials
         """
         self.org = org
-        self.credentials = self._get_credentials(credentials_path)
+        self.base_url = (base_url or os.getenv('APIGEE_BASE_URL') or self.BASE_URL).rstrip('/')
+        self.token = token
+        self.credentials = None if token else self._get_credentials(credentials_path)
         self.session = requests.Session()
     
     def _get_credentials(self, credentials_path: str = None):
         """Get Google Cloud credentials."""
+        # Imported here: the Google auth stack is slow to load and unused with a token
+        from google.auth import default
+        from google.oauth2 import service_account
+        
         if credentials_path:
             credentials = service_account.Credentials.from_service_account_file(
                 credentials_path,
@@ -45,7 +82,10 @@ class ApigeeClient:
     
     def _get_auth_header(self) -> Dict[str, str]:
         """Get authorization header with fresh token."""
+        if self.token:
+            return {"Authorization": f"Bearer {self.token}"}
         if not self.credentials.valid:
+            from google.auth.transport.requests import Request
             self.credentials.refresh(Request())
         return {"Authorization": f"Bearer {self.credentials.token}"}
     
@@ -54,9 +94,9 @@ class ApigeeClient:
         method: str,
         endpoint: str,
         **kwargs
-    ) -> requests.Response:
+    ) -> 'requests.Response':
         """Make authenticated request to Apigee API."""
-        url = f"{self.BASE_URL}/{endpoint}"
+        url = f"{self.base_url}/{endpoint}"
         headers = self._get_auth_header()
         headers.update(kwargs.pop('headers', {}))
         
@@ -221,3 +261,90 @@ class ApigeeClient:
             raise RuntimeError(
                 f"Failed to create KVM: {response.status_code} - {response.text}"
             )
+
+    def _kvm_entries_endpoint(self, env: str, kvm_name: str, key: str = None) -> str:
+        endpoint = f"organizations/{self.org}/environments/{env}/keyvaluemaps/{kvm_name}/entries"
+        if key is not None:
+            endpoint += f"/{quote(key, safe='')}"
+        return endpoint
+    
+    def list_kvm_entries(
+        self,
+        env: str,
+        kvm_name: str,
+        page_size: int = 100,
+        page_token: str = None
+    ) -> Dict[str, Any]:
+        """
+        Get one page of KVM entries.
+        
+        Returns:
+            {"keyValueEntries": [{"name", "value"}], "nextPageToken": ""}
+        """
+        params = {'pageSize': page_size}
+        if page_token:
+            params['pageToken'] = page_token
+        response = self._make_request('GET', self._kvm_entries_endpoint(env, kvm_name), params=params)
+        
+        if response.status_code == 200:
+            return response.json()
+        raise _api_error("list KVM entries", response)
+    
+    def iter_kvm_entries(
+        self,
+        env: str,
+        kvm_name: str,
+        page_size: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield every KVM entry ({"name", "value"}), fetching pages as they are consumed."""
+        page_token = None
+        while True:
+            page = self.list_kvm_entries(env, kvm_name, page_size=page_size, page_token=page_token)
+            yield from page.get('keyValueEntries', [])
+            page_token = page.get('nextPageToken')
+            if not page_token:
+                return
+    
+    def get_kvm_entry(self, env: str, kvm_name: str, key: str) -> Optional[str]:
+        """Get the value of a KVM entry (None if it does not exist)."""
+        response = self._make_request('GET', self._kvm_entries_endpoint(env, kvm_name, key))
+        
+        if response.status_code == 200:
+            return response.json().get('value')
+        elif response.status_code == 404:
+            return None
+        raise _api_error("get KVM entry", response)
+    
+    def create_kvm_entry(self, env: str, kvm_name: str, key: str, value: str) -> Dict[str, Any]:
+        """Create a KVM entry (409 ApigeeApiError if it already exists)."""
+        response = self._make_request(
+            'POST',
+            self._kvm_entries_endpoint(env, kvm_name),
+            json={"name": key, "value": value}
+        )
+        
+        if response.status_code in [200, 201]:
+            return response.json()
+        raise _api_error("create KVM entry", response)
+    
+    def update_kvm_entry(self, env: str, kvm_name: str, key: str, value: str) -> Dict[str, Any]:
+        """Update an existing KVM entry (404 ApigeeApiError if it does not exist)."""
+        response = self._make_request(
+            'PUT',
+            self._kvm_entries_endpoint(env, kvm_name, key),
+            json={"name": key, "value": value}
+        )
+        
+        if response.status_code == 200:
+            return response.json()
+        raise _api_error("update KVM entry", response)
+    
+    def delete_kvm_entry(self, env: str, kvm_name: str, key: str) -> bool:
+        """Delete a KVM entry; False if it did not exist."""
+        response = self._make_request('DELETE', self._kvm_entries_endpoint(env, kvm_name, key))
+        
+        if response.status_code in [200, 204]:
+            return True
+        elif response.status_code == 404:
+            return False
+        raise _api_error("delete KVM entry", response)
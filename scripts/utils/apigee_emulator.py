@@ -0,0 +1,540 @@
+"""
+Apigee Management API Emulator
+
+A localhost HTTP emulator of the Apigee X management endpoints used by the
+deploy tooling (ApigeeClient, ApigeeXClient, ApigeeDeployer):
+
+    - organizations/{org}/apis                       list / import (revision numbering)
+    - organizations/{org}/apis/{api}[/revisions]     get / list revisions
+    - .../environments/{env}/apis/{api}/revisions/{rev}/deployments
+                                                     deploy / status / undeploy
+    - .../environments/{env}/apis/{api}/deployments  list deployments
+    - organizations/{org}/environments               list environments
+    - .../environments/{env}/keyvaluemaps[/{map}[/entries[/{key}]]]
+                                                     KVM and entry CRUD, paginated
+    - .../environments/{env}/targetservers[/{name}]  TargetServer create / get / update
+
+Deployments report PROGRESSING until a configurable delay has elapsed and
+READY afterwards. Every request can be slowed down and failed at a seeded,
+configurable rate so pipeline timing and retry behaviour are reproducible,
+and a per-second request quota answers 429 with Retry-After like the
+management API's own quota.
+
+Point the clients at ``emulator.base_url`` (or set APIGEE_BASE_URL) with any
+access token; the emulator does not check authorization.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+
+# Environment names used by environments.json (deploy_proxy.py) and ApigeeDeployer.ENV_MAP (deploy.py)
+DEFAULT_ENVIRONMENTS = ['dev', 'qa', 'prod', 'default-dev', 'default-qa', 'default-prod']
+
+# Google API status names for the error codes the emulator returns
+STATUS_NAMES = {
+    400: 'INVALID_ARGUMENT',
+    404: 'NOT_FOUND',
+    409: 'ALREADY_EXISTS',
+    429: 'RESOURCE_EXHAUSTED',
+    500: 'INTERNAL',
+    503: 'UNAVAILABLE',
+}
+
+
+@dataclass
+class EmulatorSettings:
+    """Latency, failure and readiness behaviour of the emulator."""
+    latency_ms: float = 0.0              # Base latency added to every request
+    latency_jitter_ms: float = 0.0       # Uniform jitter added on top of latency_ms
+    error_rate: float = 0.0              # Fraction of requests failed with error_status
+    error_status: int = 503
+    ready_delay_s: float = 0.0           # Time for a deployment to go PROGRESSING -> READY
+    page_size: int = 100                 # Default KVM entries page size
+    rate_limit_per_s: float = 0.0        # Requests per second before 429 RESOURCE_EXHAUSTED (0: unlimited)
+    seed: int = 0
+    environments: List[str] = field(default_factory=lambda: list(DEFAULT_ENVIRONMENTS))
+
+
+@dataclass
+class RequestRecord:
+    """One request handled by the emulator."""
+    method: str
+    path: str
+    status: int
+    duration_ms: float
+    injected: bool = False
+
+
+class ApiError(Exception):
+    """An error response in Google API format."""
+
+    def __init__(self, status: int, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.retry_after = retry_after
+
+
+class EmulatorState:
+    """In-memory Apigee organization state shared by all request threads."""
+
+    def __init__(self, settings: EmulatorSettings):
+        self.settings = settings
+        self.lock = threading.Lock()
+        self.apis: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self.deployments: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self.kvms: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self.target_servers: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+
+    def _check_env(self, env: str) -> None:
+        if env not in self.settings.environments:
+            raise ApiError(404, f"environment {env} not found")
+
+    # ============== APIs ==============
+
+    def list_apis(self, org: str) -> Dict[str, Any]:
+        names = sorted(name for o, name in self.apis if o == org)
+        return {"proxies": [{"name": name} for name in names]}
+
+    def import_api(self, org: str, name: Optional[str], body: bytes) -> Dict[str, Any]:
+        if not name:
+            raise ApiError(400, "name is required")
+        if b'PK\x03\x04' not in body:
+            raise ApiError(400, "bundle is not a zip file")
+        revisions = self.apis.setdefault((org, name), [])
+        revision = {
+            "name": name,
+            "revision": str(len(revisions) + 1),
+            "createdAt": str(int(time.time() * 1000)),
+            "size": len(body),
+        }
+        revisions.append(revision)
+        return dict(revision)
+
+    def _revisions(self, org: str, name: str) -> List[Dict[str, Any]]:
+        revisions = self.apis.get((org, name))
+        if not revisions:
+            raise ApiError(404, f"API proxy {name} not found")
+        return revisions
+
+    def get_api(self, org: str, name: str) -> Dict[str, Any]:
+        revisions = self._revisions(org, name)
+        return {
+            "name": name,
+            "revision": [r["revision"] for r in revisions],
+            "latestRevisionId": revisions[-1]["revision"],
+        }
+
+    def list_revisions(self, org: str, name: str) -> List[str]:
+        return [r["revision"] for r in self._revisions(org, name)]
+
+    # ============== Deployments ==============
+
+    def _deployment_view(self, deployment: Dict[str, Any]) -> Dict[str, Any]:
+        ready = time.monotonic() - deployment["_started"] >= self.settings.ready_delay_s
+        view = {k: v for k, v in deployment.items() if not k.startswith('_')}
+        view["state"] = "READY" if ready else "PROGRESSING"
+        return view
+
+    def deploy(self, org: str, env: str, name: str, revision: str, override: bool) -> Dict[str, Any]:
+        self._check_env(env)
+        if revision not in self.list_revisions(org, name):
+            raise ApiError(404, f"revision {revision} of API proxy {name} not found")
+        current = self.deployments.get((org, env, name))
+        if current and current["revision"] != revision and not override:
+            raise ApiError(
+                400,
+                f"revision {current['revision']} of API proxy {name} is already deployed "
+                f"to environment {env}; set override=true to replace it"
+            )
+        deployment = {
+            "environment": env,
+            "apiProxy": name,
+            "revision": revision,
+            "deployStartTime": str(int(time.time() * 1000)),
+            "_started": time.monotonic(),
+        }
+        self.deployments[(org, env, name)] = deployment
+        return self._deployment_view(deployment)
+
+    def _deployment(self, org: str, env: str, name: str, revision: str) -> Dict[str, Any]:
+        self._check_env(env)
+        deployment = self.deployments.get((org, env, name))
+        if not deployment or deployment["revision"] != revision:
+            raise ApiError(404, f"revision {revision} of API proxy {name} is not deployed to {env}")
+        return deployment
+
+    def get_deployment(self, org: str, env: str, name: str, revision: str) -> Dict[str, Any]:
+        return self._deployment_view(self._deployment(org, env, name, revision))
+
+    def undeploy(self, org: str, env: str, name: str, revision: str) -> Dict[str, Any]:
+        self._deployment(org, env, name, revision)
+        del self.deployments[(org, env, name)]
+        return {}
+
+    def list_deployments(self, org: str, env: str, name: str) -> Dict[str, Any]:
+        self._check_env(env)
+        deployment = self.deployments.get((org, env, name))
+        return {"deployments": [self._deployment_view(deployment)] if deployment else []}
+
+    # ============== KVMs ==============
+
+    def _kvm(self, org: str, env: str, name: str) -> Dict[str, Any]:
+        self._check_env(env)
+        kvm = self.kvms.get((org, env, name))
+        if kvm is None:
+            raise ApiError(404, f"key value map {name} not found")
+        return kvm
+
+    def list_kvms(self, org: str, env: str) -> List[str]:
+        self._check_env(env)
+        return sorted(name for o, e, name in self.kvms if (o, e) == (org, env))
+
+    def create_kvm(self, org: str, env: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        self._check_env(env)
+        name = body.get("name")
+        if not name:
+            raise ApiError(400, "name is required")
+        if (org, env, name) in self.kvms:
+            raise ApiError(409, f"key value map {name} already exists")
+        self.kvms[(org, env, name)] = {"encrypted": bool(body.get("encrypted", True)), "entries": {}}
+        return {"name": name, "encrypted": self.kvms[(org, env, name)]["encrypted"]}
+
+    def get_kvm(self, org: str, env: str, name: str) -> Dict[str, Any]:
+        return {"name": name, "encrypted": self._kvm(org, env, name)["encrypted"]}
+
+    def delete_kvm(self, org: str, env: str, name: str) -> Dict[str, Any]:
+        kvm = self._kvm(org, env, name)
+        del self.kvms[(org, env, name)]
+        return {"name": name, "encrypted": kvm["encrypted"]}
+
+    def list_entries(self, org: str, env: str, name: str, page_size: int, page_token: str) -> Dict[str, Any]:
+        entries = self._kvm(org, env, name)["entries"]
+        keys = sorted(entries)
+        start = 0
+        if page_token:
+            start = next((i for i, k in enumerate(keys) if k > page_token), len(keys))
+        page = keys[start:start + page_size]
+        more = start + page_size < len(keys)
+        return {
+            "keyValueEntries": [{"name": k, "value": entries[k]} for k in page],
+            "nextPageToken": page[-1] if more and page else "",
+        }
+
+    def create_entry(self, org: str, env: str, name: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        entries = self._kvm(org, env, name)["entries"]
+        key = body.get("name")
+        if not key or "value" not in body:
+            raise ApiError(400, "name and value are required")
+        if key in entries:
+            raise ApiError(409, f"entry {key} already exists")
+        entries[key] = str(body["value"])
+        return {"name": key, "value": entries[key]}
+
+    def get_entry(self, org: str, env: str, name: str, key: str) -> Dict[str, Any]:
+        entries = self._kvm(org, env, name)["entries"]
+        if key not in entries:
+            raise ApiError(404, f"entry {key} not found")
+        return {"name": key, "value": entries[key]}
+
+    def update_entry(self, org: str, env: str, name: str, key: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        entries = self._kvm(org, env, name)["entries"]
+        if key not in entries:
+            raise ApiError(404, f"entry {key} not found")
+        if "value" not in body:
+            raise ApiError(400, "value is required")
+        entries[key] = str(body["value"])
+        return {"name": key, "value": entries[key]}
+
+    def delete_entry(self, org: str, env: str, name: str, key: str) -> Dict[str, Any]:
+        entry = self.get_entry(org, env, name, key)
+        del self._kvm(org, env, name)["entries"][key]
+        return entry
+
+    # ============== Target servers ==============
+
+    def list_target_servers(self, org: str, env: str) -> List[str]:
+        self._check_env(env)
+        return sorted(name for o, e, name in self.target_servers if (o, e) == (org, env))
+
+    def create_target_server(self, org: str, env: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        self._check_env(env)
+        name = body.get("name")
+        if not name or not body.get("host") or not body.get("port"):
+            raise ApiError(400, "name, host and port are required")
+        if (org, env, name) in self.target_servers:
+            raise ApiError(409, f"target server {name} already exists")
+        self.target_servers[(org, env, name)] = dict(body)
+        return dict(body)
+
+    def get_target_server(self, org: str, env: str, name: str) -> Dict[str, Any]:
+        self._check_env(env)
+        server = self.target_servers.get((org, env, name))
+        if server is None:
+            raise ApiError(404, f"target server {name} not found")
+        return dict(server)
+
+    def update_target_server(self, org: str, env: str, name: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        self.get_target_server(org, env, name)
+        if not body.get("host") or not body.get("port"):
+            raise ApiError(400, "host and port are required")
+        self.target_servers[(org, env, name)] = dict(body, name=name)
+        return dict(body, name=name)
+
+
+_SEG = r'([^/]+)'
+_ORG = rf'/v1/organizations/{_SEG}'
+_ENV = rf'{_ORG}/environments/{_SEG}'
+_KVM = rf'{_ENV}/keyvaluemaps/{_SEG}'
+
+# (method, path pattern, handler name); handlers receive (state, groups, query, body)
+ROUTES = [
+    ('GET', rf'{_ORG}/environments', 'list_environments'),
+    ('GET', rf'{_ORG}/apis', 'list_apis'),
+    ('POST', rf'{_ORG}/apis', 'import_api'),
+    ('GET', rf'{_ORG}/apis/{_SEG}', 'get_api'),
+    ('GET', rf'{_ORG}/apis/{_SEG}/revisions', 'list_revisions'),
+    ('GET', rf'{_ENV}/apis/{_SEG}/deployments', 'list_deployments'),
+    ('POST', rf'{_ENV}/apis/{_SEG}/revisions/{_SEG}/deployments', 'deploy'),
+    ('GET', rf'{_ENV}/apis/{_SEG}/revisions/{_SEG}/deployments', 'get_deployment'),
+    ('DELETE', rf'{_ENV}/apis/{_SEG}/revisions/{_SEG}/deployments', 'undeploy'),
+    ('GET', rf'{_ENV}/keyvaluemaps', 'list_kvms'),
+    ('POST', rf'{_ENV}/keyvaluemaps', 'create_kvm'),
+    ('GET', rf'{_KVM}', 'get_kvm'),
+    ('DELETE', rf'{_KVM}', 'delete_kvm'),
+    ('GET', rf'{_KVM}/entries', 'list_entries'),
+    ('POST', rf'{_KVM}/entries', 'create_entry'),
+    ('GET', rf'{_KVM}/entries/{_SEG}', 'get_entry'),
+    ('PUT', rf'{_KVM}/entries/{_SEG}', 'update_entry'),
+    ('DELETE', rf'{_KVM}/entries/{_SEG}', 'delete_entry'),
+    ('GET', rf'{_ENV}/targetservers', 'list_target_servers'),
+    ('POST', rf'{_ENV}/targetservers', 'create_target_server'),
+    ('GET', rf'{_ENV}/targetservers/{_SEG}', 'get_target_server'),
+    ('PUT', rf'{_ENV}/targetservers/{_SEG}', 'update_target_server'),
+]
+_COMPILED_ROUTES = [(method, re.compile(pattern + '$'), handler) for method, pattern, handler in ROUTES]
+
+
+def _json_body(body: bytes) -> Dict[str, Any]:
+    try:
+        return json.loads(body or b'{}')
+    except ValueError:
+        raise ApiError(400, "request body is not valid JSON")
+
+
+def _page_size(query: Dict[str, str], default: int) -> int:
+    try:
+        page_size = int(query.get('pageSize') or default)
+    except ValueError:
+        page_size = 0
+    if page_size < 1:
+        raise ApiError(400, f"pageSize must be a positive integer, got {query.get('pageSize')!r}")
+    return page_size
+
+
+def _dispatch(state: EmulatorState, handler: str, groups: Tuple[str, ...], query: Dict[str, str], body: bytes):
+    if handler == 'list_environments':
+        return list(state.settings.environments)
+    if handler == 'import_api':
+        return state.import_api(groups[0], query.get('name'), body)
+    if handler == 'deploy':
+        return state.deploy(*groups, override=query.get('override') == 'true')
+    if handler == 'create_kvm':
+        return state.create_kvm(*groups, _json_body(body))
+    if handler == 'list_entries':
+        page_size = _page_size(query, state.settings.page_size)
+        return state.list_entries(*groups, page_size, query.get('pageToken', ''))
+    if handler in ('create_entry', 'update_entry', 'create_target_server', 'update_target_server'):
+        return getattr(state, handler)(*groups, _json_body(body))
+    return getattr(state, handler)(*groups)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Routes requests to the emulator state."""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    emulator: 'ApigeeEmulator' = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, payload: Any, headers: Dict[str, str] = None) -> None:
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self, method: str) -> None:
+        start = time.perf_counter()
+        emulator = self.emulator
+        parsed = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+
+        delay, inject = emulator._next_fault()
+        if delay:
+            time.sleep(delay)
+
+        status, payload, headers = 200, None, {}
+        try:
+            if inject:
+                raise ApiError(emulator.settings.error_status, "injected failure")
+            retry_after = emulator._throttle()
+            if retry_after is not None:
+                raise ApiError(429, "quota exceeded for management API requests", retry_after)
+            for route_method, pattern, handler in _COMPILED_ROUTES:
+                match = pattern.match(parsed.path)
+                if match and route_method == method:
+                    with emulator.state.lock:
+                        payload = _dispatch(
+                            emulator.state, handler,
+                            tuple(unquote(g) for g in match.groups()), query, body
+                        )
+                    break
+            else:
+                raise ApiError(404, f"no route for {method} {parsed.path}")
+        except ApiError as e:
+            status = e.status
+            if e.retry_after is not None:
+                headers['Retry-After'] = f"{e.retry_after:.3f}"
+            payload = {"error": {
+                "code": e.status,
+                "message": e.message,
+                "status": STATUS_NAMES.get(e.status, 'UNKNOWN'),
+            }}
+
+        emulator._record(RequestRecord(
+            method=method,
+            path=parsed.path,
+            status=status,
+            duration_ms=(time.perf_counter() - start) * 1000,
+            injected=inject,
+        ))
+        self._send(status, payload, headers)
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PUT(self):
+        self._handle('PUT')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+
+class ApigeeEmulator:
+    """Runs the management API emulator on a background thread."""
+
+    def __init__(self, settings: EmulatorSettings = None, host: str = '127.0.0.1', port: int = 0):
+        """
+        Initialize the emulator.
+
+        Args:
+            settings: Latency, failure and readiness behaviour
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+        """
+        self.settings = settings or EmulatorSettings()
+        self.state = EmulatorState(self.settings)
+        self.requests: List[RequestRecord] = []
+        self._rng = random.Random(self.settings.seed)
+        self._rng_lock = threading.Lock()
+        self._window_start = 0.0
+        self._window_count = 0
+
+        handler = type('EmulatorHandler', (_Handler,), {'emulator': self})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """Management API base URL, equivalent to https://apigee.googleapis.com/v1."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self) -> 'ApigeeEmulator':
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and release the port."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _next_fault(self) -> Tuple[float, bool]:
+        """Draw the injected delay (seconds) and failure decision for one request."""
+        s = self.settings
+        with self._rng_lock:
+            jitter = self._rng.uniform(0, s.latency_jitter_ms) if s.latency_jitter_ms else 0.0
+            inject = s.error_rate > 0 and self._rng.random() < s.error_rate
+        return (s.latency_ms + jitter) / 1000.0, inject
+
+    def _throttle(self) -> Optional[float]:
+        """Seconds until the next one-second quota window when over rate_limit_per_s, else None."""
+        limit = self.settings.rate_limit_per_s
+        if not limit:
+            return None
+        now = time.monotonic()
+        with self._rng_lock:
+            if now - self._window_start >= 1.0:
+                self._window_start = now
+                self._window_count = 0
+            self._window_count += 1
+            if self._window_count <= limit:
+                return None
+            return max(0.0, 1.0 - (now - self._window_start))
+
+    def _record(self, record: RequestRecord) -> None:
+        with self._rng_lock:
+            self.requests.append(record)
+
+    def stats(self) -> Dict[str, Any]:
+        """Summarize handled requests by route and status."""
+        with self._rng_lock:
+            records = list(self.requests)
+        by_route: Dict[str, List[float]] = {}
+        statuses: Dict[int, int] = {}
+        for r in records:
+            route = re.sub(r'/organizations/[^/]+', '/organizations/{org}', r.path)
+            route = re.sub(r'/revisions/[^/]+', '/revisions/{rev}', route)
+            by_route.setdefault(f"{r.method} {route}", []).append(r.duration_ms)
+            statuses[r.status] = statuses.get(r.status, 0) + 1
+        return {
+            "requests": len(records),
+            "injected_failures": sum(1 for r in records if r.injected),
+            "status_counts": dict(sorted(statuses.items())),
+            "routes": {
+                route: {"count": len(d), "mean_ms": round(sum(d) / len(d), 2), "max_ms": round(max(d), 2)}
+                for route, d in sorted(by_route.items())
+            },
+        }
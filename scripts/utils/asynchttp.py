@@ -0,0 +1,511 @@
+"""
+Async HTTP/1.1
+
+A small asyncio HTTP/1.1 server and pooled client used by the local gateway,
+stub backend and load tools. Supports keep-alive, Content-Length and chunked
+bodies and TLS to upstreams; it deliberately does not implement pipelining,
+HTTP/2 or request body streaming to handlers.
+
+HTTPClient sends through httpx (requirements.txt) when it is installed and
+falls back to the built-in connection pool otherwise. The fallback only
+resends a request on a fresh connection when a pooled connection fails and
+the method is safe (GET, HEAD, OPTIONS), and never pools a connection whose
+response body was delimited by EOF.
+"""
+
+import asyncio
+import multiprocessing
+import socket
+import ssl
+import sys
+import threading
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+MAX_HEADER_BYTES = 64 * 1024
+
+# Headers that apply to a single connection and are not forwarded by proxies
+HOP_BY_HOP = frozenset([
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+    'te', 'trailer', 'transfer-encoding', 'upgrade',
+])
+
+# Methods the fallback client may resend after a stale pooled connection fails
+SAFE_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+
+# Several processes can share a listening port (not on Windows)
+REUSE_PORT = hasattr(socket, 'SO_REUSEPORT')
+
+REASONS = {
+    200: 'OK', 201: 'Created', 202: 'Accepted', 204: 'No Content',
+    301: 'Moved Permanently', 302: 'Found', 304: 'Not Modified',
+    400: 'Bad Request', 401: 'Unauthorized', 403: 'Forbidden', 404: 'Not Found',
+    405: 'Method Not Allowed', 408: 'Request Timeout', 413: 'Payload Too Large',
+    429: 'Too Many Requests', 500: 'Internal Server Error', 502: 'Bad Gateway',
+    503: 'Service Unavailable', 504: 'Gateway Timeout',
+}
+
+
+class HTTPError(Exception):
+    """Malformed HTTP message or connection failure."""
+
+
+class Headers:
+    """Ordered, case-insensitive multi-valued HTTP headers."""
+
+    def __init__(self, items: Iterable[Tuple[str, str]] = ()):
+        self._items: List[Tuple[str, str]] = list(items)
+
+    def get(self, name: str, default: str = None) -> Optional[str]:
+        lname = name.lower()
+        for key, value in self._items:
+            if key.lower() == lname:
+                return value
+        return default
+
+    def get_all(self, name: str) -> List[str]:
+        lname = name.lower()
+        return [value for key, value in self._items if key.lower() == lname]
+
+    def set(self, name: str, value: str) -> None:
+        self.remove(name)
+        self._items.append((name, str(value)))
+
+    def add(self, name: str, value: str) -> None:
+        self._items.append((name, str(value)))
+
+    def remove(self, name: str) -> None:
+        lname = name.lower()
+        self._items = [(k, v) for k, v in self._items if k.lower() != lname]
+
+    def items(self) -> List[Tuple[str, str]]:
+        return list(self._items)
+
+    def copy(self) -> 'Headers':
+        return Headers(self._items)
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return f"Headers({self._items!r})"
+
+
+@dataclass
+class Request:
+    """An HTTP request as received by the server or sent by the client."""
+    method: str
+    target: str                     # Path plus query string as sent on the wire
+    headers: Headers = field(default_factory=Headers)
+    body: bytes = b''
+    version: str = 'HTTP/1.1'
+    client: Tuple[str, int] = ('', 0)
+
+    @property
+    def path(self) -> str:
+        return self.target.split('?', 1)[0]
+
+    @property
+    def query(self) -> str:
+        return self.target.split('?', 1)[1] if '?' in self.target else ''
+
+
+@dataclass
+class Response:
+    """An HTTP response."""
+    status: int = 200
+    headers: Headers = field(default_factory=Headers)
+    body: bytes = b''
+    reason: str = ''
+
+
+# ============== Wire format ==============
+
+async def _read_head(reader: asyncio.StreamReader) -> Optional[List[str]]:
+    try:
+        data = await reader.readuntil(b'\r\n\r\n')
+    except asyncio.IncompleteReadError as e:
+        if not e.partial.strip():
+            return None
+        raise HTTPError("connection closed mid-headers")
+    except asyncio.LimitOverrunError:
+        raise HTTPError("headers too large")
+    return data[:-4].decode('latin-1').split('\r\n')
+
+
+def _parse_headers(lines: List[str]) -> Headers:
+    headers = Headers()
+    for line in lines:
+        if not line:
+            continue
+        name, sep, value = line.partition(':')
+        if not sep:
+            raise HTTPError(f"malformed header line: {line!r}")
+        headers.add(name.strip(), value.strip())
+    return headers
+
+
+async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+    chunks = []
+    while True:
+        size_line = await reader.readline()
+        try:
+            size = int(size_line.split(b';', 1)[0].strip(), 16)
+        except ValueError:
+            raise HTTPError("malformed chunk size")
+        if size == 0:
+            # Skip trailers
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            return b''.join(chunks)
+        chunks.append(await reader.readexactly(size))
+        await reader.readexactly(2)
+
+
+async def _read_body(reader: asyncio.StreamReader, headers: Headers, until_eof: bool) -> bytes:
+    if 'chunked' in (headers.get('Transfer-Encoding') or '').lower():
+        return await _read_chunked(reader)
+    length = headers.get('Content-Length')
+    if length is not None:
+        return await reader.readexactly(int(length))
+    if until_eof:
+        return await reader.read()
+    return b''
+
+
+def _serialize(first_line: str, headers: Headers, body: bytes) -> bytes:
+    lines = [first_line]
+    lines.extend(f"{name}: {value}" for name, value in headers)
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+
+def _keep_alive(version: str, headers: Headers) -> bool:
+    connection = (headers.get('Connection') or '').lower()
+    if version == 'HTTP/1.0':
+        return connection == 'keep-alive'
+    return connection != 'close'
+
+
+# ============== Server ==============
+
+Handler = Callable[[Request], Awaitable[Response]]
+
+
+async def _serve_connection(handler: Handler, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    peer = writer.get_extra_info('peername') or ('', 0)
+    try:
+        while True:
+            lines = await _read_head(reader)
+            if lines is None:
+                break
+            try:
+                method, target, version = lines[0].split(' ', 2)
+            except ValueError:
+                raise HTTPError(f"malformed request line: {lines[0]!r}")
+            headers = _parse_headers(lines[1:])
+            body = await _read_body(reader, headers, until_eof=False)
+            request = Request(method, target, headers, body, version, tuple(peer[:2]))
+
+            try:
+                response = await handler(request)
+            except Exception as e:
+                response = Response(500, Headers([('Content-Type', 'text/plain')]), f"{e}\n".encode('utf-8'))
+
+            keep_alive = _keep_alive(version, headers)
+            out = response.headers.copy()
+            for name in ('Content-Length', 'Transfer-Encoding', 'Connection'):
+                out.remove(name)
+            out.add('Content-Length', str(len(response.body)))
+            if not keep_alive:
+                out.add('Connection', 'close')
+            reason = response.reason or REASONS.get(response.status, '')
+            body = b'' if method == 'HEAD' else response.body
+            writer.write(_serialize(f"HTTP/1.1 {response.status} {reason}", out, body))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (HTTPError, asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+        # CancelledError: server shutting down with the connection idle
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(
+    handler: Handler,
+    host: str = '127.0.0.1',
+    port: int = 0,
+    reuse_port: bool = False,
+    sock: socket.socket = None
+) -> asyncio.AbstractServer:
+    """
+    Start serving handler on host:port (or an already bound socket).
+
+    With reuse_port several processes can bind the same port and the kernel
+    balances connections between them (Linux SO_REUSEPORT). It is ignored
+    where the platform has no SO_REUSEPORT (see REUSE_PORT).
+    """
+    async def on_connection(reader, writer):
+        await _serve_connection(handler, reader, writer)
+
+    if sock is not None:
+        return await asyncio.start_server(on_connection, sock=sock, limit=MAX_HEADER_BYTES)
+    return await asyncio.start_server(
+        on_connection, host, port, reuse_port=(reuse_port and REUSE_PORT) or None,
+        backlog=1024, limit=MAX_HEADER_BYTES
+    )
+
+
+def server_process_context():
+    """
+    Multiprocessing context for server child processes: fork on Linux,
+    spawn elsewhere (Windows has no fork and it is unsafe on macOS).
+    Targets and their arguments must be picklable for spawn.
+    """
+    if sys.platform.startswith('linux') and 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context('spawn')
+
+
+# ============== Client ==============
+
+class HTTPClient:
+    """HTTP/1.1 client with a keep-alive connection pool per origin."""
+
+    def __init__(self, max_idle_per_host: int = 64, verify_tls: bool = True, use_httpx: bool = True):
+        """
+        Args:
+            max_idle_per_host: Idle connections kept per origin (httpx: in total)
+            verify_tls: Verify upstream certificates
+            use_httpx: Send through httpx when it is installed
+        """
+        self.max_idle_per_host = max_idle_per_host
+        self._idle: Dict[Tuple[str, str, int], List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+        self._ssl = ssl.create_default_context()
+        if not verify_tls:
+            self._ssl.check_hostname = False
+            self._ssl.verify_mode = ssl.CERT_NONE
+        self._httpx = None
+        if use_httpx and httpx is not None:
+            self._httpx = httpx.AsyncClient(
+                verify=self._ssl,
+                limits=httpx.Limits(max_connections=None, max_keepalive_connections=max_idle_per_host),
+                trust_env=False
+            )
+
+    async def _connect(self, origin: Tuple[str, str, int]):
+        scheme, host, port = origin
+        return await asyncio.open_connection(
+            host, port,
+            ssl=self._ssl if scheme == 'https' else None,
+            limit=MAX_HEADER_BYTES
+        )
+
+    def _acquire(self, origin):
+        """Pop an idle connection the server has not closed, or None."""
+        idle = self._idle.get(origin)
+        while idle:
+            conn = idle.pop()
+            if not conn[0].at_eof() and not conn[1].is_closing():
+                return conn
+            conn[1].close()
+        return None
+
+    def _release(self, origin, conn) -> None:
+        idle = self._idle.setdefault(origin, [])
+        if len(idle) < self.max_idle_per_host:
+            idle.append(conn)
+        else:
+            conn[1].close()
+
+    async def _exchange(self, conn, method: str, data: bytes):
+        """Send one request; returns (response, whether the connection can be reused)."""
+        reader, writer = conn
+        writer.write(data)
+        await writer.drain()
+        lines = await _read_head(reader)
+        if lines is None:
+            raise HTTPError("connection closed before response")
+        parts = lines[0].split(' ', 2)
+        if len(parts) < 2:
+            raise HTTPError(f"malformed status line: {lines[0]!r}")
+        version, status = parts[0], int(parts[1])
+        reason = parts[2] if len(parts) > 2 else ''
+        headers = _parse_headers(lines[1:])
+        reusable = _keep_alive(version, headers)
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            body = b''
+        else:
+            framed = ('chunked' in (headers.get('Transfer-Encoding') or '').lower()
+                      or headers.get('Content-Length') is not None)
+            # A body delimited by EOF leaves nothing to reuse
+            reusable = reusable and framed
+            body = await _read_body(reader, headers, until_eof=True)
+        return Response(status, headers, body, reason), reusable
+
+    async def _send_httpx(self, method: str, url: str, headers: Headers, body: bytes, timeout: float) -> Response:
+        request = self._httpx.build_request(method, url, headers=headers.items(), content=body, timeout=timeout)
+        # Send only the caller's headers, not httpx's User-Agent/Accept defaults
+        for name in self._httpx.headers:
+            if name not in headers:
+                del request.headers[name]
+        try:
+            response = await self._httpx.send(request, stream=True)
+            try:
+                # Raw bytes: a proxy forwards Content-Encoding untouched
+                data = b''.join([chunk async for chunk in response.aiter_raw()])
+            finally:
+                await response.aclose()
+        except httpx.TimeoutException as e:
+            raise asyncio.TimeoutError() from e
+        except httpx.HTTPError as e:
+            raise HTTPError(str(e) or type(e).__name__) from e
+        out = Headers((name.decode('latin-1'), value.decode('latin-1')) for name, value in response.headers.raw)
+        return Response(response.status_code, out, data, response.reason_phrase)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: Headers = None,
+        body: bytes = b'',
+        timeout: float = 60.0
+    ) -> Response:
+        """Send a request and return the complete response."""
+        parts = urlsplit(url)
+        scheme = parts.scheme or 'http'
+        port = parts.port or (443 if scheme == 'https' else 80)
+        origin = (scheme, parts.hostname, port)
+        target = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+
+        out = headers.copy() if headers else Headers()
+        for name in ('Host', 'Content-Length', 'Transfer-Encoding', 'Connection'):
+            out.remove(name)
+        if self._httpx is not None:
+            return await asyncio.wait_for(self._send_httpx(method, url, out, body, timeout), timeout)
+
+        default_port = 443 if scheme == 'https' else 80
+        out.add('Host', parts.hostname if port == default_port else f"{parts.hostname}:{port}")
+        if body or method in ('POST', 'PUT', 'PATCH'):
+            out.add('Content-Length', str(len(body)))
+        data = _serialize(f"{method} {target} HTTP/1.1", out, body)
+
+        async def attempt():
+            conn = self._acquire(origin)
+            reused = conn is not None
+            if conn is None:
+                conn = await self._connect(origin)
+            try:
+                try:
+                    response, reusable = await self._exchange(conn, method, data)
+                except (HTTPError, ConnectionError, asyncio.IncompleteReadError):
+                    # The server may already have acted on the request, so only safe methods are resent
+                    if not (reused and method in SAFE_METHODS):
+                        raise
+                    conn[1].close()
+                    conn = await self._connect(origin)
+                    response, reusable = await self._exchange(conn, method, data)
+            except BaseException:
+                # Includes the cancellation from wait_for on timeout
+                conn[1].close()
+                raise
+            if reusable:
+                self._release(origin, conn)
+            else:
+                conn[1].close()
+            return response
+
+        return await asyncio.wait_for(attempt(), timeout)
+
+    async def close(self) -> None:
+        """Close all pooled connections."""
+        if self._httpx is not None:
+            await self._httpx.aclose()
+        for idle in self._idle.values():
+            for _, writer in idle:
+                writer.close()
+        self._idle.clear()
+
+
+# ============== Background server ==============
+
+class BackgroundServer:
+    """
+    Run a handler on its own event loop in a daemon thread.
+
+    Lets synchronous callers (tests, requests-based tools) talk to an async
+    handler. Use as a context manager or call start()/stop().
+    """
+
+    def __init__(self, handler: Handler, host: str = '127.0.0.1', port: int = 0):
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> 'BackgroundServer':
+        started = threading.Event()
+        errors: List[BaseException] = []
+
+        def run():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            try:
+                self._server = self.loop.run_until_complete(start_server(self.handler, self.host, self.port))
+                self.port = self._server.sockets[0].getsockname()[1]
+            except BaseException as e:
+                errors.append(e)
+                started.set()
+                return
+            started.set()
+            self.loop.run_forever()
+            self._server.close()
+            # Cancel keep-alive connections still waiting for requests
+            pending = asyncio.all_tasks(self.loop)
+            for task in pending:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop.run_until_complete(self._server.wait_closed())
+            self.loop.close()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+        return self
+
+    def call(self, coroutine, timeout: float = None):
+        """Run a coroutine on the server loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+    def stop(self) -> None:
+        if self.loop and self._thread:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,367 @@
+"""
+Test Case Catalog
+
+Declarative proxy test cases for ProxyTester. A catalog (config/test_catalog.json,
+or YAML when PyYAML is installed) lists requests with a token fixture and
+expectations; compile_catalog() turns it into TestCase objects once, with the
+expectation predicates pre-built, and adds generated cases for every
+path_mappings entry and method in config/endpoints.json.
+
+Case fields:
+    name                  Display name (unique)
+    method, path          Request, path relative to the proxy base path
+    headers, body         Extra request headers, JSON body
+    token                 Token fixture name from tests/fixtures/test_tokens.json
+    suites                Suites the case belongs to (smoke, functional, ...)
+    latency_budget_ms     Fail if the p95 response time is over budget
+    expect.status         200, [200, 201], "2xx", "!404", ["!404", "!5xx"]
+    expect.headers        {"x-request-id": true}      present
+                          {"x-debug": false}           absent
+                          {"content-type": {"contains": "json"}}
+                          {"x-ratelimit-type": "high-rate"}   equals
+    expect.body           {"json_any_key": ["message", "error"]}
+                          {"json_keys": ["id"]}, {"contains": "text"}
+                          {"json_equals": {"error.code": "NOT_FOUND"}}
+
+Generated route cases take their budget from generate.latency_budgets[path],
+then generate.latency_budget_ms, then defaults.latency_budget_ms. Only
+GET, HEAD and OPTIONS are generated unless generate.write_methods is true;
+the POST/PUT/PATCH/DELETE cases then go to the routes-write suite
+(generate.write_suites), never to "all", since they change backend data.
+
+Cases can be split across CI workers with shard(cases, index, count).
+"""
+
+import re
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from .lazy_import import lazy_import
+
+
+# (ok, message) for one expectation against a response
+Check = Callable[[Any], Tuple[bool, str]]
+
+GENERATED_SUITE = 'routes'
+WRITE_SUITE = 'routes-write'
+BODY_METHODS = {'POST', 'PUT', 'PATCH'}
+SAFE_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+
+@dataclass(frozen=True)
+class TokenFixture:
+    """A named set of JWT claims and the key to sign them with."""
+    name: str
+    claims: Mapping[str, Any]
+    secret: str
+    algorithm: str = 'HS256'
+    rate_limit: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class TestCase:
+    """One compiled catalog entry."""
+    __test__ = False  # not a pytest class
+
+    name: str
+    method: str
+    path: str
+    expected_status: Tuple[str, ...]
+    headers: Mapping[str, str] = field(default_factory=dict)
+    body: Any = None
+    token: Optional[str] = None
+    suites: Tuple[str, ...] = ()
+    latency_budget_ms: Optional[float] = None
+    generated: bool = False
+    checks: Tuple[Check, ...] = field(default=(), compare=False, repr=False)
+
+    def status_ok(self, status: int) -> bool:
+        return status_matches(status, self.expected_status)
+
+    def check(self, response) -> Tuple[bool, str]:
+        """Run the status and header/body predicates; first failure wins."""
+        if not self.status_ok(response.status_code):
+            return False, f"Expected {describe_status(self.expected_status)}, got {response.status_code}"
+        for check in self.checks:
+            ok, message = check(response)
+            if not ok:
+                return False, message
+        return True, ""
+
+
+# ============== Status specs ==============
+
+def _status_tokens(spec: Any) -> Tuple[str, ...]:
+    specs = spec if isinstance(spec, (list, tuple)) else [spec]
+    tokens = []
+    for item in specs:
+        token = str(item).strip().lower()
+        if not re.fullmatch(r'!?(\d{3}|\dxx)', token):
+            raise ValueError(f"Invalid status spec '{item}'")
+        tokens.append(token)
+    return tuple(tokens)
+
+
+def _token_matches(status: int, token: str) -> bool:
+    return token[1:] == 'xx' and str(status)[0] == token[0] if token.endswith('xx') else int(token) == status
+
+
+def status_matches(status: int, tokens: Tuple[str, ...]) -> bool:
+    """True if status matches any positive token (if any) and no negated one."""
+    positive = [t for t in tokens if not t.startswith('!')]
+    negative = [t[1:] for t in tokens if t.startswith('!')]
+    if positive and not any(_token_matches(status, t) for t in positive):
+        return False
+    return not any(_token_matches(status, t) for t in negative)
+
+
+def describe_status(tokens: Tuple[str, ...]) -> str:
+    """Readable status spec, e.g. '200 or 201' or 'not 404, not 5xx'."""
+    positive = ' or '.join(t for t in tokens if not t.startswith('!'))
+    negative = [f"not {t[1:]}" for t in tokens if t.startswith('!')]
+    return ', '.join(filter(None, [positive] + negative))
+
+
+# ============== Predicates ==============
+
+def _json_body(response) -> Tuple[Any, str]:
+    try:
+        return response.json(), ""
+    except ValueError:
+        return None, "Response is not valid JSON"
+
+
+def _json_path(data: Any, path: str) -> Tuple[bool, Any]:
+    for part in path.split('.'):
+        if isinstance(data, dict) and part in data:
+            data = data[part]
+        elif isinstance(data, list) and part.isdigit() and int(part) < len(data):
+            data = data[int(part)]
+        else:
+            return False, None
+    return True, data
+
+
+def _header_check(name: str, spec: Any) -> Check:
+    def check(response):
+        value = response.headers.get(name)
+        if spec is True:
+            return (value is not None, f"{name} header not found in response")
+        if spec is False:
+            return (value is None, f"Unexpected {name} header in response")
+        if value is None:
+            return False, f"{name} header not found in response"
+        if isinstance(spec, dict):
+            if 'contains' in spec and spec['contains'] not in value:
+                return False, f"{name} header '{value}' does not contain '{spec['contains']}'"
+            if 'matches' in spec and not re.search(spec['matches'], value):
+                return False, f"{name} header '{value}' does not match /{spec['matches']}/"
+            return True, ""
+        return (value == str(spec), f"{name} header is '{value}', expected '{spec}'")
+    return check
+
+
+def _body_check(kind: str, spec: Any) -> Check:
+    if kind == 'contains':
+        return lambda response: (spec in response.text, f"Response body does not contain '{spec}'")
+
+    def check(response):
+        data, error = _json_body(response)
+        if error:
+            return False, error
+        if kind == 'json_any_key':
+            ok = isinstance(data, dict) and any(key in data for key in spec)
+            return ok, f"Response missing any of {list(spec)}"
+        if kind == 'json_keys':
+            missing = [key for key in spec if not _json_path(data, key)[0]]
+            return not missing, f"Response missing {missing}"
+        for path, expected in spec.items():
+            found, value = _json_path(data, path)
+            if not found or value != expected:
+                return False, f"{path} is {value!r}, expected {expected!r}"
+        return True, ""
+    return check
+
+
+BODY_PREDICATES = ('contains', 'json_any_key', 'json_keys', 'json_equals')
+
+
+def _compile_checks(name: str, expect: Mapping[str, Any]) -> Tuple[Check, ...]:
+    checks = [_header_check(header.lower(), spec) for header, spec in expect.get('headers', {}).items()]
+    for kind, spec in expect.get('body', {}).items():
+        if kind not in BODY_PREDICATES:
+            raise ValueError(f"Case '{name}': unknown body predicate '{kind}' (expected one of {BODY_PREDICATES})")
+        checks.append(_body_check(kind, spec))
+    return tuple(checks)
+
+
+# ============== Loading and compiling ==============
+
+def _read(path: Path) -> Dict[str, Any]:
+    with open(path, 'r') as f:
+        if path.suffix in ('.yaml', '.yml'):
+            return lazy_import('yaml', install_hint='pip install pyyaml').safe_load(f)
+        return json.load(f)
+
+
+def load_token_fixtures(path: str) -> Dict[str, TokenFixture]:
+    """Token fixtures from tests/fixtures/test_tokens.json."""
+    data = _read(Path(path))
+    secret = data.get('test_secret', '')
+    algorithm = data.get('algorithm', 'HS256')
+    return {
+        name: TokenFixture(name, entry.get('claims', {}), secret, algorithm, entry.get('rate_limit'))
+        for name, entry in data.get('tokens', {}).items()
+    }
+
+
+def _case(entry: Mapping[str, Any], defaults: Mapping[str, Any], fixtures: Mapping[str, TokenFixture], generated=False) -> TestCase:
+    name = entry.get('name') or f"{entry.get('method', 'GET')} {entry.get('path')}"
+    if not entry.get('path', '').startswith('/'):
+        raise ValueError(f"Case '{name}': path must start with '/'")
+    token = entry.get('token')
+    if token is not None and token not in fixtures:
+        raise ValueError(f"Case '{name}': unknown token fixture '{token}'")
+    expect = entry.get('expect', {})
+    headers = dict(defaults.get('headers', {}))
+    headers.update(entry.get('headers', {}))
+    return TestCase(
+        name=name,
+        method=entry.get('method', 'GET').upper(),
+        path=entry['path'],
+        expected_status=_status_tokens(expect.get('status', 200)),
+        headers=headers,
+        body=entry.get('body'),
+        token=token,
+        suites=tuple(entry.get('suites', defaults.get('suites', ['all']))),
+        latency_budget_ms=entry.get('latency_budget_ms', defaults.get('latency_budget_ms')),
+        generated=generated,
+        checks=_compile_checks(name, expect)
+    )
+
+
+def generate_route_cases(
+    path_mappings: Mapping[str, Any],
+    settings: Mapping[str, Any],
+    defaults: Mapping[str, Any],
+    fixtures: Mapping[str, TokenFixture]
+) -> List[TestCase]:
+    """
+    One case per path_mappings entry and method (with the configured token
+    unless the path has auth_required false and with the path's latency
+    budget), plus an unauthenticated request per protected path.
+
+    Write methods are skipped unless settings['write_methods'] is true, and
+    then go to settings['write_suites'] instead of the read-only suites.
+    """
+    suites = settings.get('suites', [GENERATED_SUITE, 'all'])
+    write_suites = settings.get('write_suites', [WRITE_SUITE])
+    if 'all' in write_suites:
+        raise ValueError("generate.write_suites must not include 'all'")
+    write_methods = settings.get('write_methods', False)
+    cases = []
+    for path, mapping in path_mappings.items():
+        methods = mapping.get('method', ['GET'])
+        methods = [method.upper() for method in ([methods] if isinstance(methods, str) else methods)]
+        if not write_methods:
+            methods = [method for method in methods if method in SAFE_METHODS]
+        auth_required = mapping.get('auth_required', True)
+        budget = settings.get('latency_budgets', {}).get(
+            path, settings.get('latency_budget_ms', defaults.get('latency_budget_ms'))
+        )
+        for method in methods:
+            cases.append(_case({
+                'name': f"Route {method} {path}",
+                'method': method,
+                'path': path,
+                'token': settings.get('token') if auth_required else None,
+                'body': {} if method in BODY_METHODS else None,
+                'suites': suites if method in SAFE_METHODS else write_suites,
+                'expect': {'status': settings.get('expect_status', ['!404', '!5xx'])},
+                'latency_budget_ms': budget,
+            }, defaults, fixtures, generated=True))
+        if auth_required and methods and 'unauthenticated_status' in settings:
+            # Prefer a safe method, so a proxy that fails to reject it cannot change data
+            method = next((m for m in methods if m in SAFE_METHODS), methods[0])
+            cases.append(_case({
+                'name': f"Route {path} requires auth",
+                'method': method,
+                'path': path,
+                'body': {} if method in BODY_METHODS else None,
+                'suites': suites if method in SAFE_METHODS else write_suites,
+                'expect': {'status': settings['unauthenticated_status']},
+            }, defaults, fixtures, generated=True))
+    return cases
+
+
+def compile_catalog(
+    catalog: Mapping[str, Any],
+    path_mappings: Mapping[str, Any] = None,
+    fixtures: Mapping[str, TokenFixture] = None
+) -> List[TestCase]:
+    """
+    Compile catalog entries (and generated route cases) into TestCases.
+
+    Args:
+        catalog: Parsed catalog document
+        path_mappings: endpoints.json path_mappings used for generated cases
+        fixtures: Token fixtures referenced by the cases
+
+    Returns:
+        Cases in catalog order followed by generated cases
+    """
+    fixtures = fixtures or {}
+    defaults = catalog.get('defaults', {})
+    cases = [_case(entry, defaults, fixtures) for entry in catalog.get('cases', [])]
+    generate = catalog.get('generate', {})
+    if path_mappings and generate.get('path_mappings', False):
+        cases.extend(generate_route_cases(path_mappings, generate, defaults, fixtures))
+
+    seen = set()
+    for case in cases:
+        if case.name in seen:
+            raise ValueError(f"Duplicate test case name '{case.name}'")
+        seen.add(case.name)
+    return cases
+
+
+def load_catalog(
+    path: str,
+    path_mappings: Mapping[str, Any] = None
+) -> Tuple[List[TestCase], Dict[str, TokenFixture]]:
+    """
+    Load and compile a catalog file.
+
+    The catalog's "token_fixtures" path is resolved relative to the catalog.
+
+    Returns:
+        (cases, token fixtures)
+    """
+    path = Path(path)
+    catalog = _read(path)
+    fixtures = {}
+    if catalog.get('token_fixtures'):
+        fixtures = load_token_fixtures(str((path.parent / catalog['token_fixtures']).resolve()))
+    return compile_catalog(catalog, path_mappings, fixtures), fixtures
+
+
+def select(cases: List[TestCase], suite: str = 'all') -> List[TestCase]:
+    """Cases belonging to a suite, in catalog order."""
+    return [case for case in cases if suite in case.suites]
+
+
+def shard(cases: List[TestCase], index: int, count: int) -> List[TestCase]:
+    """Round-robin slice index (0-based) of count, so shards stay balanced."""
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard {index}/{count}")
+    return cases[index::count]
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """Parse 'I/N' (1-based, as CI matrices number jobs) into (index, count)."""
+    match = re.fullmatch(r'\s*(\d+)\s*/\s*(\d+)\s*', spec or '')
+    if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise ValueError(f"Invalid --shard '{spec}', expected I/N with 1 <= I <= N")
+    return int(match.group(1)) - 1, int(match.group(2))
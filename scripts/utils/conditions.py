@@ -0,0 +1,353 @@
+"""
+Apigee Condition Expressions
+
+Parses and evaluates the condition language used in <Condition> elements of
+proxy and target endpoints, e.g.:
+
+    (jwt.valid = true) and (jwt.username != null)
+    (proxy.pathsuffix MatchesPath "/v2/accounts/**") and (request.verb = "GET")
+
+The parser produces a small AST that can be inspected statically (used by the
+policy cost analyzer) or evaluated against a mapping of flow variables (used
+by local emulation tools).
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, List, Mapping, Optional, Tuple, Union
+
+
+# Operator aliases mapped to canonical names
+OPERATORS = {
+    '=': 'eq', '==': 'eq', 'equals': 'eq', 'is': 'eq',
+    '!=': 'ne', 'notequals': 'ne', 'isnot': 'ne',
+    ':=': 'eq_ci', 'equalscaseinsensitive': 'eq_ci',
+    '>': 'gt', 'greaterthan': 'gt',
+    '>=': 'ge', 'greaterthanorequals': 'ge',
+    '<': 'lt', 'lesserthan': 'lt',
+    '<=': 'le', 'lesserthanorequals': 'le',
+    '=|': 'startswith', 'startswith': 'startswith',
+    '~': 'matches', 'matches': 'matches', 'like': 'matches',
+    '~~': 'regex', 'javaregex': 'regex',
+    '~/': 'path', 'matchespath': 'path', 'lesserthanpath': 'path',
+}
+
+_TOKEN_RE = re.compile(r'''
+    \s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<paren>[()])
+      | (?P<symbol>&&|\|\||=\||!=|==|>=|<=|~~|~/|:=|[=<>~!])
+      | (?P<word>[A-Za-z0-9_.\-$@{}\[\]]+)
+    )
+''', re.VERBOSE)
+
+# Only quotes and backslashes are escaped in literals; "\d" in a JavaRegex stays as written
+_ESCAPE_RE = re.compile(r'\\(["\'\\])')
+
+
+class ConditionSyntaxError(ValueError):
+    """Raised when a condition expression cannot be parsed."""
+
+
+@dataclass(frozen=True)
+class Var:
+    name: str
+
+
+@dataclass(frozen=True)
+class Literal:
+    value: Any
+
+
+@dataclass(frozen=True)
+class Compare:
+    op: str
+    left: Union[Var, Literal]
+    right: Union[Var, Literal]
+
+
+@dataclass(frozen=True)
+class And:
+    items: Tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class Or:
+    items: Tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class Not:
+    item: Any
+
+
+Node = Union[Var, Literal, Compare, And, Or, Not]
+
+
+def _tokenize(text: str) -> List[Tuple[str, str]]:
+    tokens = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if not match or match.end() == pos:
+            raise ConditionSyntaxError(f"Unexpected character at {pos}: {text[pos:pos + 10]!r}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        pos = match.end()
+        while pos < len(text) and text[pos].isspace():
+            pos += 1
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser: or > and > not > comparison > operand."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.pos = 0
+
+    def _peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _next(self) -> Tuple[str, str]:
+        token = self._peek()
+        if token is None:
+            raise ConditionSyntaxError(f"Unexpected end of condition: {self.text!r}")
+        self.pos += 1
+        return token
+
+    def _peek_keyword(self, *words: str) -> bool:
+        token = self._peek()
+        return token is not None and token[0] == 'word' and token[1].lower() in words
+
+    def parse(self) -> Node:
+        node = self._parse_or()
+        if self._peek() is not None:
+            raise ConditionSyntaxError(
+                f"Unexpected token {self._peek()[1]!r} in condition: {self.text!r}"
+            )
+        return node
+
+    def _parse_or(self) -> Node:
+        items = [self._parse_and()]
+        while self._peek_keyword('or') or self._peek() == ('symbol', '||'):
+            self._next()
+            items.append(self._parse_and())
+        return items[0] if len(items) == 1 else Or(tuple(items))
+
+    def _parse_and(self) -> Node:
+        items = [self._parse_not()]
+        while self._peek_keyword('and') or self._peek() == ('symbol', '&&'):
+            self._next()
+            items.append(self._parse_not())
+        return items[0] if len(items) == 1 else And(tuple(items))
+
+    def _parse_not(self) -> Node:
+        if self._peek_keyword('not') or self._peek() == ('symbol', '!'):
+            self._next()
+            return Not(self._parse_not())
+        return self._parse_comparison()
+
+    def _parse_comparison(self) -> Node:
+        token = self._peek()
+        if token == ('paren', '('):
+            self._next()
+            node = self._parse_or()
+            if self._next() != ('paren', ')'):
+                raise ConditionSyntaxError(f"Missing ')' in condition: {self.text!r}")
+            return node
+
+        left = self._parse_operand()
+        token = self._peek()
+        if token is not None and token[0] in ('symbol', 'word') and token[1].lower() in OPERATORS:
+            self._next()
+            right = self._parse_operand()
+            return Compare(OPERATORS[token[1].lower()], left, right)
+        return left
+
+    def _parse_operand(self) -> Union[Var, Literal]:
+        kind, value = self._next()
+        if kind == 'string':
+            return Literal(_ESCAPE_RE.sub(r'\1', value[1:-1]))
+        if kind != 'word':
+            raise ConditionSyntaxError(f"Expected operand, got {value!r} in: {self.text!r}")
+        lowered = value.lower()
+        if lowered == 'null':
+            return Literal(None)
+        if lowered in ('true', 'false'):
+            return Literal(lowered == 'true')
+        try:
+            return Literal(int(value))
+        except ValueError:
+            pass
+        try:
+            return Literal(float(value))
+        except ValueError:
+            pass
+        return Var(value)
+
+
+@lru_cache(maxsize=1024)
+def parse_condition(text: str) -> Node:
+    """Parse a condition expression into an AST (results are memoized)."""
+    if text is None or not text.strip():
+        return Literal(True)
+    return _Parser(text).parse()
+
+
+@lru_cache(maxsize=256)
+def matches_path_regex(pattern: str) -> 're.Pattern':
+    """Translate a MatchesPath pattern into a compiled regular expression.
+
+    ``*`` matches a single path segment and ``/**`` matches any number of
+    trailing segments (including none).
+    """
+    regex = ''
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('/**', i):
+            regex += '(?:/.*)?'
+            i += 3
+        elif pattern.startswith('**', i):
+            regex += '.*'
+            i += 2
+        elif pattern[i] == '*':
+            regex += '[^/]*'
+            i += 1
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    return re.compile(regex)
+
+
+@lru_cache(maxsize=256)
+def _wildcard_regex(pattern: str) -> 're.Pattern':
+    return re.compile('.*'.join(re.escape(part) for part in pattern.split('*')), re.DOTALL)
+
+
+@lru_cache(maxsize=256)
+def _java_regex(pattern: str) -> 're.Pattern':
+    return re.compile(pattern)
+
+
+def _to_text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+def _to_number(value: Any) -> Optional[float]:
+    if isinstance(value, bool) or value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _resolve(operand: Union[Var, Literal], variables: Mapping[str, Any]) -> Any:
+    if isinstance(operand, Var):
+        return variables.get(operand.name)
+    return operand.value
+
+
+def _compare(op: str, left: Any, right: Any) -> bool:
+    if op in ('eq', 'ne'):
+        if left is None or right is None:
+            result = left is None and right is None
+        else:
+            lnum, rnum = _to_number(left), _to_number(right)
+            if lnum is not None and rnum is not None:
+                result = lnum == rnum
+            else:
+                result = _to_text(left) == _to_text(right)
+        return result if op == 'eq' else not result
+
+    if left is None or right is None:
+        return False
+
+    if op == 'eq_ci':
+        return _to_text(left).lower() == _to_text(right).lower()
+    if op in ('gt', 'ge', 'lt', 'le'):
+        lnum, rnum = _to_number(left), _to_number(right)
+        if lnum is None or rnum is None:
+            lnum, rnum = _to_text(left), _to_text(right)
+        return {
+            'gt': lnum > rnum, 'ge': lnum >= rnum,
+            'lt': lnum < rnum, 'le': lnum <= rnum,
+        }[op]
+    if op == 'startswith':
+        return _to_text(left).startswith(_to_text(right))
+    if op == 'matches':
+        return _wildcard_regex(_to_text(right)).fullmatch(_to_text(left)) is not None
+    if op == 'regex':
+        return _java_regex(_to_text(right)).fullmatch(_to_text(left)) is not None
+    if op == 'path':
+        return matches_path_regex(_to_text(right)).fullmatch(_to_text(left)) is not None
+    raise ConditionSyntaxError(f"Unsupported operator: {op}")
+
+
+def evaluate(node: Node, variables: Mapping[str, Any]) -> bool:
+    """Evaluate a parsed condition against flow variables."""
+    if isinstance(node, And):
+        return all(evaluate(item, variables) for item in node.items)
+    if isinstance(node, Or):
+        return any(evaluate(item, variables) for item in node.items)
+    if isinstance(node, Not):
+        return not evaluate(node.item, variables)
+    if isinstance(node, Compare):
+        return _compare(node.op, _resolve(node.left, variables), _resolve(node.right, variables))
+    value = _resolve(node, variables)
+    if isinstance(value, str):
+        return value.lower() == 'true'
+    return bool(value)
+
+
+def compile_condition(text: Optional[str]) -> Callable[[Mapping[str, Any]], bool]:
+    """Return a predicate for a condition string (empty conditions are always true)."""
+    node = parse_condition(text or '')
+    return lambda variables: evaluate(node, variables)
+
+
+def referenced_variables(node: Node) -> List[str]:
+    """List the flow variables a condition reads, in order of appearance."""
+    if isinstance(node, (And, Or)):
+        names = []
+        for item in node.items:
+            names.extend(n for n in referenced_variables(item) if n not in names)
+        return names
+    if isinstance(node, Not):
+        return referenced_variables(node.item)
+    if isinstance(node, Compare):
+        return referenced_variables(node.left) + [
+            n for n in referenced_variables(node.right)
+            if n not in referenced_variables(node.left)
+        ]
+    if isinstance(node, Var):
+        return [node.name]
+    return []
+
+
+def conjuncts(node: Node) -> Tuple[Node, ...]:
+    """Flatten a condition into its top-level AND terms."""
+    if isinstance(node, And):
+        result = ()
+        for item in node.items:
+            result += conjuncts(item)
+        return result
+    return (node,)
+
+
+def disjuncts(node: Node) -> Tuple[Node, ...]:
+    """Flatten a condition into its top-level OR terms."""
+    if isinstance(node, Or):
+        result = ()
+        for item in node.items:
+            result += disjuncts(item)
+        return result
+    return (node,)
@@ -2,15 +2,18 @@
 Configuration Loader
 
 Provides utilities for loading and validating configuration files.
+Parsing, validation and caching live in config_model; this class adds
+.env loading and keeps the dict-returning API.
 """
 
 import os
-import json
 from pathlib import Path
 from typing import Dict, Any, Optional
 
 from dotenv import load_dotenv
 
+from .config_model import PlatformConfig, load_config, thaw
+
 
 class ConfigLoader:
     """Loads and validates configuration from files and environment."""
@@ -36,28 +39,22 @@ class ConfigLoader:
         if env_file.exists():
             load_dotenv(env_file)
     
+    @property
+    def config(self) -> PlatformConfig:
+        """The validated config model (parsed once, re-read when a file changes)."""
+        return load_config(self.config_dir)
+    
     def load_environments(self) -> Dict[str, Any]:
         """Load environment configurations."""
-        config_file = self.config_dir / "environments.json"
-        return self._load_json(config_file)
+        return thaw(self.config.raw["environments"])
     
     def load_policies(self) -> Dict[str, Any]:
         """Load policy configurations."""
-        config_file = self.config_dir / "policies.json"
-        return self._load_json(config_file)
+        return thaw(self.config.raw["policies"])
     
     def load_endpoints(self) -> Dict[str, Any]:
         """Load endpoint configurations."""
-        config_file = self.config_dir / "endpoints.json"
-        return self._load_json(config_file)
-    
-    def _load_json(self, file_path: Path) -> Dict[str, Any]:
-        """Load and parse a JSON file."""
-        if not file_path.exists():
-            raise FileNotFoundError(f"Configuration file not found: {file_path}")
-        
-        with open(file_path, 'r') as f:
-            return json.load(f)
+        return thaw(self.config.raw["endpoints"])
     
     def get_env_config(self, env: str) -> Dict[str, Any]:
         """
@@ -69,23 +66,7 @@ class ConfigLoader:
         Returns:
             Environment-specific configuration dictionary
         """
-        environments = self.load_environments()
-        env_config = environments.get("environments", {}).get(env)
-        
-        if not env_config:
-            raise ValueError(f"Environment '{env}' not found in configuration")
-        
-        # Override with environment variables if present
-        env_overrides = {
-            'apigee_org': os.getenv('APIGEE_ORG'),
-            'apigee_env': os.getenv('APIGEE_ENV'),
-        }
-        
-        for key, value in env_overrides.items():
-            if value:
-                env_config[key] = value
-        
-        return env_config
+        return self.config.env(env).to_dict()
     
     def validate_config(self, env: str) -> bool:
         """
@@ -100,26 +81,12 @@ class ConfigLoader:
         errors = []
         
         try:
-            env_config = self.get_env_config(env)
-            
-            # Check required fields
-            required_fields = [
-                'name',
-                'apigee_org',
-                'apigee_env',
-                'backend_host',
-                'base_path'
-            ]
+            # Required fields and types are checked when the model is loaded
+            env_config = self.config.env(env)
             
-            for field in required_fields:
-                if not env_config.get(field):
-                    errors.append(f"Missing required field: {field}")
-            
-            # Validate backend URL
-            if env_config.get('backend_host'):
-                host = env_config['backend_host']
-                if not host or host == 'your-backend-host':
-                    errors.append("Backend host not properly configured")
+            host = env_config.backend_host
+            if not host or host == 'your-backend-host':
+                errors.append("Backend host not properly configured")
             
         except FileNotFoundError as e:
             errors.append(str(e))
@@ -141,14 +108,5 @@ class ConfigLoader:
         return None
     
     def get_backend_host(self, env: str) -> str:
-        """Get the backend host for an environment."""
-        # Check environment variable first
-        env_var = f"BACKEND_HOST_{env.upper()}"
-        host = os.getenv(env_var)
-        
-        if host:
-            return host
-        
-        # Fall back to config file
-        env_config = self.get_env_config(env)
-        return env_config.get('backend_host', '')
+        """Get the backend host for an environment (BACKEND_HOST_<ENV> wins)."""
+        return self.config.env(env).backend_host
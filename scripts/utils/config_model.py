@@ -0,0 +1,591 @@
+"""
+Config Model
+
+Typed, immutable view of config/environments.json, endpoints.json and
+policies.json, shared by every script.
+
+load_config() parses and validates the files once per process and caches
+the result keyed by path; a file is re-read only when its mtime or size
+changes. Environment overrides are resolved in one place
+(EnvironmentConfig.with_overrides):
+
+    APIGEE_ORG            apigee_org
+    APIGEE_ENV_<ENV>      apigee_env
+    APIGEE_ENV            apigee_env, unless APIGEE_ENV_<ENV> is set or it
+                          names another configured environment (so
+                          APIGEE_ENV=dev never sends --env prod to dev)
+    BACKEND_HOST_<ENV>    backend_host (and drops backend_servers, so the
+                          whole environment points at that host)
+
+EnvironmentConfig supports item access and get() so code written against
+the environments.json dicts keeps working.
+"""
+
+import os
+import re
+import json
+import threading
+import warnings
+from dataclasses import asdict, dataclass, field, fields, replace
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Collection, Dict, List, Mapping, Optional, Tuple
+
+
+CONFIG_DIR = Path(__file__).parent.parent.parent / "config"
+
+REQUIRED_ENV_FIELDS = ('name', 'apigee_org', 'apigee_env', 'backend_host', 'base_path')
+HTTP_METHODS = {'GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'HEAD', 'OPTIONS'}
+LOAD_BALANCER_ALGORITHMS = ('RoundRobin', 'Weighted', 'LeastConnections')
+
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
+class ConfigError(ValueError):
+    """Raised when configuration files fail validation."""
+
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__("Configuration validation failed:\n" + "\n".join(errors))
+
+
+def freeze(value: Any) -> Any:
+    """Read-only copy of parsed JSON: dicts become mapping proxies, lists tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Mutable JSON-compatible copy of a frozen value."""
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+@dataclass(frozen=True)
+class BackendServer:
+    """A backend_servers entry: one Apigee TargetServer behind the load balancer."""
+    name: str
+    host: str
+    port: int = 443
+    weight: int = 1
+
+    def target_server(self, protocol: str) -> Dict[str, Any]:
+        """TargetServer resource as created through the management API."""
+        server = {"name": self.name, "host": self.host, "port": self.port, "isEnabled": True, "protocol": "HTTP"}
+        if protocol == 'https':
+            server["sSLInfo"] = {"enabled": True}
+        return server
+
+
+@dataclass(frozen=True)
+class HealthMonitorConfig:
+    """HTTP health check the load balancer runs against each backend server."""
+    path: str = '/health'
+    interval_seconds: int = 10
+    timeout_seconds: int = 5
+    success_codes: Tuple[int, ...] = (200,)
+
+
+@dataclass(frozen=True)
+class LoadBalancerConfig:
+    """load_balancer settings for the backend_servers of an environment."""
+    algorithm: str = 'RoundRobin'
+    max_failures: int = 5                   # Failures before a server is taken out of rotation
+    health_monitor: Optional[HealthMonitorConfig] = HealthMonitorConfig()
+
+
+def _load_balancer_from_dict(data: Mapping[str, Any], servers: Tuple[BackendServer, ...]) -> LoadBalancerConfig:
+    weighted = any(server.weight != 1 for server in servers)
+    monitor = data.get('health_monitor', {})
+    if monitor is not None:
+        monitor = HealthMonitorConfig(**{
+            key: tuple(value) if key == 'success_codes' else value for key, value in monitor.items()
+        })
+    return LoadBalancerConfig(
+        algorithm=data.get('algorithm', 'Weighted' if weighted else 'RoundRobin'),
+        max_failures=data.get('max_failures', LoadBalancerConfig.max_failures),
+        health_monitor=monitor
+    )
+
+
+@dataclass(frozen=True)
+class EnvironmentConfig:
+    """One entry of environments.json."""
+    name: str
+    apigee_org: str
+    apigee_env: str
+    backend_host: str
+    base_path: str
+    backend_port: int = 443
+    backend_protocol: str = 'https'
+    virtual_hosts: Tuple[str, ...] = ('default', 'secure')
+    syslog_host: str = 'localhost'
+    syslog_port: int = 514
+    backend_servers: Tuple[BackendServer, ...] = ()   # Load-balanced TargetServers instead of backend_host
+    load_balancer: Optional[LoadBalancerConfig] = None
+    extra: Mapping[str, Any] = field(default_factory=lambda: _EMPTY, compare=False)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> 'EnvironmentConfig':
+        known = {f.name for f in fields(cls)} - {'extra', 'backend_servers', 'load_balancer'}
+        values = {key: freeze(value) for key, value in data.items() if key in known}
+        extra = {
+            key: value for key, value in data.items()
+            if key not in known and key not in ('backend_servers', 'load_balancer')
+        }
+        servers = tuple(
+            BackendServer(
+                name=server.get('name') or f"cropwise-backend-{index}",
+                host=server['host'],
+                port=server.get('port', data.get('backend_port', 443)),
+                weight=server.get('weight', 1)
+            )
+            for index, server in enumerate(data.get('backend_servers') or [], start=1)
+        )
+        if servers:
+            values['backend_servers'] = servers
+            values['load_balancer'] = _load_balancer_from_dict(data.get('load_balancer') or {}, servers)
+        return cls(extra=freeze(extra), **values)
+
+    @property
+    def backend_url(self) -> str:
+        return f"{self.backend_protocol}://{self.backend_host}:{self.backend_port}"
+
+    def with_overrides(self, environ: Mapping[str, str] = None,
+                       other_envs: Collection[str] = ()) -> 'EnvironmentConfig':
+        """
+        Copy with the APIGEE_ORG / APIGEE_ENV[_<ENV>] / BACKEND_HOST_<ENV>
+        overrides applied. A global APIGEE_ENV naming one of other_envs (the
+        names and Apigee environments of the other configured environments)
+        is ignored with a warning.
+        """
+        environ = os.environ if environ is None else environ
+        apigee_env = environ.get(f"APIGEE_ENV_{self.name.upper()}")
+        if not apigee_env:
+            apigee_env = environ.get('APIGEE_ENV')
+            if apigee_env and apigee_env != self.apigee_env and apigee_env in other_envs:
+                warnings.warn(
+                    f"Ignoring APIGEE_ENV={apigee_env} for environment '{self.name}': it names another "
+                    f"environment (set APIGEE_ENV_{self.name.upper()} to override this one)"
+                )
+                apigee_env = None
+        overrides = {
+            'apigee_org': environ.get('APIGEE_ORG'),
+            'apigee_env': apigee_env,
+            'backend_host': environ.get(f"BACKEND_HOST_{self.name.upper()}"),
+        }
+        overrides = {key: value for key, value in overrides.items() if value}
+        if 'backend_host' in overrides:
+            overrides.update(backend_servers=(), load_balancer=None)
+        return replace(self, **overrides) if overrides else self
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = thaw({
+            f.name: getattr(self, f.name) for f in fields(self)
+            if f.name not in ('extra', 'backend_servers', 'load_balancer')
+        })
+        if self.backend_servers:
+            data['backend_servers'] = [asdict(server) for server in self.backend_servers]
+            data['load_balancer'] = thaw(asdict(self.load_balancer))
+        data.update(thaw(self.extra))
+        return data
+
+    # Dict-style access, as used with the raw environments.json entries
+
+    def __getitem__(self, key: str) -> Any:
+        if key != 'extra' and hasattr(self, key):
+            return getattr(self, key)
+        return self.extra[key]
+
+    def __contains__(self, key: str) -> bool:
+        return (key != 'extra' and hasattr(self, key)) or key in self.extra
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+@dataclass(frozen=True)
+class TargetEndpointConfig:
+    """A target endpoint from endpoints.json."""
+    name: str
+    description: str = ''
+    url_template: str = '{protocol}://{host}:{port}'
+    path_rewrites: Mapping[str, str] = field(default_factory=lambda: _EMPTY)
+
+    def own_host(self, env: EnvironmentConfig) -> Optional[str]:
+        """The environment's <endpoint>_host (e.g. read_replica_host for "read-replica"), if set."""
+        return env.get(f"{self.name.replace('-', '_')}_host")
+
+    def url(self, env: EnvironmentConfig) -> str:
+        """Target URL for an environment: own_host when set, otherwise backend_host."""
+        host = self.own_host(env) or env.backend_host
+        return self.url_template.format(protocol=env.backend_protocol, host=host, port=env.backend_port)
+
+
+@dataclass(frozen=True)
+class PathMapping:
+    """A path_mappings entry from endpoints.json."""
+    path: str
+    target: str
+    methods: Tuple[str, ...]
+    auth_required: bool = True
+    streaming: bool = False                 # Route-scoped AM-Enable-Streaming flow
+    max_payload_bytes: Optional[int] = None  # RF-PayloadTooLarge above this Content-Length
+    extra: Mapping[str, Any] = field(default_factory=lambda: _EMPTY, compare=False)
+
+
+@dataclass(frozen=True)
+class ReadOnlyRoutes:
+    """read_only_routes from endpoints.json: requests served by a read-replica target."""
+    target: str
+    methods: Tuple[str, ...] = ('GET',)
+    paths: Tuple[str, ...] = ()             # MatchesPath patterns on proxy.pathsuffix
+    regex: Tuple[str, ...] = ()             # JavaRegex patterns matched against the whole pathsuffix
+
+
+@dataclass(frozen=True)
+class PlatformConfig:
+    """Validated environments, endpoints and policies."""
+    environments: Mapping[str, EnvironmentConfig]
+    endpoints: Mapping[str, TargetEndpointConfig]
+    path_mappings: Mapping[str, PathMapping]
+    policies: Mapping[str, Any]
+    raw: Mapping[str, Any] = field(compare=False)
+    read_only_routes: Optional[ReadOnlyRoutes] = None
+    compile_path_rewrites: bool = False     # Generate rewrite policies from path_rewrites (changes backend paths)
+
+    def env(self, name: str, overrides: bool = True) -> EnvironmentConfig:
+        """Environment config, with environment-variable overrides unless disabled."""
+        env_config = self.environments.get(name)
+        if env_config is None:
+            raise ValueError(f"Environment '{name}' not found in configuration")
+        if not overrides:
+            return env_config
+        other_envs = {
+            value for key, other in self.environments.items() if key != name
+            for value in (key, other.name, other.apigee_env)
+        }
+        return env_config.with_overrides(other_envs=other_envs)
+
+    def policy(self, name: str) -> Mapping[str, Any]:
+        """Settings for a policy from policies.json (empty if not configured)."""
+        return self.policies.get(name, _EMPTY)
+
+    def path_rewrites(self) -> Dict[str, str]:
+        """Path rewrites of all target endpoints combined."""
+        rewrites: Dict[str, str] = {}
+        for endpoint in self.endpoints.values():
+            rewrites.update(endpoint.path_rewrites)
+        return rewrites
+
+
+def _validate_environments(data: Any, errors: List[str]) -> Dict[str, EnvironmentConfig]:
+    environments = data.get('environments') if isinstance(data, dict) else None
+    if not isinstance(environments, dict):
+        errors.append("environments.json: 'environments' must be an object")
+        return {}
+
+    result = {}
+    for name, env in environments.items():
+        prefix = f"environments.{name}"
+        if not isinstance(env, dict):
+            errors.append(f"{prefix}: must be an object")
+            continue
+        missing = [key for key in REQUIRED_ENV_FIELDS if not isinstance(env.get(key), str) or not env.get(key)]
+        errors.extend(f"{prefix}: missing required field: {key}" for key in missing)
+        for key in ('backend_port', 'syslog_port'):
+            port = env.get(key)
+            if port is not None and (not isinstance(port, int) or isinstance(port, bool) or not 0 < port < 65536):
+                errors.append(f"{prefix}.{key}: must be a port number, got {port!r}")
+        if env.get('backend_protocol', 'https') not in ('http', 'https'):
+            errors.append(f"{prefix}.backend_protocol: must be http or https")
+        virtual_hosts = env.get('virtual_hosts', [])
+        if not isinstance(virtual_hosts, list) or not all(isinstance(vh, str) for vh in virtual_hosts):
+            errors.append(f"{prefix}.virtual_hosts: must be a list of names")
+        if isinstance(env.get('base_path'), str) and not env['base_path'].startswith('/'):
+            errors.append(f"{prefix}.base_path: must start with '/'")
+        count = len(errors)
+        _validate_load_balancing(env, prefix, errors)
+        if len(errors) > count:
+            continue
+        if not missing:
+            result[name] = EnvironmentConfig.from_dict(env)
+    return result
+
+
+def _positive_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+def _validate_load_balancing(env: Mapping[str, Any], prefix: str, errors: List[str]) -> None:
+    servers = env.get('backend_servers')
+    balancer = env.get('load_balancer')
+    if servers is None:
+        if balancer is not None:
+            errors.append(f"{prefix}.load_balancer: needs backend_servers")
+        return
+    if not isinstance(servers, list) or not servers or not all(isinstance(s, dict) for s in servers):
+        errors.append(f"{prefix}.backend_servers: must be a non-empty list of objects")
+        return
+    names = []
+    for index, server in enumerate(servers, start=1):
+        where = f"{prefix}.backend_servers[{index - 1}]"
+        if not isinstance(server.get('host'), str) or not server.get('host'):
+            errors.append(f"{where}: missing required field: host")
+        port = server.get('port', env.get('backend_port', 443))
+        if not isinstance(port, int) or isinstance(port, bool) or not 0 < port < 65536:
+            errors.append(f"{where}.port: must be a port number, got {port!r}")
+        weight = server.get('weight', 1)
+        if not _positive_int(weight) or weight > 100:
+            errors.append(f"{where}.weight: must be a whole number from 1 to 100, got {weight!r}")
+        names.append(server.get('name') or f"cropwise-backend-{index}")
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        errors.append(f"{prefix}.backend_servers: duplicate server names {duplicates}")
+
+    if balancer is None:
+        # The defaults still include a health monitor
+        balancer = {}
+    if not isinstance(balancer, dict):
+        errors.append(f"{prefix}.load_balancer: must be an object")
+        return
+    algorithm = balancer.get('algorithm')
+    if algorithm is not None and algorithm not in LOAD_BALANCER_ALGORITHMS:
+        errors.append(f"{prefix}.load_balancer.algorithm: must be one of {', '.join(LOAD_BALANCER_ALGORITHMS)}")
+    elif algorithm not in (None, 'Weighted') and any(s.get('weight', 1) != 1 for s in servers):
+        errors.append(f"{prefix}.load_balancer.algorithm: server weights only apply to Weighted, not {algorithm}")
+    if not _positive_int(balancer.get('max_failures', 1)):
+        errors.append(f"{prefix}.load_balancer.max_failures: must be a positive number")
+    monitor = balancer.get('health_monitor', {})
+    if monitor is None:
+        return
+    if len({s.get('port', env.get('backend_port', 443)) for s in servers}) > 1:
+        errors.append(f"{prefix}.load_balancer.health_monitor: backend_servers must share one port to be monitored")
+    known = {f.name for f in fields(HealthMonitorConfig)}
+    if not isinstance(monitor, dict) or set(monitor) - known:
+        errors.append(f"{prefix}.load_balancer.health_monitor: must be an object with {', '.join(sorted(known))}")
+        return
+    if not isinstance(monitor.get('path', '/'), str) or not monitor.get('path', '/').startswith('/'):
+        errors.append(f"{prefix}.load_balancer.health_monitor.path: must start with '/'")
+    for key in ('interval_seconds', 'timeout_seconds'):
+        if not _positive_int(monitor.get(key, 1)):
+            errors.append(f"{prefix}.load_balancer.health_monitor.{key}: must be a positive number of seconds")
+    codes = monitor.get('success_codes', [200])
+    if not isinstance(codes, list) or not codes or not all(_positive_int(c) and 100 <= c < 600 for c in codes):
+        errors.append(f"{prefix}.load_balancer.health_monitor.success_codes: must be a list of HTTP status codes")
+
+
+def _validate_endpoints(
+    data: Any,
+    errors: List[str]
+) -> Tuple[Dict[str, TargetEndpointConfig], Dict[str, PathMapping]]:
+    if not isinstance(data, dict):
+        errors.append("endpoints.json: must be an object")
+        return {}, {}
+
+    endpoints = {}
+    for name, endpoint in data.get('endpoints', {}).items():
+        rewrites = endpoint.get('path_rewrites', {}) if isinstance(endpoint, dict) else None
+        if not isinstance(rewrites, dict):
+            errors.append(f"endpoints.{name}: must be an object with a path_rewrites object")
+            continue
+        endpoints[name] = TargetEndpointConfig(
+            name=endpoint.get('name', name),
+            description=endpoint.get('description', ''),
+            url_template=endpoint.get('url_template', TargetEndpointConfig.url_template),
+            path_rewrites=freeze(rewrites)
+        )
+
+    mappings = {}
+    for path, mapping in data.get('path_mappings', {}).items():
+        prefix = f"path_mappings.{path}"
+        if not path.startswith('/'):
+            errors.append(f"{prefix}: path must start with '/'")
+        if not isinstance(mapping, dict):
+            errors.append(f"{prefix}: must be an object")
+            continue
+        target = mapping.get('target', 'default')
+        if endpoints and target not in endpoints:
+            errors.append(f"{prefix}.target: unknown endpoint '{target}'")
+        methods = mapping.get('method', [])
+        methods = [methods] if isinstance(methods, str) else methods
+        invalid = [m for m in methods if not isinstance(m, str) or m.upper() not in HTTP_METHODS]
+        if invalid:
+            errors.append(f"{prefix}.method: invalid HTTP methods {invalid}")
+            continue
+        streaming = mapping.get('streaming', False)
+        if not isinstance(streaming, bool):
+            errors.append(f"{prefix}.streaming: must be true or false")
+            continue
+        max_payload = mapping.get('max_payload_bytes')
+        if max_payload is not None and (not isinstance(max_payload, int) or isinstance(max_payload, bool)
+                                        or max_payload <= 0):
+            errors.append(f"{prefix}.max_payload_bytes: must be a positive number of bytes, got {max_payload!r}")
+            continue
+        extra = {
+            key: value for key, value in mapping.items()
+            if key not in ('target', 'method', 'auth_required', 'streaming', 'max_payload_bytes')
+        }
+        mappings[path] = PathMapping(
+            path=path,
+            target=target,
+            methods=tuple(m.upper() for m in methods),
+            auth_required=bool(mapping.get('auth_required', True)),
+            streaming=streaming,
+            max_payload_bytes=max_payload,
+            extra=freeze(extra)
+        )
+    return endpoints, mappings
+
+
+def _validate_read_only_routes(
+    data: Any,
+    endpoints: Mapping[str, TargetEndpointConfig],
+    errors: List[str]
+) -> Optional[ReadOnlyRoutes]:
+    routes = data.get('read_only_routes') if isinstance(data, dict) else None
+    if routes is None:
+        return None
+    if not isinstance(routes, dict):
+        errors.append("read_only_routes: must be an object")
+        return None
+    count = len(errors)
+    target = routes.get('target')
+    if not isinstance(target, str) or (endpoints and target not in endpoints):
+        errors.append(f"read_only_routes.target: unknown endpoint {target!r}")
+    methods = routes.get('method', ['GET'])
+    methods = [methods] if isinstance(methods, str) else methods
+    if not methods or not all(isinstance(m, str) and m.upper() in HTTP_METHODS for m in methods):
+        errors.append(f"read_only_routes.method: invalid HTTP methods {methods!r}")
+    paths = routes.get('paths', [])
+    if not isinstance(paths, list) or not all(isinstance(p, str) and p.startswith('/') for p in paths):
+        errors.append("read_only_routes.paths: must be a list of paths starting with '/'")
+    patterns = routes.get('regex', [])
+    if not isinstance(patterns, list) or not all(isinstance(p, str) for p in patterns):
+        errors.append("read_only_routes.regex: must be a list of regular expressions")
+    else:
+        for pattern in patterns:
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                errors.append(f"read_only_routes.regex: invalid pattern {pattern!r}: {e}")
+    if not paths and not patterns:
+        errors.append("read_only_routes: needs at least one entry in paths or regex")
+    if len(errors) > count:
+        return None
+    return ReadOnlyRoutes(
+        target=target,
+        methods=tuple(m.upper() for m in methods),
+        paths=tuple(paths),
+        regex=tuple(patterns)
+    )
+
+
+def _validate_policies(data: Any, errors: List[str]) -> Mapping[str, Any]:
+    policies = data.get('policies', {}) if isinstance(data, dict) else None
+    if not isinstance(policies, dict) or not all(isinstance(p, dict) for p in policies.values()):
+        errors.append("policies.json: 'policies' must be an object of policy settings")
+        return _EMPTY
+    return freeze(policies)
+
+
+def _read_json(path: Path, required: bool) -> Any:
+    if not path.exists():
+        if required:
+            raise FileNotFoundError(f"Configuration file not found: {path}")
+        return {}
+    with open(path, 'r') as f:
+        try:
+            return json.load(f)
+        except json.JSONDecodeError as e:
+            raise ConfigError([f"{path.name}: invalid JSON: {e}"])
+
+
+def parse_config(environments: Any, endpoints: Any = None, policies: Any = None) -> PlatformConfig:
+    """Validate parsed config documents and build the model; raises ConfigError."""
+    endpoints = {} if endpoints is None else endpoints
+    policies = {} if policies is None else policies
+    errors: List[str] = []
+    env_configs = _validate_environments(environments, errors)
+    endpoint_configs, mappings = _validate_endpoints(endpoints, errors)
+    read_only_routes = _validate_read_only_routes(endpoints, endpoint_configs, errors)
+    compile_path_rewrites = endpoints.get('compile_path_rewrites', False) if isinstance(endpoints, dict) else False
+    if not isinstance(compile_path_rewrites, bool):
+        errors.append("compile_path_rewrites: must be true or false")
+    policy_configs = _validate_policies(policies, errors)
+    if errors:
+        raise ConfigError(errors)
+    return PlatformConfig(
+        environments=MappingProxyType(env_configs),
+        endpoints=MappingProxyType(endpoint_configs),
+        path_mappings=MappingProxyType(mappings),
+        policies=policy_configs,
+        raw=freeze({"environments": environments, "endpoints": endpoints, "policies": policies}),
+        read_only_routes=read_only_routes,
+        compile_path_rewrites=compile_path_rewrites
+    )
+
+
+_cache: Dict[Tuple[Path, ...], Tuple[Tuple, PlatformConfig]] = {}
+_cache_lock = threading.Lock()
+
+
+def _stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_config(
+    config_dir: str = None,
+    environments_path: str = None,
+    endpoints_path: str = None,
+    policies_path: str = None
+) -> PlatformConfig:
+    """
+    Load and validate the platform configuration, cached per process.
+
+    Args:
+        config_dir: Directory with the three JSON files (default: config/)
+        environments_path: Override for environments.json (e.g. --config)
+        endpoints_path: Override for endpoints.json
+        policies_path: Override for policies.json
+
+    Returns:
+        The cached PlatformConfig while none of the files has changed
+    """
+    config_dir = Path(config_dir) if config_dir else CONFIG_DIR
+    paths = (
+        Path(environments_path or config_dir / "environments.json").resolve(),
+        Path(endpoints_path or config_dir / "endpoints.json").resolve(),
+        Path(policies_path or config_dir / "policies.json").resolve(),
+    )
+    stamps = tuple(_stamp(path) for path in paths)
+    with _cache_lock:
+        cached = _cache.get(paths)
+        if cached and cached[0] == stamps:
+            return cached[1]
+        config = parse_config(
+            _read_json(paths[0], required=True),
+            _read_json(paths[1], required=False),
+            _read_json(paths[2], required=False)
+        )
+        _cache[paths] = (stamps, config)
+        return config
+
+
+def clear_config_cache() -> None:
+    """Drop cached configs (tests, long-running processes that edit config)."""
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,330 @@
+"""
+JavaScript Policy Harness
+
+Runs Apigee JavaScript policy resources (apiproxy/resources/jsc/*.js) locally
+with a mocked ``context`` object (getVariable/setVariable/removeVariable) and
+``print``, so their behaviour and CPU cost can be measured without deploying.
+
+Two engines are supported:
+    - node:       a persistent Node.js subprocess speaking line-delimited JSON
+    - mini_racer: an embedded V8 through the optional ``py_mini_racer`` package
+
+Per-invocation durations are measured inside the engine, so process and IPC
+overhead does not leak into the numbers.
+"""
+
+import os
+import json
+import base64
+import random
+import shutil
+import statistics
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+DRIVER_PATH = Path(__file__).parent / "js_harness_driver.js"
+
+
+@dataclass
+class JSInvocation:
+    """Result of running a script once."""
+    variables: Dict[str, Any] = field(default_factory=dict)
+    prints: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    duration_ms: float = 0.0
+
+
+class _NodeBackend:
+    """Persistent Node.js process executing the harness driver."""
+
+    def __init__(self, node_binary: str):
+        self.process = subprocess.Popen(
+            [node_binary, str(DRIVER_PATH)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+            bufsize=1
+        )
+        self._lock = threading.Lock()
+
+    def _call(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self.process.stdin.write(json.dumps(message) + "\n")
+            self.process.stdin.flush()
+            line = self.process.stdout.readline()
+        if not line:
+            stderr = self.process.stderr.read() if self.process.poll() is not None else ""
+            raise RuntimeError(f"Node harness exited unexpectedly: {stderr.strip()}")
+        response = json.loads(line)
+        if not response.get('ok'):
+            raise RuntimeError(f"Node harness error: {response.get('error')}")
+        return response
+
+    def load(self, name: str, source: str) -> None:
+        self._call({'op': 'load', 'name': name, 'source': source})
+
+    def batch(self, name: str, inputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return self._call({'op': 'batch', 'name': name, 'inputs': inputs})['results']
+
+    def close(self) -> None:
+        if self.process.poll() is None:
+            self.process.stdin.close()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+class _MiniRacerBackend:
+    """Embedded V8 through py_mini_racer."""
+
+    def __init__(self):
+        from py_mini_racer import MiniRacer
+
+        self.ctx = MiniRacer()
+        self.ctx.eval(DRIVER_PATH.read_text(encoding='utf-8'))
+        self._lock = threading.Lock()
+
+    def load(self, name: str, source: str) -> None:
+        with self._lock:
+            self.ctx.call('__cwHarness.load', name, source)
+
+    def batch(self, name: str, inputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self.ctx.call('__cwHarness.batch', name, inputs)
+
+    def close(self) -> None:
+        pass
+
+
+def find_node() -> Optional[str]:
+    """Locate a Node.js binary (NODE_BINARY overrides PATH lookup)."""
+    return os.getenv('NODE_BINARY') or shutil.which('node')
+
+
+def available_engines() -> List[str]:
+    """List JavaScript engines usable on this machine."""
+    engines = []
+    if find_node():
+        engines.append('node')
+    try:
+        import py_mini_racer  # noqa: F401
+        engines.append('mini_racer')
+    except ImportError:
+        pass
+    return engines
+
+
+class JSPolicyHarness:
+    """Loads and runs Apigee JavaScript policy resources locally."""
+
+    def __init__(self, engine: str = 'auto', node_binary: str = None):
+        """
+        Initialize the harness.
+
+        Args:
+            engine: 'node', 'mini_racer' or 'auto' (first available)
+            node_binary: Optional path to the node executable
+        """
+        if engine == 'auto':
+            engines = available_engines()
+            if not engines:
+                raise RuntimeError(
+                    "No JavaScript engine available: install Node.js or py_mini_racer"
+                )
+            engine = engines[0]
+
+        if engine == 'node':
+            binary = node_binary or find_node()
+            if not binary:
+                raise RuntimeError("Node.js not found (set NODE_BINARY or add node to PATH)")
+            self._backend = _NodeBackend(binary)
+        elif engine == 'mini_racer':
+            self._backend = _MiniRacerBackend()
+        else:
+            raise ValueError(f"Unknown JavaScript engine: {engine}")
+
+        self.engine = engine
+        self._loaded: Dict[str, str] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def load(self, script_path: str, name: str = None) -> str:
+        """Compile a script and return the name used to run it."""
+        path = Path(script_path)
+        return self.load_source(name or path.name, path.read_text(encoding='utf-8'))
+
+    def load_source(self, name: str, source: str) -> str:
+        """Compile script source under the given name (e.g. read from a bundle zip)."""
+        if self._loaded.get(name) != source:
+            self._backend.load(name, source)
+            self._loaded[name] = source
+        return name
+
+    def run(
+        self,
+        name: str,
+        variables: Dict[str, Any],
+        now_ms: int = None
+    ) -> JSInvocation:
+        """Run a loaded script once with the given flow variables."""
+        return self.run_batch(name, [variables], now_ms=now_ms)[0]
+
+    def run_batch(
+        self,
+        name: str,
+        variable_sets: List[Dict[str, Any]],
+        now_ms: int = None
+    ) -> List[JSInvocation]:
+        """
+        Run a loaded script once per variable set.
+
+        Args:
+            name: Script name returned by load()
+            variable_sets: Flow variables visible through context.getVariable
+            now_ms: Optional fixed Date.now() value for deterministic runs
+
+        Returns:
+            One JSInvocation per variable set, in order
+        """
+        if name not in self._loaded:
+            raise KeyError(f"Script not loaded: {name}")
+
+        inputs = [{'variables': v, 'now': now_ms} for v in variable_sets]
+        return [
+            JSInvocation(
+                variables=r['variables'],
+                prints=r['prints'],
+                error=r['error'],
+                duration_ms=r['duration_us'] / 1000.0
+            )
+            for r in self._backend.batch(name, inputs)
+        ]
+
+    def close(self) -> None:
+        """Stop the engine."""
+        self._backend.close()
+
+
+def summarize(invocations: List[JSInvocation]) -> Dict[str, Any]:
+    """Compute timing statistics (in microseconds) for a set of invocations."""
+    durations = sorted(i.duration_ms * 1000 for i in invocations)
+    if not durations:
+        return {"count": 0}
+
+    def percentile(p: float) -> float:
+        return durations[min(len(durations) - 1, int(round(p / 100 * (len(durations) - 1))))]
+
+    return {
+        "count": len(durations),
+        "errors": sum(1 for i in invocations if i.error),
+        "mean_us": round(statistics.mean(durations), 2),
+        "p50_us": round(percentile(50), 2),
+        "p95_us": round(percentile(95), 2),
+        "p99_us": round(percentile(99), 2),
+        "max_us": round(durations[-1], 2),
+        "total_ms": round(sum(durations) / 1000, 2)
+    }
+
+
+# ============== Input Generators ==============
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode('ascii')
+
+
+def encode_unsigned_jwt(claims: Any, header: Dict[str, Any] = None, rng: random.Random = None) -> str:
+    """Build a JWT-shaped token with a random signature (not verifiable), drawn from rng when given."""
+    header = header or {"alg": "RS256", "typ": "JWT"}
+    payload = claims if isinstance(claims, (bytes, bytearray)) else json.dumps(claims, ensure_ascii=False).encode('utf-8')
+    signature = _b64url(rng.getrandbits(256).to_bytes(32, 'big') if rng else os.urandom(32))
+    return f"{_b64url(json.dumps(header).encode('utf-8'))}.{_b64url(payload)}.{signature}"
+
+
+def generate_jwt_inputs(count: int, seed: int = 0, now: int = None) -> List[Dict[str, Any]]:
+    """
+    Generate flow variable sets covering the branches of parse-jwt-token.js.
+
+    Mixes valid tokens with the different username/client claim fallbacks,
+    optional claims, expired tokens, unicode claims and malformed tokens.
+    The same seed and now give the same tokens, signatures included.
+    """
+    rng = random.Random(seed)
+    now = int(time.time()) if now is None else now
+    inputs = []
+
+    for i in range(count):
+        user = f"user{rng.randint(0, 99999)}@syngenta.com"
+        kind = rng.choice([
+            'username', 'username', 'username', 'user_name', 'sub_only',
+            'azp', 'optional', 'expired', 'no_exp', 'unicode',
+            'two_parts', 'bad_base64', 'not_json', 'null_payload', 'missing'
+        ])
+        claims: Dict[str, Any] = {"sub": user, "iss": "cropwise-test", "iat": now - 60, "exp": now + 3600}
+
+        if kind == 'username':
+            claims.update(username=user, client_id="strider-ui")
+        elif kind == 'user_name':
+            claims.update(user_name=user, client_id="strix-ui")
+        elif kind == 'sub_only':
+            claims.pop('iss')
+        elif kind == 'azp':
+            claims.update(username=user, azp="azp-client")
+        elif kind == 'optional':
+            claims.update(
+                username=user, client_id="strider-ui", scope="read write",
+                roles=["admin", "viewer"], is_using_rbac=rng.choice([True, False])
+            )
+        elif kind == 'expired':
+            claims.update(username=user, exp=now - rng.randint(1, 86400))
+        elif kind == 'no_exp':
+            claims.pop('exp')
+        elif kind == 'unicode':
+            claims.update(username=f"josé.{i}@syngenta.com", client_id="cliënt")
+
+        if kind == 'missing':
+            inputs.append({})
+            continue
+        if kind == 'two_parts':
+            token = ".".join(encode_unsigned_jwt(claims, rng=rng).split(".")[:2])
+        elif kind == 'bad_base64':
+            token = "eyJhbGciOiJIUzI1NiJ9.%%%not-base64%%%.sig"
+        elif kind == 'not_json':
+            token = encode_unsigned_jwt(b"{not json", rng=rng)
+        elif kind == 'null_payload':
+            token = encode_unsigned_jwt(None, rng=rng)
+        else:
+            token = encode_unsigned_jwt(claims, rng=rng)
+        inputs.append({"jwt.token": token})
+
+    return inputs
+
+
+ROUTE_SAMPLES = [
+    "/v1/users/{id}", "/v1/users", "/v1/users/{id}/roles", "/v1/data/{id}",
+    "/v1/data", "/v2/accounts/{id}", "/v2/accounts/ids", "/v2/accounts/{id}/orgs",
+    "/remote-sensing/v1/imagery", "/remote-sensing/v1/imagery/{id}",
+    "/remote-sensing/v2/data", "/health", "/accounts/me", "/",
+]
+
+
+def generate_route_inputs(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Generate proxy.pathsuffix/request.verb sets for handle-readonly-routes.js."""
+    rng = random.Random(seed)
+    verbs = ["GET", "GET", "GET", "POST", "PUT", "DELETE"]
+    inputs = []
+    for _ in range(count):
+        path = rng.choice(ROUTE_SAMPLES).replace("{id}", str(rng.randint(1, 10 ** 6)))
+        inputs.append({"proxy.pathsuffix": path, "request.verb": rng.choice(verbs)})
+    return inputs
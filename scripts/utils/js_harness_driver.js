@@ -0,0 +1,150 @@
+/**
+ * js_harness_driver.js
+ *
+ * Engine-agnostic driver used by js_harness.py to execute Apigee JavaScript
+ * policy resources outside of Apigee. Each script is compiled once into a
+ * function receiving a mocked `context`, `print`, `Date` and `atob`, so
+ * top-level `var` declarations stay local to a single invocation.
+ *
+ * Under Node the driver also runs a line-delimited JSON loop on stdin/stdout.
+ */
+
+var __cwHarness = (function () {
+    var scripts = {};
+    var B64 = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/";
+
+    // Forgiving-base64 decode, used when the engine has no native atob
+    function atobPolyfill(input) {
+        var str = String(input).replace(/[\t\n\f\r ]/g, "");
+        if (str.length % 4 === 0) {
+            str = str.replace(/==?$/, "");
+        }
+        if (str.length % 4 === 1 || /[^+\/0-9A-Za-z]/.test(str)) {
+            throw new Error("Invalid character");
+        }
+        var output = "";
+        var buffer = 0;
+        var bits = 0;
+        for (var i = 0; i < str.length; i++) {
+            buffer = (buffer << 6) | B64.indexOf(str.charAt(i));
+            bits += 6;
+            if (bits >= 8) {
+                bits -= 8;
+                output += String.fromCharCode((buffer >> bits) & 0xff);
+            }
+        }
+        return output;
+    }
+
+    var atobImpl = (typeof atob === "function") ? atob : atobPolyfill;
+
+    function makeDate(now) {
+        if (now === undefined || now === null) {
+            return Date;
+        }
+        function FixedDate() {
+            if (arguments.length === 0) {
+                return new Date(now);
+            }
+            var args = [null].concat(Array.prototype.slice.call(arguments));
+            return new (Function.prototype.bind.apply(Date, args))();
+        }
+        FixedDate.now = function () { return now; };
+        FixedDate.UTC = Date.UTC;
+        FixedDate.parse = Date.parse;
+        FixedDate.prototype = Date.prototype;
+        return FixedDate;
+    }
+
+    function load(name, source) {
+        scripts[name] = new Function("context", "print", "Date", "atob", source);
+        return true;
+    }
+
+    function invoke(name, input, clock) {
+        var script = scripts[name];
+        var variables = input.variables || {};
+        var output = {};
+        var prints = [];
+        var context = {
+            getVariable: function (key) {
+                if (Object.prototype.hasOwnProperty.call(output, key)) {
+                    return output[key];
+                }
+                var value = variables[key];
+                return value === undefined ? null : value;
+            },
+            setVariable: function (key, value) {
+                if (typeof value === "function") {
+                    value = String(value);
+                }
+                output[key] = value === undefined ? null : value;
+            },
+            removeVariable: function (key) {
+                output[key] = null;
+            }
+        };
+        var printFn = function (message) { prints.push(String(message)); };
+        var dateImpl = makeDate(input.now);
+
+        var error = null;
+        var start = clock();
+        try {
+            script(context, printFn, dateImpl, atobImpl);
+        } catch (e) {
+            error = (e && e.message) ? e.message : String(e);
+        }
+        var elapsed = clock() - start;
+
+        return { variables: output, prints: prints, error: error, duration_us: elapsed };
+    }
+
+    function batch(name, inputs, clock) {
+        if (!scripts[name]) {
+            throw new Error("Script not loaded: " + name);
+        }
+        var results = new Array(inputs.length);
+        for (var i = 0; i < inputs.length; i++) {
+            results[i] = invoke(name, inputs[i], clock);
+        }
+        return results;
+    }
+
+    function defaultClock() {
+        if (typeof performance !== "undefined" && performance.now) {
+            return performance.now() * 1000;
+        }
+        return Date.now() * 1000;
+    }
+
+    return {
+        load: load,
+        batch: function (name, inputs) { return batch(name, inputs, defaultClock); },
+        batchWithClock: batch
+    };
+})();
+
+if (typeof require !== "undefined" && typeof module !== "undefined" && require.main === module) {
+    var hrClock = function () {
+        var t = process.hrtime();
+        return t[0] * 1e6 + t[1] / 1e3;
+    };
+    var readline = require("readline");
+    var rl = readline.createInterface({ input: process.stdin, terminal: false });
+    rl.on("line", function (line) {
+        var response;
+        try {
+            var message = JSON.parse(line);
+            if (message.op === "load") {
+                response = { ok: __cwHarness.load(message.name, message.source) };
+            } else if (message.op === "batch") {
+                response = { ok: true, results: __cwHarness.batchWithClock(message.name, message.inputs, hrClock) };
+            } else {
+                response = { ok: false, error: "Unknown op: " + message.op };
+            }
+        } catch (e) {
+            response = { ok: false, error: (e && e.message) ? e.message : String(e) };
+        }
+        process.stdout.write(JSON.stringify(response) + "\n");
+    });
+}
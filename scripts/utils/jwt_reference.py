@@ -0,0 +1,263 @@
+"""
+JWT Parsing Reference Implementation
+
+Pure-Python equivalent of apiproxy/resources/jsc/parse-jwt-token.js. Given the
+value of ``jwt.token`` it produces exactly the flow variables the script sets
+(``jwt.valid``, ``jwt.username``, ``jwt.client_id``, ``jwt.expired`` ...),
+including JavaScript truthiness for the claim fallbacks
+(``username``/``user_name``/``sub`` and ``client_id``/``azp``).
+
+Used for offline replay of large token sets and for differential testing
+against the JavaScript policy through the local JS harness.
+
+Error messages for malformed base64, UTF-8 and ``null`` payloads match V8;
+JSON syntax errors carry Python's message since engines word them differently.
+"""
+
+import re
+import json
+import math
+import time
+import base64
+import binascii
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class _Undefined:
+    """Stand-in for JavaScript ``undefined`` (a missing property)."""
+
+    def __repr__(self):
+        return 'undefined'
+
+
+UNDEFINED = _Undefined()
+
+_WHITESPACE_RE = re.compile(r'[\t\n\f\r ]')
+_TRAILING_PAD_RE = re.compile(r'==?$')
+_INVALID_B64_RE = re.compile(r'[^+/0-9A-Za-z]')
+
+
+class _ScriptError(Exception):
+    """An exception thrown inside the emulated script."""
+
+
+def _truthy(value: Any) -> bool:
+    """JavaScript ToBoolean."""
+    if value is UNDEFINED or value is None or value is False:
+        return False
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value != 0 and not (isinstance(value, float) and math.isnan(value))
+    if isinstance(value, str):
+        return value != ""
+    return True
+
+
+def _js_or(*values: Any) -> Any:
+    """JavaScript ``a || b || c``: first truthy operand, else the last one."""
+    for value in values[:-1]:
+        if _truthy(value):
+            return value
+    return values[-1]
+
+
+def _number_to_string(value: float) -> str:
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, int):
+        return str(value)
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return 'Infinity' if value > 0 else '-Infinity'
+    if value.is_integer() and abs(value) < 1e21:
+        return str(int(value))
+    text = repr(value)
+    if 'e' in text:
+        mantissa, exponent = text.split('e')
+        sign = '-' if exponent.startswith('-') else '+'
+        text = f"{mantissa}e{sign}{int(exponent.lstrip('+-'))}"
+    return text
+
+
+def _to_string(value: Any) -> str:
+    """JavaScript ToString for JSON-derived values."""
+    if value is UNDEFINED:
+        return 'undefined'
+    if value is None:
+        return 'null'
+    if isinstance(value, bool) or isinstance(value, (int, float)):
+        return _number_to_string(value)
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list):
+        return ",".join("" if v is None else _to_string(v) for v in value)
+    return '[object Object]'
+
+
+def _to_number(value: Any) -> float:
+    """JavaScript ToNumber for JSON-derived values."""
+    if isinstance(value, bool):
+        return 1.0 if value else 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    if value is None:
+        return 0.0
+    if isinstance(value, (list, str)):
+        text = _to_string(value).strip()
+        if text == "":
+            return 0.0
+        try:
+            if text.lower().startswith(('0x', '0o', '0b')):
+                return float(int(text, 0))
+            if text in ('Infinity', '+Infinity', '-Infinity'):
+                return float(text.replace('Infinity', 'inf'))
+            if not re.fullmatch(r'[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?', text):
+                return math.nan
+            return float(text)
+        except ValueError:
+            return math.nan
+    return math.nan
+
+
+def _stringify(value: Any) -> str:
+    """JSON.stringify for JSON-derived values."""
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, (int, float)):
+        return 'null' if isinstance(value, float) and not math.isfinite(value) else _number_to_string(value)
+    if isinstance(value, list):
+        return '[' + ','.join(_stringify(v) for v in value) + ']'
+    return '{' + ','.join(
+        f"{json.dumps(k, ensure_ascii=False)}:{_stringify(v)}" for k, v in value.items()
+    ) + '}'
+
+
+def _atob(data: str) -> bytes:
+    """Forgiving-base64 decode with the same acceptance rules as atob()."""
+    data = _WHITESPACE_RE.sub('', data)
+    if len(data) % 4 == 0:
+        data = _TRAILING_PAD_RE.sub('', data)
+    if len(data) % 4 == 1 or _INVALID_B64_RE.search(data):
+        raise _ScriptError("Invalid character")
+    try:
+        return base64.b64decode(data + '=' * (-len(data) % 4))
+    except binascii.Error:
+        raise _ScriptError("Invalid character")
+
+
+def _reject_constant(name: str):
+    raise ValueError(f"Unexpected token '{name[0]}' in JSON")
+
+
+def _get(claims: Any, key: str) -> Any:
+    if claims is None:
+        raise _ScriptError(f"Cannot read properties of null (reading '{key}')")
+    if isinstance(claims, dict):
+        return claims.get(key, UNDEFINED)
+    if isinstance(claims, str) and key == "sub":
+        # A JSON string payload exposes String.prototype.sub, stringified on set
+        return "function sub() { [native code] }"
+    return UNDEFINED
+
+
+def parse_jwt_token(
+    token: Optional[str],
+    now: float = None,
+    prints: List[str] = None
+) -> Dict[str, Any]:
+    """
+    Reproduce parse-jwt-token.js for one token.
+
+    Args:
+        token: Value of the jwt.token flow variable (None when unset)
+        now: Current time in epoch seconds (defaults to time.time())
+        prints: Optional list collecting the script's print() output
+
+    Returns:
+        The flow variables the script leaves set
+    """
+    variables: Dict[str, Any] = {}
+
+    if not token:
+        variables["jwt.valid"] = False
+        variables["jwt.error"] = "No token provided"
+        return variables
+
+    try:
+        parts = token.split(".")
+        if len(parts) != 3:
+            raise _ScriptError("Invalid JWT format")
+
+        payload = parts[1].replace("-", "+").replace("_", "/")
+        payload += "=" * (-len(payload) % 4)
+
+        try:
+            decoded = _atob(payload).decode('utf-8')
+        except UnicodeDecodeError:
+            raise _ScriptError("URI malformed")
+        try:
+            claims = json.loads(decoded, parse_constant=_reject_constant)
+        except ValueError as e:
+            raise _ScriptError(str(e))
+
+        variables["jwt.valid"] = True
+        sub = _get(claims, "sub")
+        username = _get(claims, "username")
+        user_name = _get(claims, "user_name")
+        variables["jwt.sub"] = _js_or(sub, "")
+        variables["jwt.username"] = _js_or(username, user_name, sub, "")
+        variables["jwt.client_id"] = _js_or(_get(claims, "client_id"), _get(claims, "azp"), "")
+        variables["jwt.iss"] = _js_or(_get(claims, "iss"), "")
+        exp = _get(claims, "exp")
+        variables["jwt.exp"] = _js_or(exp, 0)
+        variables["jwt.iat"] = _js_or(_get(claims, "iat"), 0)
+
+        scope = _get(claims, "scope")
+        if _truthy(scope):
+            variables["jwt.scope"] = scope
+
+        roles = _get(claims, "roles")
+        if _truthy(roles):
+            variables["jwt.roles"] = _stringify(roles)
+
+        rbac = _get(claims, "is_using_rbac")
+        if rbac is not UNDEFINED:
+            variables["jwt.is_using_rbac"] = rbac
+
+        now_seconds = math.floor(time.time() if now is None else now)
+        if _truthy(exp) and _to_number(exp) < now_seconds:
+            variables["jwt.expired"] = True
+            variables["jwt.valid"] = False
+            variables["jwt.error"] = "Token expired"
+        else:
+            variables["jwt.expired"] = False
+
+        if prints is not None:
+            prints.append("[JWT] Parsed token for user: " + _to_string(_js_or(username, user_name, sub)))
+
+    except _ScriptError as e:
+        variables["jwt.valid"] = False
+        variables["jwt.error"] = f"Failed to parse JWT: {e}"
+        if prints is not None:
+            prints.append(f"[JWT] Parse error: {e}")
+
+    return variables
+
+
+def parse_jwt_batch(tokens: Iterable[Optional[str]], now: float = None) -> List[Dict[str, Any]]:
+    """
+    Parse many tokens against a single clock reading.
+
+    Repeated tokens (the common case when replaying traffic from a small set
+    of clients) are parsed once; the returned dicts for duplicates are shared
+    and should be treated as read-only.
+    """
+    now = time.time() if now is None else now
+    cache: Dict[Optional[str], Dict[str, Any]] = {}
+    results = []
+    for token in tokens:
+        variables = cache.get(token)
+        if variables is None:
+            variables = cache[token] = parse_jwt_token(token, now)
+        results.append(variables)
+    return results
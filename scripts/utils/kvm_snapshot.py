@@ -0,0 +1,309 @@
+"""
+KVM Snapshot
+
+A compact local copy of a KVM export for analysis without re-downloading:
+
+    user-rate-limits.kvs        key<TAB>value lines sorted by key
+    user-rate-limits.kvs.idx    JSON: metadata, value counts and a sparse
+                                index of (first key, byte offset) per block
+
+Entries are written as they arrive from the paginated export. Sorted runs
+are spilled to disk and merged at the end, so memory stays bounded by the
+run size however large the map is. A point lookup bisects the sparse index
+and reads a single block; value (tier) counts come from the index.
+
+KvmSnapshot is a read-only Mapping, so it can stand in for the dict-based
+local KVM store of the gateway and the rate-limit simulator.
+"""
+
+import os
+import json
+import time
+import heapq
+import tempfile
+from bisect import bisect_right
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+SNAPSHOT_SUFFIX = '.kvs'
+INDEX_SUFFIX = '.idx'
+
+
+def _escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def _unescape(text: str) -> str:
+    if '\\' not in text:
+        return text
+    out = []
+    chars = iter(text)
+    for ch in chars:
+        if ch == '\\':
+            nxt = next(chars, '')
+            out.append({'t': '\t', 'n': '\n', 'r': '\r'}.get(nxt, nxt))
+        else:
+            out.append(ch)
+    return ''.join(out)
+
+
+def _parse(line: bytes) -> Tuple[str, str]:
+    key, _, value = line.rstrip(b'\n').decode('utf-8').partition('\t')
+    return _unescape(key), _unescape(value)
+
+
+def snapshot_paths(path: str) -> Tuple[Path, Path]:
+    """(data file, index file) for a snapshot given either path."""
+    path = Path(path)
+    if path.name.endswith(SNAPSHOT_SUFFIX + INDEX_SUFFIX):
+        return path.with_name(path.name[:-len(INDEX_SUFFIX)]), path
+    return path, path.with_name(path.name + INDEX_SUFFIX)
+
+
+def is_snapshot(path: str) -> bool:
+    """True if path names a snapshot data or index file that exists."""
+    return snapshot_paths(path)[1].exists() and str(path).endswith((SNAPSHOT_SUFFIX, INDEX_SUFFIX))
+
+
+class SnapshotWriter:
+    """
+    Builds a snapshot from entries in any order (later duplicates win).
+
+    Use as a context manager; the snapshot is finalized on a clean exit and
+    discarded if the block raises.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        kvm_name: str = '',
+        env: str = '',
+        org: str = '',
+        run_size: int = 100000,
+        block_size: int = 128
+    ):
+        self.data_path, self.index_path = snapshot_paths(path)
+        self.meta = {"kvm": kvm_name, "env": env, "org": org}
+        self.run_size = run_size
+        self.block_size = block_size
+        self.received = 0
+        self._buffer: List[Tuple[str, str]] = []
+        self._runs: List[str] = []
+        self._tmp_dir: Optional[str] = None
+
+    def add(self, key: str, value: str) -> None:
+        self._buffer.append((key, value))
+        self.received += 1
+        if len(self._buffer) >= self.run_size:
+            self._spill()
+
+    def _spill(self) -> None:
+        if not self._buffer:
+            return
+        if self._tmp_dir is None:
+            self.data_path.parent.mkdir(parents=True, exist_ok=True)
+            self._tmp_dir = tempfile.mkdtemp(prefix='.kvs-runs-', dir=self.data_path.parent)
+        # Stable sort keeps arrival order between duplicates
+        self._buffer.sort(key=lambda kv: kv[0])
+        run_path = os.path.join(self._tmp_dir, f"run-{len(self._runs):05d}")
+        with open(run_path, 'wb') as f:
+            f.writelines(f"{_escape(k)}\t{_escape(v)}\n".encode('utf-8') for k, v in self._buffer)
+        self._runs.append(run_path)
+        self._buffer = []
+
+    def _merged(self) -> Iterator[Tuple[str, str]]:
+        """Sorted, de-duplicated entries from all runs (the last occurrence of a key wins)."""
+        files = [open(run, 'rb') for run in self._runs]
+        try:
+            streams = [(_parse(line) for line in f) for f in files]
+            pending = None
+            for key, value in heapq.merge(*streams, key=lambda kv: kv[0]):
+                if pending is not None and pending[0] != key:
+                    yield pending
+                pending = (key, value)
+            if pending is not None:
+                yield pending
+        finally:
+            for f in files:
+                f.close()
+
+    def close(self) -> 'KvmSnapshot':
+        """Merge the runs into the data file and write the index."""
+        self._spill()
+        self.data_path.parent.mkdir(parents=True, exist_ok=True)
+        index: List[Tuple[str, int]] = []
+        values: Dict[str, int] = {}
+        count = 0
+        offset = 0
+        tmp_data = self.data_path.with_name(self.data_path.name + '.tmp')
+        with open(tmp_data, 'wb') as out:
+            for key, value in self._merged():
+                if count % self.block_size == 0:
+                    index.append((key, offset))
+                line = f"{_escape(key)}\t{_escape(value)}\n".encode('utf-8')
+                out.write(line)
+                offset += len(line)
+                values[value] = values.get(value, 0) + 1
+                count += 1
+        self._cleanup()
+
+        meta = dict(self.meta)
+        meta.update({
+            "created": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            "entries": count,
+            "received": self.received,
+            "bytes": offset,
+            "block_size": self.block_size,
+            "values": dict(sorted(values.items(), key=lambda item: -item[1])),
+            "index": index,
+        })
+        tmp_index = self.index_path.with_name(self.index_path.name + '.tmp')
+        with open(tmp_index, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, separators=(',', ':'))
+        os.replace(tmp_data, self.data_path)
+        os.replace(tmp_index, self.index_path)
+        return KvmSnapshot.open(str(self.data_path))
+
+    def _cleanup(self) -> None:
+        for run in self._runs:
+            os.unlink(run)
+        self._runs = []
+        if self._tmp_dir is not None:
+            os.rmdir(self._tmp_dir)
+            self._tmp_dir = None
+
+    def __enter__(self) -> 'SnapshotWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.snapshot = self.close()
+        else:
+            self._buffer = []
+            self._cleanup()
+
+
+class KvmSnapshot(Mapping):
+    """Read-only, indexed view of a snapshot."""
+
+    def __init__(self, data_path: Path, meta: Dict[str, Any]):
+        self.data_path = data_path
+        self.meta = meta
+        self._first_keys = [key for key, _ in meta['index']]
+        self._offsets = [offset for _, offset in meta['index']] + [meta['bytes']]
+        self._file = None
+        self._pid = None
+
+    @classmethod
+    def open(cls, path: str) -> 'KvmSnapshot':
+        data_path, index_path = snapshot_paths(path)
+        with open(index_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        return cls(data_path, meta)
+
+    @property
+    def kvm_name(self) -> str:
+        return self.meta.get('kvm', '')
+
+    def _handle(self):
+        # Reopen after fork so gateway workers do not share a file offset
+        if self._file is None or self._pid != os.getpid():
+            self._file = open(self.data_path, 'rb')
+            self._pid = os.getpid()
+        return self._file
+
+    def _block(self, index: int) -> List[bytes]:
+        f = self._handle()
+        f.seek(self._offsets[index])
+        return f.read(self._offsets[index + 1] - self._offsets[index]).splitlines()
+
+    def __getitem__(self, key: str) -> str:
+        block = bisect_right(self._first_keys, key) - 1
+        if block < 0:
+            raise KeyError(key)
+        for line in self._block(block):
+            entry_key, value = _parse(line)
+            if entry_key == key:
+                return value
+            if entry_key > key:
+                break
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for key, _ in self.iter_items():
+            yield key
+
+    def __len__(self) -> int:
+        return self.meta['entries']
+
+    def iter_items(self, start: str = None) -> Iterator[Tuple[str, str]]:
+        """Stream (key, value) pairs in key order, optionally from the first key >= start."""
+        first_block = 0
+        if start is not None:
+            first_block = max(0, bisect_right(self._first_keys, start) - 1)
+        with open(self.data_path, 'rb') as f:
+            f.seek(self._offsets[first_block] if self._first_keys else 0)
+            for line in f:
+                key, value = _parse(line)
+                if start is None or key >= start:
+                    yield key, value
+
+    def to_dict(self) -> Dict[str, str]:
+        return dict(self.iter_items())
+
+    def stats(self, group_readonly: bool = False) -> Dict[str, Any]:
+        """Entry count and value (tier) distribution from the index."""
+        values = self.meta.get('values', {})
+        if group_readonly:
+            grouped: Dict[str, int] = {}
+            for value, count in values.items():
+                base = value[len('readonly-'):] if value.startswith('readonly-') else value
+                grouped[base] = grouped.get(base, 0) + count
+            values = dict(sorted(grouped.items(), key=lambda item: -item[1]))
+        total = self.meta['entries']
+        return {
+            "kvm": self.meta.get('kvm'),
+            "env": self.meta.get('env'),
+            "org": self.meta.get('org'),
+            "created": self.meta.get('created'),
+            "entries": total,
+            "bytes": self.meta.get('bytes'),
+            "values": {
+                value: {"count": count, "fraction": round(count / total, 4) if total else 0.0}
+                for value, count in values.items()
+            },
+        }
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def write_snapshot(path: str, entries: Dict[str, str], **meta) -> KvmSnapshot:
+    """Write a snapshot from an in-memory mapping."""
+    with SnapshotWriter(path, **meta) as writer:
+        for key, value in entries.items():
+            writer.add(key, value)
+    return writer.snapshot
+
+
+def export_snapshot(
+    client,
+    env: str,
+    kvm_name: str,
+    path: str,
+    page_size: int = 1000,
+    on_progress: Callable[[int], None] = None
+) -> KvmSnapshot:
+    """Stream a KVM from the management API (ApigeeClient.iter_kvm_entries) into a snapshot."""
+    with SnapshotWriter(path, kvm_name=kvm_name, env=env, org=getattr(client, 'org', '')) as writer:
+        for entry in client.iter_kvm_entries(env, kvm_name, page_size=page_size):
+            writer.add(entry['name'], entry.get('value', ''))
+            if on_progress and writer.received % page_size == 0:
+                on_progress(writer.received)
+    if on_progress:
+        on_progress(writer.received)
+    return writer.snapshot
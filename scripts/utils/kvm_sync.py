@@ -0,0 +1,397 @@
+"""
+KVM Sync
+
+Brings an Apigee KVM (typically user-rate-limits) to a desired state:
+fetches the current entries page by page, diffs them against a CSV/JSON
+desired-state file and applies the creates, updates and (optionally)
+deletes concurrently.
+
+The management API has no bulk entry endpoint, so every change is one call.
+Throughput comes from a worker pool paced by a shared adaptive rate: 429
+RESOURCE_EXHAUSTED halves the rate and honours Retry-After, successes
+slowly raise it back to max_rps. Operations run in batches; after each
+batch the completed keys are appended to a checkpoint so an interrupted
+sync resumes from the saved plan without re-fetching the map.
+"""
+
+import os
+import csv
+import json
+import time
+import random
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .apigee_client import ApigeeApiError, ApigeeClient
+from .lazy_import import lazy_import
+from .rate_limit_sim import load_tier_map
+
+requests = lazy_import('requests')
+
+
+KVM_NAME = 'user-rate-limits'
+
+# Header cells recognised in the first row of a CSV desired-state file
+_CSV_HEADERS = {'name', 'key', 'user', 'username', 'email'}
+
+_RETRYABLE = {429, 500, 502, 503, 504}
+
+
+def load_entries(path: str, map_name: str = KVM_NAME) -> Dict[str, str]:
+    """
+    Load KVM entries from a desired-state or export file.
+
+    CSV files hold key,value rows (an optional header row is skipped); JSON
+    exports and KVM snapshots are read by load_tier_map.
+    """
+    if not str(path).lower().endswith('.csv'):
+        return load_tier_map(path, map_name)
+    entries = {}
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        for index, row in enumerate(csv.reader(f)):
+            if not row or not row[0].strip() or row[0].startswith('#'):
+                continue
+            if index == 0 and row[0].strip().lower() in _CSV_HEADERS:
+                continue
+            if len(row) < 2:
+                raise ValueError(f"{path}:{index + 1}: expected key,value")
+            entries[row[0].strip()] = row[1].strip()
+    return entries
+
+
+@dataclass
+class SyncOperation:
+    """One entry change: create, update or delete."""
+    op: str
+    key: str
+    value: Optional[str] = None
+
+    @property
+    def checkpoint_key(self) -> str:
+        return f"{self.op}\t{self.key}"
+
+
+def diff_entries(current: Dict[str, str], desired: Dict[str, str], prune: bool = False) -> List[SyncOperation]:
+    """Operations (sorted by key) that turn current into desired; deletes only with prune."""
+    operations = []
+    for key in sorted(desired):
+        if key not in current:
+            operations.append(SyncOperation('create', key, desired[key]))
+        elif current[key] != desired[key]:
+            operations.append(SyncOperation('update', key, desired[key]))
+    if prune:
+        operations.extend(SyncOperation('delete', key) for key in sorted(set(current) - set(desired)))
+    return operations
+
+
+def fetch_entries(
+    client: ApigeeClient,
+    env: str,
+    kvm_name: str,
+    page_size: int = 1000,
+    on_page: Callable[[int], None] = None
+) -> Dict[str, str]:
+    """All entries of a KVM, following nextPageToken."""
+    entries: Dict[str, str] = {}
+    for entry in client.iter_kvm_entries(env, kvm_name, page_size=page_size):
+        entries[entry['name']] = entry.get('value', '')
+        if on_page and len(entries) % page_size == 0:
+            on_page(len(entries))
+    if on_page:
+        on_page(len(entries))
+    return entries
+
+
+def desired_fingerprint(env: str, kvm_name: str, desired: Dict[str, str], prune: bool) -> str:
+    """Identifies a sync job so a checkpoint is only reused for the same input."""
+    digest = hashlib.sha256(f"{env}\0{kvm_name}\0{prune}\n".encode('utf-8'))
+    for key in sorted(desired):
+        digest.update(f"{key}\0{desired[key]}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class AdaptiveRate:
+    """
+    Paces calls from many threads to a shared rate (AIMD).
+
+    Each acquire() reserves the next send slot. throttled() halves the rate
+    (once per back-off period, however many workers hit the 429) and pushes
+    every pending slot past Retry-After; succeeded() adds back 1% of max_rate.
+    """
+
+    def __init__(self, max_rate: float, min_rate: float = 1.0):
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.rate = max_rate
+        self._next = 0.0
+        self._backoff_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + 1.0 / self.rate
+        if slot > now:
+            time.sleep(slot - now)
+
+    def throttled(self, retry_after: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if now >= self._backoff_until:
+                self.rate = max(self.min_rate, self.rate / 2)
+                self._backoff_until = now + max(retry_after, 1.0 / self.rate)
+            self._next = max(self._next, now + retry_after)
+
+    def succeeded(self) -> None:
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 100)
+
+
+class SyncCheckpoint:
+    """Saved plan plus an append-only log of completed operations."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.plan_path = self.directory / 'plan.json'
+        self.done_path = self.directory / 'done.log'
+
+    def load(self, fingerprint: str) -> Optional[Tuple[List[SyncOperation], Set[str]]]:
+        """The saved plan and completed operation keys, if they belong to this job."""
+        if not self.plan_path.exists():
+            return None
+        with open(self.plan_path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        if saved.get('fingerprint') != fingerprint:
+            return None
+        operations = [SyncOperation(*op) for op in saved['operations']]
+        done = set()
+        if self.done_path.exists():
+            with open(self.done_path, 'r', encoding='utf-8') as f:
+                done = {line.rstrip('\n') for line in f if line.strip()}
+        return operations, done
+
+    def save_plan(self, fingerprint: str, operations: List[SyncOperation]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.plan_path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({
+                "fingerprint": fingerprint,
+                "created": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                "operations": [[op.op, op.key, op.value] for op in operations],
+            }, f)
+        os.replace(tmp, self.plan_path)
+        self.done_path.unlink(missing_ok=True)
+
+    def mark_done(self, operations: Iterable[SyncOperation]) -> None:
+        with open(self.done_path, 'a', encoding='utf-8') as f:
+            f.writelines(f"{op.checkpoint_key}\n" for op in operations)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear(self) -> None:
+        self.plan_path.unlink(missing_ok=True)
+        self.done_path.unlink(missing_ok=True)
+        try:
+            self.directory.rmdir()
+        except OSError:
+            pass
+
+
+@dataclass
+class SyncResult:
+    """Outcome of applying a plan."""
+    planned: int = 0
+    resumed: int = 0
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    failed: List[Tuple[str, str, str]] = field(default_factory=list)
+    retries: int = 0
+    throttled: int = 0
+    elapsed_s: float = 0.0
+    final_rate: float = 0.0
+
+    @property
+    def applied(self) -> int:
+        return self.created + self.updated + self.deleted
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "planned": self.planned,
+            "resumed": self.resumed,
+            "created": self.created,
+            "updated": self.updated,
+            "deleted": self.deleted,
+            "failed": len(self.failed),
+            "failures": [{"op": op, "key": key, "error": error} for op, key, error in self.failed[:100]],
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "elapsed_s": round(self.elapsed_s, 3),
+            "calls_per_s": round(self.applied / self.elapsed_s, 1) if self.elapsed_s else 0.0,
+            "final_rate_per_s": round(self.final_rate, 1),
+        }
+
+
+class KvmSync:
+    """Plans and applies KVM entry changes."""
+
+    def __init__(
+        self,
+        client: ApigeeClient,
+        env: str,
+        kvm_name: str = KVM_NAME,
+        concurrency: int = 16,
+        max_rps: float = 50.0,
+        batch_size: int = 500,
+        max_retries: int = 6,
+        checkpoint_dir: str = None,
+        progress: Callable[[int, int, SyncResult], None] = None
+    ):
+        """
+        Args:
+            client: Management API client
+            env: Apigee environment holding the KVM
+            kvm_name: KVM to sync
+            concurrency: Worker threads issuing entry calls
+            max_rps: Ceiling for the adaptive call rate
+            batch_size: Operations per checkpointed batch
+            max_retries: Retries per operation for 429, 5xx and connection errors
+            checkpoint_dir: Where to keep the plan and progress for resuming (None: no checkpoint)
+            progress: Called after each batch with (done, total, result)
+        """
+        self.client = client
+        self.env = env
+        self.kvm_name = kvm_name
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.rate = AdaptiveRate(max_rps)
+        self.checkpoint = SyncCheckpoint(checkpoint_dir) if checkpoint_dir else None
+        self.progress = progress
+        self.resumed = 0
+        self._lock = threading.Lock()
+
+        # One pooled connection per worker
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        client.session.mount('https://', adapter)
+        client.session.mount('http://', adapter)
+
+    def plan(
+        self,
+        desired: Dict[str, str],
+        prune: bool = False,
+        page_size: int = 1000,
+        on_page: Callable[[int], None] = None
+    ) -> List[SyncOperation]:
+        """
+        Operations still to apply: the remainder of a matching checkpoint, or a
+        fresh diff against the entries currently in the KVM.
+        """
+        fingerprint = desired_fingerprint(self.env, self.kvm_name, desired, prune)
+        if self.checkpoint:
+            saved = self.checkpoint.load(fingerprint)
+            if saved is not None:
+                operations, done = saved
+                remaining = [op for op in operations if op.checkpoint_key not in done]
+                self.resumed = len(operations) - len(remaining)
+                return remaining
+
+        current = fetch_entries(self.client, self.env, self.kvm_name, page_size, on_page)
+        operations = diff_entries(current, desired, prune)
+        self.resumed = 0
+        if self.checkpoint and operations:
+            self.checkpoint.save_plan(fingerprint, operations)
+        return operations
+
+    def _call(self, op: SyncOperation) -> str:
+        """Apply one operation, falling back when the entry changed under us."""
+        client = self.client
+        try:
+            if op.op == 'delete':
+                client.delete_kvm_entry(self.env, self.kvm_name, op.key)
+                return 'delete'
+            if op.op == 'create':
+                client.create_kvm_entry(self.env, self.kvm_name, op.key, op.value)
+                return 'create'
+            client.update_kvm_entry(self.env, self.kvm_name, op.key, op.value)
+            return 'update'
+        except ApigeeApiError as e:
+            if op.op == 'create' and e.status_code == 409:
+                client.update_kvm_entry(self.env, self.kvm_name, op.key, op.value)
+                return 'update'
+            if op.op == 'delete' and e.status_code == 404:
+                # Already gone: deleted before an interruption, or by a retry of a timed-out call
+                return 'delete'
+            if op.op == 'update' and e.status_code == 404:
+                client.create_kvm_entry(self.env, self.kvm_name, op.key, op.value)
+                return 'create'
+            raise
+
+    def _apply_one(self, op: SyncOperation, result: SyncResult) -> Optional[str]:
+        """Apply with retries; returns the performed action or None on failure."""
+        for attempt in range(self.max_retries + 1):
+            self.rate.acquire()
+            try:
+                action = self._call(op)
+                self.rate.succeeded()
+                return action
+            except ApigeeApiError as e:
+                if e.status_code not in _RETRYABLE or attempt == self.max_retries:
+                    error = str(e)
+                    break
+                backoff = min(30.0, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.0)
+                if e.status_code == 429:
+                    with self._lock:
+                        result.throttled += 1
+                    self.rate.throttled(e.retry_after if e.retry_after is not None else backoff)
+                else:
+                    time.sleep(backoff)
+            except requests.RequestException as e:
+                if attempt == self.max_retries:
+                    error = str(e)
+                    break
+                time.sleep(min(30.0, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.0))
+            with self._lock:
+                result.retries += 1
+        with self._lock:
+            result.failed.append((op.op, op.key, error))
+        return None
+
+    def apply(self, operations: List[SyncOperation]) -> SyncResult:
+        """Apply operations in checkpointed batches on the worker pool."""
+        result = SyncResult(planned=len(operations) + self.resumed, resumed=self.resumed)
+        start = time.perf_counter()
+        done = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for offset in range(0, len(operations), self.batch_size):
+                batch = operations[offset:offset + self.batch_size]
+                actions = list(pool.map(lambda op: self._apply_one(op, result), batch))
+                completed = []
+                for op, action in zip(batch, actions):
+                    if action is None:
+                        continue
+                    completed.append(op)
+                    if action == 'create':
+                        result.created += 1
+                    elif action == 'update':
+                        result.updated += 1
+                    else:
+                        result.deleted += 1
+                if self.checkpoint and completed:
+                    self.checkpoint.mark_done(completed)
+                done += len(batch)
+                result.elapsed_s = time.perf_counter() - start
+                result.final_rate = self.rate.rate
+                if self.progress:
+                    self.progress(done, len(operations), result)
+
+        result.elapsed_s = time.perf_counter() - start
+        result.final_rate = self.rate.rate
+        if self.checkpoint and not result.failed:
+            self.checkpoint.clear()
+        return result
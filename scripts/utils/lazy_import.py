@@ -0,0 +1,96 @@
+"""
+Lazy Imports
+
+Defers loading heavy third-party modules (requests, jwt, colorama, ...)
+until an attribute is first used, so `--help`, `--dry-run` and
+`--bundle-only` runs do not pay for imports they never touch:
+
+    requests = lazy_import('requests')
+    ...
+    response = requests.get(url)    # requests is loaded here
+
+A module that is not installed imports as a placeholder whose first
+attribute access raises ImportError with the install hint, so optional
+dependencies fail at the point of use rather than at startup.
+
+Submodules (google.auth.transport.requests) import their parent packages
+when looked up; import those inside the function that needs them instead.
+
+The first load runs under a lock, so a lazy module may be touched for the
+first time from several threads at once (importlib's LazyLoader is not
+thread-safe before Python 3.12).
+"""
+
+import sys
+import threading
+import importlib
+import importlib.util
+from types import ModuleType
+from typing import Dict
+
+
+class MissingModule(ModuleType):
+    """Placeholder for a lazily imported module that is not installed."""
+
+    def __init__(self, name: str, install_hint: str = None):
+        super().__init__(name)
+        self.__install_hint = install_hint or f"pip install {name.split('.')[0]}"
+
+    def __getattr__(self, attr: str):
+        raise ImportError(
+            f"'{self.__name__}' is required for this command. Install with: {self.__install_hint}",
+            name=self.__name__
+        )
+
+    def __bool__(self) -> bool:
+        return False
+
+
+class LazyModule(ModuleType):
+    """Stand-in that imports the real module on first attribute access."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__lock = threading.Lock()
+        self.__module = None
+
+    def __load(self) -> ModuleType:
+        with self.__lock:
+            if self.__module is None:
+                module = importlib.import_module(self.__name__)
+                # Later lookups find the attributes directly and skip __getattr__
+                self.__dict__.update(
+                    (key, value) for key, value in vars(module).items() if key not in ('__name__', '__spec__')
+                )
+                self.__module = module
+            return self.__module
+
+    def __getattr__(self, attr: str):
+        return getattr(self.__load(), attr)
+
+
+_LAZY: Dict[str, LazyModule] = {}
+_LAZY_LOCK = threading.Lock()
+
+
+def lazy_import(name: str, install_hint: str = None) -> ModuleType:
+    """
+    Module that is executed on first attribute access.
+
+    Args:
+        name: Top-level module name, e.g. 'requests'
+        install_hint: Shown if the module is missing (default: pip install <name>)
+
+    Returns:
+        The module (already loaded if imported elsewhere), a lazy module, or
+        a MissingModule placeholder
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    with _LAZY_LOCK:
+        if name not in _LAZY:
+            if importlib.util.find_spec(name) is None:
+                return MissingModule(name, install_hint)
+            _LAZY[name] = LazyModule(name)
+        return _LAZY[name]
+
@@ -0,0 +1,1290 @@
+"""
+Local Gateway
+
+Executes a generated proxy bundle locally for throughput and policy-overhead
+testing. The gateway serves the ProxyEndpoint BasePath, runs the flows in
+Apigee order (PreFlow, first matching conditional Flow, PostFlow, RouteRule,
+target flows, then the response flows) and proxies to the
+HTTPTargetConnection URL, normally a local stub backend.
+
+Supported policies:
+    - AssignMessage:          AssignVariable, Set, Add, Remove, Copy
+    - ExtractVariables:       Header, QueryParam, URIPath, Variable, JSONPayload
+    - KeyValueMapOperations:  Get from a local JSON store {"map": {"key": "value"}}
+                              or a KVM snapshot (.kvs)
+    - RaiseFault:             FaultResponse
+    - JavaScript:             Python reference ports where available, else the
+                              local JS harness (Node.js / py_mini_racer)
+    - LookupCache / PopulateCache: in-memory per worker with TTL
+    - MessageLogging:         Syslog to a local sink when ``syslog`` is set
+
+Anything else (FlowCallout, Quota ...) is skipped and counted.
+
+Load-balanced targets (<LoadBalancer> over TargetServers) pick a server per
+request with the bundle's algorithm (RoundRobin, Weighted, LeastConnections)
+from ``target_servers`` (name -> base URL); health monitoring and
+MaxFailures are not emulated.
+
+Semantics follow Apigee: ``<Value>`` in AssignVariable is a literal and
+message templates only substitute plain variable references, so the
+arithmetic templates in the timing policies (``{a - b}``) resolve to empty.
+Use ``timing_headers`` for gateway-measured phase timings instead.
+"""
+
+import re
+import json
+import time
+import queue
+import uuid
+import zipfile
+import signal
+import socket
+import asyncio
+import threading
+import multiprocessing
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit
+
+from .asynchttp import (
+    HOP_BY_HOP, REUSE_PORT, Headers, HTTPClient, HTTPError, Request, Response, server_process_context
+)
+from .conditions import compile_condition
+from .jwt_reference import parse_jwt_token
+from .kvm_snapshot import KvmSnapshot, is_snapshot
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+JS_ENGINES = ['auto', 'reference', 'node', 'mini_racer']
+
+_GET_VARIABLE_RE = re.compile(r'getVariable\(\s*["\']([^"\']+)["\']\s*\)')
+_TEMPLATE_RE = re.compile(r'\{([^{}]*)\}')
+_VARIABLE_NAME_RE = re.compile(r'^[\w.\-]+$')
+_EXPRESSION_RE = re.compile(r'^[\w.\-\s()+*/]+$')
+
+
+class BundleError(Exception):
+    """The bundle could not be loaded."""
+
+
+class PolicyFault(Exception):
+    """A policy raised a fault; carries the error response."""
+
+    def __init__(self, response: Response, policy: str = None):
+        super().__init__(f"{policy}: {response.status}")
+        self.response = response
+        self.policy = policy
+
+
+def _fault_response(status: int, faultstring: str, errorcode: str) -> Response:
+    body = json.dumps({"fault": {"faultstring": faultstring, "detail": {"errorcode": errorcode}}})
+    return Response(status, Headers([('Content-Type', 'application/json')]), body.encode('utf-8'))
+
+
+# ============== Bundle model ==============
+
+@dataclass
+class Step:
+    """A policy step with its compiled condition."""
+    name: str
+    condition: Optional[str] = None
+    matches: Callable[[Mapping[str, Any]], bool] = None
+
+    def __post_init__(self):
+        self.matches = compile_condition(self.condition)
+
+
+@dataclass
+class Flow:
+    """A PreFlow, PostFlow or conditional Flow."""
+    name: str
+    request: List[Step] = field(default_factory=list)
+    response: List[Step] = field(default_factory=list)
+    condition: Optional[str] = None
+    matches: Callable[[Mapping[str, Any]], bool] = None
+
+    def __post_init__(self):
+        self.matches = compile_condition(self.condition)
+
+
+@dataclass
+class RouteRule:
+    name: str
+    target: Optional[str] = None
+    url: Optional[str] = None
+    condition: Optional[str] = None
+    matches: Callable[[Mapping[str, Any]], bool] = None
+
+    def __post_init__(self):
+        self.matches = compile_condition(self.condition)
+
+
+@dataclass
+class Endpoint:
+    """A ProxyEndpoint or TargetEndpoint."""
+    name: str
+    preflow: Flow
+    postflow: Flow
+    flows: List[Flow] = field(default_factory=list)
+    post_client_flow: Optional[Flow] = None
+    base_path: str = ''
+    route_rules: List[RouteRule] = field(default_factory=list)
+    url: Optional[str] = None
+    properties: Dict[str, str] = field(default_factory=dict)
+    servers: List[Tuple[str, int]] = field(default_factory=list)   # LoadBalancer (TargetServer, weight)
+    algorithm: str = 'RoundRobin'
+    path: str = ''                                                   # Path appended to a TargetServer URL
+
+    def match_flow(self, context: Mapping[str, Any]) -> Optional[Flow]:
+        for flow in self.flows:
+            if flow.matches(context):
+                return flow
+        return None
+
+
+def _text(element: Optional[ET.Element], default: str = None) -> Optional[str]:
+    if element is None or element.text is None:
+        return default
+    return element.text.strip()
+
+
+def _parse_steps(phase: Optional[ET.Element]) -> List[Step]:
+    if phase is None:
+        return []
+    return [
+        Step(_text(step.find('Name')), _text(step.find('Condition')) or None)
+        for step in phase.findall('Step')
+    ]
+
+
+def _parse_flow(element: Optional[ET.Element], name: str) -> Flow:
+    if element is None:
+        return Flow(name)
+    return Flow(
+        element.get('name', name),
+        _parse_steps(element.find('Request')),
+        _parse_steps(element.find('Response')),
+        _text(element.find('Condition')) or None
+    )
+
+
+def _parse_endpoint(root: ET.Element) -> Endpoint:
+    endpoint = Endpoint(
+        name=root.get('name', 'default'),
+        preflow=_parse_flow(root.find('PreFlow'), 'PreFlow'),
+        postflow=_parse_flow(root.find('PostFlow'), 'PostFlow'),
+        flows=[_parse_flow(f, f.get('name', '')) for f in root.findall('./Flows/Flow')]
+    )
+    if root.find('PostClientFlow') is not None:
+        endpoint.post_client_flow = _parse_flow(root.find('PostClientFlow'), 'PostClientFlow')
+
+    proxy_connection = root.find('HTTPProxyConnection')
+    if proxy_connection is not None:
+        endpoint.base_path = (_text(proxy_connection.find('BasePath'), '') or '').rstrip('/')
+    for rule in root.findall('RouteRule'):
+        endpoint.route_rules.append(RouteRule(
+            rule.get('name', ''),
+            _text(rule.find('TargetEndpoint')),
+            _text(rule.find('URL')),
+            _text(rule.find('Condition')) or None
+        ))
+
+    target_connection = root.find('HTTPTargetConnection')
+    if target_connection is not None:
+        endpoint.url = _text(target_connection.find('URL'))
+        balancer = target_connection.find('LoadBalancer')
+        if balancer is not None:
+            endpoint.algorithm = _text(balancer.find('Algorithm'), 'RoundRobin')
+            endpoint.servers = [
+                (server.get('name'), int(_text(server.find('Weight'), '1')))
+                for server in balancer.findall('Server')
+            ]
+            endpoint.path = (_text(target_connection.find('Path'), '') or '').rstrip('/')
+        for prop in target_connection.findall('./Properties/Property'):
+            endpoint.properties[prop.get('name')] = _text(prop, '')
+    return endpoint
+
+
+@dataclass
+class ProxyBundle:
+    """Parsed apiproxy bundle."""
+    name: str
+    revision: str
+    policies: Dict[str, ET.Element]
+    proxy_endpoints: Dict[str, Endpoint]
+    target_endpoints: Dict[str, Endpoint]
+    resources: Dict[str, str]
+
+    @classmethod
+    def load(cls, path: str) -> 'ProxyBundle':
+        """
+        Load a bundle zip, a directory containing apiproxy/, or an apiproxy directory.
+        """
+        files = dict(_iter_bundle_files(Path(path)))
+        descriptors = [n for n in files if '/' not in n and n.endswith('.xml')]
+        if not descriptors:
+            raise BundleError(f"No proxy descriptor found in {path}")
+        descriptor = ET.fromstring(files[descriptors[0]])
+
+        def parse_dir(prefix: str) -> Dict[str, ET.Element]:
+            return {
+                Path(n).stem: ET.fromstring(files[n])
+                for n in sorted(files)
+                if n.startswith(prefix) and n.endswith('.xml')
+            }
+
+        policies = {root.get('name', name): root for name, root in parse_dir('policies/').items()}
+        proxies = {e.name: e for e in map(_parse_endpoint, parse_dir('proxies/').values())}
+        targets = {e.name: e for e in map(_parse_endpoint, parse_dir('targets/').values())}
+        if not proxies:
+            raise BundleError(f"No proxy endpoints found in {path}")
+        resources = {
+            n.split('/', 2)[2]: files[n].decode('utf-8')
+            for n in files if n.startswith('resources/jsc/')
+        }
+        return cls(
+            name=descriptor.get('name', Path(descriptors[0]).stem),
+            revision=descriptor.get('revision', '1'),
+            policies=policies,
+            proxy_endpoints=proxies,
+            target_endpoints=targets,
+            resources=resources
+        )
+
+
+def _iter_bundle_files(path: Path) -> Iterator[Tuple[str, bytes]]:
+    """Yield (path relative to apiproxy/, content) for every bundle file."""
+    if path.is_file():
+        with zipfile.ZipFile(path) as zf:
+            for name in zf.namelist():
+                if name.startswith('apiproxy/') and not name.endswith('/'):
+                    yield name[len('apiproxy/'):], zf.read(name)
+        return
+    root = path / 'apiproxy' if (path / 'apiproxy').is_dir() else path
+    if not root.is_dir():
+        raise BundleError(f"Bundle not found: {path}")
+    for file in root.rglob('*'):
+        if file.is_file():
+            yield file.relative_to(root).as_posix(), file.read_bytes()
+
+
+# ============== Message context ==============
+
+@dataclass
+class Message:
+    """Mutable request or response message."""
+    headers: Headers = field(default_factory=Headers)
+    body: bytes = b''
+    verb: str = 'GET'
+    path: str = '/'
+    query: List[Tuple[str, str]] = field(default_factory=list)
+    status: int = 200
+    reason: str = ''
+
+
+def _format(value: Any) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class MessageContext(Mapping):
+    """
+    Flow variables for one request.
+
+    Explicitly set variables live in a dict; message variables
+    (``request.header.*``, ``proxy.pathsuffix``, ``response.status.code`` ...)
+    are resolved from the request and response messages on access.
+    """
+
+    def __init__(self, gateway: 'LocalGateway', endpoint: Endpoint, request: Request):
+        self.gateway = gateway
+        self.endpoint = endpoint
+        self.variables: Dict[str, Any] = {}
+        self.request = Message(
+            headers=request.headers.copy(),
+            body=request.body,
+            verb=request.method,
+            path=request.path,
+            query=parse_qsl(request.query, keep_blank_values=True)
+        )
+        self.response = Message()
+        self.received_uri = request.target
+        self.client_ip = request.client[0]
+        self.path_override: Optional[str] = None
+        self.phase = 'request'
+        self.messageid = uuid.uuid4().hex
+
+    # Mapping interface used by condition evaluation
+    def __getitem__(self, name: str) -> Any:
+        value = self.get(name)
+        if value is None:
+            raise KeyError(name)
+        return value
+
+    def __iter__(self):
+        return iter(self.variables)
+
+    def __len__(self):
+        return len(self.variables)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        if name in self.variables:
+            return self.variables[name]
+        value = self._dynamic(name)
+        return default if value is None else value
+
+    def message_for(self, prefix: str) -> Optional[Message]:
+        if prefix == 'message':
+            prefix = self.phase
+        return self.request if prefix == 'request' else self.response if prefix == 'response' else None
+
+    def _dynamic(self, name: str) -> Any:
+        head, _, rest = name.partition('.')
+        message = self.message_for(head)
+        if message is not None:
+            if rest.startswith('header.'):
+                return message.headers.get(rest[7:])
+            if rest.startswith('queryparam.'):
+                key = rest[11:]
+                return next((v for k, v in message.query if k == key), None)
+            if rest in ('content', 'payload'):
+                return message.body.decode('utf-8', 'replace')
+            if rest == 'verb':
+                return message.verb
+            if rest == 'path':
+                return message.path
+            if rest == 'querystring':
+                return urlencode(message.query)
+            if rest == 'uri':
+                return self.received_uri if message is self.request else None
+            if rest == 'status.code':
+                return message.status
+            if rest == 'reason.phrase':
+                return message.reason
+            return None
+
+        if name == 'proxy.pathsuffix':
+            return self.request.path[len(self.endpoint.base_path):] if self.request.path.startswith(self.endpoint.base_path) else ''
+        if name == 'proxy.basepath':
+            return self.endpoint.base_path
+        if name == 'proxy.name':
+            return self.endpoint.name
+        if name == 'system.timestamp':
+            return int(time.time() * 1000)
+        if name == 'system.uuid':
+            return str(uuid.uuid4())
+        if name == 'messageid':
+            return self.messageid
+        if name in ('client.ip', 'proxy.client.ip'):
+            return self.client_ip
+        if name == 'environment.name':
+            return self.gateway.settings.env
+        if name == 'organization.name':
+            return self.gateway.settings.organization
+        if name == 'apiproxy.name':
+            return self.gateway.bundle.name
+        if name == 'apiproxy.revision':
+            return self.gateway.bundle.revision
+        return None
+
+    def set(self, name: str, value: Any) -> None:
+        head, _, rest = name.partition('.')
+        message = self.message_for(head)
+        if message is not None:
+            if rest.startswith('header.'):
+                message.headers.set(rest[7:], _format(value))
+                return
+            if rest in ('content', 'payload'):
+                message.body = _format(value).encode('utf-8')
+                return
+            if rest == 'verb':
+                message.verb = _format(value)
+                return
+            if rest == 'status.code':
+                message.status = int(value)
+                return
+        self.variables[name] = value
+
+    def remove(self, name: str) -> None:
+        self.variables.pop(name, None)
+
+    def timestamp(self, name: str) -> None:
+        """Record one of the Apigee phase timestamps (epoch ms)."""
+        self.variables[name] = int(time.time() * 1000)
+
+    def template(self, text: str) -> str:
+        """
+        Resolve a message template.
+
+        Plain variable references are substituted (unresolved -> ""),
+        expressions resolve to "" and anything else (e.g. JSON braces in a
+        payload) is kept literally.
+        """
+        def substitute(match):
+            inner = match.group(1).strip()
+            if _VARIABLE_NAME_RE.match(inner):
+                return _format(self.get(inner))
+            if _EXPRESSION_RE.match(inner):
+                return ''
+            return match.group(0)
+
+        return _TEMPLATE_RE.sub(substitute, text) if '{' in text else text
+
+
+# ============== Policy executors ==============
+
+class _Executor:
+    """Base policy executor; subclasses implement run() or run_async()."""
+
+    blocking = False
+
+    def __init__(self, gateway: 'LocalGateway', root: ET.Element):
+        self.gateway = gateway
+        self.name = root.get('name')
+        self.continue_on_error = root.get('continueOnError') == 'true'
+        self.enabled = root.get('enabled', 'true') != 'false'
+
+    def run(self, context: MessageContext) -> None:
+        raise NotImplementedError
+
+    async def run_async(self, context: MessageContext) -> None:
+        self.run(context)
+
+
+class _Skipped(_Executor):
+    """Unsupported policy type: counted, not executed."""
+
+    def run(self, context: MessageContext) -> None:
+        pass
+
+
+def _apply_message_ops(context: MessageContext, message: Message, element: ET.Element, op: str) -> None:
+    for header in element.findall('./Headers/Header'):
+        name = header.get('name')
+        if op == 'remove':
+            message.headers.remove(name)
+        else:
+            value = context.template(header.text or '')
+            message.headers.set(name, value) if op == 'set' else message.headers.add(name, value)
+    for param in element.findall('./QueryParams/QueryParam'):
+        name = param.get('name')
+        remaining = [(k, v) for k, v in message.query if k != name] if op != 'add' else message.query
+        if op != 'remove':
+            remaining = remaining + [(name, context.template(param.text or ''))]
+        message.query = remaining
+    if op == 'remove':
+        if element.find('Payload') is not None:
+            message.body = b''
+        return
+
+    payload = element.find('Payload')
+    if payload is not None:
+        message.body = context.template((payload.text or '').strip()).encode('utf-8')
+        if payload.get('contentType'):
+            message.headers.set('Content-Type', payload.get('contentType'))
+    if op != 'set':
+        return
+    if element.find('StatusCode') is not None:
+        message.status = int(context.template(_text(element.find('StatusCode'))))
+    if element.find('ReasonPhrase') is not None:
+        message.reason = context.template(_text(element.find('ReasonPhrase'), ''))
+    if element.find('Verb') is not None:
+        message.verb = context.template(_text(element.find('Verb')))
+    if element.find('Path') is not None and message is context.request:
+        context.path_override = context.template(_text(element.find('Path'), ''))
+
+
+class _AssignMessage(_Executor):
+    """AssignMessage: Remove, Copy, Add, Set, then AssignVariable."""
+
+    def __init__(self, gateway, root):
+        super().__init__(gateway, root)
+        self.root = root
+        assign_to = root.find('AssignTo')
+        self.assign_to = (assign_to.get('type') or _text(assign_to) or 'request') if assign_to is not None else None
+
+    def _target(self, context: MessageContext) -> Message:
+        if self.assign_to == 'response' or (self.assign_to is None and context.phase == 'response'):
+            return context.response
+        return context.request
+
+    def run(self, context: MessageContext) -> None:
+        message = self._target(context)
+        for element in self.root.findall('Remove'):
+            _apply_message_ops(context, message, element, 'remove')
+        for element in self.root.findall('Copy'):
+            source = context.message_for(element.get('source') or 'request')
+            if source is None or source is message:
+                continue
+            for header in element.findall('./Headers/Header'):
+                name = header.get('name')
+                if source.headers.get(name) is not None:
+                    message.headers.set(name, source.headers.get(name))
+            if element.findtext('Payload', '').strip() == 'true':
+                message.body = source.body
+        for element in self.root.findall('Add'):
+            _apply_message_ops(context, message, element, 'add')
+        for element in self.root.findall('Set'):
+            _apply_message_ops(context, message, element, 'set')
+
+        for assign in self.root.findall('AssignVariable'):
+            name = _text(assign.find('Name'))
+            value = None
+            if assign.find('Ref') is not None:
+                value = context.get(_text(assign.find('Ref')))
+            if value is None and assign.find('Template') is not None:
+                value = context.template(assign.find('Template').text or '')
+            if value is None and assign.find('Value') is not None:
+                value = assign.find('Value').text or ''
+            if name and value is not None:
+                context.set(name, value)
+
+
+def _pattern_regex(pattern: str, ignore_case: bool) -> Tuple['re.Pattern', List[str]]:
+    """Convert an ExtractVariables pattern ("Bearer {token}") to a regex."""
+    names = []
+    parts = []
+    position = 0
+    for match in _TEMPLATE_RE.finditer(pattern):
+        parts.append(re.escape(pattern[position:match.start()]))
+        parts.append('(.*?)')
+        names.append(match.group(1).strip())
+        position = match.end()
+    parts.append(re.escape(pattern[position:]))
+    return re.compile(''.join(parts), re.IGNORECASE if ignore_case else 0), names
+
+
+def _json_path(document: Any, path: str) -> Any:
+    """Evaluate a simple JSONPath ($.a.b[0].c)."""
+    value = document
+    for token in re.findall(r'\.([^.\[\]]+)|\[(\d+)\]', path.lstrip('$')):
+        key, index = token
+        if key and isinstance(value, dict):
+            value = value.get(key)
+        elif index and isinstance(value, list) and int(index) < len(value):
+            value = value[int(index)]
+        else:
+            return None
+    return value
+
+
+class _ExtractVariables(_Executor):
+
+    def __init__(self, gateway, root):
+        super().__init__(gateway, root)
+        self.source = _text(root.find('Source'), 'request')
+        self.prefix = _text(root.find('VariablePrefix'))
+        self.extractors: List[Tuple[str, str, List[Tuple['re.Pattern', List[str]]]]] = []
+        for kind in ('Header', 'QueryParam', 'Variable', 'URIPath'):
+            for element in root.findall(kind):
+                patterns = [
+                    _pattern_regex(p.text or '', p.get('ignoreCase') == 'true')
+                    for p in element.findall('Pattern')
+                ]
+                self.extractors.append((kind, element.get('name'), patterns))
+        self.json_variables = [
+            (v.get('name'), _text(v.find('JSONPath')))
+            for v in root.findall('./JSONPayload/Variable')
+        ]
+
+    def _store(self, context: MessageContext, name: str, value: Any) -> None:
+        context.set(f"{self.prefix}.{name}" if self.prefix else name, value)
+
+    def run(self, context: MessageContext) -> None:
+        message = context.message_for(self.source)
+        for kind, name, patterns in self.extractors:
+            if kind == 'Header':
+                value = message.headers.get(name) if message else None
+            elif kind == 'QueryParam':
+                value = next((v for k, v in message.query if k == name), None) if message else None
+            elif kind == 'URIPath':
+                value = context.get('proxy.pathsuffix')
+            else:
+                value = context.get(name)
+            if value is None:
+                continue
+            for regex, names in patterns:
+                match = regex.fullmatch(_format(value))
+                if match:
+                    for variable, extracted in zip(names, match.groups()):
+                        self._store(context, variable, extracted)
+                    break
+
+        if self.json_variables and message is not None and message.body:
+            try:
+                document = json.loads(message.body)
+            except ValueError:
+                return
+            for name, path in self.json_variables:
+                value = _json_path(document, path or '$')
+                if value is not None:
+                    self._store(context, name, value if isinstance(value, str) else json.dumps(value))
+
+
+class _KeyValueMapGet(_Executor):
+    """KeyValueMapOperations Get against the gateway's local KVM store."""
+
+    def __init__(self, gateway, root):
+        super().__init__(gateway, root)
+        self.map_name = root.get('mapIdentifier', '')
+        self.gets = []
+        for get in root.findall('Get'):
+            parameters = [(p.get('ref'), p.text) for p in get.findall('./Key/Parameter')]
+            self.gets.append((get.get('assignTo'), parameters))
+
+    def run(self, context: MessageContext) -> None:
+        entries = self.gateway.kvm_store.get(self.map_name, {})
+        for assign_to, parameters in self.gets:
+            fragments = [context.get(ref) if ref else text for ref, text in parameters]
+            if any(f is None for f in fragments):
+                continue
+            value = entries.get('__'.join(_format(f) for f in fragments))
+            if value is not None:
+                context.set(assign_to, value)
+
+
+class _RaiseFault(_Executor):
+
+    def __init__(self, gateway, root):
+        super().__init__(gateway, root)
+        self.fault_response = root.find('FaultResponse')
+
+    def run(self, context: MessageContext) -> None:
+        message = Message(status=500)
+        if self.fault_response is not None:
+            for element in self.fault_response.findall('Set'):
+                _apply_message_ops(context, message, element, 'set')
+            for element in self.fault_response.findall('Add'):
+                _apply_message_ops(context, message, element, 'add')
+        raise PolicyFault(Response(message.status, message.headers, message.body, message.reason), self.name)
+
+
+def _cache_key(context: MessageContext, root: ET.Element) -> Optional[str]:
+    fragments = [_text(root.find('./CacheKey/Prefix'))] if root.find('./CacheKey/Prefix') is not None else []
+    for fragment in root.findall('./CacheKey/KeyFragment'):
+        value = context.get(fragment.get('ref')) if fragment.get('ref') else fragment.text
+        if value is None:
+            return None
+        fragments.append(_format(value))
+    return '__'.join(fragments)
+
+
+class _LookupCache(_Executor):
+
+    def __init__(self, gateway, root):
+        super().__init__(gateway, root)
+        self.root = root
+        self.assign_to = _text(root.find('AssignTo'))
+
+    def run(self, context: MessageContext) -> None:
+        key = _cache_key(context, self.root)
+        entry = self.gateway.cache.get(key) if key is not None else None
+        hit = entry is not None and entry[1] > time.monotonic()
+        if hit:
+            context.set(self.assign_to, entry[0])
+        context.set(f"lookupcache.{self.name}.cachehit", hit)
+
+
+class _PopulateCache(_Executor):
+
+    def __init__(self, gateway, root):
+        super().__init__(gateway, root)
+        self.root = root
+        self.source = _text(root.find('Source'))
+        self.ttl = float(_text(root.find('./ExpirySettings/TimeoutInSec'), '300'))
+
+    def run(self, context: MessageContext) -> None:
+        key = _cache_key(context, self.root)
+        value = context.get(self.source)
+        if key is not None and value is not None:
+            self.gateway.cache[key] = (value, time.monotonic() + self.ttl)
+
+
+def _jwt_reference(context: MessageContext) -> Dict[str, Any]:
+    return parse_jwt_token(context.get('jwt.token'))
+
+
+# Pure-Python ports used instead of a JS engine when js_engine is auto/reference
+REFERENCE_SCRIPTS = {
+    'parse-jwt-token.js': _jwt_reference,
+}
+
+
+class _JavaScript(_Executor):
+    """JavaScript policy through a reference port or the local JS harness."""
+
+    def __init__(self, gateway, root):
+        super().__init__(gateway, root)
+        resource = _text(root.find('ResourceURL'), '')
+        self.script = resource.replace('jsc://', '')
+        if self.script not in gateway.bundle.resources:
+            raise BundleError(f"{self.name}: resource {resource} not in bundle")
+
+        engine = gateway.settings.js_engine
+        self.reference = REFERENCE_SCRIPTS.get(self.script) if engine in ('auto', 'reference') else None
+        if self.reference is None:
+            if engine == 'reference':
+                raise BundleError(f"{self.name}: no reference implementation for {self.script}")
+            source = gateway.bundle.resources[self.script]
+            self.inputs = sorted(set(_GET_VARIABLE_RE.findall(source)))
+            self.harness_name = gateway.harness().load_source(self.script, source)
+            self.blocking = True
+
+    def _fail(self, error: str) -> None:
+        raise PolicyFault(
+            _fault_response(500, f"Execution of {self.name} failed with error: {error}",
+                            'steps.javascript.ScriptExecutionFailed'),
+            self.name
+        )
+
+    def _apply(self, context: MessageContext, variables: Dict[str, Any]) -> None:
+        for name, value in variables.items():
+            if value is None:
+                context.remove(name)
+            else:
+                context.set(name, value)
+
+    def run(self, context: MessageContext) -> None:
+        self._apply(context, self.reference(context))
+
+    async def run_async(self, context: MessageContext) -> None:
+        if self.reference is not None:
+            self.run(context)
+            return
+        variables = {name: context.get(name) for name in self.inputs}
+        loop = asyncio.get_running_loop()
+        harness = self.gateway.harness()
+        invocation = await loop.run_in_executor(None, harness.run, self.harness_name, variables)
+        self._apply(context, invocation.variables)
+        if invocation.error:
+            self._fail(invocation.error)
+
+
+class _SyslogSender:
+    """Fire-and-forget syslog client (newline-framed TCP or UDP)."""
+
+    # Lines dropped instead of buffered once this many bytes are pending
+    MAX_PENDING_BYTES = 4 * 1024 * 1024
+
+    def __init__(self, host: str, port: int, protocol: str = 'TCP'):
+        self.host = host
+        self.port = port
+        self.protocol = protocol.upper()
+        self.sent = 0
+        self.dropped = 0
+        self._transport = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._connecting: Optional[asyncio.Future] = None
+
+    async def _connect(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self.protocol == 'UDP':
+            self._transport, _ = await loop.create_datagram_endpoint(
+                asyncio.DatagramProtocol, remote_addr=(self.host, self.port)
+            )
+        else:
+            # Keep the writer referenced: collecting it closes the transport
+            _, self._writer = await asyncio.open_connection(self.host, self.port)
+            self._transport = self._writer.transport
+
+    async def send(self, line: str) -> None:
+        if self._transport is None or self._transport.is_closing():
+            self._transport = None
+            if self._connecting is None:
+                self._connecting = asyncio.ensure_future(self._connect())
+            try:
+                await asyncio.shield(self._connecting)
+            except OSError:
+                self.dropped += 1
+                return
+            finally:
+                self._connecting = None
+        data = line.encode('utf-8')
+        if self.protocol == 'UDP':
+            self._transport.sendto(data)
+        elif self._transport.get_write_buffer_size() > self.MAX_PENDING_BYTES:
+            self.dropped += 1
+            return
+        else:
+            self._transport.write(data + b'\n')
+        self.sent += 1
+
+    def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+
+
+class _MessageLogging(_Executor):
+    """MessageLogging Syslog, sent to the gateway's syslog sink (GatewaySettings.syslog)."""
+
+    blocking = True
+
+    def __init__(self, gateway, root):
+        super().__init__(gateway, root)
+        syslog = root.find('Syslog')
+        self.message = (syslog.findtext('Message') or '') if syslog is not None else ''
+        self.format_message = syslog is not None and _text(syslog.find('FormatMessage')) == 'true'
+        host, _, port = gateway.settings.syslog.rpartition(':')
+        protocol = _text(syslog.find('Protocol'), 'TCP') if syslog is not None else 'TCP'
+        self.sender = gateway.syslog_sender(host or '127.0.0.1', int(port), protocol)
+
+    async def run_async(self, context: MessageContext) -> None:
+        line = context.template(self.message)
+        if self.format_message:
+            timestamp = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+            line = f"<134>1 {timestamp} local-gateway {self.gateway.bundle.name} - - - {line}"
+        await self.sender.send(line)
+
+
+EXECUTORS = {
+    'AssignMessage': _AssignMessage,
+    'ExtractVariables': _ExtractVariables,
+    'KeyValueMapOperations': _KeyValueMapGet,
+    'RaiseFault': _RaiseFault,
+    'LookupCache': _LookupCache,
+    'PopulateCache': _PopulateCache,
+    'Javascript': _JavaScript,
+    'MessageLogging': _MessageLogging,
+}
+
+
+# ============== Gateway ==============
+
+@dataclass
+class GatewaySettings:
+    """Runtime settings for a local gateway."""
+    env: str = 'dev'
+    organization: str = 'local'
+    target_url: Optional[str] = None        # Overrides every HTTPTargetConnection URL
+    target_servers: Dict[str, str] = field(default_factory=dict)  # TargetServer name -> base URL
+    kvm_store: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    js_engine: str = 'auto'
+    timing_headers: bool = False
+    verify_tls: bool = True
+    syslog: Optional[str] = None            # host:port for MessageLogging; None skips the policy
+
+
+class LocalGateway:
+    """Executes a ProxyBundle for incoming requests."""
+
+    def __init__(self, bundle: ProxyBundle, settings: GatewaySettings = None):
+        if settings is not None and settings.js_engine not in JS_ENGINES:
+            raise ValueError(f"Unknown JavaScript engine: {settings.js_engine}")
+        self.bundle = bundle
+        self.settings = settings or GatewaySettings()
+        self.kvm_store = self.settings.kvm_store
+        self.cache: Dict[str, Tuple[Any, float]] = {}
+        self._harness = None
+        self._client: Optional[HTTPClient] = None
+        self._balancers: Dict[str, Dict[str, Any]] = {}
+        self._syslog_senders: Dict[Tuple[str, int, str], _SyslogSender] = {}
+        self._stats = {
+            'requests': 0,
+            'statuses': {},
+            'faults': 0,
+            'target_ms': 0.0,
+            'policies': {},
+            'skipped_policies': {},
+        }
+        # Longest base path first so nested base paths classify correctly
+        self.proxy_endpoints = sorted(bundle.proxy_endpoints.values(), key=lambda e: -len(e.base_path))
+        self.executors: Dict[str, _Executor] = {}
+        for name, root in bundle.policies.items():
+            executor_class = EXECUTORS.get(root.tag, _Skipped)
+            if root.tag == 'MessageLogging' and (not self.settings.syslog or root.find('Syslog') is None):
+                executor_class = _Skipped
+            self.executors[name] = executor_class(self, root)
+
+    def harness(self):
+        """The JS harness, started on first use."""
+        if self._harness is None:
+            from .js_harness import JSPolicyHarness
+            engine = self.settings.js_engine
+            self._harness = JSPolicyHarness(engine='auto' if engine in ('auto', 'reference') else engine)
+        return self._harness
+
+    def syslog_sender(self, host: str, port: int, protocol: str) -> _SyslogSender:
+        """Shared sender per syslog destination."""
+        key = (host, port, protocol.upper())
+        if key not in self._syslog_senders:
+            self._syslog_senders[key] = _SyslogSender(host, port, protocol)
+        return self._syslog_senders[key]
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+        for sender in self._syslog_senders.values():
+            sender.close()
+        if self._harness is not None:
+            self._harness.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and per-policy execution time for this gateway."""
+        return merge_stats([self.raw_stats()])
+
+    def raw_stats(self) -> Dict[str, Any]:
+        """Unsummarized counters, for merging across workers."""
+        raw = dict(self._stats)
+        raw['syslog_sent'] = sum(s.sent for s in self._syslog_senders.values())
+        raw['syslog_dropped'] = sum(s.dropped for s in self._syslog_senders.values())
+        return raw
+
+    async def _run_steps(self, context: MessageContext, steps: List[Step]) -> None:
+        for step in steps:
+            executor = self.executors.get(step.name)
+            if executor is None or not executor.enabled or not step.matches(context):
+                continue
+            if isinstance(executor, _Skipped):
+                skipped = self._stats['skipped_policies']
+                skipped[step.name] = skipped.get(step.name, 0) + 1
+                continue
+            start = time.perf_counter()
+            try:
+                if executor.blocking:
+                    await executor.run_async(context)
+                else:
+                    executor.run(context)
+            except PolicyFault:
+                if not executor.continue_on_error:
+                    raise
+            except Exception as e:
+                if not executor.continue_on_error:
+                    raise PolicyFault(_fault_response(500, f"{step.name}: {e}", 'steps.policy.ExecutionFailed'), step.name)
+            finally:
+                timing = self._stats['policies'].setdefault(step.name, {'count': 0, 'total_ms': 0.0})
+                timing['count'] += 1
+                timing['total_ms'] += (time.perf_counter() - start) * 1000
+
+    def _pick_server(self, target: Endpoint) -> str:
+        """TargetServer for the next request to a load-balanced target."""
+        state = self._balancers.setdefault(target.name, {
+            'next': 0,
+            'current': {name: 0 for name, _ in target.servers},
+            'in_flight': {name: 0 for name, _ in target.servers},
+        })
+        if target.algorithm == 'Weighted':
+            # Smooth weighted round robin: spreads each server's share evenly over the cycle
+            total = sum(weight for _, weight in target.servers)
+            for name, weight in target.servers:
+                state['current'][name] += weight
+            name = max(state['current'], key=state['current'].get)
+            state['current'][name] -= total
+        elif target.algorithm == 'LeastConnections':
+            name = min((n for n, _ in target.servers), key=lambda n: state['in_flight'][n])
+        else:
+            name = target.servers[state['next'] % len(target.servers)][0]
+            state['next'] += 1
+        return name
+
+    def _target_url(self, context: MessageContext, target: Endpoint, route: RouteRule) -> str:
+        base = context.get('target.url') or self.settings.target_url or route.url or target.url
+        if not base and target.servers:
+            server = self._pick_server(target)
+            context.set('loadbalancing.targetserver', server)
+            if server not in self.settings.target_servers:
+                raise PolicyFault(_fault_response(503, f"TargetServer {server} is not defined",
+                                                  'messaging.adaptors.http.flow.ServiceUnavailable'))
+            base = self.settings.target_servers[server].rstrip('/') + target.path
+        parts = urlsplit(base)
+        if context.path_override is not None:
+            suffix = context.path_override
+        elif _format(context.get('target.copy.pathsuffix')) != 'false':
+            suffix = context.get('proxy.pathsuffix')
+        else:
+            suffix = ''
+        path = parts.path.rstrip('/') + suffix
+        query = urlencode(context.request.query) if _format(context.get('target.copy.queryparams')) != 'false' else ''
+        return f"{parts.scheme}://{parts.netloc}{quote(path, safe='/%:@!$&()*+,;=~')}" + (f"?{query}" if query else '')
+
+    async def _call_target(self, context: MessageContext, target: Endpoint, route: RouteRule) -> None:
+        if self._client is None:
+            self._client = HTTPClient(verify_tls=self.settings.verify_tls)
+        headers = Headers((k, v) for k, v in context.request.headers if k.lower() not in HOP_BY_HOP)
+        timeout = float(target.properties.get('io.timeout.millis', 60000)) / 1000
+
+        url = self._target_url(context, target, route)
+        context.set('target.url', url)
+        server = context.get('loadbalancing.targetserver')
+        in_flight = self._balancers[target.name]['in_flight'] if server else None
+        if in_flight is not None:
+            in_flight[server] += 1
+        context.timestamp('target.sent.start.timestamp')
+        context.timestamp('target.sent.end.timestamp')
+        start = time.perf_counter()
+        try:
+            response = await self._client.request(context.request.verb, url, headers, context.request.body, timeout)
+        except asyncio.TimeoutError:
+            raise PolicyFault(_fault_response(504, "Gateway Timeout", 'messaging.adaptors.http.flow.GatewayTimeout'))
+        except (OSError, HTTPError, asyncio.IncompleteReadError) as e:
+            raise PolicyFault(_fault_response(503, f"The Service is temporarily unavailable: {e}",
+                                              'messaging.adaptors.http.flow.ServiceUnavailable'))
+        finally:
+            self._stats['target_ms'] += (time.perf_counter() - start) * 1000
+            if in_flight is not None:
+                in_flight[server] -= 1
+        context.timestamp('target.received.start.timestamp')
+        context.timestamp('target.received.end.timestamp')
+
+        context.response = Message(
+            headers=Headers((k, v) for k, v in response.headers if k.lower() not in HOP_BY_HOP),
+            body=response.body,
+            status=response.status,
+            reason=response.reason
+        )
+
+    async def _execute(self, context: MessageContext, endpoint: Endpoint, marks: Dict[str, float]) -> None:
+        await self._run_steps(context, endpoint.preflow.request)
+        flow = endpoint.match_flow(context)
+        if flow:
+            await self._run_steps(context, flow.request)
+        await self._run_steps(context, endpoint.postflow.request)
+
+        route = next((r for r in endpoint.route_rules if r.matches(context)), None)
+        target = self.bundle.target_endpoints.get(route.target) if route and route.target else None
+        target_flow = None
+        if target is not None:
+            await self._run_steps(context, target.preflow.request)
+            target_flow = target.match_flow(context)
+            if target_flow:
+                await self._run_steps(context, target_flow.request)
+            await self._run_steps(context, target.postflow.request)
+        marks['target_start'] = time.perf_counter()
+        if target is not None or (route and route.url):
+            await self._call_target(context, target or Endpoint(route.name, Flow('PreFlow'), Flow('PostFlow')), route)
+        marks['target_end'] = time.perf_counter()
+
+        context.phase = 'response'
+        if target is not None:
+            await self._run_steps(context, target.preflow.response)
+            if target_flow:
+                await self._run_steps(context, target_flow.response)
+            await self._run_steps(context, target.postflow.response)
+        await self._run_steps(context, endpoint.preflow.response)
+        if flow:
+            await self._run_steps(context, flow.response)
+        await self._run_steps(context, endpoint.postflow.response)
+
+    async def handle(self, request: Request) -> Response:
+        """Run one request through the bundle."""
+        self._stats['requests'] += 1
+        marks = {'start': time.perf_counter()}
+        endpoint = next(
+            (e for e in self.proxy_endpoints
+             if request.path == e.base_path or request.path.startswith(e.base_path + '/')),
+            None
+        )
+        if endpoint is None:
+            response = _fault_response(
+                404, f"Unable to identify proxy for host: default and url: {request.path}",
+                'messaging.adaptors.http.flow.ApplicationNotFound'
+            )
+            return self._finish(response, marks)
+
+        context = MessageContext(self, endpoint, request)
+        context.timestamp('client.received.start.timestamp')
+        context.timestamp('client.received.end.timestamp')
+        try:
+            await self._execute(context, endpoint, marks)
+            response = Response(context.response.status, context.response.headers, context.response.body, context.response.reason)
+        except PolicyFault as fault:
+            self._stats['faults'] += 1
+            response = fault.response
+        context.timestamp('client.sent.start.timestamp')
+
+        if endpoint.post_client_flow is not None:
+            context.phase = 'response'
+            try:
+                await self._run_steps(context, endpoint.post_client_flow.response)
+            except PolicyFault:
+                pass
+        return self._finish(response, marks)
+
+    def _finish(self, response: Response, marks: Dict[str, float]) -> Response:
+        status = str(response.status)
+        self._stats['statuses'][status] = self._stats['statuses'].get(status, 0) + 1
+        if self.settings.timing_headers:
+            end = time.perf_counter()
+            target_start = marks.get('target_start', end)
+            target_end = marks.get('target_end', end)
+            response.headers.set('X-Gateway-Request-Processing-Ms', f"{(target_start - marks['start']) * 1000:.3f}")
+            response.headers.set('X-Gateway-Target-Ms', f"{(target_end - target_start) * 1000:.3f}")
+            response.headers.set('X-Gateway-Response-Processing-Ms', f"{(end - target_end) * 1000:.3f}")
+        return response
+
+
+def load_kvm_store(path: Optional[str]) -> Dict[str, Mapping[str, str]]:
+    """
+    Load a local KVM store file ({"map-name": {"key": "value"}}), or a KVM
+    snapshot (.kvs) served under its map name without loading it into memory.
+    """
+    if not path:
+        return {}
+    if is_snapshot(path):
+        snapshot = KvmSnapshot.open(path)
+        return {snapshot.kvm_name: snapshot}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def merge_stats(raw_stats: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine raw counters from one or more gateways (e.g. worker processes)."""
+    merged = {
+        'workers': len(raw_stats),
+        'requests': 0,
+        'statuses': {},
+        'faults': 0,
+        'target_ms': 0.0,
+        'syslog_sent': 0,
+        'syslog_dropped': 0,
+        'policies': {},
+        'skipped_policies': {},
+    }
+    policies: Dict[str, Dict[str, float]] = {}
+    for raw in raw_stats:
+        merged['requests'] += raw['requests']
+        merged['faults'] += raw['faults']
+        merged['target_ms'] += raw['target_ms']
+        merged['syslog_sent'] += raw.get('syslog_sent', 0)
+        merged['syslog_dropped'] += raw.get('syslog_dropped', 0)
+        for key in ('statuses', 'skipped_policies'):
+            for name, count in raw[key].items():
+                merged[key][name] = merged[key].get(name, 0) + count
+        for name, timing in raw['policies'].items():
+            total = policies.setdefault(name, {'count': 0, 'total_ms': 0.0})
+            total['count'] += timing['count']
+            total['total_ms'] += timing['total_ms']
+    merged['target_ms'] = round(merged['target_ms'], 3)
+    merged['policies'] = {
+        name: {'count': p['count'], 'mean_us': round(p['total_ms'] * 1000 / p['count'], 2)}
+        for name, p in sorted(policies.items())
+    }
+    return merged
+
+
+# ============== Workers ==============
+
+def _free_port(host: str) -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+async def _serve_worker(bundle_path: str, settings: GatewaySettings, host: str, port: int,
+                        reuse_port: bool, ready, stop) -> Dict[str, Any]:
+    from .asynchttp import start_server
+
+    gateway = LocalGateway(ProxyBundle.load(bundle_path), settings)
+    server = await start_server(gateway.handle, host, port, reuse_port=reuse_port)
+    ready.put(('ready', server.sockets[0].getsockname()[1]))
+    try:
+        while not stop.is_set():
+            await asyncio.sleep(0.2)
+    finally:
+        server.close()
+        await server.wait_closed()
+        await gateway.close()
+    return gateway.raw_stats()
+
+
+def _run_worker(bundle_path, settings, host, port, reuse_port, ready, stop, results) -> None:
+    try:
+        results.put(asyncio.run(_serve_worker(bundle_path, settings, host, port, reuse_port, ready, stop)))
+    except Exception as e:
+        ready.put(('error', str(e)))
+
+
+def _worker_main(bundle_path, settings, host, port, reuse_port, ready, stop, results) -> None:
+    # The parent handles Ctrl+C and signals shutdown through `stop`
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    _run_worker(bundle_path, settings, host, port, reuse_port, ready, stop, results)
+
+
+class GatewayWorkers:
+    """
+    Run the gateway in N worker processes sharing one port (SO_REUSEPORT).
+
+    Each worker has its own event loop, bundle, cache and JS engine, so the
+    gateway scales with cores instead of being limited by one loop.
+
+    One worker is served on a thread of this process unless in_process is
+    False. Where processes cannot share a port (no SO_REUSEPORT, e.g.
+    Windows) only one worker runs. Child processes are forked on Linux and
+    spawned elsewhere (see asynchttp.server_process_context).
+    """
+
+    def __init__(self, bundle_path: str, settings: GatewaySettings = None,
+                 host: str = '127.0.0.1', port: int = 0, workers: int = None,
+                 in_process: bool = None):
+        self.bundle_path = str(bundle_path)
+        self.settings = settings or GatewaySettings()
+        self.host = host
+        self.port = port or _free_port(host)
+        self.workers = (workers or multiprocessing.cpu_count()) if REUSE_PORT else 1
+        if in_process is None:
+            in_process = self.workers == 1
+        self.in_process = in_process and self.workers == 1
+        self._running = []
+        if self.in_process:
+            self._stop, self._ready, self._results = threading.Event(), queue.Queue(), queue.Queue()
+        else:
+            context = server_process_context()
+            self._stop, self._ready, self._results = context.Event(), context.Queue(), context.Queue()
+            self._context = context
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> 'GatewayWorkers':
+        # Fail fast on bundle errors before starting workers
+        asyncio.run(LocalGateway(ProxyBundle.load(self.bundle_path), self.settings).close())
+        args = (self.bundle_path, self.settings, self.host, self.port, self.workers > 1,
+                self._ready, self._stop, self._results)
+        for _ in range(self.workers):
+            if self.in_process:
+                worker = threading.Thread(target=_run_worker, args=args, daemon=True)
+            else:
+                worker = self._context.Process(target=_worker_main, args=args, daemon=True)
+            worker.start()
+            self._running.append(worker)
+        for _ in range(self.workers):
+            state, detail = self._ready.get(timeout=30)
+            if state != 'ready':
+                self.stop()
+                raise RuntimeError(f"Gateway worker failed to start: {detail}")
+        return self
+
+    def stop(self) -> Dict[str, Any]:
+        """Stop all workers and return their merged stats."""
+        self._stop.set()
+        raw = []
+        for _ in self._running:
+            try:
+                raw.append(self._results.get(timeout=5))
+            except Exception:
+                break
+        for worker in self._running:
+            worker.join(timeout=5)
+            if worker.is_alive() and not self.in_process:
+                worker.terminate()
+        self._running = []
+        return merge_stats(raw)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
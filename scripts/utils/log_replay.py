@@ -0,0 +1,307 @@
+"""
+Log Replay
+
+Re-issues the request mix recorded by the FC-Syng-Logging MessageLogging
+policy against the proxy, the local gateway or the direct target, keeping
+the original inter-arrival timing (optionally compressed N×).
+
+Log files are streamed (plain or gzip) through the syslog sink parser, so
+replays of large captures run in constant memory. Arrival times come from
+the syslog header timestamp (RFC 5424, or any ISO 8601 timestamp before the
+platform message); lines without one are spaced at a fixed fallback rate.
+
+Scheduling is open-loop: a request is sent at its due time whether or not
+earlier ones have completed, up to max_in_flight. When that limit (or the
+client) cannot keep up, the delay is reported as schedule lag instead of
+silently stretching the workload.
+
+Logs carry no request bodies, so only GET and HEAD are replayed by default;
+POST, PUT, PATCH and DELETE are sent (with an empty body) only when listed
+in methods.
+"""
+
+import re
+import time
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Collection, Dict, Iterable, Iterator, Optional
+
+from .asynchttp import Headers, HTTPClient, HTTPError
+from .syslog_sink import LatencyHistogram, normalize_path, parse_line
+
+
+_TIMESTAMP_RE = re.compile(
+    r'(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?)'
+)
+
+REPLAY_MODES = ['proxy', 'gateway', 'target']
+
+# Replayed unless more methods are asked for: the rest change state on the target
+DEFAULT_METHODS = ('GET', 'HEAD')
+
+
+@dataclass
+class ReplayEvent:
+    """A request to re-issue, offset_s seconds after the first logged request."""
+    offset_s: float
+    method: str
+    path: str                       # request.uri as logged (base path and query included)
+    user: str = ''
+    status: Optional[int] = None    # status the proxy returned originally
+    latency_ms: Optional[float] = None
+
+
+def parse_timestamp(line: str) -> Optional[float]:
+    """Epoch seconds of the first ISO 8601 timestamp before the platform message."""
+    head = line.split('[CropwisePlatform]', 1)[0]
+    match = _TIMESTAMP_RE.search(head)
+    if not match:
+        return None
+    try:
+        value = datetime.fromisoformat(match.group(1).replace(' ', 'T'))
+    except ValueError:
+        return None
+    return value.timestamp()
+
+
+def iter_replay_events(
+    lines: Iterable[str],
+    fallback_rate: float = 10.0,
+    max_gap_s: float = None,
+    methods: Collection[str] = DEFAULT_METHODS
+) -> Iterator[ReplayEvent]:
+    """
+    Turn log lines into replay events with offsets relative to the first one.
+
+    Args:
+        lines: Log lines (syslog framed or bare platform messages)
+        fallback_rate: Requests per second assumed between lines without a timestamp
+        max_gap_s: Cap on the idle time between consecutive requests (e.g. overnight gaps)
+        methods: HTTP methods to replay; other requests are skipped (default: GET, HEAD)
+    """
+    methods = {method.upper() for method in methods}
+    previous = None
+    offset = None
+    for line in lines:
+        record = parse_line(line)
+        if record is None or not record.method or not record.path:
+            continue
+        if record.method.upper() not in methods:
+            continue
+        timestamp = parse_timestamp(line)
+        if offset is None:
+            gap = 0.0
+        elif timestamp is not None and previous is not None:
+            # Out-of-order lines (async logging) are sent immediately
+            gap = max(0.0, timestamp - previous)
+        else:
+            gap = 1.0 / fallback_rate if fallback_rate > 0 else 0.0
+        if max_gap_s is not None:
+            gap = min(gap, max_gap_s)
+        offset = (offset or 0.0) + gap
+        if timestamp is not None:
+            previous = timestamp if previous is None else max(previous, timestamp)
+        yield ReplayEvent(
+            offset_s=offset,
+            method=record.method.upper(),
+            path=record.path,
+            user=record.user,
+            status=record.status,
+            latency_ms=record.latency_ms
+        )
+
+
+def replay_path(uri: str, base_path: str = '', rewrites: Dict[str, str] = None) -> str:
+    """
+    Map a logged request.uri to the path to send.
+
+    The proxy base path is stripped (the replay base URL carries it for the
+    proxy and gateway). For the direct target, path_rewrites from
+    config/endpoints.json are applied to the suffix the way the proxy does.
+    """
+    path, sep, query = uri.partition('?')
+    if base_path and (path == base_path or path.startswith(base_path.rstrip('/') + '/')):
+        path = path[len(base_path.rstrip('/')):] or '/'
+    for source, target in sorted((rewrites or {}).items(), key=lambda item: -len(item[0])):
+        if path == source or path.startswith(source.rstrip('/') + '/'):
+            path = target + path[len(source):]
+            break
+    return path + sep + query
+
+
+@dataclass
+class _PathStats:
+    replayed: LatencyHistogram = field(default_factory=LatencyHistogram)
+    original: LatencyHistogram = field(default_factory=LatencyHistogram)
+    statuses: Dict[str, int] = field(default_factory=dict)
+    count: int = 0
+
+
+class ReplayStats:
+    """Replayed vs originally logged latency, status agreement and schedule lag."""
+
+    def __init__(self, base_path: str = ''):
+        self.base_path = base_path
+        self.paths: Dict[str, _PathStats] = {}
+        self.overall = LatencyHistogram()
+        self.lag = LatencyHistogram()
+        self.statuses: Dict[str, int] = {}
+        self.sent = 0
+        self.completed = 0
+        self.errors: Dict[str, int] = {}
+        self.status_mismatches = 0
+        self.max_in_flight = 0
+        self.logged_span_s = 0.0
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+
+    def record(self, event: ReplayEvent, status: Optional[int], latency_ms: float, lag_ms: float, error: str = None) -> None:
+        key = f"{event.method} {normalize_path(event.path, self.base_path)}"
+        stats = self.paths.get(key)
+        if stats is None:
+            stats = self.paths[key] = _PathStats()
+        stats.count += 1
+        self.lag.record(max(lag_ms, 0.0))
+        if event.latency_ms is not None:
+            stats.original.record(event.latency_ms)
+        if error is not None:
+            self.errors[error] = self.errors.get(error, 0) + 1
+            stats.statuses['error'] = stats.statuses.get('error', 0) + 1
+            return
+        self.completed += 1
+        stats.replayed.record(latency_ms)
+        self.overall.record(latency_ms)
+        status_key = str(status)
+        stats.statuses[status_key] = stats.statuses.get(status_key, 0) + 1
+        self.statuses[status_key] = self.statuses.get(status_key, 0) + 1
+        if event.status is not None and event.status != status:
+            self.status_mismatches += 1
+
+    def report(self, top: int = None) -> Dict[str, Any]:
+        elapsed = max((self.finished or time.monotonic()) - self.started, 1e-9)
+        paths = sorted(self.paths.items(), key=lambda item: -item[1].count)
+        if top:
+            paths = paths[:top]
+        return {
+            "sent": self.sent,
+            "completed": self.completed,
+            "errors": dict(sorted(self.errors.items())),
+            "status_mismatches": self.status_mismatches,
+            "elapsed_s": round(elapsed, 3),
+            "logged_span_s": round(self.logged_span_s, 3),
+            "achieved_rate_per_s": round(self.sent / elapsed, 1),
+            "max_in_flight": self.max_in_flight,
+            "statuses": dict(sorted(self.statuses.items())),
+            "latency": self.overall.summary(),
+            "schedule_lag": self.lag.summary(),
+            "paths": {
+                key: {
+                    "count": s.count,
+                    "statuses": dict(sorted(s.statuses.items())),
+                    "latency": s.replayed.summary(),
+                    "original_latency": s.original.summary(),
+                }
+                for key, s in paths
+            },
+        }
+
+
+class LogReplayer:
+    """Sends replay events against a base URL on the original schedule."""
+
+    def __init__(
+        self,
+        base_url: str,
+        speed: float = 1.0,
+        max_in_flight: int = 256,
+        timeout: float = 30.0,
+        base_path: str = '',
+        rewrites: Dict[str, str] = None,
+        token_for: Callable[[str], Optional[str]] = None,
+        headers: Dict[str, str] = None,
+        verify_tls: bool = True,
+        client: HTTPClient = None
+    ):
+        """
+        Args:
+            base_url: URL the mapped path is appended to (include the base path for the proxy/gateway)
+            speed: Time compression factor (2 = twice as fast); 0 sends as fast as max_in_flight allows
+            max_in_flight: Concurrent request limit
+            timeout: Per-request timeout in seconds
+            base_path: Proxy base path stripped from logged URIs
+            rewrites: Path rewrites applied after stripping (direct target mode)
+            token_for: Returns the bearer token for a logged user (None: no Authorization header)
+            headers: Extra headers sent with every request
+            verify_tls: Verify HTTPS certificates
+            client: Shared HTTP client (created when omitted)
+        """
+        self.base_url = base_url.rstrip('/')
+        self.speed = speed
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.base_path = base_path
+        self.rewrites = rewrites or {}
+        self.token_for = token_for
+        self.headers = headers or {}
+        self.client = client or HTTPClient(max_idle_per_host=max_in_flight, verify_tls=verify_tls)
+        self._owns_client = client is None
+        self.stats = ReplayStats(base_path)
+        self._in_flight = 0
+
+    def _request_headers(self, event: ReplayEvent) -> Headers:
+        headers = Headers([('User-Agent', 'CropwisePlatform-LogReplay/1.0'), ('Accept', 'application/json')])
+        for name, value in self.headers.items():
+            headers.set(name, value)
+        token = self.token_for(event.user) if self.token_for else None
+        if token:
+            headers.set('Authorization', f"Bearer {token}")
+        return headers
+
+    async def _send(self, event: ReplayEvent, lag_ms: float, slots: asyncio.Semaphore) -> None:
+        url = self.base_url + replay_path(event.path, self.base_path, self.rewrites)
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(
+                event.method, url, self._request_headers(event), timeout=self.timeout
+            )
+            self.stats.record(event, response.status, (time.perf_counter() - start) * 1000, lag_ms)
+        except asyncio.TimeoutError:
+            self.stats.record(event, None, 0.0, lag_ms, error='timeout')
+        except (OSError, HTTPError, asyncio.IncompleteReadError) as e:
+            self.stats.record(event, None, 0.0, lag_ms, error=type(e).__name__)
+        finally:
+            self._in_flight -= 1
+            slots.release()
+
+    async def run(self, events: Iterable[ReplayEvent], limit: int = None) -> ReplayStats:
+        """Replay events (consumed lazily) and wait for every response."""
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.max_in_flight)
+        pending = set()
+        self.stats.started = time.monotonic()
+        start = loop.time()
+        try:
+            for event in events:
+                if limit is not None and self.stats.sent >= limit:
+                    break
+                due = start + event.offset_s / self.speed if self.speed > 0 else loop.time()
+                delay = due - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await slots.acquire()
+                lag_ms = (loop.time() - due) * 1000
+                self._in_flight += 1
+                task = loop.create_task(self._send(event, lag_ms, slots))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+                self.stats.sent += 1
+                self.stats.logged_span_s = event.offset_s
+                self.stats.max_in_flight = max(self.stats.max_in_flight, self._in_flight)
+            if pending:
+                await asyncio.gather(*pending)
+        finally:
+            self.stats.finished = time.monotonic()
+            if self._owns_client:
+                await self.client.close()
+        return self.stats
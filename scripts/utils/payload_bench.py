@@ -0,0 +1,286 @@
+"""
+Payload Size Benchmark
+
+Measures request (upload) and response (download) bodies across a size
+sweep in two modes:
+
+    buffered   client holds the whole body (bytes upload, response.content),
+               against a route the proxy buffers (RF-PayloadTooLarge applies)
+    streaming  client sends a chunked generator and reads iter_content,
+               against a route with AM-Enable-Streaming
+
+Per transfer it records status, time to first byte (response headers),
+total time, throughput and the client's peak Python heap (tracemalloc), so
+the sizes where buffering starts to cost can be read off the sweep.
+
+payload_backend() is the stub target for local runs: GET returns ?size=
+bytes, any other method returns the number of bytes received. It runs in
+its own process (PayloadBackendProcess), like the gateway workers, so the
+client's tracemalloc peak does not include server buffers. The local
+gateway reads whole messages in both modes (asynchttp has no body
+streaming), so local runs show the buffered gateway path and the client
+side of streaming; server-side streaming gains need the deployed proxy.
+"""
+
+import re
+import json
+import time
+import signal
+import asyncio
+import socket
+import multiprocessing
+import statistics
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .asynchttp import Headers, Request, Response, server_process_context, start_server
+from .lazy_import import lazy_import
+
+requests = lazy_import('requests')
+
+
+MODES = ('buffered', 'streaming')
+DIRECTIONS = ('download', 'upload')
+DEFAULT_SIZES = ['1KB', '10KB', '100KB', '1MB', '5MB', '10MB', '30MB', '50MB']
+CHUNK_SIZE = 64 * 1024
+
+_UNITS = {'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+_CHUNK = b'x' * CHUNK_SIZE
+
+
+def parse_size(spec: str) -> int:
+    """'512', '10KB', '1.5MB' -> bytes (binary units)."""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMG]?)B?\s*', str(spec).upper())
+    if not match:
+        raise ValueError(f"Invalid size '{spec}', expected e.g. 512, 10KB, 5MB")
+    unit = match.group(2) + 'B' if match.group(2) else 'B'
+    return int(float(match.group(1)) * _UNITS[unit])
+
+
+def format_size(size: int) -> str:
+    for unit in ('GB', 'MB', 'KB'):
+        if size >= _UNITS[unit] and size % _UNITS[unit] == 0:
+            return f"{size // _UNITS[unit]}{unit}"
+    return f"{size}B"
+
+
+def _chunks(size: int) -> Iterator[bytes]:
+    sent = 0
+    while sent < size:
+        chunk = _CHUNK[:min(CHUNK_SIZE, size - sent)]
+        sent += len(chunk)
+        yield chunk
+
+
+# ============== Stub target ==============
+
+async def payload_backend(request: Request) -> Response:
+    """Target for local runs: GET ?size=N returns N bytes, uploads are counted."""
+    if request.method == 'GET':
+        query = dict(part.partition('=')[::2] for part in request.query.split('&') if part)
+        size = int(query.get('size', 0))
+        return Response(200, Headers([('Content-Type', 'application/octet-stream')]), b'x' * size)
+    body = json.dumps({"received": len(request.body)}).encode('utf-8')
+    return Response(200, Headers([('Content-Type', 'application/json')]), body)
+
+
+async def _serve_backend(host: str, port: int, ready, stop) -> None:
+    server = await start_server(payload_backend, host, port)
+    ready.put('ready')
+    loop = asyncio.get_running_loop()
+    while not await loop.run_in_executor(None, stop.wait, 0.2):
+        pass
+    server.close()
+    await server.wait_closed()
+
+
+def _backend_main(host, port, ready, stop) -> None:
+    # The parent handles Ctrl+C and signals shutdown through `stop`
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(_serve_backend(host, port, ready, stop))
+
+
+class PayloadBackendProcess:
+    """Serve payload_backend from a child process."""
+
+    def __init__(self, host: str = '127.0.0.1'):
+        self.host = host
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.bind((host, 0))
+            self.port = sock.getsockname()[1]
+        self._context = server_process_context()
+        self._ready = self._context.Queue()
+        self._stop = self._context.Event()
+        self._process = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> 'PayloadBackendProcess':
+        self._process = self._context.Process(
+            target=_backend_main, args=(self.host, self.port, self._ready, self._stop), daemon=True
+        )
+        self._process.start()
+        self._ready.get(timeout=30)
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._process is not None:
+            self._process.join(timeout=5)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# ============== Measurement ==============
+
+@dataclass
+class Transfer:
+    """One measured request."""
+    mode: str
+    direction: str
+    size: int
+    status: Optional[int] = None
+    ttfb_ms: float = 0.0
+    total_ms: float = 0.0
+    bytes: int = 0
+    peak_memory_bytes: int = 0
+    error: Optional[str] = None
+
+    @property
+    def throughput_mbps(self) -> float:
+        # Downloads count what actually arrived (an error body is not the payload)
+        moved = self.bytes if self.direction == 'download' else self.size
+        return (moved / 1024 ** 2) / (self.total_ms / 1000) if self.total_ms else 0.0
+
+
+class PayloadBench:
+    """Runs the size sweep against a base URL with a shared session."""
+
+    def __init__(
+        self,
+        base_url: str,
+        paths: Dict[str, str],
+        headers: Dict[str, str] = None,
+        timeout: float = 300.0,
+        verify_tls: bool = True,
+        track_memory: bool = True
+    ):
+        """
+        Args:
+            base_url: Proxy or gateway URL including the base path
+            paths: Request path per mode, e.g. {"buffered": "/v1/data", "streaming": "/remote-sensing/v1/imagery"}
+            headers: Extra headers (Authorization) sent with every request
+            timeout: Per-request timeout in seconds
+            verify_tls: Verify HTTPS certificates
+            track_memory: Record the client's peak heap per transfer (slows very large transfers slightly)
+        """
+        self.base_url = base_url.rstrip('/')
+        self.paths = paths
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.verify_tls = verify_tls
+        self.track_memory = track_memory
+        self.session = requests.Session()
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _send(self, transfer: Transfer) -> None:
+        url = self.base_url + self.paths[transfer.mode]
+        streaming = transfer.mode == 'streaming'
+        if transfer.direction == 'download':
+            method, params = 'GET', {'size': transfer.size}
+            data = None
+        else:
+            method, params = 'POST', None
+            data = _chunks(transfer.size) if streaming else b'x' * transfer.size
+
+        start = time.perf_counter()
+        response = self.session.request(
+            method, url, params=params, data=data, headers=self.headers,
+            stream=True, timeout=self.timeout, verify=self.verify_tls
+        )
+        transfer.ttfb_ms = (time.perf_counter() - start) * 1000
+        transfer.status = response.status_code
+        if streaming:
+            transfer.bytes = sum(len(chunk) for chunk in response.iter_content(CHUNK_SIZE))
+        else:
+            transfer.bytes = len(response.content)
+        transfer.total_ms = (time.perf_counter() - start) * 1000
+        response.close()
+
+    def measure(self, mode: str, direction: str, size: int) -> Transfer:
+        """Send one transfer and record its timings."""
+        transfer = Transfer(mode, direction, size)
+        if self.track_memory:
+            tracemalloc.start()
+        try:
+            self._send(transfer)
+        except requests.exceptions.RequestException as e:
+            transfer.error = type(e).__name__
+        finally:
+            if self.track_memory:
+                transfer.peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+        return transfer
+
+    def sweep(
+        self,
+        sizes: List[int],
+        modes: List[str] = MODES,
+        directions: List[str] = DIRECTIONS,
+        repeat: int = 3,
+        on_result: Callable[[Dict[str, Any]], None] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Median of repeat transfers for every size, mode and direction.
+
+        Returns:
+            One summary per (direction, size, mode), in sweep order
+        """
+        results = []
+        for direction in directions:
+            for size in sizes:
+                for mode in modes:
+                    transfers = [self.measure(mode, direction, size) for _ in range(max(1, repeat))]
+                    summary = summarize(transfers)
+                    results.append(summary)
+                    if on_result:
+                        on_result(summary)
+        return results
+
+
+def summarize(transfers: List[Transfer]) -> Dict[str, Any]:
+    """Medians over the successful transfers of one sweep point."""
+    first = transfers[0]
+    ok = [t for t in transfers if t.error is None]
+    statuses: Dict[str, int] = {}
+    for t in transfers:
+        key = str(t.status) if t.error is None else t.error
+        statuses[key] = statuses.get(key, 0) + 1
+    summary = {
+        "mode": first.mode,
+        "direction": first.direction,
+        "size": first.size,
+        "size_label": format_size(first.size),
+        "runs": len(transfers),
+        "statuses": statuses,
+    }
+    if ok:
+        summary.update(
+            ttfb_ms=round(statistics.median(t.ttfb_ms for t in ok), 2),
+            total_ms=round(statistics.median(t.total_ms for t in ok), 2),
+            throughput_mbps=round(statistics.median(t.throughput_mbps for t in ok), 2),
+            peak_memory_mb=round(max(t.peak_memory_bytes for t in ok) / 1024 ** 2, 2),
+        )
+    return summary
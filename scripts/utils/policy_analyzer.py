@@ -0,0 +1,495 @@
+"""
+Policy Cost Analyzer
+
+Statically walks the proxy and target endpoints of an apiproxy directory,
+classifies every step by the cost class of the policy it executes, flags
+redundant or mergeable steps and estimates a per-request cost budget for
+each route.
+
+The cost figures are rough relative estimates (milliseconds of gateway time
+per execution) intended for comparing flow layouts, not absolute latencies.
+"""
+
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .conditions import (
+    Compare, ConditionSyntaxError, Literal, Var,
+    conjuncts, disjuncts, parse_condition,
+)
+
+
+# Cost classes and their estimated cost per execution in milliseconds
+COST_CLASSES = {
+    'javascript': 2.0,
+    'kvm-io': 3.0,
+    'cache-io': 1.0,
+    'messagelogging-sync': 5.0,
+    'messagelogging-async': 0.5,
+    'quota': 1.0,
+    'flowcallout': 1.0,
+    'extractvariables': 0.3,
+    'assignmessage': 0.2,
+    'raisefault': 0.2,
+    'other': 0.5,
+}
+
+# Estimated cost of evaluating one step or flow condition
+CONDITION_COST_MS = 0.02
+
+POLICY_TYPE_CLASSES = {
+    'Javascript': 'javascript',
+    'JavaScript': 'javascript',
+    'KeyValueMapOperations': 'kvm-io',
+    'LookupCache': 'cache-io',
+    'PopulateCache': 'cache-io',
+    'InvalidateCache': 'cache-io',
+    'ResponseCache': 'cache-io',
+    'Quota': 'quota',
+    'SpikeArrest': 'quota',
+    'FlowCallout': 'flowcallout',
+    'ExtractVariables': 'extractvariables',
+    'AssignMessage': 'assignmessage',
+    'RaiseFault': 'raisefault',
+}
+
+# Conditions that only hold when performance debugging is requested
+DEBUG_HEADER = 'request.header.X-Debug-Performance'
+
+# Policy types that parse or rewrite the message body, which needs the
+# payload buffered (see docs/PAYLOAD-SIZE-LIMITS.md)
+BODY_POLICY_TYPES = {
+    'JSONThreatProtection', 'XMLThreatProtection', 'RegularExpressionProtection',
+    'JSONToXML', 'XMLToJSON', 'XSL', 'MessageValidation', 'SOAPMessageValidation',
+    'OASValidation', 'Python',
+}
+CONTENT_VARIABLES = ('request.content', 'response.content', 'message.content')
+STREAMING_VARIABLES = ('request.streaming.enabled', 'response.streaming.enabled')
+
+
+@dataclass
+class PolicyInfo:
+    """A policy definition loaded from the policies directory."""
+    name: str
+    policy_type: str
+    cost_class: str
+    enabled: bool = True
+    inspects_body: bool = False
+    enables_streaming: bool = False
+
+
+@dataclass
+class StepCost:
+    """A single <Step> reference located in an endpoint flow."""
+    endpoint: str
+    flow: str
+    phase: str
+    policy: str
+    condition: Optional[str]
+    cost_class: str
+    cost_ms: float
+    debug_only: bool = False
+
+
+@dataclass
+class Finding:
+    """A problem or optimization opportunity found during analysis."""
+    severity: str  # error, warning or info
+    message: str
+    steps: Tuple[str, ...] = ()
+
+
+@dataclass
+class RouteBudget:
+    """Estimated per-request cost for one conditional route."""
+    route: str
+    always_ms: float = 0.0
+    conditional_ms: float = 0.0
+    debug_only_ms: float = 0.0
+    deferred_ms: float = 0.0
+    conditions: int = 0
+
+    @property
+    def critical_path_ms(self) -> float:
+        return self.always_ms + self.conditional_ms + self.conditions * CONDITION_COST_MS
+
+
+@dataclass
+class AnalysisReport:
+    """Result of a policy cost analysis."""
+    steps: List[StepCost] = field(default_factory=list)
+    findings: List[Finding] = field(default_factory=list)
+    budgets: List[RouteBudget] = field(default_factory=list)
+
+    @property
+    def errors(self) -> List[Finding]:
+        return [f for f in self.findings if f.severity == 'error']
+
+    def cost_by_class(self) -> Dict[str, Tuple[int, float]]:
+        """Return {cost_class: (step_count, estimated_ms)} for all steps."""
+        totals: Dict[str, Tuple[int, float]] = {}
+        for step in self.steps:
+            count, cost = totals.get(step.cost_class, (0, 0.0))
+            totals[step.cost_class] = (count + 1, cost + step.cost_ms)
+        return totals
+
+
+class PolicyCostAnalyzer:
+    """Analyzes the policy execution cost of an apiproxy directory."""
+
+    def __init__(self, apiproxy_dir: str, cost_classes: Dict[str, float] = None):
+        self.apiproxy_dir = Path(apiproxy_dir)
+        self.cost_classes = dict(COST_CLASSES)
+        if cost_classes:
+            self.cost_classes.update(cost_classes)
+        self.policies: Dict[str, PolicyInfo] = {}
+
+    # ============== Loading ==============
+
+    def _classify(self, root: ET.Element) -> str:
+        if root.tag == 'MessageLogging':
+            return 'messagelogging-async' if root.get('async') == 'true' else 'messagelogging-sync'
+        return POLICY_TYPE_CLASSES.get(root.tag, 'other')
+
+    def _inspects_body(self, root: ET.Element) -> bool:
+        """Whether a policy reads or rewrites the payload."""
+        if root.tag in BODY_POLICY_TYPES:
+            return True
+        if root.tag == 'RaiseFault':
+            # Fault responses replace the message instead of reading it
+            return False
+        if root.tag == 'ExtractVariables' and any(
+            root.find(tag) is not None for tag in ('JSONPayload', 'XMLPayload', 'FormParam')
+        ):
+            return True
+        if root.tag == 'AssignMessage' and any(
+            (element.tag == 'Payload' and element.text and element.text.strip() != 'false')
+            or element.tag == 'FormParams'
+            for operation in ('Set', 'Add', 'Copy')
+            for child in root.findall(operation)
+            for element in child
+        ):
+            return True
+        text = ET.tostring(root, encoding='unicode')
+        resource = root.findtext('ResourceURL') or ''
+        if resource.startswith('jsc://'):
+            script = self.apiproxy_dir / 'resources' / 'jsc' / resource[len('jsc://'):]
+            if script.exists():
+                text += script.read_text(encoding='utf-8', errors='replace')
+        return any(variable in text for variable in CONTENT_VARIABLES)
+
+    @staticmethod
+    def _enables_streaming(root: ET.Element) -> bool:
+        return any(
+            (variable.findtext('Name') or '').strip() in STREAMING_VARIABLES
+            and (variable.findtext('Value') or '').strip() == 'true'
+            for variable in root.findall('AssignVariable')
+        )
+
+    def _load_policies(self) -> None:
+        self.policies = {}
+        for policy_file in sorted((self.apiproxy_dir / "policies").glob("*.xml")):
+            root = ET.parse(policy_file).getroot()
+            name = root.get('name', policy_file.stem)
+            self.policies[name] = PolicyInfo(
+                name=name,
+                policy_type=root.tag,
+                cost_class=self._classify(root),
+                enabled=root.get('enabled', 'true') != 'false',
+                inspects_body=self._inspects_body(root),
+                enables_streaming=self._enables_streaming(root),
+            )
+
+    def _iter_flows(self, root: ET.Element):
+        """Yield (flow_name, flow_condition, flow_element) for an endpoint."""
+        for tag in ('PreFlow', 'PostFlow', 'PostClientFlow'):
+            flow = root.find(tag)
+            if flow is not None:
+                yield tag, None, flow
+        for flow in root.findall('./Flows/Flow'):
+            condition = flow.findtext('Condition')
+            yield flow.get('name', 'unnamed'), condition.strip() if condition else None, flow
+
+    def _load_steps(self, endpoint_file: Path, kind: str) -> List[Tuple[str, Optional[str], List[StepCost]]]:
+        root = ET.parse(endpoint_file).getroot()
+        endpoint = f"{kind}/{root.get('name', endpoint_file.stem)}"
+        flows = []
+        for flow_name, flow_condition, flow in self._iter_flows(root):
+            steps = []
+            for phase in ('Request', 'Response'):
+                for step in flow.findall(f'./{phase}/Step'):
+                    policy_name = (step.findtext('Name') or '').strip()
+                    condition = step.findtext('Condition')
+                    condition = condition.strip() if condition else None
+                    info = self.policies.get(policy_name)
+                    cost_class = info.cost_class if info else 'other'
+                    steps.append(StepCost(
+                        endpoint=endpoint,
+                        flow=flow_name,
+                        phase=phase,
+                        policy=policy_name,
+                        condition=condition,
+                        cost_class=cost_class,
+                        cost_ms=self.cost_classes.get(cost_class, self.cost_classes['other']),
+                        debug_only=bool(condition) and DEBUG_HEADER in condition,
+                    ))
+            flows.append((flow_name, flow_condition, steps))
+        return flows
+
+    # ============== Findings ==============
+
+    def _check_references(self, report: AnalysisReport) -> None:
+        referenced = set()
+        for step in report.steps:
+            referenced.add(step.policy)
+            info = self.policies.get(step.policy)
+            if info is None:
+                report.findings.append(Finding(
+                    'error',
+                    f"{step.endpoint} {step.flow}: step references undefined policy '{step.policy}'",
+                    (step.policy,),
+                ))
+            elif not info.enabled:
+                report.findings.append(Finding(
+                    'warning',
+                    f"{step.endpoint} {step.flow}: '{step.policy}' is disabled but still in the flow "
+                    f"(its condition is evaluated on every request)",
+                    (step.policy,),
+                ))
+
+        unused = sorted(set(self.policies) - referenced)
+        if unused:
+            report.findings.append(Finding(
+                'info',
+                f"{len(unused)} policies are never referenced from a flow: {', '.join(unused)}",
+                tuple(unused),
+            ))
+
+    def _check_duplicates(self, flow_name: str, steps: List[StepCost], report: AnalysisReport) -> None:
+        seen: Dict[Tuple[str, str], StepCost] = {}
+        for step in steps:
+            key = (step.phase, step.policy)
+            if key in seen and seen[key].condition == step.condition:
+                report.findings.append(Finding(
+                    'warning',
+                    f"{step.endpoint} {flow_name}: '{step.policy}' runs twice in {step.phase} "
+                    f"with the same condition",
+                    (step.policy,),
+                ))
+            seen[key] = step
+
+    @staticmethod
+    def _equality_split(condition: Optional[str]) -> Optional[Tuple[frozenset, str, frozenset]]:
+        """Split 'shared and (v = "a" or v = "b")' into (shared terms, v, {a, b})."""
+        if not condition:
+            return None
+        try:
+            node = parse_condition(condition)
+        except ConditionSyntaxError:
+            return None
+
+        shared, selector = [], None
+        for term in conjuncts(node):
+            options = disjuncts(term)
+            compares = [
+                o for o in options
+                if isinstance(o, Compare) and o.op == 'eq'
+                and isinstance(o.left, Var) and isinstance(o.right, Literal)
+                and isinstance(o.right.value, str)
+            ]
+            if len(compares) == len(options) and len({c.left.name for c in compares}) == 1:
+                if selector is not None:
+                    shared.append(term)
+                    continue
+                selector = (compares[0].left.name, frozenset(c.right.value for c in compares))
+            else:
+                shared.append(term)
+
+        if selector is None:
+            return None
+        return frozenset(shared), selector[0], selector[1]
+
+    def _check_mutually_exclusive(self, flow_name: str, steps: List[StepCost], report: AnalysisReport) -> None:
+        """Flag runs of same-type steps selected by disjoint values of one variable."""
+        group: List[Tuple[StepCost, Tuple[frozenset, str, frozenset]]] = []
+
+        def flush():
+            if len(group) > 1:
+                variable = group[0][1][1]
+                names = tuple(s.policy for s, _ in group)
+                report.findings.append(Finding(
+                    'warning',
+                    f"{group[0][0].endpoint} {flow_name}: {len(names)} mutually exclusive "
+                    f"{self.policies[names[0]].policy_type} steps select on '{variable}' "
+                    f"({', '.join(names)}); merge them into one step driven by the variable "
+                    f"to save {len(names) - 1} condition evaluations per request",
+                    names,
+                ))
+            group.clear()
+
+        for step in steps:
+            split = self._equality_split(step.condition)
+            info = self.policies.get(step.policy)
+            if split is None or info is None:
+                flush()
+                continue
+            if group:
+                first_step, (shared, variable, _) = group[0]
+                seen_values = frozenset().union(*(g[1][2] for g in group))
+                same_kind = (
+                    self.policies[first_step.policy].policy_type == info.policy_type
+                    and first_step.phase == step.phase
+                )
+                if not (same_kind and split[0] == shared and split[1] == variable
+                        and not (split[2] & seen_values)):
+                    flush()
+            group.append((step, split))
+        flush()
+
+    def _check_redundant_null_checks(self, report: AnalysisReport) -> None:
+        seen = set()
+        for step in report.steps:
+            if not step.condition or step.condition in seen:
+                continue
+            seen.add(step.condition)
+            try:
+                terms = conjuncts(parse_condition(step.condition))
+            except ConditionSyntaxError:
+                continue
+            not_null = {
+                t.left.name for t in terms
+                if isinstance(t, Compare) and t.op == 'ne'
+                and isinstance(t.left, Var) and isinstance(t.right, Literal) and t.right.value is None
+            }
+            compared = {
+                t.left.name for t in terms
+                if isinstance(t, Compare) and t.op == 'eq'
+                and isinstance(t.left, Var) and isinstance(t.right, Literal) and t.right.value is not None
+            }
+            for name in sorted(not_null & compared):
+                report.findings.append(Finding(
+                    'info',
+                    f"{step.endpoint} {step.flow}: '{step.policy}' checks '{name} != null' "
+                    f"redundantly before comparing it to a literal",
+                    (step.policy,),
+                ))
+
+    def _check_debug_steps(self, report: AnalysisReport) -> None:
+        debug_steps = [s for s in report.steps if s.debug_only]
+        if len(debug_steps) > 1:
+            report.findings.append(Finding(
+                'warning',
+                f"{len(debug_steps)} debug-only steps evaluate '{DEBUG_HEADER}' on every request "
+                f"even when the header is absent; gate them behind a single conditional flow "
+                f"or drop them from production bundles",
+                tuple(s.policy for s in debug_steps),
+            ))
+
+    def _check_streaming_routes(self, proxy_flows, target_flows, report: AnalysisReport) -> None:
+        """Flag body-inspecting policies on routes that enable streaming."""
+        shared = [s for n, _, s in proxy_flows + target_flows if n in ('PreFlow', 'PostFlow', 'PostClientFlow')]
+        target_conditional = [s for n, _, s in target_flows if n not in ('PreFlow', 'PostFlow', 'PostClientFlow')]
+        for flow_name, _, flow_steps in proxy_flows:
+            if flow_name in ('PreFlow', 'PostFlow', 'PostClientFlow'):
+                continue
+            streaming = [s for s in flow_steps if s.policy in self.policies and self.policies[s.policy].enables_streaming]
+            if not streaming:
+                continue
+            for steps in shared + [flow_steps] + target_conditional:
+                for step in steps:
+                    info = self.policies.get(step.policy)
+                    if info is not None and info.enabled and info.inspects_body:
+                        report.findings.append(Finding(
+                            'error',
+                            f"{step.endpoint} {step.flow}: '{step.policy}' ({info.policy_type}) inspects the "
+                            f"payload on streaming route '{flow_name}'; streamed bodies are not buffered for it",
+                            (step.policy,),
+                        ))
+
+    # ============== Budget ==============
+
+    def _add_to_budget(self, budget: RouteBudget, steps: List[StepCost]) -> None:
+        for step in steps:
+            if step.policy not in self.policies:
+                continue
+            if step.condition:
+                budget.conditions += 1
+            if step.cost_class == 'messagelogging-async':
+                budget.deferred_ms += step.cost_ms
+            elif step.debug_only:
+                budget.debug_only_ms += step.cost_ms
+            elif step.condition:
+                budget.conditional_ms += step.cost_ms
+            else:
+                budget.always_ms += step.cost_ms
+
+    def _build_budgets(self, proxy_flows, target_flows) -> List[RouteBudget]:
+        shared = [(n, s) for n, c, s in proxy_flows + target_flows if n in ('PreFlow', 'PostFlow', 'PostClientFlow')]
+        conditional = [(n, c, s) for n, c, s in proxy_flows if n not in ('PreFlow', 'PostFlow', 'PostClientFlow')]
+        target_conditional = [(n, c, s) for n, c, s in target_flows if n not in ('PreFlow', 'PostFlow', 'PostClientFlow')]
+
+        budgets = []
+        for index, (flow_name, _, flow_steps) in enumerate(conditional):
+            budget = RouteBudget(route=flow_name)
+            for _, steps in shared:
+                self._add_to_budget(budget, steps)
+            self._add_to_budget(budget, flow_steps)
+            for _, _, steps in target_conditional:
+                self._add_to_budget(budget, steps)
+            # Every flow condition up to and including this one is evaluated
+            budget.conditions += index + 1 + len(target_conditional)
+            budgets.append(budget)
+        return budgets
+
+    # ============== Entry points ==============
+
+    def analyze(self) -> AnalysisReport:
+        """Run the analysis and return a report."""
+        self._load_policies()
+        report = AnalysisReport()
+
+        proxy_flows, target_flows = [], []
+        for endpoint_file in sorted((self.apiproxy_dir / "proxies").glob("*.xml")):
+            proxy_flows.extend(self._load_steps(endpoint_file, 'proxy'))
+        for endpoint_file in sorted((self.apiproxy_dir / "targets").glob("*.xml")):
+            target_flows.extend(self._load_steps(endpoint_file, 'target'))
+
+        for flow_name, _, steps in proxy_flows + target_flows:
+            report.steps.extend(steps)
+            self._check_duplicates(flow_name, steps, report)
+            for phase in ('Request', 'Response'):
+                self._check_mutually_exclusive(
+                    flow_name, [s for s in steps if s.phase == phase], report
+                )
+
+        self._check_references(report)
+        self._check_redundant_null_checks(report)
+        self._check_debug_steps(report)
+        self._check_streaming_routes(proxy_flows, target_flows, report)
+        report.budgets = self._build_budgets(proxy_flows, target_flows)
+        return report
+
+    def print_report(self, report: AnalysisReport) -> None:
+        """Print a human readable cost report."""
+        print("\nPolicy Cost Analysis:")
+        print(f"  {'Cost class':<22} {'Steps':>5} {'Est. ms':>8}")
+        for cost_class, (count, cost) in sorted(
+            report.cost_by_class().items(), key=lambda item: -item[1][1]
+        ):
+            print(f"  {cost_class:<22} {count:>5} {cost:>8.2f}")
+
+        print(f"\n  {'Route':<20} {'Always':>7} {'Cond.':>7} {'Debug':>7} {'Async':>7} {'Conds':>6} {'Budget':>8}")
+        for budget in report.budgets:
+            print(
+                f"  {budget.route:<20} {budget.always_ms:>7.2f} {budget.conditional_ms:>7.2f} "
+                f"{budget.debug_only_ms:>7.2f} {budget.deferred_ms:>7.2f} {budget.conditions:>6} "
+                f"{budget.critical_path_ms:>7.2f}ms"
+            )
+
+        icons = {'error': '❌', 'warning': '⚠️ ', 'info': 'ℹ️ '}
+        if report.findings:
+            print("\n  Findings:")
+            for finding in report.findings:
+                print(f"  {icons.get(finding.severity, '-')} {finding.message}")
@@ -0,0 +1,236 @@
+"""
+Policy Templates
+
+Builders for policies the bundle generator emits on demand (cache lookups,
+variable extraction) and helpers to wire their steps into endpoint flows and
+register them in the proxy descriptor.
+"""
+
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Iterable, Optional, Sequence, Tuple
+
+
+# (policy name, condition) pairs describing steps to insert
+StepSpec = Tuple[str, Optional[str]]
+
+
+def _policy_root(tag: str, name: str, continue_on_error: bool = False) -> ET.Element:
+    root = ET.Element(tag, {
+        'async': 'false',
+        'continueOnError': 'true' if continue_on_error else 'false',
+        'enabled': 'true',
+        'name': name,
+    })
+    ET.SubElement(root, 'DisplayName').text = name
+    return root
+
+
+def _cache_key(parent: ET.Element, key_ref: str, prefix: Optional[str]) -> None:
+    cache_key = ET.SubElement(parent, 'CacheKey')
+    if prefix:
+        ET.SubElement(cache_key, 'Prefix').text = prefix
+    ET.SubElement(cache_key, 'KeyFragment', {'ref': key_ref})
+
+
+def extract_variables_policy(name: str, source_variable: str, pattern: str, prefix: str) -> ET.Element:
+    """ExtractVariables policy matching a pattern against a flow variable."""
+    root = _policy_root('ExtractVariables', name)
+    variable = ET.SubElement(root, 'Variable', {'name': source_variable})
+    ET.SubElement(variable, 'Pattern').text = pattern
+    ET.SubElement(root, 'VariablePrefix').text = prefix
+    ET.SubElement(root, 'IgnoreUnresolvedVariables').text = 'true'
+    return root
+
+
+def lookup_cache_policy(
+    name: str,
+    key_ref: str,
+    assign_to: str,
+    prefix: str = None,
+    cache_resource: str = None
+) -> ET.Element:
+    """LookupCache policy reading an entry into a flow variable."""
+    root = _policy_root('LookupCache', name, continue_on_error=True)
+    _cache_key(root, key_ref, prefix)
+    if cache_resource:
+        ET.SubElement(root, 'CacheResource').text = cache_resource
+    ET.SubElement(root, 'Scope').text = 'Exclusive'
+    ET.SubElement(root, 'AssignTo').text = assign_to
+    return root
+
+
+def populate_cache_policy(
+    name: str,
+    key_ref: str,
+    source: str,
+    ttl_seconds: int,
+    prefix: str = None,
+    cache_resource: str = None
+) -> ET.Element:
+    """PopulateCache policy storing a flow variable for ttl_seconds."""
+    root = _policy_root('PopulateCache', name, continue_on_error=True)
+    _cache_key(root, key_ref, prefix)
+    if cache_resource:
+        ET.SubElement(root, 'CacheResource').text = cache_resource
+    ET.SubElement(root, 'Scope').text = 'Exclusive'
+    expiry = ET.SubElement(root, 'ExpirySettings')
+    ET.SubElement(expiry, 'TimeoutInSec').text = str(int(ttl_seconds))
+    ET.SubElement(root, 'Source').text = source
+    return root
+
+
+def rewrite_path_policy(name: str, path_template: str) -> ET.Element:
+    """AssignMessage setting the target request path (proxy.pathsuffix is not appended)."""
+    root = _policy_root('AssignMessage', name)
+    variable = ET.SubElement(root, 'AssignVariable')
+    ET.SubElement(variable, 'Name').text = 'target.copy.pathsuffix'
+    ET.SubElement(variable, 'Value').text = 'false'
+    ET.SubElement(ET.SubElement(root, 'Set'), 'Path').text = path_template
+    ET.SubElement(root, 'AssignTo', {'createNew': 'false', 'transport': 'http', 'type': 'request'})
+    return root
+
+
+def write_policy(policy: ET.Element, policies_dir: Path) -> Path:
+    """Write a policy element to <policies_dir>/<name>.xml."""
+    path = Path(policies_dir) / f"{policy.get('name')}.xml"
+    tree = ET.ElementTree(policy)
+    ET.indent(tree, space='    ')
+    tree.write(path, encoding='UTF-8', xml_declaration=True)
+    return path
+
+
+def make_step(name: str, condition: str = None) -> ET.Element:
+    """Build a <Step> element."""
+    step = ET.Element('Step')
+    ET.SubElement(step, 'Name').text = name
+    if condition:
+        ET.SubElement(step, 'Condition').text = condition
+    return step
+
+
+def make_flow(
+    name: str,
+    condition: str,
+    request: Sequence[ET.Element] = (),
+    response: Sequence[ET.Element] = (),
+    description: str = None
+) -> ET.Element:
+    """Build a conditional <Flow> from request and response <Step> elements."""
+    flow = ET.Element('Flow', {'name': name})
+    if description:
+        ET.SubElement(flow, 'Description').text = description
+    for phase, steps in (('Request', request), ('Response', response)):
+        ET.SubElement(flow, phase).extend(steps)
+    ET.SubElement(flow, 'Condition').text = condition
+    return flow
+
+
+def make_route_rule(name: str, target: str, condition: str = None) -> ET.Element:
+    """Build a <RouteRule> to a target endpoint, conditional when condition is given."""
+    rule = ET.Element('RouteRule', {'name': name})
+    if condition:
+        ET.SubElement(rule, 'Condition').text = condition
+    ET.SubElement(rule, 'TargetEndpoint').text = target
+    return rule
+
+
+def make_load_balancer(
+    servers: Sequence[Tuple[str, int]],
+    algorithm: str = 'RoundRobin',
+    max_failures: int = 5
+) -> ET.Element:
+    """Build a <LoadBalancer> over (TargetServer name, weight) pairs."""
+    balancer = ET.Element('LoadBalancer')
+    ET.SubElement(balancer, 'Algorithm').text = algorithm
+    for name, weight in servers:
+        server = ET.SubElement(balancer, 'Server', {'name': name})
+        if algorithm == 'Weighted':
+            ET.SubElement(server, 'Weight').text = str(weight)
+    ET.SubElement(balancer, 'MaxFailures').text = str(max_failures)
+    return balancer
+
+
+def make_health_monitor(
+    path: str,
+    port: int,
+    interval_seconds: int = 10,
+    timeout_seconds: int = 5,
+    success_codes: Sequence[int] = (200,)
+) -> ET.Element:
+    """Build an HTTP <HealthMonitor> that GETs path on every load-balanced server."""
+    monitor = ET.Element('HealthMonitor')
+    ET.SubElement(monitor, 'IsEnabled').text = 'true'
+    ET.SubElement(monitor, 'IntervalInSec').text = str(interval_seconds)
+    http = ET.SubElement(monitor, 'HTTPMonitor')
+    request = ET.SubElement(http, 'Request')
+    ET.SubElement(request, 'ConnectTimeoutInSec').text = str(timeout_seconds)
+    ET.SubElement(request, 'SocketReadTimeoutInSec').text = str(timeout_seconds)
+    ET.SubElement(request, 'Port').text = str(port)
+    ET.SubElement(request, 'Verb').text = 'GET'
+    ET.SubElement(request, 'Path').text = path
+    success = ET.SubElement(http, 'SuccessResponse')
+    for code in success_codes:
+        ET.SubElement(success, 'ResponseCode').text = str(code)
+    return monitor
+
+
+def find_step(parent: ET.Element, policy_name: str) -> Optional[ET.Element]:
+    """Find the step executing policy_name directly under parent."""
+    for step in parent.findall('Step'):
+        if (step.findtext('Name') or '').strip() == policy_name:
+            return step
+    return None
+
+
+def and_condition(step: ET.Element, clause: str) -> None:
+    """AND an extra clause onto a step's condition (or set it if absent)."""
+    condition = step.find('Condition')
+    if condition is None or not (condition.text or '').strip():
+        if condition is None:
+            condition = ET.SubElement(step, 'Condition')
+        condition.text = clause
+    else:
+        condition.text = f"{condition.text.strip()} and {clause}"
+
+
+def insert_steps(
+    parent: ET.Element,
+    anchor: str,
+    before: Sequence[StepSpec] = (),
+    after: Sequence[StepSpec] = ()
+) -> bool:
+    """
+    Insert steps around the step executing `anchor`.
+
+    Args:
+        parent: Flow phase element (<Request> or <Response>) holding the steps
+        anchor: Policy name of the existing step
+        before: Steps to insert immediately before the anchor
+        after: Steps to insert immediately after the anchor
+
+    Returns:
+        False if the anchor step was not found
+    """
+    anchor_step = find_step(parent, anchor)
+    if anchor_step is None:
+        return False
+    index = list(parent).index(anchor_step)
+    for offset, (name, condition) in enumerate(before):
+        parent.insert(index + offset, make_step(name, condition))
+    index = list(parent).index(anchor_step)
+    for offset, (name, condition) in enumerate(after, start=1):
+        parent.insert(index + offset, make_step(name, condition))
+    return True
+
+
+def register_policies(descriptor: ET.Element, names: Iterable[str]) -> None:
+    """Add policy names to the <Policies> list of a proxy descriptor."""
+    policies = descriptor.find('Policies')
+    if policies is None:
+        policies = ET.SubElement(descriptor, 'Policies')
+    existing = {p.text for p in policies.findall('Policy')}
+    for name in names:
+        if name not in existing:
+            ET.SubElement(policies, 'Policy').text = name
+            existing.add(name)
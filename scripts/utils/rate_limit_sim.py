@@ -0,0 +1,280 @@
+"""
+Rate Limit Simulator
+
+Models what the user-rate-limits KVM tiers (low-rate, medium-rate,
+high-rate and their readonly-* variants) mean for throughput. Given a
+user-to-tier mapping and a request trace, each user gets their own quota
+for their tier and every request is admitted, delayed (queued) or
+throttled.
+
+Algorithms:
+    token-bucket      rate_per_second refill, up to burst tokens (GCRA)
+    sliding-window    at most rate_per_second * window_seconds requests in
+                      any window_seconds interval (sliding log)
+
+With max_queue_s > 0 a request that is over the limit waits for capacity
+(FIFO per user) when the wait is short enough, which yields the queueing
+delay a SpikeArrest-style smoother would add; otherwise it is throttled.
+
+Tier resolution follows the proxy: a KVM value picks the tier, users
+without an entry get the default tier (AM-Set-Default-Rate-Limit) and
+requests without a user (no valid JWT) are not rate limited. Unrecognized
+KVM values keep the default tier, as no AM-Set-*-Rate-Header step matches.
+"""
+
+import json
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, Optional
+
+from .kvm_snapshot import KvmSnapshot, is_snapshot
+from .syslog_sink import LatencyHistogram
+
+
+ALGORITHMS = ['token-bucket', 'sliding-window']
+DEFAULT_TIER = 'medium-rate'
+UNLIMITED = 'unauthenticated'
+
+
+@dataclass
+class TierLimit:
+    """Per-user limit for one tier."""
+    rate_per_second: float
+    burst: int = 1
+    window_seconds: float = 60.0
+
+    @property
+    def window_limit(self) -> int:
+        return max(1, int(self.rate_per_second * self.window_seconds))
+
+    def describe(self) -> str:
+        return f"{self.rate_per_second:g}/s burst {self.burst} ({self.window_limit}/{self.window_seconds:g}s)"
+
+
+def parse_tier_limit(spec: str) -> TierLimit:
+    """Parse "RATE[:BURST[:WINDOW]]", e.g. "10:50" or "10:50:60"."""
+    parts = spec.split(':')
+    try:
+        rate = float(parts[0])
+        burst = int(parts[1]) if len(parts) > 1 and parts[1] else max(1, math.ceil(rate))
+        window = float(parts[2]) if len(parts) > 2 and parts[2] else 60.0
+    except ValueError:
+        raise ValueError(f"Invalid tier limit '{spec}', expected RATE[:BURST[:WINDOW]]")
+    if rate <= 0 or burst < 1 or window <= 0:
+        raise ValueError(f"Invalid tier limit '{spec}': rate, burst and window must be positive")
+    return TierLimit(rate, burst, window)
+
+
+def tier_limits_from_policies(policies: Dict[str, Any]) -> Dict[str, TierLimit]:
+    """Tier limits from the KVM-Get-User-Rate-Limit entry of policies.json."""
+    tiers = policies.get('KVM-Get-User-Rate-Limit', {}).get('tiers', {})
+    return {
+        name: TierLimit(float(value['rate_per_second']), int(value.get('burst', 1)), float(value.get('window_seconds', 60)))
+        for name, value in tiers.items()
+        if isinstance(value, dict)
+    }
+
+
+def load_tier_map(path: str, map_name: str = 'user-rate-limits') -> Dict[str, str]:
+    """
+    Load a user-to-tier mapping from a KVM export.
+
+    Accepts a local KVM store ({"user-rate-limits": {user: tier}}), a plain
+    {user: tier} object, or Apigee entries ({"keyValueEntries": [{"name", "value"}]}
+    or a list of {"name", "value"}), or a KVM snapshot (.kvs).
+    """
+    if is_snapshot(path):
+        return KvmSnapshot.open(path).to_dict()
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict) and 'keyValueEntries' in data:
+        data = data['keyValueEntries']
+    if isinstance(data, list):
+        return {entry['name']: str(entry['value']) for entry in data}
+    if isinstance(data.get(map_name), dict):
+        return {user: str(tier) for user, tier in data[map_name].items()}
+    return {user: tier for user, tier in data.items() if isinstance(tier, str)}
+
+
+class _TokenBucket:
+    """GCRA: tat is the theoretical arrival time of the next conforming request."""
+
+    __slots__ = ('interval', 'tolerance', 'tat')
+
+    def __init__(self, limit: TierLimit):
+        self.interval = 1.0 / limit.rate_per_second
+        self.tolerance = (limit.burst - 1) * self.interval
+        self.tat = -math.inf
+
+    def admit(self, now: float, max_queue_s: float) -> Optional[float]:
+        """Delay before the request is admitted, or None if throttled."""
+        earliest = self.tat - self.tolerance
+        delay = max(0.0, earliest - now)
+        if delay > max_queue_s:
+            return None
+        self.tat = max(self.tat, now + delay) + self.interval
+        return delay
+
+
+class _SlidingWindow:
+    """Sliding log of the last window_limit admission times."""
+
+    __slots__ = ('limit', 'window', 'admitted')
+
+    def __init__(self, limit: TierLimit):
+        self.limit = limit.window_limit
+        self.window = limit.window_seconds
+        self.admitted: Deque[float] = deque(maxlen=self.limit)
+
+    def admit(self, now: float, max_queue_s: float) -> Optional[float]:
+        at = now
+        if self.admitted:
+            # FIFO: never admit before the previously queued request
+            at = max(at, self.admitted[-1])
+        if len(self.admitted) == self.limit:
+            at = max(at, self.admitted[0] + self.window)
+        delay = at - now
+        if delay > max_queue_s:
+            return None
+        self.admitted.append(at)
+        return delay
+
+
+_LIMITERS = {'token-bucket': _TokenBucket, 'sliding-window': _SlidingWindow}
+
+
+@dataclass
+class _TierStats:
+    users: set = field(default_factory=set)
+    requests: int = 0
+    admitted: int = 0
+    queued: int = 0
+    throttled: int = 0
+    queue_delay: LatencyHistogram = field(default_factory=LatencyHistogram)
+    throttled_users: Dict[str, int] = field(default_factory=dict)
+    per_second: Dict[int, int] = field(default_factory=dict)
+
+
+class RateLimitSimulator:
+    """Applies per-user tier limits to a request trace."""
+
+    def __init__(
+        self,
+        limits: Dict[str, TierLimit],
+        tier_map: Dict[str, str] = None,
+        algorithm: str = 'token-bucket',
+        max_queue_s: float = 0.0,
+        default_tier: str = DEFAULT_TIER
+    ):
+        """
+        Args:
+            limits: Limit per tier name; readonly-<tier> falls back to <tier>
+            tier_map: KVM mapping of user to tier
+            algorithm: token-bucket or sliding-window
+            max_queue_s: Longest a request may wait for capacity before it is throttled
+            default_tier: Tier for users without a KVM entry
+        """
+        if algorithm not in _LIMITERS:
+            raise ValueError(f"Unknown algorithm '{algorithm}', expected one of {ALGORITHMS}")
+        self.limits = limits
+        self.tier_map = tier_map or {}
+        self.algorithm = algorithm
+        self.max_queue_s = max_queue_s
+        self.default_tier = default_tier
+        self._limiters: Dict[str, Any] = {}
+        self.tiers: Dict[str, _TierStats] = {}
+        self.first: Optional[float] = None
+        self.last: Optional[float] = None
+
+    def tier_for(self, user: str) -> str:
+        if not user:
+            return UNLIMITED
+        return self.tier_map.get(user, self.default_tier)
+
+    def limit_for(self, tier: str) -> Optional[TierLimit]:
+        if tier == UNLIMITED:
+            return None
+        if tier in self.limits:
+            return self.limits[tier]
+        if tier.startswith('readonly-') and tier[len('readonly-'):] in self.limits:
+            return self.limits[tier[len('readonly-'):]]
+        # Unrecognized KVM values keep the default tier's header
+        return self.limits.get(self.default_tier)
+
+    def offer(self, user: str, at: float) -> Optional[float]:
+        """
+        Offer one request at time `at` (seconds, non-decreasing per user).
+
+        Returns the queueing delay in seconds, or None if the request is throttled.
+        """
+        tier = self.tier_for(user)
+        stats = self.tiers.get(tier)
+        if stats is None:
+            stats = self.tiers[tier] = _TierStats()
+        stats.users.add(user)
+        stats.requests += 1
+        self.first = at if self.first is None else min(self.first, at)
+        self.last = at if self.last is None else max(self.last, at)
+
+        limit = self.limit_for(tier)
+        if limit is None:
+            delay = 0.0
+        else:
+            limiter = self._limiters.get(user)
+            if limiter is None:
+                limiter = self._limiters[user] = _LIMITERS[self.algorithm](limit)
+            delay = limiter.admit(at, self.max_queue_s)
+
+        if delay is None:
+            stats.throttled += 1
+            stats.throttled_users[user] = stats.throttled_users.get(user, 0) + 1
+            return None
+        stats.admitted += 1
+        if delay > 0:
+            stats.queued += 1
+            stats.queue_delay.record(delay * 1000)
+        second = int(at + delay)
+        stats.per_second[second] = stats.per_second.get(second, 0) + 1
+        return delay
+
+    def run(self, events: Iterable[Any]) -> 'RateLimitSimulator':
+        """Offer every event (anything with .user and .offset_s, e.g. log replay events)."""
+        for event in events:
+            self.offer(event.user, event.offset_s)
+        return self
+
+    def report(self, top_users: int = 5) -> Dict[str, Any]:
+        span = max((self.last or 0.0) - (self.first or 0.0), 1.0)
+        tiers = {}
+        totals = {'requests': 0, 'admitted': 0, 'throttled': 0, 'queued': 0}
+        for name, stats in sorted(self.tiers.items()):
+            limit = self.limit_for(name)
+            for key in totals:
+                totals[key] += getattr(stats, key)
+            top = sorted(stats.throttled_users.items(), key=lambda item: -item[1])[:top_users]
+            tiers[name] = {
+                "limit": limit.describe() if limit else "unlimited",
+                "users": len(stats.users),
+                "requests": stats.requests,
+                "admitted": stats.admitted,
+                "queued": stats.queued,
+                "throttled": stats.throttled,
+                "throttled_fraction": round(stats.throttled / stats.requests, 4) if stats.requests else 0.0,
+                "offered_rate_per_s": round(stats.requests / span, 2),
+                "throughput_per_s": round(stats.admitted / span, 2),
+                "peak_throughput_per_s": max(stats.per_second.values(), default=0),
+                "queue_delay": stats.queue_delay.summary(),
+                "top_throttled_users": dict(top),
+            }
+        return {
+            "algorithm": self.algorithm,
+            "max_queue_s": self.max_queue_s,
+            "trace_span_s": round(span, 3),
+            "requests": totals['requests'],
+            "admitted": totals['admitted'],
+            "queued": totals['queued'],
+            "throttled": totals['throttled'],
+            "throttled_fraction": round(totals['throttled'] / totals['requests'], 4) if totals['requests'] else 0.0,
+            "tiers": tiers,
+        }
@@ -0,0 +1,470 @@
+"""
+Route Compiler
+
+Compiles the route table in config/endpoints.json (path_mappings plus the
+path_rewrites prefixes) into the conditional <Flow> elements of the proxy
+endpoint, so the bundle routes exactly what the config lists.
+
+Only the first matching flow runs and conditions are evaluated in order,
+so the compiler:
+
+    - checks the route's methods next to its path, so unlisted methods fall
+      through to later flows (and the not-found catch-all) as before
+    - orders flows by request count (when traffic is known), then by
+      specificity, always keeping a route ahead of any route containing it
+    - merges a route into its parent prefix when both run the same steps,
+      and sibling routes with the same steps into one flow guarded by a
+      StartsWith on their shared prefix
+    - generates an ExtractVariables/AssignMessage pair per path_rewrites
+      entry that replaces the prefix and keeps the rest of the path
+
+read_only_condition() compiles read_only_routes into the condition of a
+RouteRule to the read-replica target: a verb check, then MatchesPath and
+JavaRegex clauses, all evaluated natively without a JavaScript step.
+
+Hand-written flows in proxies/default.xml keep working: the steps of the
+flow that matched a route's path are carried into its compiled flow
+(hand-written rewrites give way to the generated ones) and a route whose
+flow matched only the exact path stays exact, flows whose paths are all
+compiled are dropped, and the rest follow the compiled flows in
+their original order with the catch-all last.
+"""
+
+import json
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import Any, Callable, Collection, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .conditions import And, Compare, Literal, Not, Or, Var, compile_condition, parse_condition
+from .config_model import ReadOnlyRoutes
+from .policy_templates import StepSpec, extract_variables_policy, make_flow, make_step, rewrite_path_policy
+from .syslog_sink import iter_log_lines, normalize_path, parse_line
+
+
+STREAMING_POLICY = 'AM-Enable-Streaming'
+PATH_VARIABLE = 'proxy.pathsuffix'
+SUFFIX_PREFIX = 'route'                 # ExtractVariables prefix: the rest of the path lands in route.suffix
+
+
+def _covers(prefix: str, path: str) -> bool:
+    """Whether `path` lies under the route prefix (MatchesPath "<prefix>/**")."""
+    return prefix == '/' or path == prefix or path.startswith(prefix + '/')
+
+
+def _depth(path: str) -> int:
+    return len([segment for segment in path.split('/') if segment])
+
+
+def _slug(path: str) -> str:
+    return path.strip('/').replace('/', '-') or 'root'
+
+
+def _policy_slug(path: str) -> str:
+    return '-'.join(part.capitalize() for part in _slug(path).split('-'))
+
+
+def _path_patterns(node: Any) -> List[str]:
+    """MatchesPath / equality patterns tested against proxy.pathsuffix in a condition."""
+    if isinstance(node, (And, Or)):
+        return [pattern for item in node.items for pattern in _path_patterns(item)]
+    if isinstance(node, Not):
+        return _path_patterns(node.item)
+    if (isinstance(node, Compare) and node.op in ('path', 'eq') and isinstance(node.left, Var)
+            and node.left.name == PATH_VARIABLE and isinstance(node.right, Literal)):
+        return [str(node.right.value)]
+    return []
+
+
+def _verb_clause(methods: Sequence[str]) -> Optional[str]:
+    clauses = [f'(request.verb = "{method}")' for method in methods]
+    if len(clauses) > 1:
+        return f"({' or '.join(clauses)})"
+    return clauses[0] if clauses else None
+
+
+def _flow_steps(flow: ET.Element, phase: str) -> List[StepSpec]:
+    steps = []
+    for step in flow.findall(f'./{phase}/Step'):
+        condition = (step.findtext('Condition') or '').strip()
+        steps.append(((step.findtext('Name') or '').strip(), condition or None))
+    return steps
+
+
+def read_only_condition(routes: ReadOnlyRoutes) -> str:
+    """
+    RouteRule condition for read_only_routes.
+
+    The verb check comes first so writes skip the path clauses, and the
+    MatchesPath clauses come before the JavaRegex ones.
+    """
+    verbs = ' or '.join(f'(request.verb = "{method}")' for method in routes.methods)
+    clauses = [f'({PATH_VARIABLE} MatchesPath "{pattern}")' for pattern in routes.paths]
+    clauses += [f'({PATH_VARIABLE} JavaRegex "{pattern}")' for pattern in routes.regex]
+    if len(routes.methods) > 1:
+        verbs = f"({verbs})"
+    return f"{verbs} and ({' or '.join(clauses)})"
+
+
+def load_traffic(path: str, base_path: str = '') -> Dict[str, int]:
+    """
+    Request counts per path for ordering flows.
+
+    Accepts a JSON object ({"/v1/users": 1200, ...}), a syslog_sink report
+    ({"paths": {"GET /v1/users": {"count": 1200}}}) or FC-Syng-Logging log
+    lines (plain or gzip).
+    """
+    if str(path).endswith('.json'):
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if isinstance(data.get('paths'), dict):
+            counts: Dict[str, int] = {}
+            for key, stats in data['paths'].items():
+                route = normalize_path(key.split(' ', 1)[-1], base_path)
+                counts[route] = counts.get(route, 0) + int(stats.get('count', 0))
+            return counts
+        return {normalize_path(key, base_path): int(value) for key, value in data.items()}
+    counts = {}
+    for line in iter_log_lines(path):
+        record = parse_line(line)
+        if record is not None and record.path:
+            route = normalize_path(record.path, base_path)
+            counts[route] = counts.get(route, 0) + 1
+    return counts
+
+
+@dataclass
+class Route:
+    """One route prefix from endpoints.json and the steps its flow runs."""
+    path: str
+    methods: Tuple[str, ...] = ()
+    rewrite: Optional[Tuple[str, str]] = None       # (source prefix, target prefix)
+    streaming: bool = False
+    max_payload_bytes: Optional[int] = None
+    exact: bool = False                             # Matches the path only, not the paths below it
+    inherited: Optional[str] = None                 # Hand-written flow whose steps were carried over
+    request: List[StepSpec] = field(default_factory=list)
+    response: List[StepSpec] = field(default_factory=list)
+    traffic: int = 0
+
+    @property
+    def signature(self) -> Tuple:
+        return tuple(self.request), tuple(self.response)
+
+    @property
+    def clause(self) -> str:
+        """Path check, and the verb check when methods are listed."""
+        pattern = self.path if self.exact else f'{self.path.rstrip("/")}/**'
+        verbs = _verb_clause(self.methods)
+        path = f'({PATH_VARIABLE} MatchesPath "{pattern}")'
+        return f"{path} and {verbs}" if verbs else path
+
+    def admits(self, other: 'Route') -> bool:
+        """Whether this route's flow can serve `other`: it covers the path and every method."""
+        if self.exact or not _covers(self.path, other.path):
+            return False
+        return not self.methods or (bool(other.methods) and set(other.methods) <= set(self.methods))
+
+
+@dataclass
+class CompiledFlow:
+    """A generated flow: one or more routes sharing the same steps."""
+    name: str
+    roots: List[Route]                              # Routes tested by the condition
+    merged: List[Route] = field(default_factory=list)  # Routes folded into a parent prefix
+
+    @property
+    def routes(self) -> List[Route]:
+        return self.roots + self.merged
+
+    @property
+    def traffic(self) -> int:
+        return sum(route.traffic for route in self.routes)
+
+    @property
+    def condition(self) -> str:
+        clauses = [route.clause for route in self.roots]
+        if len(clauses) == 1:
+            return clauses[0]
+        clauses = [f"({clause})" if route.methods else clause for route, clause in zip(self.roots, clauses)]
+        shared = self.roots[0].path.rsplit('/', 1)[0]
+        return f'({PATH_VARIABLE} StartsWith "{shared}/") and ({" or ".join(clauses)})'
+
+    def describe(self) -> str:
+        route = self.roots[0]
+        labels = []
+        if route.streaming:
+            labels.append('streaming')
+        if route.max_payload_bytes:
+            labels.append(f"max {route.max_payload_bytes} bytes")
+        if route.rewrite:
+            labels.append(f"rewrite {route.rewrite[0]} -> {route.rewrite[1]}")
+        if route.inherited:
+            labels.append(f"steps of '{route.inherited}'")
+        paths = ', '.join(r.path for r in self.routes)
+        return f"Generated from endpoints.json: {paths}" + (f" ({'; '.join(labels)})" if labels else '')
+
+    def element(self) -> ET.Element:
+        route = self.roots[0]
+        return make_flow(
+            self.name,
+            self.condition,
+            [make_step(name, condition) for name, condition in route.request],
+            [make_step(name, condition) for name, condition in route.response],
+            self.describe()
+        )
+
+
+@dataclass
+class RouteTable:
+    """Compiled flows in evaluation order, plus the flows kept or dropped from the source."""
+    compiled: List[CompiledFlow] = field(default_factory=list)
+    flows: List[ET.Element] = field(default_factory=list)   # Final <Flows> content
+    policies: List[ET.Element] = field(default_factory=list)  # Generated rewrite policies
+    kept: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+
+    @property
+    def step_policies(self) -> List[str]:
+        """Policies referenced by the compiled flows."""
+        names = []
+        for flow in self.compiled:
+            for name, _ in flow.roots[0].request + flow.roots[0].response:
+                if name not in names:
+                    names.append(name)
+        return names
+
+    @property
+    def expected_conditions(self) -> Optional[float]:
+        """Flow conditions evaluated per request, weighted by traffic (None without traffic)."""
+        total = sum(flow.traffic for flow in self.compiled)
+        if not total:
+            return None
+        return sum(position * flow.traffic for position, flow in enumerate(self.compiled, start=1)) / total
+
+    def to_dict(self) -> Dict[str, Any]:
+        total = sum(flow.traffic for flow in self.compiled)
+        return {
+            "flows": [
+                {
+                    "position": position,
+                    "name": flow.name,
+                    "condition": flow.condition,
+                    "routes": {route.path: list(route.methods) for route in flow.routes},
+                    "request_steps": [name for name, _ in flow.roots[0].request],
+                    "response_steps": [name for name, _ in flow.roots[0].response],
+                    "rewrite": list(flow.roots[0].rewrite) if flow.roots[0].rewrite else None,
+                    "traffic": flow.traffic,
+                    "traffic_share": round(flow.traffic / total, 4) if total else None,
+                }
+                for position, flow in enumerate(self.compiled, start=1)
+            ],
+            "kept_flows": self.kept,
+            "dropped_flows": self.dropped,
+            "expected_conditions_per_request": (
+                round(self.expected_conditions, 3) if self.expected_conditions is not None else None
+            ),
+        }
+
+
+class RouteCompiler:
+    """Compiles endpoints.json routes and the hand-written flows into a route table."""
+
+    def __init__(
+        self,
+        path_mappings: Mapping[str, Any],
+        path_rewrites: Mapping[str, str],
+        flows: Sequence[ET.Element] = (),
+        rewrite_policies: Collection[str] = (),
+        traffic: Mapping[str, int] = None,
+        limit_policy: Callable[[int], str] = None
+    ):
+        """
+        Args:
+            path_mappings: PathMapping objects by path (config_model)
+            path_rewrites: Source prefix -> target prefix
+            flows: Hand-written <Flow> elements of the proxy endpoint
+            rewrite_policies: Policies that set the target path; not carried into rewritten routes
+            traffic: Request counts per path used to order flows
+            limit_policy: Name of the RF policy for a payload limit (default RF-PayloadTooLarge)
+        """
+        self.path_mappings = path_mappings
+        self.path_rewrites = {source.rstrip('/') or '/': target.rstrip('/') for source, target in path_rewrites.items()}
+        self.flows = list(flows)
+        self.rewrite_policies = set(rewrite_policies)
+        self.traffic = dict(traffic or {})
+        self.limit_policy = limit_policy or (lambda limit: 'RF-PayloadTooLarge')
+
+    # ============== Routes ==============
+
+    @staticmethod
+    def _is_fallback(flow: ET.Element) -> bool:
+        return (flow.findtext('Condition') or '').strip().lower() in ('', 'true')
+
+    def _rewrite_for(self, path: str) -> Optional[Tuple[str, str]]:
+        sources = [source for source in self.path_rewrites if _covers(source, path)]
+        if not sources:
+            return None
+        source = max(sources, key=len)
+        return source, self.path_rewrites[source]
+
+    def _rewrite_policies(self, source: str, target: str) -> Tuple[ET.Element, ET.Element]:
+        slug = _policy_slug(source)
+        extract = extract_variables_policy(
+            f"EV-Rewrite-{slug}-Suffix", PATH_VARIABLE, f"{source.rstrip('/')}{{suffix}}", SUFFIX_PREFIX
+        )
+        assign = rewrite_path_policy(f"AM-Rewrite-{slug}-URI", f"{target}{{{SUFFIX_PREFIX}.suffix}}")
+        return extract, assign
+
+    def _routes(self) -> Dict[str, Route]:
+        routes: Dict[str, Route] = {}
+        for path, mapping in self.path_mappings.items():
+            key = path.rstrip('/') or '/'
+            routes[key] = Route(
+                path=key,
+                methods=tuple(mapping.methods),
+                streaming=mapping.streaming,
+                max_payload_bytes=mapping.max_payload_bytes,
+            )
+        for source in self.path_rewrites:
+            routes.setdefault(source, Route(path=source))
+
+        handwritten = [flow for flow in self.flows if not self._is_fallback(flow)]
+        for route in routes.values():
+            route.rewrite = self._rewrite_for(route.path)
+            variables = {PATH_VARIABLE: route.path, 'request.verb': route.methods[0] if route.methods else 'GET'}
+            inherited = next(
+                (flow for flow in handwritten if compile_condition(flow.findtext('Condition'))(variables)),
+                None
+            )
+            if route.max_payload_bytes:
+                route.request.append((
+                    self.limit_policy(route.max_payload_bytes),
+                    f"(request.header.Content-Length > {route.max_payload_bytes})"
+                ))
+            if route.streaming:
+                route.request.append((STREAMING_POLICY, None))
+            if route.rewrite:
+                extract, assign = self._rewrite_policies(*route.rewrite)
+                route.request += [(extract.get('name'), None), (assign.get('name'), None)]
+            if inherited is not None:
+                below = dict(variables, **{PATH_VARIABLE: route.path.rstrip('/') + '/-'})
+                route.exact = not compile_condition(inherited.findtext('Condition'))(below)
+                carried = [
+                    step for step in _flow_steps(inherited, 'Request')
+                    if not (route.rewrite and step[0] in self.rewrite_policies)
+                ]
+                response = _flow_steps(inherited, 'Response')
+                if carried or response:
+                    route.inherited = inherited.get('name')
+                    route.request += carried
+                    route.response += response
+
+        for path, count in self.traffic.items():
+            covering = [route for route in routes.values() if _covers(route.path, path)]
+            if covering:
+                max(covering, key=lambda r: len(r.path)).traffic += count
+        return routes
+
+    # ============== Flows ==============
+
+    def _merge(self, routes: Dict[str, Route]) -> List[CompiledFlow]:
+        """Fold routes into parents with the same steps, then group same-step siblings."""
+        def parent(route: Route, candidates) -> Optional[Route]:
+            ancestors = [r for r in candidates if r is not route and not r.exact and _covers(r.path, route.path)]
+            return max(ancestors, key=lambda r: len(r.path)) if ancestors else None
+
+        flows: Dict[str, CompiledFlow] = {}
+        owner: Dict[str, str] = {}
+        for route in sorted(routes.values(), key=lambda r: len(r.path)):
+            ancestor = parent(route, routes.values())
+            if ancestor is not None and ancestor.signature == route.signature and ancestor.admits(route):
+                flow = flows[owner[ancestor.path]]
+                flow.merged.append(route)
+                owner[route.path] = flow.name
+                continue
+            flow = CompiledFlow(name=_slug(route.path), roots=[route])
+            flows[flow.name] = flow
+            owner[route.path] = flow.name
+
+        groups: Dict[Tuple, List[CompiledFlow]] = {}
+        for flow in flows.values():
+            root = flow.roots[0]
+            shared = root.path.rsplit('/', 1)[0]
+            enclosing = parent(root, [r for f in flows.values() for r in f.routes])
+            if shared and enclosing is None:
+                groups.setdefault((shared, root.signature), []).append(flow)
+        for (shared, _), siblings in groups.items():
+            if len(siblings) < 2:
+                continue
+            first = siblings[0]
+            for sibling in siblings[1:]:
+                first.roots += sibling.roots
+                first.merged += sibling.merged
+                del flows[sibling.name]
+            del flows[first.name]
+            first.name = _slug(shared)
+            flows[first.name] = first
+        return list(flows.values())
+
+    @staticmethod
+    def _order(flows: List[CompiledFlow]) -> List[CompiledFlow]:
+        """Busiest first, then most specific, never placing a flow after one that contains it."""
+        def inside(inner: CompiledFlow, outer: CompiledFlow) -> bool:
+            return any(
+                _covers(o.path, i.path) and o.path != i.path
+                for i in inner.routes for o in outer.roots
+            )
+
+        remaining = list(flows)
+        ordered = []
+        while remaining:
+            ready = [f for f in remaining if not any(inside(other, f) for other in remaining if other is not f)]
+            best = min(ready, key=lambda f: (-f.traffic, -max(_depth(r.path) for r in f.roots), f.name))
+            ordered.append(best)
+            remaining.remove(best)
+        return ordered
+
+    def compile(self) -> RouteTable:
+        """Compile the route table."""
+        routes = self._routes()
+        table = RouteTable(compiled=self._order(self._merge(routes)))
+
+        seen = set()
+        for route in routes.values():
+            if route.rewrite and route.rewrite[0] not in seen:
+                seen.add(route.rewrite[0])
+                table.policies.extend(self._rewrite_policies(*route.rewrite))
+
+        table.flows = [flow.element() for flow in table.compiled]
+        prefixes = [route.path for route in routes.values()]
+        fallbacks = []
+        for flow in self.flows:
+            if self._is_fallback(flow):
+                fallbacks.append(flow)
+                continue
+            patterns = [p[:-3] if p.endswith('/**') else p for p in _path_patterns(parse_condition(flow.findtext('Condition') or ''))]
+            if patterns and all(any(_covers(prefix, p or '/') for prefix in prefixes) for p in patterns):
+                table.dropped.append(flow.get('name'))
+            else:
+                table.flows.append(flow)
+                table.kept.append(flow.get('name'))
+        for flow in fallbacks:
+            table.flows.append(flow)
+            table.kept.append(flow.get('name'))
+        return table
+
+    def print_report(self, table: RouteTable) -> None:
+        """Print the route table in evaluation order."""
+        total = sum(flow.traffic for flow in table.compiled)
+        print("\nRoute Table:")
+        print(f"  {'#':>2} {'Flow':<28} {'Traffic':>8} {'Routes':<40} Steps")
+        for position, flow in enumerate(table.compiled, start=1):
+            share = f"{flow.traffic / total * 100:.1f}%" if total else '-'
+            steps = ', '.join(name for name, _ in flow.roots[0].request) or '-'
+            print(f"  {position:>2} {flow.name:<28} {share:>8} {', '.join(r.path for r in flow.routes):<40} {steps}")
+        if table.kept:
+            print(f"  Hand-written flows kept: {', '.join(table.kept)}")
+        if table.dropped:
+            print(f"  Hand-written flows replaced: {', '.join(table.dropped)}")
+        if table.expected_conditions is not None:
+            print(f"  Flow conditions evaluated per routed request: {table.expected_conditions:.2f}")
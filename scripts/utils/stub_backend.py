@@ -0,0 +1,284 @@
+"""
+Stub Backend
+
+A local stand-in for the Cropwise backends used when benchmarking the proxy.
+Serves the paths from config/endpoints.json (path_mappings and the
+path_rewrites targets) with configurable response sizes, status codes and
+latency distributions, so proxy overhead can be measured without backend
+variance.
+
+Latency specs:
+    fixed:50                               always 50 ms
+    lognormal:median=120,sigma=0.5         lognormal around a median (ms)
+    replay:tests/latency-test/latency-results-20260202-183128.json
+                                           sample recorded target latencies
+    replay:<file>#proxy                    ... or the recorded proxy latencies
+
+Replay files may be latency-results JSON, a JSON list of numbers or a text
+file with one latency (ms) per line.
+
+Every response carries X-Stub-Latency-Ms with the injected delay, so a
+client can subtract it to isolate proxy overhead.
+"""
+
+import json
+import math
+import random
+import asyncio
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .asynchttp import Headers, Request, Response
+
+
+METHODS = ['GET', 'POST', 'PUT', 'PATCH', 'DELETE']
+
+
+# ============== Latency models ==============
+
+class LatencyModel:
+    """Draws a backend latency (ms) per request."""
+
+    spec = ''
+
+    def sample(self, rng: random.Random) -> float:
+        raise NotImplementedError
+
+
+class FixedLatency(LatencyModel):
+
+    def __init__(self, ms: float):
+        self.ms = float(ms)
+        self.spec = f"fixed:{self.ms:g}"
+
+    def sample(self, rng: random.Random) -> float:
+        return self.ms
+
+
+class LognormalLatency(LatencyModel):
+    """Lognormal latency; median_ms = exp(mu), sigma is the log-space spread."""
+
+    def __init__(self, median_ms: float, sigma: float = 0.5):
+        if median_ms <= 0:
+            raise ValueError("lognormal median must be positive")
+        self.mu = math.log(median_ms)
+        self.sigma = float(sigma)
+        self.spec = f"lognormal:median={median_ms:g},sigma={self.sigma:g}"
+
+    def sample(self, rng: random.Random) -> float:
+        return rng.lognormvariate(self.mu, self.sigma)
+
+
+class ReplayLatency(LatencyModel):
+    """Samples uniformly from recorded latencies."""
+
+    def __init__(self, samples: List[float], spec: str = 'replay'):
+        if not samples:
+            raise ValueError("replay latency needs at least one sample")
+        self.samples = [float(s) for s in samples]
+        self.spec = spec
+
+    def sample(self, rng: random.Random) -> float:
+        return rng.choice(self.samples)
+
+
+def load_latency_samples(path: str, section: str = 'target') -> List[float]:
+    """
+    Load recorded latencies from a latency-results JSON file (the given
+    section's successful results), a JSON list, or one number per line.
+    """
+    text = Path(path).read_text(encoding='utf-8')
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return [float(line) for line in text.split() if line.strip()]
+
+    if isinstance(data, list):
+        return [float(v) for v in data]
+    if section not in data:
+        raise ValueError(f"{path} has no '{section}' section")
+    return [
+        r['latency_ms'] for r in data[section].get('results', [])
+        if r.get('success') and r.get('latency_ms') is not None
+    ]
+
+
+def parse_latency(spec: Optional[str]) -> LatencyModel:
+    """Parse a latency spec (see module docstring)."""
+    if not spec:
+        return FixedLatency(0)
+    kind, _, args = spec.partition(':')
+    kind = kind.strip().lower()
+    if kind == 'fixed':
+        return FixedLatency(float(args or 0))
+    if kind == 'lognormal':
+        params = dict(p.split('=', 1) for p in args.split(',') if p)
+        try:
+            return LognormalLatency(float(params['median']), float(params.get('sigma', 0.5)))
+        except KeyError:
+            raise ValueError("lognormal latency needs median=<ms>")
+    if kind == 'replay':
+        path, _, section = args.partition('#')
+        samples = load_latency_samples(path, section or 'target')
+        return ReplayLatency(samples, f"replay:{Path(path).name} ({len(samples)} samples)")
+    raise ValueError(f"Unknown latency spec: {spec}")
+
+
+# ============== Routes ==============
+
+@dataclass
+class StubRoute:
+    """A path prefix served by the stub."""
+    prefix: str
+    methods: List[str] = field(default_factory=lambda: list(METHODS))
+    latency: LatencyModel = field(default_factory=lambda: FixedLatency(0))
+    size: int = 256
+    status: int = 200
+    content_type: str = 'application/json'
+
+    def matches(self, path: str) -> bool:
+        return path == self.prefix or path.startswith(self.prefix.rstrip('/') + '/')
+
+
+def routes_from_endpoints(endpoints: Dict[str, Any]) -> List[StubRoute]:
+    """
+    Build stub routes from config/endpoints.json.
+
+    Each path_mappings entry is served at its own path and, when a
+    path_rewrites prefix applies, at the rewritten backend path. The
+    rewrite targets themselves are also served (e.g. /remote-sensing/api).
+    """
+    mappings = endpoints.get('path_mappings', {})
+    rewrites: Dict[str, str] = {}
+    for endpoint in endpoints.get('endpoints', {}).values():
+        rewrites.update(endpoint.get('path_rewrites', {}))
+
+    routes: Dict[str, List[str]] = {}
+
+    def add(prefix: str, methods: List[str]) -> None:
+        existing = routes.setdefault(prefix, [])
+        existing.extend(m for m in methods if m not in existing)
+
+    for path, mapping in mappings.items():
+        methods = [m.upper() for m in mapping.get('method', METHODS)]
+        add(path, methods)
+        for source, target in rewrites.items():
+            if path == source or path.startswith(source.rstrip('/') + '/'):
+                add(target + path[len(source):], methods)
+    for source, target in rewrites.items():
+        add(source, METHODS)
+        add(target, METHODS)
+
+    return [StubRoute(prefix, methods) for prefix, methods in routes.items()]
+
+
+def _json_body(route: StubRoute, request: Request, size: int) -> bytes:
+    """A JSON document padded to exactly `size` bytes where possible."""
+    document = {"stub": True, "route": route.prefix, "method": request.method, "path": request.path, "padding": ""}
+    base = len(json.dumps(document, separators=(',', ':')))
+    document["padding"] = 'x' * max(0, size - base)
+    return json.dumps(document, separators=(',', ':')).encode('utf-8')
+
+
+# ============== Server ==============
+
+class StubBackend:
+    """Async request handler for the stub routes."""
+
+    def __init__(
+        self,
+        routes: List[StubRoute],
+        seed: int = None,
+        error_rate: float = 0.0,
+        error_status: int = 503
+    ):
+        # Longest prefix first
+        self.routes = sorted(routes, key=lambda r: -len(r.prefix))
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._rng = random.Random(seed)
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def route_for(self, path: str) -> Optional[StubRoute]:
+        return next((r for r in self.routes if r.matches(path)), None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Requests and mean injected latency per route."""
+        return {
+            prefix: {
+                'count': int(s['count']),
+                'errors': int(s['errors']),
+                'mean_latency_ms': round(s['latency_ms'] / s['count'], 3) if s['count'] else 0.0
+            }
+            for prefix, s in sorted(self._stats.items())
+        }
+
+    async def handle(self, request: Request) -> Response:
+        route = self.route_for(request.path)
+        if route is None:
+            body = json.dumps({"error": "not_found", "path": request.path}).encode('utf-8')
+            return Response(404, Headers([('Content-Type', 'application/json')]), body)
+        if request.method not in route.methods and request.method != 'HEAD':
+            body = json.dumps({"error": "method_not_allowed", "allowed": route.methods}).encode('utf-8')
+            return Response(405, Headers([('Content-Type', 'application/json'), ('Allow', ', '.join(route.methods))]), body)
+
+        stats = self._stats.setdefault(route.prefix, {'count': 0, 'errors': 0, 'latency_ms': 0.0})
+        latency = max(0.0, route.latency.sample(self._rng))
+        failed = self.error_rate > 0 and self._rng.random() < self.error_rate
+        stats['count'] += 1
+        stats['latency_ms'] += latency
+        if latency:
+            await asyncio.sleep(latency / 1000)
+
+        headers = Headers([
+            ('Content-Type', route.content_type),
+            ('X-Stub-Latency-Ms', f"{latency:.3f}"),
+        ])
+        if failed:
+            stats['errors'] += 1
+            body = json.dumps({"error": "injected_failure"}).encode('utf-8')
+            return Response(self.error_status, headers, body)
+        return Response(route.status, headers, _json_body(route, request, route.size))
+
+
+def build_stub(
+    endpoints: Dict[str, Any],
+    latency: str = None,
+    size: int = 256,
+    overrides: Dict[str, Dict[str, Any]] = None,
+    seed: int = None,
+    error_rate: float = 0.0
+) -> StubBackend:
+    """
+    Create a stub from endpoints.json content.
+
+    Args:
+        endpoints: Parsed config/endpoints.json
+        latency: Default latency spec for every route
+        size: Default response body size in bytes
+        overrides: Per-prefix settings, e.g. {"/v2/accounts": {"latency": "fixed:80", "size": 2048}};
+            prefixes not in endpoints.json are added as routes
+        seed: Random seed for latency sampling and failures
+        error_rate: Fraction of requests answered with 503
+    """
+    default_latency = parse_latency(latency)
+    routes = {r.prefix: r for r in routes_from_endpoints(endpoints)}
+    for route in routes.values():
+        route.latency = default_latency
+        route.size = size
+
+    for prefix, settings in (overrides or {}).items():
+        route = routes.setdefault(prefix, StubRoute(prefix, latency=default_latency, size=size))
+        if 'latency' in settings:
+            route.latency = parse_latency(settings['latency'])
+        if 'size' in settings:
+            route.size = int(settings['size'])
+        if 'status' in settings:
+            route.status = int(settings['status'])
+        if 'methods' in settings:
+            route.methods = [m.upper() for m in settings['methods']]
+        if 'content_type' in settings:
+            route.content_type = settings['content_type']
+
+    return StubBackend(list(routes.values()), seed=seed, error_rate=error_rate)
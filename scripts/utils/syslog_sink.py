@@ -0,0 +1,328 @@
+"""
+Syslog Sink
+
+A local high-throughput receiver for the FC-Syng-Logging MessageLogging
+policy. Accepts syslog over TCP (octet-counted or newline-framed, RFC 6587)
+and UDP, parses the platform log line
+
+    [CropwisePlatform][dev] RequestId=... User=... ClientIP=... Method=GET
+    Path=/cropwise-unified-platform/v2/accounts/me Status=200 Latency=123ms
+
+and streams records into per-path latency histograms and status counts.
+The same aggregator analyzes captured log files offline.
+"""
+
+import re
+import gzip
+import math
+import time
+import asyncio
+from dataclasses import dataclass, field
+from typing import IO, Any, AsyncIterator, Dict, Iterable, Iterator, Optional
+
+
+LOG_LINE_RE = re.compile(
+    r'\[CropwisePlatform\]\[(?P<env>[^\]]*)\]\s+'
+    r'RequestId=(?P<request_id>\S*)\s+'
+    r'User=(?P<user>\S*)\s+'
+    r'ClientIP=(?P<client_ip>\S*)\s+'
+    r'Method=(?P<method>\S*)\s+'
+    r'Path=(?P<path>\S*)\s+'
+    r'Status=(?P<status>\S*)\s+'
+    r'Latency=(?P<latency>\S*?)ms'
+)
+
+_ID_SEGMENT_RE = re.compile(
+    r'^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'
+    r'|[0-9a-fA-F]{24,}|[^/@]+@[^/]+)$'
+)
+
+# Relative width of histogram buckets (~2% error on percentiles)
+BUCKET_GROWTH = 1.04
+
+
+@dataclass
+class LogRecord:
+    """One parsed platform log line."""
+    env: str
+    request_id: str
+    user: str
+    client_ip: str
+    method: str
+    path: str
+    status: Optional[int]
+    latency_ms: Optional[float]     # None when the template did not resolve
+
+
+def parse_line(line: str) -> Optional[LogRecord]:
+    """Parse a log line (with or without a syslog header); None if not a platform line."""
+    match = LOG_LINE_RE.search(line)
+    if not match:
+        return None
+    status = match.group('status')
+    latency = match.group('latency')
+    try:
+        latency_ms = float(latency) if latency else None
+    except ValueError:
+        latency_ms = None
+    return LogRecord(
+        env=match.group('env'),
+        request_id=match.group('request_id'),
+        user=match.group('user'),
+        client_ip=match.group('client_ip'),
+        method=match.group('method'),
+        path=match.group('path'),
+        status=int(status) if status.isdigit() else None,
+        latency_ms=latency_ms
+    )
+
+
+def normalize_path(path: str, base_path: str = '') -> str:
+    """Strip the query and base path and collapse ID-like segments to {id}."""
+    path = path.split('?', 1)[0]
+    if base_path and path.startswith(base_path):
+        path = path[len(base_path):] or '/'
+    return '/'.join('{id}' if _ID_SEGMENT_RE.match(s) else s for s in path.split('/'))
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with constant memory; mergeable."""
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, value_ms: float) -> None:
+        index = int(math.log(value_ms) / math.log(BUCKET_GROWTH)) if value_ms >= 1 else 0
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value_ms
+        self.min = min(self.min, value_ms)
+        self.max = max(self.max, value_ms)
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p: float) -> float:
+        """Approximate percentile (bucket midpoint, clamped to the observed range)."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(p / 100 * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                if index == 0:
+                    value = min(self.max, 1.0)
+                else:
+                    value = BUCKET_GROWTH ** (index + 0.5)
+                return min(self.max, max(self.min, value))
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 2),
+            "min_ms": round(self.min, 2),
+            "p50_ms": round(self.percentile(50), 2),
+            "p95_ms": round(self.percentile(95), 2),
+            "p99_ms": round(self.percentile(99), 2),
+            "max_ms": round(self.max, 2),
+        }
+
+
+@dataclass
+class _PathStats:
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+    statuses: Dict[str, int] = field(default_factory=dict)
+    count: int = 0
+
+
+class LogAggregator:
+    """Streams records into per-path histograms and counters."""
+
+    def __init__(self, base_path: str = '', normalize: bool = True):
+        self.base_path = base_path
+        self.normalize = normalize
+        self.paths: Dict[str, _PathStats] = {}
+        self.overall = LatencyHistogram()
+        self.statuses: Dict[str, int] = {}
+        self.environments: Dict[str, int] = {}
+        self.records = 0
+        self.unparsed = 0
+        self.unresolved_latency = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+        self._window_start = self.started
+        self._window_records = 0
+        self.peak_rate = 0.0
+
+    def add_line(self, line: str) -> Optional[LogRecord]:
+        self.bytes += len(line)
+        record = parse_line(line)
+        if record is None:
+            self.unparsed += 1
+            return None
+        self.add(record)
+        return record
+
+    def add(self, record: LogRecord) -> None:
+        self.records += 1
+        key = f"{record.method} {normalize_path(record.path, self.base_path) if self.normalize else record.path}"
+        stats = self.paths.get(key)
+        if stats is None:
+            stats = self.paths[key] = _PathStats()
+        stats.count += 1
+        status = str(record.status) if record.status is not None else 'unresolved'
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.environments[record.env] = self.environments.get(record.env, 0) + 1
+        if record.latency_ms is None:
+            self.unresolved_latency += 1
+        else:
+            stats.histogram.record(record.latency_ms)
+            self.overall.record(record.latency_ms)
+
+        self._window_records += 1
+        now = time.monotonic()
+        if now - self._window_start >= 1.0:
+            self.peak_rate = max(self.peak_rate, self._window_records / (now - self._window_start))
+            self._window_start = now
+            self._window_records = 0
+
+    def report(self, top: int = None) -> Dict[str, Any]:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        paths = sorted(self.paths.items(), key=lambda item: -item[1].count)
+        if top:
+            paths = paths[:top]
+        return {
+            "records": self.records,
+            "unparsed": self.unparsed,
+            "unresolved_latency": self.unresolved_latency,
+            "bytes": self.bytes,
+            "elapsed_s": round(elapsed, 3),
+            "ingest_rate_per_s": round(self.records / elapsed, 1),
+            "peak_rate_per_s": round(self.peak_rate or self.records / elapsed, 1),
+            "statuses": dict(sorted(self.statuses.items())),
+            "environments": self.environments,
+            "latency": self.overall.summary(),
+            "paths": {
+                key: {"count": s.count, "statuses": dict(sorted(s.statuses.items())), "latency": s.histogram.summary()}
+                for key, s in paths
+            },
+        }
+
+
+def iter_log_lines(path: str) -> Iterator[str]:
+    """Stream lines from a plain or gzip log file."""
+    opener = gzip.open if str(path).endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            yield line.rstrip('\n')
+
+
+def analyze_lines(lines: Iterable[str], base_path: str = '') -> LogAggregator:
+    """Aggregate an iterable of log lines."""
+    aggregator = LogAggregator(base_path)
+    for line in lines:
+        aggregator.add_line(line)
+    return aggregator
+
+
+# ============== Network sink ==============
+
+async def read_frames(reader: asyncio.StreamReader) -> AsyncIterator[bytes]:
+    """
+    Yield syslog messages from a TCP stream, detecting per frame whether it
+    is octet-counted ("<len> <msg>") or newline-terminated.
+    """
+    while True:
+        first = await reader.read(1)
+        if not first:
+            return
+        if first.isdigit():
+            digits = first
+            while True:
+                byte = await reader.read(1)
+                if not byte:
+                    return
+                if byte.isdigit() and len(digits) < 9:
+                    digits += byte
+                    continue
+                break
+            if byte == b' ':
+                yield await reader.readexactly(int(digits))
+                continue
+            rest = digits + byte
+        else:
+            rest = first
+        if rest.endswith(b'\n'):
+            yield rest.rstrip(b'\r\n')
+            continue
+        line = await reader.readline()
+        yield (rest + line).rstrip(b'\r\n')
+
+
+class _UDPProtocol(asyncio.DatagramProtocol):
+
+    def __init__(self, sink: 'SyslogSink'):
+        self.sink = sink
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        for line in data.splitlines():
+            self.sink.ingest(line)
+
+
+class SyslogSink:
+    """TCP/UDP syslog receiver feeding a LogAggregator (and optionally a capture file)."""
+
+    def __init__(self, aggregator: LogAggregator = None, record_to: IO[str] = None):
+        self.aggregator = aggregator or LogAggregator()
+        self.record_to = record_to
+        self.tcp_port: Optional[int] = None
+        self.udp_port: Optional[int] = None
+        self._tcp_server = None
+        self._udp_transport = None
+
+    def ingest(self, data: bytes) -> None:
+        line = data.decode('utf-8', 'replace')
+        self.aggregator.add_line(line)
+        if self.record_to is not None:
+            self.record_to.write(line + '\n')
+
+    async def _on_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            async for frame in read_frames(reader):
+                self.ingest(frame)
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = '127.0.0.1', tcp_port: int = 0, udp_port: int = None) -> None:
+        """Listen on TCP (and UDP when udp_port is not None; 0 picks a free port)."""
+        self._tcp_server = await asyncio.start_server(self._on_connection, host, tcp_port, limit=1024 * 1024)
+        self.tcp_port = self._tcp_server.sockets[0].getsockname()[1]
+        if udp_port is not None:
+            loop = asyncio.get_running_loop()
+            self._udp_transport, _ = await loop.create_datagram_endpoint(
+                lambda: _UDPProtocol(self), local_addr=(host, udp_port)
+            )
+            self.udp_port = self._udp_transport.get_extra_info('sockname')[1]
+
+    async def close(self) -> None:
+        if self._tcp_server is not None:
+            self._tcp_server.close()
+            await self._tcp_server.wait_closed()
+        if self._udp_transport is not None:
+            self._udp_transport.close()
@@ -0,0 +1,232 @@
+"""
+JWT Token Pool
+
+Pre-signed HS256 tokens for load generators, so signing stays out of the
+measurement loop. The pool signs one token per synthetic user up front
+(stdlib hmac, no PyJWT), re-signs all of them on a background thread
+before they expire, and hands them out without locks:
+
+    pool = TokenPool.from_fixtures('tests/fixtures/test_tokens.json', per_fixture=200)
+    with pool:                      # starts/stops the rotation thread
+        token = pool.get()          # round-robin over all users
+        token = pool.get('high-rate')      # round-robin within a tier
+        token = pool.token_for(user)       # stable user for a logged user
+
+Handout reads an immutable snapshot (a tuple swapped in whole by the
+rotation thread) and advances an itertools.count, which is atomic under the
+GIL, so workers never contend on a lock.
+
+Synthetic users are derived from the token fixtures: user+N@domain for each
+fixture, keeping the fixture's client_id, extra claims and rate-limit tier,
+so load spreads across as many KVM keys as there are users.
+"""
+
+import hmac
+import json
+import time
+import zlib
+import base64
+import hashlib
+import itertools
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .case_catalog import TokenFixture, load_token_fixtures
+
+
+# Claims the pool sets itself on every signing
+POOL_CLAIMS = ('iat', 'exp')
+
+_HEADER = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(b"=").decode('ascii')
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode('ascii')
+
+
+def sign_hs256(claims: Mapping[str, Any], secret: str) -> str:
+    """Compact HS256 JWT for claims (verifiable with PyJWT)."""
+    payload = _b64url(json.dumps(claims, separators=(',', ':')).encode('utf-8'))
+    signing_input = f"{_HEADER}.{payload}"
+    signature = hmac.new(secret.encode('utf-8'), signing_input.encode('ascii'), hashlib.sha256).digest()
+    return f"{signing_input}.{_b64url(signature)}"
+
+
+@dataclass(frozen=True)
+class PoolUser:
+    """A synthetic user the pool signs tokens for."""
+    username: str
+    client_id: str = 'test-client'
+    tier: Optional[str] = None
+    claims: Mapping[str, Any] = field(default_factory=dict)
+
+
+def synthetic_users(
+    fixtures: Mapping[str, TokenFixture],
+    per_fixture: int = 1,
+    now: float = None
+) -> List[PoolUser]:
+    """
+    per_fixture users for each token fixture.
+
+    The first user keeps the fixture's username, the rest are user+N@domain.
+    Fixtures with a fixed exp in the past (expired_token) are skipped.
+    """
+    now = time.time() if now is None else now
+    users = []
+    for fixture in fixtures.values():
+        claims = dict(fixture.claims)
+        if 'exp' in claims and claims['exp'] <= now:
+            continue
+        username = claims.get('username', claims.get('sub', fixture.name))
+        local, at, domain = username.partition('@')
+        extra = {k: v for k, v in claims.items() if k not in ('sub', 'username', 'client_id') + POOL_CLAIMS}
+        for i in range(per_fixture):
+            name = username if i == 0 else f"{local}+{i}{at}{domain}"
+            users.append(PoolUser(name, claims.get('client_id', 'test-client'), fixture.rate_limit, extra))
+    return users
+
+
+class TokenPool:
+    """Pre-signed tokens for a set of users, rotated before expiry."""
+
+    def __init__(
+        self,
+        users: Iterable[PoolUser],
+        secret: str,
+        ttl: int = 3600,
+        refresh_before: int = 300,
+        issuer: str = 'cropwise-test',
+        clock: Callable[[], float] = time.time,
+        poll_interval: float = 1.0
+    ):
+        """
+        Args:
+            users: Users to sign tokens for
+            secret: HS256 signing key
+            ttl: Token lifetime in seconds
+            refresh_before: Re-sign this many seconds before the tokens expire
+            issuer: iss claim
+            clock: Time source (seconds since the epoch)
+            poll_interval: How often the rotation thread checks the clock
+        """
+        self.users: Tuple[PoolUser, ...] = tuple(users)
+        if not self.users:
+            raise ValueError("Token pool needs at least one user")
+        if not 0 <= refresh_before < ttl:
+            raise ValueError(f"refresh_before ({refresh_before}s) must be less than ttl ({ttl}s)")
+        self.secret = secret
+        self.ttl = ttl
+        self.refresh_before = refresh_before
+        self.issuer = issuer
+        self.clock = clock
+        self.poll_interval = poll_interval
+        self.generation = 0
+        self.expires_at = 0.0
+        self.last_sign_ms = 0.0
+        self._counters: Dict[Optional[str], itertools.count] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.refresh()
+
+    @classmethod
+    def from_fixtures(cls, path: str, per_fixture: int = 1, **kwargs) -> 'TokenPool':
+        """Pool of synthetic users from tests/fixtures/test_tokens.json, signed with its test secret."""
+        fixtures = load_token_fixtures(path)
+        secret = next(iter(fixtures.values())).secret if fixtures else ''
+        return cls(synthetic_users(fixtures, per_fixture), secret, **kwargs)
+
+    def _claims(self, user: PoolUser, now: int) -> Dict[str, Any]:
+        claims = dict(user.claims)
+        claims.update(
+            sub=user.username,
+            username=user.username,
+            client_id=user.client_id,
+            iss=claims.get('iss', self.issuer),
+            iat=now,
+            exp=now + self.ttl
+        )
+        return claims
+
+    def refresh(self) -> None:
+        """Sign a new token for every user and swap them in."""
+        start = time.perf_counter()
+        now = int(self.clock())
+        tokens = tuple(sign_hs256(self._claims(user, now), self.secret) for user in self.users)
+
+        by_tier: Dict[Optional[str], List[str]] = {None: list(tokens)}
+        for user, token in zip(self.users, tokens):
+            if user.tier:
+                by_tier.setdefault(user.tier, []).append(token)
+        by_user = {user.username: token for user, token in zip(self.users, tokens)}
+
+        # Each attribute is replaced in one assignment; readers see old or new tokens, both valid
+        self._by_tier = {tier: tuple(items) for tier, items in by_tier.items()}
+        self._by_user = by_user
+        self.expires_at = now + self.ttl
+        self.generation += 1
+        self.last_sign_ms = (time.perf_counter() - start) * 1000
+
+    @property
+    def tiers(self) -> List[str]:
+        return [tier for tier in self._by_tier if tier is not None]
+
+    def get(self, tier: str = None) -> str:
+        """Next token round-robin, from all users or one rate-limit tier."""
+        tokens = self._by_tier.get(tier)
+        if not tokens:
+            raise KeyError(f"No users in tier '{tier}' (tiers: {', '.join(self.tiers) or 'none'})")
+        counter = self._counters.get(tier)
+        if counter is None:
+            counter = self._counters.setdefault(tier, itertools.count())
+        return tokens[next(counter) % len(tokens)]
+
+    def token_for(self, user: str) -> str:
+        """Token of a pool user, or a stable pool user for any other name (LogReplayer token_for)."""
+        token = self._by_user.get(user)
+        if token is not None:
+            return token
+        tokens = self._by_tier[None]
+        return tokens[zlib.crc32(user.encode('utf-8')) % len(tokens)]
+
+    # ============== Rotation ==============
+
+    def _rotate(self) -> None:
+        # Poll rather than sleep until due, so clock jumps (suspend, NTP) are noticed
+        while True:
+            remaining = self.expires_at - self.refresh_before - self.clock()
+            if remaining <= 0:
+                self.refresh()
+            elif self._stop.wait(min(remaining, self.poll_interval)):
+                return
+
+    def start(self) -> 'TokenPool':
+        """Start re-signing in the background before the tokens expire."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._rotate, name='token-pool', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the rotation thread."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> 'TokenPool':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "users": len(self.users),
+            "tiers": {tier: len(self._by_tier[tier]) for tier in self.tiers},
+            "generation": self.generation,
+            "expires_in_s": round(self.expires_at - self.clock(), 1),
+            "last_sign_ms": round(self.last_sign_ms, 2),
+        }
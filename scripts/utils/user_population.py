@@ -0,0 +1,356 @@
+"""
+Synthetic User Population
+
+Builds N synthetic users with a rate-limit tier distribution for
+KVM-cardinality load tests of KVM-Get-User-Rate-Limit:
+
+    users = generate_population(10000, parse_tier_distribution('high-rate=5,medium-rate=25,low-rate=20,default=50'))
+    write_desired_state(users, 'users-kvm.json')      # for kvm_sync.py
+    pool = TokenPool(users, secret)                   # pre-signed tokens
+    sampler = ZipfSampler(len(users), s=1.1)          # skewed user popularity
+
+Users in the 'default' tier get no KVM entry, so the lookup misses and the
+proxy falls back to the default rate type, as for unknown users in
+production.
+
+KvmCacheModel replays the sampled user sequence through the rate-limit
+cache in front of the KVM lookup (generate_proxy.py --cache-rate-limits):
+an entry is populated on a miss and expires ttl_seconds later, and users
+without a KVM entry are never cached. It gives the expected hit rate for a
+cardinality, skew and request rate, to compare with the measured
+X-Apigee-KVM-Time split. PopulationLoad sends the sampled requests and
+reports latency and X-Apigee-KVM-Time for modeled hits and misses.
+"""
+
+import csv
+import json
+import time
+import random
+import bisect
+import asyncio
+import itertools
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .asynchttp import Headers, HTTPClient, HTTPError
+from .kvm_sync import KVM_NAME
+from .syslog_sink import LatencyHistogram
+from .token_pool import PoolUser, TokenPool
+
+
+# Tier meaning "no KVM entry" (the policy falls back to default_rate_type)
+NO_ENTRY = 'default'
+
+
+def parse_tier_distribution(spec: str) -> Dict[str, float]:
+    """
+    Parse 'high-rate=5,medium-rate=25,default=70' into normalized fractions.
+
+    Weights may be percentages or fractions; they are scaled to sum to 1.
+    """
+    weights = {}
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        tier, sep, weight = part.partition('=')
+        try:
+            value = float(weight)
+        except ValueError:
+            value = -1.0
+        if not sep or not tier.strip() or value < 0:
+            raise ValueError(f"Invalid tier weight '{part}', expected tier=weight")
+        weights[tier.strip()] = weights.get(tier.strip(), 0.0) + value
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError(f"Tier distribution '{spec}' has no positive weights")
+    return {tier: weight / total for tier, weight in weights.items()}
+
+
+def tier_counts(count: int, distribution: Dict[str, float]) -> Dict[str, int]:
+    """Exact user counts per tier (largest remainder, so they sum to count)."""
+    exact = {tier: count * fraction for tier, fraction in distribution.items()}
+    counts = {tier: int(value) for tier, value in exact.items()}
+    by_remainder = sorted(exact, key=lambda tier: counts[tier] - exact[tier])
+    for tier in by_remainder[:count - sum(counts.values())]:
+        counts[tier] += 1
+    return counts
+
+
+def generate_population(
+    count: int,
+    distribution: Dict[str, float],
+    seed: int = 0,
+    domain: str = 'loadtest.syngenta.com',
+    client_id: str = 'load-test'
+) -> List[PoolUser]:
+    """
+    count users (user00001@domain, ...) with tiers in the given proportions.
+
+    Tiers are shuffled over the users with the seed, so a Zipf sampler's
+    most popular users are not all in one tier.
+    """
+    tiers = [tier for tier, n in tier_counts(count, distribution).items() for _ in range(n)]
+    random.Random(seed).shuffle(tiers)
+    width = max(5, len(str(count)))
+    return [
+        PoolUser(f"user{i:0{width}d}@{domain}", client_id, None if tier == NO_ENTRY else tier)
+        for i, tier in enumerate(tiers, start=1)
+    ]
+
+
+def kvm_entries(users: Iterable[PoolUser]) -> Dict[str, str]:
+    """KVM entries (username -> tier) for the users that have one."""
+    return {user.username: user.tier for user in users if user.tier}
+
+
+def write_desired_state(users: Iterable[PoolUser], path: str, map_name: str = KVM_NAME) -> int:
+    """
+    Write a kvm_sync.py desired-state file (.csv, or JSON local KVM store).
+
+    Returns:
+        Number of entries written
+    """
+    entries = kvm_entries(users)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix.lower() == '.csv':
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['name', 'value'])
+            writer.writerows(entries.items())
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({map_name: entries}, f, indent=2)
+    return len(entries)
+
+
+class ZipfSampler:
+    """
+    Draws user indexes with Zipf popularity (rank r has weight 1 / r**s).
+
+    s = 0 is uniform; s around 1 matches typical API user skew. Ranks are
+    assigned to users in a seeded random order.
+    """
+
+    def __init__(self, count: int, s: float = 1.0, seed: int = 0):
+        if count < 1:
+            raise ValueError("ZipfSampler needs at least one user")
+        if s < 0:
+            raise ValueError(f"Zipf exponent must be >= 0, got {s}")
+        self.count = count
+        self.s = s
+        self._rng = random.Random(seed)
+        self._cumulative = list(itertools.accumulate(1.0 / (rank ** s) for rank in range(1, count + 1)))
+        self._users = list(range(count))
+        self._rng.shuffle(self._users)
+
+    def sample(self) -> int:
+        """Index of the next user."""
+        rank = bisect.bisect(self._cumulative, self._rng.random() * self._cumulative[-1])
+        return self._users[min(rank, self.count - 1)]
+
+    def samples(self, n: int) -> List[int]:
+        return [self.sample() for _ in range(n)]
+
+    def top_share(self, fraction: float) -> float:
+        """Share of requests going to the most popular fraction of users."""
+        top = max(1, int(self.count * fraction))
+        return self._cumulative[top - 1] / self._cumulative[-1]
+
+
+class KvmCacheModel:
+    """
+    Hit/miss model of the rate-limit cache in front of the KVM lookup.
+
+    A lookup hits if the user's entry was populated less than ttl_seconds
+    ago; a miss reads the KVM and populates the cache. Users without a KVM
+    entry always miss.
+    """
+
+    def __init__(self, ttl_seconds: float = 300.0):
+        self.ttl_seconds = ttl_seconds
+        self._expires: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, user: PoolUser, now: float) -> bool:
+        """Record a lookup at time now (seconds); True on a cache hit."""
+        expires = self._expires.get(user.username)
+        if expires is not None and now < expires:
+            self.hits += 1
+            return True
+        self.misses += 1
+        if user.tier:
+            self._expires[user.username] = now + self.ttl_seconds
+        return False
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def expected_hit_rate(
+    users: List[PoolUser],
+    sampler: ZipfSampler,
+    requests: int,
+    rate_per_s: float,
+    ttl_seconds: float = 300.0
+) -> Dict[str, float]:
+    """
+    Cache hit rate for requests sampled at a steady rate.
+
+    Returns:
+        hit_rate, distinct users touched, and the share of requests from
+        users without a KVM entry (always misses)
+    """
+    if rate_per_s <= 0:
+        raise ValueError("expected_hit_rate needs a request rate above 0")
+    model = KvmCacheModel(ttl_seconds)
+    touched = set()
+    no_entry = 0
+    for i in range(requests):
+        user = users[sampler.sample()]
+        touched.add(user.username)
+        no_entry += user.tier is None
+        model.lookup(user, i / rate_per_s)
+    return {
+        "hit_rate": round(model.hit_rate, 4),
+        "distinct_users": len(touched),
+        "no_entry_share": round(no_entry / requests, 4) if requests else 0.0,
+    }
+
+
+class PopulationStats:
+    """Latency and KVM time per modeled cache outcome, per tier and status."""
+
+    def __init__(self):
+        self.latency = {'hit': LatencyHistogram(), 'miss': LatencyHistogram()}
+        self.kvm_time = {'hit': LatencyHistogram(), 'miss': LatencyHistogram()}
+        self.tiers: Dict[str, int] = {}
+        self.statuses: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.users = set()
+        self.sent = 0
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+
+    def record(self, user: PoolUser, hit: bool, status: Optional[int], latency_ms: float,
+               kvm_ms: Optional[float], error: str = None) -> None:
+        tier = user.tier or NO_ENTRY
+        self.tiers[tier] = self.tiers.get(tier, 0) + 1
+        self.users.add(user.username)
+        if error is not None:
+            self.errors[error] = self.errors.get(error, 0) + 1
+            return
+        outcome = 'hit' if hit else 'miss'
+        self.latency[outcome].record(latency_ms)
+        if kvm_ms is not None:
+            self.kvm_time[outcome].record(kvm_ms)
+        self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+
+    def report(self, model: KvmCacheModel) -> Dict[str, Any]:
+        elapsed = max((self.finished or time.monotonic()) - self.started, 1e-9)
+        return {
+            "sent": self.sent,
+            "elapsed_s": round(elapsed, 3),
+            "achieved_rate_per_s": round(self.sent / elapsed, 1),
+            "distinct_users": len(self.users),
+            "requests_by_tier": dict(sorted(self.tiers.items())),
+            "statuses": dict(sorted(self.statuses.items())),
+            "errors": dict(sorted(self.errors.items())),
+            "modeled_hit_rate": round(model.hit_rate, 4),
+            "latency": {outcome: h.summary() for outcome, h in self.latency.items()},
+            "kvm_time": {outcome: h.summary() for outcome, h in self.kvm_time.items()},
+        }
+
+
+class PopulationLoad:
+    """Sends requests for Zipf-sampled population users at a steady rate."""
+
+    def __init__(
+        self,
+        base_url: str,
+        users: List[PoolUser],
+        pool: TokenPool,
+        sampler: ZipfSampler,
+        path: str = '/v1/users',
+        rate_per_s: float = 100.0,
+        max_in_flight: int = 64,
+        cache_ttl_seconds: float = 300.0,
+        timeout: float = 30.0,
+        verify_tls: bool = True,
+        client: HTTPClient = None
+    ):
+        """
+        Args:
+            base_url: Proxy (or gateway) URL including the base path
+            users: Population; sampler indexes into it
+            pool: Pre-signed tokens for the population
+            sampler: User popularity
+            path: Request path appended to base_url
+            rate_per_s: Request rate; 0 sends as fast as max_in_flight allows
+            max_in_flight: Concurrent request limit
+            cache_ttl_seconds: Rate-limit cache TTL used for the hit/miss model
+            timeout: Per-request timeout in seconds
+            verify_tls: Verify HTTPS certificates
+            client: Shared HTTP client (created when omitted)
+        """
+        self.url = base_url.rstrip('/') + path
+        self.users = users
+        self.pool = pool
+        self.sampler = sampler
+        self.rate_per_s = rate_per_s
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.client = client or HTTPClient(max_idle_per_host=max_in_flight, verify_tls=verify_tls)
+        self._owns_client = client is None
+        self.model = KvmCacheModel(cache_ttl_seconds)
+        self.stats = PopulationStats()
+
+    async def _send(self, user: PoolUser, hit: bool, slots: asyncio.Semaphore) -> None:
+        headers = Headers([
+            ('User-Agent', 'CropwisePlatform-UserLoad/1.0'),
+            ('Accept', 'application/json'),
+            ('Authorization', f"Bearer {self.pool.token_for(user.username)}"),
+        ])
+        start = time.perf_counter()
+        try:
+            response = await self.client.request('GET', self.url, headers, timeout=self.timeout)
+            try:
+                kvm_ms = float(response.headers.get('X-Apigee-KVM-Time'))
+            except (TypeError, ValueError):
+                kvm_ms = None
+            self.stats.record(user, hit, response.status, (time.perf_counter() - start) * 1000, kvm_ms)
+        except asyncio.TimeoutError:
+            self.stats.record(user, hit, None, 0.0, None, error='timeout')
+        except (OSError, HTTPError, asyncio.IncompleteReadError) as e:
+            self.stats.record(user, hit, None, 0.0, None, error=type(e).__name__)
+        finally:
+            slots.release()
+
+    async def run(self, requests: int) -> Dict[str, Any]:
+        """Send the requests, wait for every response and return the report."""
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.max_in_flight)
+        pending = set()
+        self.stats.started = time.monotonic()
+        start = loop.time()
+        try:
+            for i in range(requests):
+                if self.rate_per_s > 0:
+                    delay = start + i / self.rate_per_s - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                await slots.acquire()
+                user = self.users[self.sampler.sample()]
+                hit = self.model.lookup(user, loop.time() - start)
+                task = loop.create_task(self._send(user, hit, slots))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+                self.stats.sent += 1
+            if pending:
+                await asyncio.gather(*pending)
+        finally:
+            self.stats.finished = time.monotonic()
+            if self._owns_client:
+                await self.client.close()
+        return self.stats.report(self.model)
@@ -0,0 +1,230 @@
+"""
+Test Apigee Management API Emulator
+
+Exercises the emulator over HTTP with the standard library, and drives the
+deploy scripts against it when their dependencies are installed.
+"""
+
+import io
+import sys
+import json
+import time
+import zipfile
+import urllib.error
+import urllib.request
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from utils.apigee_emulator import ApigeeEmulator, EmulatorSettings
+
+
+ORG = "test-org"
+
+
+def _bundle_bytes() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as zf:
+        zf.writestr("apiproxy/proxy.xml", "<APIProxy/>")
+    return buffer.getvalue()
+
+
+def _call(emulator, method, path, body=None, data=None):
+    """Return (status, json) for a management API call."""
+    if body is not None:
+        data = json.dumps(body).encode('utf-8')
+    request = urllib.request.Request(f"{emulator.base_url}/{path}", data=data, method=method)
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+@pytest.fixture
+def emulator():
+    """Start an emulator with instant deployments."""
+    with ApigeeEmulator() as emu:
+        yield emu
+
+
+class TestProxyLifecycle:
+    """Test import, deploy and undeploy."""
+
+    def test_import_numbers_revisions(self, emulator):
+        """Test that each import creates the next revision."""
+        for expected in ("1", "2"):
+            status, body = _call(emulator, "POST", f"organizations/{ORG}/apis?action=import&name=p", data=_bundle_bytes())
+            assert status == 200
+            assert body["revision"] == expected
+
+        assert _call(emulator, "GET", f"organizations/{ORG}/apis/p/revisions") == (200, ["1", "2"])
+        assert _call(emulator, "GET", f"organizations/{ORG}/apis/missing")[0] == 404
+
+    def test_import_rejects_non_zip(self, emulator):
+        """Test that a non-zip body is rejected."""
+        status, body = _call(emulator, "POST", f"organizations/{ORG}/apis?action=import&name=p", data=b"nope")
+
+        assert status == 400
+        assert body["error"]["status"] == "INVALID_ARGUMENT"
+
+    def test_deployment_becomes_ready(self):
+        """Test PROGRESSING -> READY after the configured delay."""
+        with ApigeeEmulator(EmulatorSettings(ready_delay_s=0.2)) as emu:
+            _call(emu, "POST", f"organizations/{ORG}/apis?action=import&name=p", data=_bundle_bytes())
+            path = f"organizations/{ORG}/environments/dev/apis/p/revisions/1/deployments"
+
+            assert _call(emu, "POST", path)[1]["state"] == "PROGRESSING"
+            time.sleep(0.25)
+            assert _call(emu, "GET", path)[1]["state"] == "READY"
+
+    def test_redeploy_requires_override(self, emulator):
+        """Test that replacing a deployed revision needs override=true."""
+        for _ in range(2):
+            _call(emulator, "POST", f"organizations/{ORG}/apis?action=import&name=p", data=_bundle_bytes())
+        base = f"organizations/{ORG}/environments/dev/apis/p"
+        _call(emulator, "POST", f"{base}/revisions/1/deployments")
+
+        assert _call(emulator, "POST", f"{base}/revisions/2/deployments")[0] == 400
+        assert _call(emulator, "POST", f"{base}/revisions/2/deployments?override=true")[0] == 200
+        assert [d["revision"] for d in _call(emulator, "GET", f"{base}/deployments")[1]["deployments"]] == ["2"]
+        assert _call(emulator, "DELETE", f"{base}/revisions/2/deployments")[0] == 200
+        assert _call(emulator, "GET", f"{base}/deployments")[1] == {"deployments": []}
+
+    def test_unknown_environment(self, emulator):
+        """Test that unknown environments are 404."""
+        assert _call(emulator, "GET", f"organizations/{ORG}/environments/nope/apis/p/deployments")[0] == 404
+        assert "dev" in _call(emulator, "GET", f"organizations/{ORG}/environments")[1]
+
+
+class TestKeyValueMaps:
+    """Test KVM and entry CRUD."""
+
+    def test_kvm_crud(self, emulator):
+        """Test create, get, duplicate and delete of a map."""
+        base = f"organizations/{ORG}/environments/dev/keyvaluemaps"
+
+        assert _call(emulator, "POST", base, {"name": "user-rate-limits", "encrypted": False})[0] == 200
+        assert _call(emulator, "POST", base, {"name": "user-rate-limits"})[0] == 409
+        assert _call(emulator, "GET", f"{base}/user-rate-limits")[1] == {"name": "user-rate-limits", "encrypted": False}
+        assert _call(emulator, "GET", base)[1] == ["user-rate-limits"]
+        assert _call(emulator, "DELETE", f"{base}/user-rate-limits")[0] == 200
+        assert _call(emulator, "GET", f"{base}/user-rate-limits")[0] == 404
+
+    def test_entries_paginate(self, emulator):
+        """Test entry CRUD and page tokens."""
+        base = f"organizations/{ORG}/environments/dev/keyvaluemaps/m"
+        _call(emulator, "POST", f"organizations/{ORG}/environments/dev/keyvaluemaps", {"name": "m"})
+        for i in range(5):
+            _call(emulator, "POST", f"{base}/entries", {"name": f"user{i}@syngenta.com", "value": "low-rate"})
+
+        assert _call(emulator, "PUT", f"{base}/entries/user0@syngenta.com", {"value": "high-rate"})[0] == 200
+        assert _call(emulator, "GET", f"{base}/entries/user0@syngenta.com")[1]["value"] == "high-rate"
+        assert _call(emulator, "DELETE", f"{base}/entries/user4@syngenta.com")[0] == 200
+
+        names, token = [], ""
+        while True:
+            page = _call(emulator, "GET", f"{base}/entries?pageSize=2&pageToken={token}")[1]
+            names.extend(e["name"] for e in page["keyValueEntries"])
+            token = page["nextPageToken"]
+            if not token:
+                break
+        assert names == [f"user{i}@syngenta.com" for i in range(4)]
+
+        status, error = _call(emulator, "GET", f"{base}/entries?pageSize=ten")
+        assert status == 400 and error["error"]["status"] == "INVALID_ARGUMENT"
+        assert _call(emulator, "GET", f"{base}/entries?pageSize=0")[0] == 400
+
+
+class TestFaultInjection:
+    """Test latency and failure injection."""
+
+    def test_error_rate_is_seeded(self):
+        """Test that injected failures repeat for the same seed."""
+        def statuses(seed):
+            with ApigeeEmulator(EmulatorSettings(error_rate=0.5, seed=seed)) as emu:
+                return [_call(emu, "GET", f"organizations/{ORG}/environments")[0] for _ in range(20)]
+
+        first = statuses(7)
+        assert first == statuses(7)
+        assert set(first) == {200, 503}
+
+    def test_latency_and_stats(self):
+        """Test added latency and the per-route stats."""
+        with ApigeeEmulator(EmulatorSettings(latency_ms=30)) as emu:
+            start = time.perf_counter()
+            _call(emu, "GET", f"organizations/{ORG}/environments")
+            elapsed = time.perf_counter() - start
+            stats = emu.stats()
+
+        assert elapsed >= 0.03
+        assert stats["requests"] == 1
+        assert stats["routes"]["GET /v1/organizations/{org}/environments"]["count"] == 1
+
+    def test_rate_limit_returns_429(self):
+        """Test that requests over the per-second quota get 429 with Retry-After."""
+        with ApigeeEmulator(EmulatorSettings(rate_limit_per_s=5)) as emu:
+            statuses = [_call(emu, "GET", f"organizations/{ORG}/environments")[0] for _ in range(8)]
+            request = urllib.request.Request(f"{emu.base_url}/organizations/{ORG}/environments")
+            with pytest.raises(urllib.error.HTTPError) as excinfo:
+                urllib.request.urlopen(request)
+
+        assert statuses == [200] * 5 + [429] * 3
+        assert excinfo.value.code == 429
+        assert 0 <= float(excinfo.value.headers["Retry-After"]) <= 1
+
+
+class TestDeployScripts:
+    """Drive the deploy scripts against the emulator."""
+
+    def test_proxy_deployer_full_deploy(self, tmp_path, monkeypatch):
+        """Test ProxyDeployer.full_deploy waits for READY."""
+        pytest.importorskip("requests")
+        pytest.importorskip("google.auth")
+        from deploy_proxy import ProxyDeployer
+
+        bundle = tmp_path / "bundle.zip"
+        bundle.write_bytes(_bundle_bytes())
+        with ApigeeEmulator(EmulatorSettings(ready_delay_s=0.2)) as emu:
+            deployer = ProxyDeployer(env="dev", base_url=emu.base_url, token="test")
+            monkeypatch.setattr(deployer, "_save_result", lambda result: None)
+            result = deployer.full_deploy(str(bundle), wait=True, timeout=5, poll_interval=0.05)
+
+        assert result["success"] is True
+        assert result["revision"] == "1"
+
+    def test_apigee_deployer_accepts_ready(self, tmp_path):
+        """Test ApigeeDeployer treats the Apigee X READY state as deployed."""
+        pytest.importorskip("requests")
+        from deploy import ApigeeDeployer
+
+        with ApigeeEmulator() as emu:
+            deployer = ApigeeDeployer(env="dev", organization=ORG, token="test", base_url=emu.base_url, poll_interval=0.05)
+            deployer.dist_dir = tmp_path
+            revision = deployer.upload_bundle(deployer.create_bundle())
+            assert deployer.deploy_revision(revision)
+            assert deployer.check_deployment_status(revision, timeout=2)
+
+    def test_proxy_deployer_syncs_target_servers(self, tmp_path):
+        """Test ProxyDeployer creates TargetServers once and then leaves them unchanged."""
+        pytest.importorskip("requests")
+        pytest.importorskip("google.auth")
+        from deploy_proxy import ProxyDeployer
+
+        environments = json.loads((Path(__file__).parent.parent / "config" / "environments.json").read_text())
+        environments["environments"]["dev"]["backend_servers"] = [{"host": "a.example.com"}, {"host": "b.example.com"}]
+        config_path = tmp_path / "environments.json"
+        config_path.write_text(json.dumps(environments))
+        with ApigeeEmulator() as emu:
+            deployer = ProxyDeployer(env="dev", config_path=str(config_path), base_url=emu.base_url, token="test")
+            first = deployer.sync_target_servers()
+            second = deployer.sync_target_servers()
+            env = deployer.env_config['apigee_env']
+            status, server = _call(emu, "GET", f"organizations/{deployer.env_config['apigee_org']}"
+                                               f"/environments/{env}/targetservers/cropwise-backend-2")
+
+        assert first == {"cropwise-backend-1": "created", "cropwise-backend-2": "created"}
+        assert second == {"cropwise-backend-1": "unchanged", "cropwise-backend-2": "unchanged"}
+        assert status == 200
+        assert server["host"] == "b.example.com"
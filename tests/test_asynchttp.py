@@ -0,0 +1,152 @@
+"""
+Test Async HTTP Client
+
+Checks when the built-in pool resends or reuses a connection, that timeouts
+close the connection on both client paths, and that the httpx path sends
+only the caller's headers and returns raw bodies.
+"""
+
+import sys
+import gzip
+import asyncio
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from utils.asynchttp import Headers, HTTPClient, HTTPError, httpx
+
+
+CLIENTS = [
+    pytest.param(False, id="builtin"),
+    pytest.param(True, id="httpx", marks=pytest.mark.skipif(httpx is None, reason="httpx not installed")),
+]
+
+
+async def _serve(on_connection):
+    server = await asyncio.start_server(on_connection, '127.0.0.1', 0)
+    return server, f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+
+
+class TestBuiltinPool:
+    """Test the fallback connection pool."""
+
+    def _drop_second_request(self, method):
+        """Answer requests on one connection but drop the second without a response."""
+        received = []
+
+        async def on_connection(reader, writer):
+            try:
+                while True:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                    received.append(head.split(b' ', 1)[0].decode())
+                    if len(received) == 2:
+                        break
+                    writer.write(b'HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok')
+                    await writer.drain()
+            except asyncio.IncompleteReadError:
+                pass
+            writer.close()
+
+        async def scenario():
+            server, url = await _serve(on_connection)
+            client = HTTPClient(use_httpx=False)
+            try:
+                await client.request(method, url, timeout=5)
+                try:
+                    return (await client.request(method, url, timeout=5)).status
+                except HTTPError:
+                    return None
+            finally:
+                await client.close()
+                server.close()
+
+        return asyncio.run(scenario()), received
+
+    def test_safe_method_retried_on_fresh_connection(self):
+        """Test that a GET on a dropped pooled connection is resent once."""
+        status, received = self._drop_second_request('GET')
+
+        assert status == 200
+        assert received == ['GET', 'GET', 'GET']
+
+    def test_unsafe_method_not_replayed(self):
+        """Test that a POST the server may have acted on is not resent."""
+        status, received = self._drop_second_request('POST')
+
+        assert status is None
+        assert received == ['POST', 'POST']
+
+    def test_eof_delimited_body_not_pooled(self):
+        """Test that a response without Content-Length or chunking does not return its connection."""
+        async def on_connection(reader, writer):
+            await reader.readuntil(b'\r\n\r\n')
+            writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\n\r\nuntil close')
+            await writer.drain()
+            writer.close()
+
+        async def scenario():
+            server, url = await _serve(on_connection)
+            client = HTTPClient(use_httpx=False)
+            response = await client.request('GET', url, timeout=5)
+            idle = sum(len(conns) for conns in client._idle.values())
+            await client.close()
+            server.close()
+            return response, idle
+
+        response, idle = asyncio.run(scenario())
+        assert response.body == b'until close'
+        assert idle == 0
+
+
+class TestClient:
+    """Test behaviour shared by both client paths."""
+
+    @pytest.mark.parametrize("use_httpx", CLIENTS)
+    def test_timeout_closes_connection(self, use_httpx):
+        """Test that a request cancelled by its timeout closes its connection."""
+        async def scenario():
+            closed = asyncio.Event()
+
+            async def on_connection(reader, writer):
+                await reader.readuntil(b'\r\n\r\n')
+                await reader.read()
+                closed.set()
+                writer.close()
+
+            server, url = await _serve(on_connection)
+            client = HTTPClient(use_httpx=use_httpx)
+            with pytest.raises(asyncio.TimeoutError):
+                await client.request('GET', url, timeout=0.2)
+            await asyncio.wait_for(closed.wait(), 2)
+            await client.close()
+            server.close()
+
+        asyncio.run(scenario())
+
+    @pytest.mark.skipif(httpx is None, reason="httpx not installed")
+    def test_httpx_headers_and_raw_body(self):
+        """Test that only the caller's headers are sent and encoded bodies are not decoded."""
+        payload = gzip.compress(b'{"ok": true}')
+        seen = []
+
+        async def on_connection(reader, writer):
+            head = await reader.readuntil(b'\r\n\r\n')
+            seen.extend(line.split(':', 1)[0].lower() for line in head.decode().split('\r\n')[1:] if line)
+            writer.write(b'HTTP/1.1 200 OK\r\nContent-Encoding: gzip\r\nContent-Length: '
+                         + str(len(payload)).encode() + b'\r\n\r\n' + payload)
+            await writer.drain()
+            writer.close()
+
+        async def scenario():
+            server, url = await _serve(on_connection)
+            client = HTTPClient()
+            response = await client.request('GET', url, Headers([('X-Request-Id', 'abc'), ('Host', 'client')]))
+            await client.close()
+            server.close()
+            return response
+
+        response = asyncio.run(scenario())
+        assert sorted(seen) == ['host', 'x-request-id']
+        assert response.headers.get('Content-Encoding') == 'gzip'
+        assert response.body == payload
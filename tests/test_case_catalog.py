@@ -0,0 +1,205 @@
+"""
+Test Case Catalog
+
+Tests compiling the declarative ProxyTester catalog: status specs, header
+and body predicates, generated route cases, token fixtures and sharding.
+"""
+
+import sys
+import json
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from utils.case_catalog import (
+    TokenFixture, compile_catalog, load_catalog, load_token_fixtures, parse_shard, select, shard, status_matches
+)
+
+
+BASE_DIR = Path(__file__).parent.parent
+CATALOG = BASE_DIR / "config" / "test_catalog.json"
+TOKENS = BASE_DIR / "tests" / "fixtures" / "test_tokens.json"
+
+
+class _Response:
+    """Minimal stand-in for requests.Response."""
+
+    def __init__(self, status_code=200, headers=None, body=""):
+        self.status_code = status_code
+        self.headers = {k.lower(): v for k, v in (headers or {}).items()}
+        self.text = body if isinstance(body, str) else json.dumps(body)
+
+    def json(self):
+        return json.loads(self.text)
+
+
+@pytest.fixture
+def path_mappings():
+    with open(BASE_DIR / "config" / "endpoints.json") as f:
+        return json.load(f)["path_mappings"]
+
+
+def _compile(*entries, **catalog):
+    return compile_catalog({"cases": list(entries), **catalog})
+
+
+class TestStatusSpecs:
+    """Test expected status matching."""
+
+    @pytest.mark.parametrize("status,spec,expected", [
+        (200, ("200",), True),
+        (201, ("200", "201"), True),
+        (204, ("2xx",), True),
+        (302, ("2xx",), False),
+        (401, ("!404", "!5xx"), True),
+        (404, ("!404", "!5xx"), False),
+        (503, ("!404", "!5xx"), False),
+        (404, ("4xx", "!404"), False),
+    ])
+    def test_status_matches(self, status, spec, expected):
+        """Test exact, class and negated status specs."""
+        assert status_matches(status, spec) is expected
+
+    def test_invalid_status_rejected(self):
+        """Test that malformed status specs fail at compile time."""
+        with pytest.raises(ValueError, match="status spec"):
+            _compile({"name": "Bad", "path": "/x", "expect": {"status": "20x"}})
+
+    def test_failure_message(self):
+        """Test the message for an unexpected status."""
+        case = _compile({"name": "Any", "path": "/x", "expect": {"status": ["!404", "!5xx"]}})[0]
+
+        assert case.check(_Response(404)) == (False, "Expected not 404, not 5xx, got 404")
+
+
+class TestPredicates:
+    """Test header and body expectations."""
+
+    def test_header_predicates(self):
+        """Test presence, absence, equality and contains checks."""
+        case = _compile({"name": "Headers", "path": "/x", "expect": {"headers": {
+            "X-Request-Id": True,
+            "x-debug": False,
+            "x-ratelimit-type": "high-rate",
+            "content-type": {"contains": "json"},
+        }}})[0]
+        headers = {"x-request-id": "abc", "x-ratelimit-type": "high-rate", "content-type": "application/json"}
+
+        assert case.check(_Response(200, headers)) == (True, "")
+        ok, message = case.check(_Response(200, dict(headers, **{"x-ratelimit-type": "low-rate"})))
+        assert not ok and "expected 'high-rate'" in message
+        ok, message = case.check(_Response(200, dict(headers, **{"x-debug": "1"})))
+        assert not ok and "x-debug" in message
+
+    def test_body_predicates(self):
+        """Test JSON key and value checks."""
+        case = _compile({"name": "Body", "path": "/x", "expect": {"status": 404, "body": {
+            "json_any_key": ["message", "error"],
+            "json_equals": {"error.code": "NOT_FOUND"},
+        }}})[0]
+
+        assert case.check(_Response(404, body={"error": {"code": "NOT_FOUND"}}))[0]
+        assert not case.check(_Response(404, body={"error": {"code": "OTHER"}}))[0]
+        assert case.check(_Response(404, body="<html>")) == (False, "Response is not valid JSON")
+
+    def test_unknown_body_predicate(self):
+        """Test that typos in predicates fail at compile time."""
+        with pytest.raises(ValueError, match="unknown body predicate"):
+            _compile({"name": "Typo", "path": "/x", "expect": {"body": {"json_key": ["id"]}}})
+
+
+class TestCompile:
+    """Test compiling the catalog."""
+
+    def test_repo_catalog(self, path_mappings):
+        """Test that the shipped catalog compiles with the former hand-written suites."""
+        cases, fixtures = load_catalog(str(CATALOG), path_mappings)
+
+        assert [c.name for c in select(cases, "smoke")] == [
+            "Health Check", "Unauthorized Request", "Invalid Path Returns 404"
+        ]
+        assert len(select(cases, "functional")) == 8
+        assert all(c.token in fixtures for c in cases if c.token)
+        assert all(c.latency_budget_ms == 5000 for c in cases if not c.generated)
+
+    def test_generated_route_cases(self, path_mappings):
+        """Test a case per path mapping and safe method, plus an auth check per protected path."""
+        cases, _ = load_catalog(str(CATALOG), path_mappings)
+        routes = select(cases, "routes")
+        names = {c.name for c in routes}
+
+        for path, mapping in path_mappings.items():
+            safe = [method for method in mapping["method"] if method in ("GET", "HEAD", "OPTIONS")]
+            for method in safe:
+                assert f"Route {method} {path}" in names
+            assert (f"Route {path} requires auth" in names) == (bool(safe) and mapping.get("auth_required", True))
+        health = next(c for c in routes if c.name == "Route GET /health")
+        assert health.token is None
+        assert {c.method for c in cases if c.generated} <= {"GET", "HEAD", "OPTIONS"}
+
+    def test_write_methods_opt_in(self):
+        """Test that write methods are generated only on request, and never into 'all'."""
+        mappings = {"/v1/data": {"method": ["GET", "POST"]}, "/v1/jobs": {"method": ["DELETE"]}}
+        generate = {"path_mappings": True, "token": "valid_user", "unauthenticated_status": 401}
+        fixtures = {"valid_user": TokenFixture("valid_user", {}, "secret")}
+        cases = compile_catalog({"generate": dict(generate, write_methods=True)}, mappings, fixtures)
+
+        assert [c.name for c in select(cases, "all")] == ["Route GET /v1/data", "Route /v1/data requires auth"]
+        writes = select(cases, "routes-write")
+        assert [c.name for c in writes] == ["Route POST /v1/data", "Route DELETE /v1/jobs", "Route /v1/jobs requires auth"]
+        assert writes[0].token == "valid_user" and writes[0].body == {}
+        assert [c.name for c in compile_catalog({"generate": generate}, mappings, fixtures)] == [
+            "Route GET /v1/data", "Route /v1/data requires auth"
+        ]
+        with pytest.raises(ValueError, match="write_suites"):
+            compile_catalog({"generate": dict(generate, write_methods=True, write_suites=["all"])}, mappings, fixtures)
+
+    def test_route_latency_budgets(self):
+        """Test per-path budgets for generated cases, falling back to the defaults."""
+        mappings = {"/fast": {"method": ["GET"]}, "/slow": {"method": ["GET"]}}
+        cases = compile_catalog({
+            "defaults": {"latency_budget_ms": 2000},
+            "generate": {"path_mappings": True, "latency_budgets": {"/fast": 200}},
+        }, mappings)
+        budgets = {c.name: c.latency_budget_ms for c in cases}
+
+        assert budgets == {"Route GET /fast": 200, "Route GET /slow": 2000}
+
+    def test_duplicate_names_rejected(self):
+        """Test that case names must be unique."""
+        with pytest.raises(ValueError, match="Duplicate"):
+            _compile({"name": "Same", "path": "/a"}, {"name": "Same", "path": "/b"})
+
+    def test_unknown_token_fixture(self):
+        """Test that cases must reference an existing token fixture."""
+        with pytest.raises(ValueError, match="unknown token fixture 'nobody'"):
+            _compile({"name": "Who", "path": "/x", "token": "nobody"})
+
+    def test_token_fixtures(self):
+        """Test loading the token fixtures with the shared secret."""
+        fixtures = load_token_fixtures(str(TOKENS))
+
+        assert fixtures["high_rate_user"].rate_limit == "high-rate"
+        assert fixtures["expired_token"].claims["exp"] == 1609459200
+        assert {f.secret for f in fixtures.values()} == {"test-secret-key-for-jwt-signing"}
+
+
+class TestSharding:
+    """Test splitting cases across workers."""
+
+    def test_shards_cover_all_cases_once(self, path_mappings):
+        """Test that shards partition the suite and stay balanced."""
+        cases, _ = load_catalog(str(CATALOG), path_mappings)
+        shards = [shard(cases, i, 4) for i in range(4)]
+
+        assert sorted(c.name for s in shards for c in s) == sorted(c.name for c in cases)
+        assert max(map(len, shards)) - min(map(len, shards)) <= 1
+
+    def test_parse_shard(self):
+        """Test the 1-based I/N CLI syntax."""
+        assert parse_shard("1/4") == (0, 4)
+        assert parse_shard("4/4") == (3, 4)
+        for spec in ("0/4", "5/4", "2", "a/b"):
+            with pytest.raises(ValueError):
+                parse_shard(spec)
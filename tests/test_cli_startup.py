@@ -0,0 +1,120 @@
+"""
+Test Unified CLI and Startup Time
+
+Checks subcommand dispatch in cropwise_apigee.py, the lazy import helper,
+and that cold start stays within budget without loading heavy dependencies.
+"""
+
+import sys
+import subprocess
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import cropwise_apigee
+from utils.lazy_import import MissingModule, lazy_import
+
+
+# Subcommands that must start without requests / google.auth / jwt / colorama
+LAZY_COMMANDS = ['generate', 'deploy', 'deploy-bundle', 'test', 'analyze', 'kvm-sync', 'kvm-snapshot']
+
+
+class TestDispatch:
+    """Test the subcommand entry point."""
+
+    def test_help_lists_every_command(self, capsys):
+        """Test that top-level help lists all subcommands without loading them."""
+        with pytest.raises(SystemExit) as excinfo:
+            cropwise_apigee.main(['--help'])
+        out = capsys.readouterr().out
+
+        assert excinfo.value.code == 0
+        for command in cropwise_apigee.COMMANDS:
+            assert command in out
+
+    def test_arguments_pass_through(self, capsys):
+        """Test that options after the subcommand reach the script's parser."""
+        with pytest.raises(SystemExit) as excinfo:
+            cropwise_apigee.main(['analyze', '--help'])
+
+        assert excinfo.value.code == 0
+        assert "usage: cropwise-apigee analyze" in capsys.readouterr().out
+
+    def test_every_script_exists(self):
+        """Test that each subcommand points at a script with a main()."""
+        for script, _ in cropwise_apigee.COMMANDS.values():
+            path = cropwise_apigee.BASE_DIR / script
+            assert path.exists(), script
+            assert "def main(" in path.read_text()
+
+
+class TestLazyImport:
+    """Test the lazy import helper."""
+
+    def test_missing_module_fails_on_use(self):
+        """Test that a missing module only raises when used, with the install hint."""
+        module = lazy_import('cropwise_no_such_module', install_hint='pip install nothing')
+
+        assert isinstance(module, MissingModule)
+        assert not module
+        with pytest.raises(ImportError, match="pip install nothing"):
+            module.anything
+
+    def test_module_loads_on_first_attribute(self):
+        """Test that a lazily imported module executes on first access."""
+        if 'colorsys' in sys.modules:
+            pytest.skip("colorsys already imported")
+        module = lazy_import('colorsys')
+        try:
+            assert module.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+        finally:
+            sys.modules.pop('colorsys', None)
+
+    def test_first_use_from_threads(self):
+        """Test that threads touching a lazy module at the same moment all see it loaded."""
+        pytest.importorskip("jwt")
+        code = (
+            "import sys, threading; sys.path.insert(0, %r)\n"
+            "from utils.lazy_import import lazy_import\n"
+            "jwt = lazy_import('jwt'); barrier = threading.Barrier(8); errors = []\n"
+            "def use():\n"
+            "    barrier.wait()\n"
+            "    try:\n"
+            "        jwt.encode({'sub': 'x'}, 'secret', algorithm='HS256')\n"
+            "    except Exception as e:\n"
+            "        errors.append(repr(e))\n"
+            "threads = [threading.Thread(target=use) for _ in range(8)]\n"
+            "[t.start() for t in threads]; [t.join() for t in threads]\n"
+            "print(errors)"
+        ) % str(cropwise_apigee.SCRIPTS_DIR)
+        proc = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, timeout=60)
+
+        assert proc.returncode == 0, proc.stderr
+        assert proc.stdout.strip() == "[]"
+
+
+class TestStartupBudget:
+    """Cold start regression checks (fresh interpreters)."""
+
+    @pytest.mark.parametrize("command", LAZY_COMMANDS)
+    def test_no_heavy_modules_at_import(self, command):
+        """Test that the subcommand defers its heavy dependencies."""
+        result = cropwise_apigee.measure_startup(command)
+
+        assert 'error' not in result, result.get('error')
+        assert result['heavy_modules'] == []
+
+    def test_heavy_modules_are_detected(self):
+        """Test that an eager import of requests is reported."""
+        pytest.importorskip("requests")
+        result = cropwise_apigee.measure_startup('latency')
+
+        assert 'requests' in result['heavy_modules']
+
+    def test_cold_start_within_budget(self):
+        """Test the median cold import time of the core subcommands."""
+        # Generous budget for shared CI runners; local runs are well under 50ms
+        report = cropwise_apigee.bench_startup(['generate', 'deploy', 'test', 'analyze'], runs=3, budget_ms=300)
+
+        assert report['passed'], report['commands']
@@ -0,0 +1,272 @@
+"""
+Test Config Model
+
+Checks the typed config model: validation, immutability, environment
+overrides and the per-process cache with mtime invalidation.
+"""
+
+import os
+import sys
+import json
+import dataclasses
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from utils.config_model import ConfigError, clear_config_cache, load_config, parse_config
+
+
+BASE_DIR = Path(__file__).parent.parent
+CONFIG_DIR = BASE_DIR / "config"
+
+
+def _environments(**overrides):
+    env = {
+        "name": "dev",
+        "apigee_org": "org",
+        "apigee_env": "dev",
+        "backend_host": "dev.example.com",
+        "base_path": "/cropwise-unified-platform",
+    }
+    env.update(overrides)
+    return {"environments": {"dev": env}}
+
+
+@pytest.fixture(autouse=True)
+def no_overrides(monkeypatch):
+    """Keep developer environment variables out of the tests."""
+    for name in ("APIGEE_ORG", "APIGEE_ENV", "APIGEE_ENV_DEV", "APIGEE_ENV_PROD", "BACKEND_HOST_DEV"):
+        monkeypatch.delenv(name, raising=False)
+    clear_config_cache()
+    yield
+    clear_config_cache()
+
+
+class TestModel:
+    """Test the model built from the repository config."""
+
+    def test_repository_config_loads(self):
+        """Test that config/ validates and maps to typed objects."""
+        config = load_config(CONFIG_DIR)
+        dev = config.env("dev")
+
+        assert set(config.environments) == {"dev", "qa", "prod"}
+        assert dev.backend_port == 443
+        assert dev.virtual_hosts == ("default", "secure")
+        assert dev.backend_url == "https://dev.api.insights.cropwise.com:443"
+        assert config.path_mappings["/health"].auth_required is False
+        assert config.path_mappings["/v1/data"].methods == ("GET", "POST")
+        assert config.path_mappings["/v1/data"].max_payload_bytes == 31457280
+        assert config.path_mappings["/remote-sensing/v1/imagery"].streaming is True
+        assert config.path_rewrites()["/remote-sensing"] == "/remote-sensing/api"
+        assert "tiers" in config.policy("KVM-Get-User-Rate-Limit")
+
+    def test_dict_style_access(self):
+        """Test item access and get() on environments, including unmodelled keys."""
+        dev = parse_config(_environments(region="eu")).env("dev")
+
+        assert dev["backend_host"] == "dev.example.com"
+        assert dev.get("region") == "eu"
+        assert dev.get("missing", 1) == 1
+        assert "region" in dev and "extra" not in dev
+        assert dev.to_dict()["virtual_hosts"] == ["default", "secure"]
+
+    def test_model_is_immutable(self):
+        """Test that neither the dataclasses nor nested settings can be modified."""
+        config = load_config(CONFIG_DIR)
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            config.env("dev").backend_host = "elsewhere"
+        with pytest.raises(TypeError):
+            config.policies["KVM-Get-User-Rate-Limit"]["tiers"] = {}
+
+    def test_unknown_environment(self):
+        """Test the error for an environment that is not configured."""
+        with pytest.raises(ValueError, match="Environment 'staging' not found"):
+            load_config(CONFIG_DIR).env("staging")
+
+
+class TestValidation:
+    """Test schema validation."""
+
+    def test_errors_are_collected(self):
+        """Test that every problem is reported at once."""
+        environments = _environments(backend_host="", backend_port="443", base_path="api")
+        endpoints = {"endpoints": {}, "path_mappings": {"/v1": {"target": "default", "method": ["FETCH"]}}}
+
+        with pytest.raises(ConfigError) as excinfo:
+            parse_config(environments, endpoints, {"policies": {"x": 1}})
+
+        errors = excinfo.value.errors
+        assert "environments.dev: missing required field: backend_host" in errors
+        assert any("backend_port" in error for error in errors)
+        assert any("base_path" in error for error in errors)
+        assert any("FETCH" in error for error in errors)
+        assert any("policies.json" in error for error in errors)
+
+    def test_payload_settings(self):
+        """Test that streaming must be a boolean and size limits positive byte counts."""
+        endpoints = {"endpoints": {}, "path_mappings": {
+            "/a": {"method": ["GET"], "streaming": "yes"},
+            "/b": {"method": ["POST"], "max_payload_bytes": 0},
+            "/c": {"method": ["POST"], "max_payload_bytes": "30MB"},
+        }}
+
+        with pytest.raises(ConfigError) as excinfo:
+            parse_config(_environments(), endpoints)
+
+        assert len(excinfo.value.errors) == 3
+        assert "path_mappings./a.streaming: must be true or false" in excinfo.value.errors
+
+    def test_compile_path_rewrites(self):
+        """Test that generated rewrites are off unless set to true."""
+        assert not parse_config(_environments(), {"endpoints": {}}).compile_path_rewrites
+        assert parse_config(_environments(), {"endpoints": {}, "compile_path_rewrites": True}).compile_path_rewrites
+
+        with pytest.raises(ConfigError) as excinfo:
+            parse_config(_environments(), {"endpoints": {}, "compile_path_rewrites": "yes"})
+        assert excinfo.value.errors == ["compile_path_rewrites: must be true or false"]
+
+    def test_read_only_routes(self):
+        """Test read-only route validation and the replica URL from its own host setting."""
+        endpoints = {
+            "endpoints": {"replica": {"url_template": "{protocol}://{host}:{port}/read-only"}},
+            "read_only_routes": {"target": "replica", "paths": ["/v1/users/*"], "regex": ["/imagery.*"]},
+        }
+        config = parse_config(_environments(replica_host="replica.example.com"), endpoints)
+
+        assert config.read_only_routes.methods == ("GET",)
+        assert config.endpoints["replica"].url(config.env("dev")) == "https://replica.example.com:443/read-only"
+
+        endpoints["read_only_routes"] = {"target": "other", "paths": ["v1/users"], "regex": ["(unclosed"]}
+        with pytest.raises(ConfigError) as excinfo:
+            parse_config(_environments(), endpoints)
+        assert len(excinfo.value.errors) == 3
+
+    def test_backend_servers(self):
+        """Test server defaults, the Weighted default for uneven weights and the dict round trip."""
+        environments = _environments(backend_port=8443, backend_servers=[
+            {"host": "a.example.com", "weight": 3},
+            {"name": "spare", "host": "b.example.com"},
+        ])
+        env = parse_config(environments).env("dev")
+
+        assert [(s.name, s.port, s.weight) for s in env.backend_servers] == [
+            ("cropwise-backend-1", 8443, 3), ("spare", 8443, 1)
+        ]
+        assert env.load_balancer.algorithm == "Weighted"
+        assert env.load_balancer.health_monitor.path == "/health"
+        assert parse_config({"environments": {"dev": env.to_dict()}}).env("dev") == env
+
+    def test_load_balancer_validation(self):
+        """Test algorithm, weight and health monitor checks."""
+        environments = _environments(
+            backend_servers=[{"host": "a", "weight": 2}, {"host": "b", "port": 8443, "weight": 0}],
+            load_balancer={"algorithm": "RoundRobin", "health_monitor": {"path": "health", "success_codes": []}},
+        )
+
+        with pytest.raises(ConfigError) as excinfo:
+            parse_config(environments)
+
+        errors = excinfo.value.errors
+        assert "environments.dev.backend_servers[1].weight: must be a whole number from 1 to 100, got 0" in errors
+        assert any("weights only apply to Weighted" in error for error in errors)
+        assert any("share one port" in error for error in errors)
+        assert any("health_monitor.path" in error for error in errors)
+        assert any("success_codes" in error for error in errors)
+
+    def test_server_port_defaults_to_backend_port(self):
+        """Test that the shared-port check uses backend_port for servers without a port."""
+        shared = _environments(backend_port=8443, backend_servers=[{"host": "a"}, {"host": "b", "port": 8443}])
+        assert parse_config(shared).env("dev").load_balancer.health_monitor is not None
+
+        mixed = _environments(backend_port=8443, backend_servers=[{"host": "a"}, {"host": "b", "port": 443}])
+        with pytest.raises(ConfigError, match="share one port"):
+            parse_config(mixed)
+
+    def test_unknown_target_endpoint(self):
+        """Test that path mappings must reference a defined endpoint."""
+        endpoints = {"endpoints": {"default": {}}, "path_mappings": {"/v1": {"target": "other", "method": ["GET"]}}}
+
+        with pytest.raises(ConfigError, match="unknown endpoint 'other'"):
+            parse_config(_environments(), endpoints)
+
+
+class TestOverridesAndCache:
+    """Test environment overrides and caching."""
+
+    def test_environment_overrides(self, monkeypatch):
+        """Test APIGEE_ORG, APIGEE_ENV and BACKEND_HOST_<ENV>."""
+        monkeypatch.setenv("APIGEE_ORG", "override-org")
+        monkeypatch.setenv("BACKEND_HOST_DEV", "localhost")
+        config = parse_config(_environments())
+
+        assert config.env("dev").apigee_org == "override-org"
+        assert config.env("dev").backend_host == "localhost"
+
+    def test_apigee_env_naming_another_environment(self, monkeypatch):
+        """Test that APIGEE_ENV=dev does not send prod to the dev Apigee environment."""
+        environments = _environments()
+        environments["environments"]["prod"] = dict(
+            environments["environments"]["dev"], name="prod", apigee_env="prod", backend_host="example.com"
+        )
+        monkeypatch.setenv("APIGEE_ENV", "dev")
+        config = parse_config(environments)
+
+        assert config.env("dev").apigee_env == "dev"
+        with pytest.warns(UserWarning, match="APIGEE_ENV_PROD"):
+            assert config.env("prod").apigee_env == "prod"
+
+        monkeypatch.setenv("APIGEE_ENV", "sandbox")
+        assert config.env("prod").apigee_env == "sandbox"
+        monkeypatch.setenv("APIGEE_ENV_PROD", "prod-eu")
+        assert config.env("prod").apigee_env == "prod-eu"
+        assert config.env("dev").apigee_env == "sandbox"
+
+    def test_backend_host_override_drops_servers(self, monkeypatch):
+        """Test that BACKEND_HOST_<ENV> points the whole environment at one host."""
+        monkeypatch.setenv("BACKEND_HOST_DEV", "localhost")
+        config = parse_config(_environments(backend_servers=[{"host": "a"}, {"host": "b"}]))
+
+        assert config.env("dev").backend_servers == ()
+        assert len(config.env("dev", overrides=False).backend_servers) == 2
+        assert config.env("dev").apigee_env == "dev"
+        assert config.env("dev", overrides=False).backend_host == "dev.example.com"
+
+    def test_cached_until_file_changes(self, tmp_path):
+        """Test that a config is parsed once and re-read after its mtime changes."""
+        path = tmp_path / "environments.json"
+        path.write_text(json.dumps(_environments()))
+
+        first = load_config(tmp_path)
+        assert load_config(tmp_path) is first
+
+        path.write_text(json.dumps(_environments(backend_host="new.example.com")))
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        second = load_config(tmp_path)
+
+        assert second is not first
+        assert second.env("dev").backend_host == "new.example.com"
+
+    def test_missing_environments_file(self, tmp_path):
+        """Test that environments.json is required while the others are optional."""
+        with pytest.raises(FileNotFoundError):
+            load_config(tmp_path)
+
+        (tmp_path / "environments.json").write_text(json.dumps(_environments()))
+        config = load_config(tmp_path)
+        assert config.policies == {} and config.path_mappings == {}
+
+    def test_config_loader_uses_model(self):
+        """Test that ConfigLoader returns dicts from the cached model."""
+        pytest.importorskip("dotenv")
+        from utils.config_loader import ConfigLoader
+
+        loader = ConfigLoader(str(BASE_DIR))
+        env_config = loader.get_env_config("dev")
+        env_config["backend_host"] = "mutated"
+
+        assert loader.get_env_config("dev")["backend_host"] == "dev.api.insights.cropwise.com"
+        assert loader.validate_config("dev") is True
@@ -0,0 +1,264 @@
+"""
+Test Proxy Generator
+
+Generates bundles from the repository's apiproxy and checks the optional
+policy variants wired in by the generator.
+"""
+
+import sys
+import json
+import shutil
+import zipfile
+import pytest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from generate_proxy import ProxyGenerator
+from utils.policy_templates import insert_steps, lookup_cache_policy, populate_cache_policy
+
+
+BASE_DIR = Path(__file__).parent.parent
+
+
+def _generate(tmp_path, base_dir=BASE_DIR, **kwargs):
+    """Generate a bundle and extract it, returning the apiproxy directory."""
+    generator = ProxyGenerator(base_dir=str(base_dir), env="dev", **kwargs)
+    bundle = generator.generate(str(tmp_path / "dist"))
+    with zipfile.ZipFile(bundle) as zf:
+        zf.extractall(tmp_path / "bundle")
+    return tmp_path / "bundle" / "apiproxy"
+
+
+def _base_dir(tmp_path, path_mappings=None, preflow_policy=None):
+    """Copy apiproxy and config to tmp_path, optionally changing path mappings or adding a PreFlow policy."""
+    base = tmp_path / "base"
+    shutil.copytree(BASE_DIR / "apiproxy", base / "apiproxy")
+    shutil.copytree(BASE_DIR / "config", base / "config")
+    if path_mappings:
+        endpoints_file = base / "config" / "endpoints.json"
+        endpoints = json.loads(endpoints_file.read_text())
+        endpoints["path_mappings"].update(path_mappings)
+        endpoints_file.write_text(json.dumps(endpoints))
+    if preflow_policy:
+        name = preflow_policy.get("name")
+        ET.ElementTree(preflow_policy).write(base / "apiproxy" / "policies" / f"{name}.xml")
+        proxy_file = base / "apiproxy" / "proxies" / "default.xml"
+        tree = ET.parse(proxy_file)
+        step = ET.SubElement(tree.getroot().find("./PreFlow/Request"), "Step")
+        ET.SubElement(step, "Name").text = name
+        tree.write(proxy_file)
+    return base
+
+
+def _flows(apiproxy):
+    root = ET.parse(apiproxy / "proxies" / "default.xml").getroot()
+    return root.findall("./Flows/Flow")
+
+
+def _preflow_steps(apiproxy):
+    root = ET.parse(apiproxy / "proxies" / "default.xml").getroot()
+    return [
+        (step.findtext("Name"), step.findtext("Condition"))
+        for step in root.findall("./PreFlow/Request/Step")
+    ]
+
+
+class TestPolicyTemplates:
+    """Test generated policy builders and step wiring."""
+
+    def test_insert_steps_around_anchor(self):
+        """Test that steps are inserted directly before and after the anchor."""
+        request = ET.fromstring("<Request><Step><Name>A</Name></Step><Step><Name>B</Name></Step></Request>")
+
+        assert insert_steps(request, "A", before=[("X", None)], after=[("Y", "c = 1"), ("Z", None)])
+        assert [s.findtext("Name") for s in request] == ["X", "A", "Y", "Z", "B"]
+        assert request[2].findtext("Condition") == "c = 1"
+        assert not insert_steps(request, "missing", before=[("X", None)])
+
+    def test_cache_policies_share_key(self):
+        """Test that lookup and populate use the same cache key."""
+        lookup = lookup_cache_policy("LC", "jwt.signature", "out", prefix="p")
+        populate = populate_cache_policy("PC", "jwt.signature", "in", 60, prefix="p")
+
+        assert ET.tostring(lookup.find("CacheKey")) == ET.tostring(populate.find("CacheKey"))
+        assert populate.findtext("ExpirySettings/TimeoutInSec") == "60"
+
+
+class TestJWTParserVariant:
+    """Test the --jwt-parser generator option."""
+
+    def test_standard_parser_is_unchanged(self, tmp_path):
+        """Test that the default bundle keeps the original script and flow."""
+        apiproxy = _generate(tmp_path)
+
+        policy = ET.parse(apiproxy / "policies" / "JS-Parse-JWT-Token.xml").getroot()
+        assert policy.findtext("ResourceURL") == "jsc://parse-jwt-token.js"
+        assert not (apiproxy / "policies" / "LC-JWT-Claims.xml").exists()
+
+    def test_optimized_parser_wires_cache(self, tmp_path):
+        """Test that the optimized variant adds the claims cache around the parser."""
+        apiproxy = _generate(tmp_path, jwt_parser="optimized")
+
+        policy = ET.parse(apiproxy / "policies" / "JS-Parse-JWT-Token.xml").getroot()
+        assert policy.findtext("ResourceURL") == "jsc://parse-jwt-token-optimized.js"
+
+        names = [name for name, _ in _preflow_steps(apiproxy)]
+        index = names.index("JS-Parse-JWT-Token")
+        assert names[index - 2:index + 2] == [
+            "EV-Extract-JWT-Signature", "LC-JWT-Claims", "JS-Parse-JWT-Token", "PC-JWT-Claims"
+        ]
+
+        populate = ET.parse(apiproxy / "policies" / "PC-JWT-Claims.xml").getroot()
+        assert populate.findtext("ExpirySettings/TimeoutInSec") == "300"
+
+        descriptor = ET.parse(next(apiproxy.glob("*.xml"))).getroot()
+        registered = {p.text for p in descriptor.findall("./Policies/Policy")}
+        assert {"EV-Extract-JWT-Signature", "LC-JWT-Claims", "PC-JWT-Claims"} <= registered
+
+    def test_unknown_parser_rejected(self):
+        """Test that an unknown variant is rejected."""
+        with pytest.raises(ValueError):
+            ProxyGenerator(base_dir=str(BASE_DIR), env="dev", jwt_parser="fast")
+
+
+class TestRateLimitCache:
+    """Test the --cache-rate-limits generator option."""
+
+    def test_kvm_only_read_on_cache_miss(self, tmp_path):
+        """Test that the KVM lookup is wrapped by the rate-limit cache."""
+        apiproxy = _generate(tmp_path, cache_rate_limits=True)
+
+        steps = _preflow_steps(apiproxy)
+        names = [name for name, _ in steps]
+        index = names.index("KVM-Get-User-Rate-Limit")
+        assert names[index - 2:index + 3] == [
+            "AM-Timestamp-KVM-Start", "LC-User-Rate-Limit", "KVM-Get-User-Rate-Limit",
+            "PC-User-Rate-Limit", "AM-Timestamp-KVM-End"
+        ]
+        assert steps[index][1].endswith("and (lookupcache.LC-User-Rate-Limit.cachehit = false)")
+
+        lookup = ET.parse(apiproxy / "policies" / "LC-User-Rate-Limit.xml").getroot()
+        assert lookup.find("CacheKey/KeyFragment").get("ref") == "jwt.username"
+        assert lookup.findtext("AssignTo") == "user.rate.limit.type"
+
+    def test_combined_with_optimized_parser(self, tmp_path):
+        """Test that both caches can be enabled together."""
+        apiproxy = _generate(tmp_path, jwt_parser="optimized", cache_rate_limits=True)
+
+        names = [name for name, _ in _preflow_steps(apiproxy)]
+        assert {"LC-JWT-Claims", "PC-JWT-Claims", "LC-User-Rate-Limit", "PC-User-Rate-Limit"} <= set(names)
+
+
+class TestPayloadRoutes:
+    """Test streaming and payload-limit flows generated from endpoints.json."""
+
+    def test_streaming_and_limit_flows(self, tmp_path):
+        """Test that configured routes get flows ahead of the flow they shadow."""
+        apiproxy = _generate(tmp_path)
+        flows = {flow.get("name"): flow for flow in _flows(apiproxy)}
+        names = list(flows)
+
+        streaming = flows["remote-sensing-v1-imagery"]
+        assert names.index("remote-sensing-v1-imagery") < names.index("remote-sensing")
+        assert streaming.findtext("Condition") == (
+            '(proxy.pathsuffix MatchesPath "/remote-sensing/v1/imagery/**") and (request.verb = "GET")'
+        )
+        assert [s.findtext("Name") for s in streaming.findall("./Request/Step")] == [
+            "AM-Enable-Streaming", "AM-Rewrite-Remote-Sensing-URI"
+        ]
+
+        limit = flows["v1-data"].find("./Request/Step")
+        assert limit.findtext("Name") == "RF-PayloadTooLarge"
+        assert limit.findtext("Condition") == "(request.header.Content-Length > 31457280)"
+
+        descriptor = ET.parse(next(apiproxy.glob("*.xml"))).getroot()
+        assert "AM-Enable-Streaming" in {p.text for p in descriptor.findall("./Policies/Policy")}
+
+    def test_custom_limit_gets_own_fault(self, tmp_path):
+        """Test that a non-default limit raises a fault reporting that limit."""
+        base = _base_dir(tmp_path, {"/v1/uploads": {"method": ["POST"], "max_payload_bytes": 50 * 1024 * 1024}})
+        apiproxy = _generate(tmp_path, base_dir=base)
+
+        policy = ET.parse(apiproxy / "policies" / "RF-PayloadTooLarge-50MB.xml").getroot()
+        details = json.loads(policy.findtext(".//Payload").replace("{messageid}", ""))["details"]
+        assert policy.get("name") == "RF-PayloadTooLarge-50MB"
+        assert details["max_size_bytes"] == 52428800
+        assert details["max_size_mb"] == 50
+
+    def test_body_policy_rejected_on_streaming_route(self, tmp_path):
+        """Test that generation fails when a streaming route would inspect the payload."""
+        policy = ET.Element("JSONThreatProtection", {"name": "JTP-Body"})
+        ET.SubElement(policy, "Source").text = "request"
+        base = _base_dir(tmp_path, preflow_policy=policy)
+
+        with pytest.raises(RuntimeError, match="'JTP-Body' .* inspects the payload on streaming route"):
+            _generate(tmp_path, base_dir=base)
+
+
+class TestLoadBalancedTargets:
+    """Test TargetServers and the LoadBalancer generated from backend_servers."""
+
+    def _generate(self, tmp_path, read_replica=False, **env):
+        environments = json.loads((BASE_DIR / "config" / "environments.json").read_text())
+        environments["environments"]["dev"].update(env)
+        tmp_path.mkdir(exist_ok=True)
+        config_path = tmp_path / "environments.json"
+        config_path.write_text(json.dumps(environments))
+        return _generate(tmp_path, config_path=str(config_path), read_replica=read_replica)
+
+    def test_load_balancer_and_target_servers(self, tmp_path):
+        """Test that the target URL becomes a weighted LoadBalancer with a health monitor."""
+        apiproxy = self._generate(tmp_path, backend_servers=[
+            {"host": "a.example.com", "weight": 2}, {"host": "b.example.com"}
+        ], load_balancer={"max_failures": 3, "health_monitor": {"path": "/health", "interval_seconds": 5}})
+        connection = ET.parse(apiproxy / "targets" / "default.xml").getroot().find("HTTPTargetConnection")
+        balancer = connection.find("LoadBalancer")
+
+        assert connection.find("URL") is None
+        assert balancer.findtext("Algorithm") == "Weighted"
+        assert [(s.get("name"), s.findtext("Weight")) for s in balancer.findall("Server")] == [
+            ("cropwise-backend-1", "2"), ("cropwise-backend-2", "1")
+        ]
+        assert balancer.findtext("MaxFailures") == "3"
+        assert connection.findtext("./HealthMonitor/IntervalInSec") == "5"
+        assert connection.findtext("./HealthMonitor/HTTPMonitor/Request/Path") == "/health"
+
+        servers = json.loads(next((tmp_path / "dist").glob("*-targetservers.json")).read_text())
+        assert [(s["name"], s["host"], s["port"], s["sSLInfo"]["enabled"]) for s in servers] == [
+            ("cropwise-backend-1", "a.example.com", 443, True), ("cropwise-backend-2", "b.example.com", 443, True)
+        ]
+
+    def test_read_replica_target(self, tmp_path):
+        """Test that the replica shares the servers under its path, or uses its own host."""
+        servers = [{"host": "a.example.com"}, {"host": "b.example.com"}]
+        shared = ET.parse(self._generate(tmp_path / "shared", read_replica=True, backend_servers=servers)
+                          / "targets" / "read-replica.xml").getroot().find("HTTPTargetConnection")
+        own = ET.parse(self._generate(tmp_path / "own", backend_servers=servers, read_replica_host="replica.example.com")
+                       / "targets" / "read-replica.xml").getroot().find("HTTPTargetConnection")
+
+        assert shared.find("LoadBalancer") is not None
+        assert shared.findtext("Path") == "/read-only"
+        assert own.find("LoadBalancer") is None
+        assert own.findtext("URL") == "https://replica.example.com:443/read-only"
+
+    @pytest.mark.parametrize("env", ["dev", "prod"])
+    def test_read_replica_off_by_default(self, tmp_path, env):
+        """Test that shipped environments get no replica target or RouteRule without opting in."""
+        generator = ProxyGenerator(base_dir=str(BASE_DIR), env=env)
+        with zipfile.ZipFile(generator.generate(str(tmp_path / "dist"))) as zf:
+            names = zf.namelist()
+            proxy = ET.fromstring(zf.read("apiproxy/proxies/default.xml"))
+
+        assert "apiproxy/targets/read-replica.xml" not in names
+        assert [rule.findtext("TargetEndpoint") for rule in proxy.findall("RouteRule")] == ["default"]
+
+    def test_single_backend_unchanged(self, tmp_path):
+        """Test that environments without backend_servers keep one URL and no TargetServers."""
+        apiproxy = _generate(tmp_path)
+        connection = ET.parse(apiproxy / "targets" / "default.xml").getroot().find("HTTPTargetConnection")
+
+        assert connection.findtext("URL") == "https://dev.api.insights.cropwise.com:443"
+        assert connection.find("LoadBalancer") is None
+        assert list((tmp_path / "dist").glob("*-targetservers.json")) == []
@@ -0,0 +1,157 @@
+"""
+Test JavaScript Harness
+
+Runs the proxy's JavaScript policy resources through the local harness.
+Skipped when no JavaScript engine (Node.js or py_mini_racer) is available.
+"""
+
+import sys
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from utils.js_harness import JSPolicyHarness, available_engines, encode_unsigned_jwt, generate_jwt_inputs, summarize
+
+
+JSC_DIR = Path(__file__).parent.parent / "apiproxy" / "resources" / "jsc"
+NOW = 1770000000
+
+pytestmark = pytest.mark.skipif(not available_engines(), reason="No JavaScript engine available")
+
+
+@pytest.fixture(scope="module")
+def harness():
+    """Start one engine for the whole module."""
+    with JSPolicyHarness() as h:
+        yield h
+
+
+class TestParseJWTToken:
+    """Tests for parse-jwt-token.js under the harness."""
+    
+    def test_valid_token_claims(self, harness):
+        """Test that claims are exposed as jwt.* variables."""
+        name = harness.load(JSC_DIR / "parse-jwt-token.js")
+        token = encode_unsigned_jwt({
+            "sub": "abc", "user_name": "test.user@syngenta.com", "azp": "strider-ui",
+            "iss": "cropwise", "iat": NOW - 10, "exp": NOW + 3600, "roles": ["admin"]
+        })
+        
+        result = harness.run(name, {"jwt.token": token}, now_ms=NOW * 1000)
+        
+        assert result.error is None
+        assert result.variables["jwt.valid"] is True
+        assert result.variables["jwt.username"] == "test.user@syngenta.com"
+        assert result.variables["jwt.client_id"] == "strider-ui"
+        assert result.variables["jwt.roles"] == '["admin"]'
+        assert result.variables["jwt.expired"] is False
+        assert result.prints == ["[JWT] Parsed token for user: test.user@syngenta.com"]
+    
+    def test_expired_token(self, harness):
+        """Test that an expired token is marked invalid using the fixed clock."""
+        name = harness.load(JSC_DIR / "parse-jwt-token.js")
+        token = encode_unsigned_jwt({"sub": "abc", "exp": NOW - 1})
+        
+        result = harness.run(name, {"jwt.token": token}, now_ms=NOW * 1000)
+        
+        assert result.variables["jwt.valid"] is False
+        assert result.variables["jwt.error"] == "Token expired"
+    
+    def test_missing_token(self, harness):
+        """Test the no-token branch."""
+        name = harness.load(JSC_DIR / "parse-jwt-token.js")
+        
+        result = harness.run(name, {})
+        
+        assert result.variables == {"jwt.valid": False, "jwt.error": "No token provided"}
+
+
+class TestParseJWTTokenOptimized:
+    """Tests for parse-jwt-token-optimized.js against the standard script."""
+    
+    @staticmethod
+    def _without_cache(variables):
+        return {k: v for k, v in variables.items() if k != "jwt.claims.cache"}
+    
+    def test_matches_standard_script(self, harness):
+        """Test that a cache miss sets the same variables as parse-jwt-token.js."""
+        standard = harness.load(JSC_DIR / "parse-jwt-token.js")
+        optimized = harness.load(JSC_DIR / "parse-jwt-token-optimized.js")
+        inputs = generate_jwt_inputs(2000, seed=11, now=NOW)
+        
+        expected = harness.run_batch(standard, inputs, now_ms=NOW * 1000)
+        actual = harness.run_batch(optimized, inputs, now_ms=NOW * 1000)
+        
+        for variables, want, got in zip(inputs, expected, actual):
+            assert self._without_cache(got.variables) == want.variables, variables
+            assert got.prints == []
+    
+    def test_cache_hit_skips_parsing(self, harness):
+        """Test that cached claims reproduce the miss result and are not re-cached."""
+        name = harness.load(JSC_DIR / "parse-jwt-token-optimized.js")
+        token = encode_unsigned_jwt({"user_name": "u@syngenta.com", "azp": "strider-ui", "roles": ["a"], "exp": NOW + 60})
+        
+        miss = harness.run(name, {"jwt.token": token}, now_ms=NOW * 1000)
+        cached = miss.variables["jwt.claims.cache"]
+        hit = harness.run(name, {"jwt.token": "x.y.z", "jwt.cached.claims": cached}, now_ms=NOW * 1000)
+        
+        assert "jwt.claims.cache" not in hit.variables
+        assert hit.variables == self._without_cache(miss.variables)
+    
+    def test_cached_claims_still_expire(self, harness):
+        """Test that expiry is evaluated on every hit, not cached."""
+        name = harness.load(JSC_DIR / "parse-jwt-token-optimized.js")
+        token = encode_unsigned_jwt({"sub": "abc", "exp": NOW + 60})
+        cached = harness.run(name, {"jwt.token": token}, now_ms=NOW * 1000).variables["jwt.claims.cache"]
+        
+        later = harness.run(name, {"jwt.token": token, "jwt.cached.claims": cached}, now_ms=(NOW + 120) * 1000)
+        
+        assert later.variables["jwt.valid"] is False
+        assert later.variables["jwt.expired"] is True
+        assert later.variables["jwt.error"] == "Token expired"
+
+
+class TestHandleReadOnlyRoutes:
+    """Tests for handle-readonly-routes.js under the harness."""
+    
+    @pytest.mark.parametrize("verb,path,expected", [
+        ("GET", "/v1/users/42", True),
+        ("GET", "/v1/users/42/roles", False),
+        ("POST", "/v1/users/42", False),
+        ("GET", "/remote-sensing/v1/imagery/tiles", True),
+        ("GET", "/health", False),
+    ])
+    def test_readonly_detection(self, harness, verb, path, expected):
+        """Test read-only classification of request paths."""
+        name = harness.load(JSC_DIR / "handle-readonly-routes.js")
+        
+        result = harness.run(name, {"proxy.pathsuffix": path, "request.verb": verb})
+        
+        assert result.variables["is.readonly.request"] is expected
+
+
+class TestHarness:
+    """Tests for harness behaviour."""
+    
+    def test_uncaught_errors_are_reported(self, harness, tmp_path):
+        """Test that exceptions escaping a script are captured per invocation."""
+        script = tmp_path / "throws.js"
+        script.write_text('context.setVariable("before", 1); throw new Error("boom");')
+        name = harness.load(script)
+        
+        results = harness.run_batch(name, [{}, {}])
+        
+        assert [r.error for r in results] == ["boom", "boom"]
+        assert results[0].variables == {"before": 1}
+        assert summarize(results)["errors"] == 2
+    
+    def test_variables_do_not_leak_between_invocations(self, harness, tmp_path):
+        """Test that top-level vars are local to one invocation."""
+        script = tmp_path / "counter.js"
+        script.write_text('var n = (typeof n === "number" ? n : 0) + 1; context.setVariable("n", n);')
+        name = harness.load(script)
+        
+        results = harness.run_batch(name, [{}, {}, {}])
+        
+        assert [r.variables["n"] for r in results] == [1, 1, 1]
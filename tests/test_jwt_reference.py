@@ -0,0 +1,157 @@
+"""
+Test JWT Reference Implementation
+
+Checks the Python port of parse-jwt-token.js directly, and differentially
+against the JavaScript policy when a JavaScript engine is available.
+"""
+
+import sys
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from utils.js_harness import JSPolicyHarness, available_engines, encode_unsigned_jwt, generate_jwt_inputs
+from utils.jwt_reference import parse_jwt_token, parse_jwt_batch
+from replay_jwt import extract_token, replay
+
+
+JSC_DIR = Path(__file__).parent.parent / "apiproxy" / "resources" / "jsc"
+NOW = 1770000000
+
+# Error messages whose wording is identical in V8 and the reference
+EXACT_ERRORS = ("Invalid JWT format", "Invalid character", "URI malformed", "Cannot read", "No token", "Token expired")
+
+
+def _normalize(variables):
+    """Mask JSON syntax error wording, which differs between engines."""
+    variables = dict(variables)
+    error = variables.get("jwt.error")
+    if error and not any(known in error for known in EXACT_ERRORS):
+        variables["jwt.error"] = "Failed to parse JWT: <json error>"
+    return variables
+
+
+class TestParseJWTToken:
+    """Test the reference parser."""
+
+    def test_claim_fallbacks(self):
+        """Test username/user_name/sub and client_id/azp fallbacks."""
+        token = encode_unsigned_jwt({"sub": "abc", "user_name": "u@syngenta.com", "azp": "strider-ui", "exp": NOW + 60})
+
+        result = parse_jwt_token(token, now=NOW)
+
+        assert result["jwt.valid"] is True
+        assert result["jwt.sub"] == "abc"
+        assert result["jwt.username"] == "u@syngenta.com"
+        assert result["jwt.client_id"] == "strider-ui"
+        assert result["jwt.iss"] == ""
+        assert result["jwt.expired"] is False
+
+    def test_falsy_claims_fall_through(self):
+        """Test that empty strings and zero use JavaScript truthiness."""
+        token = encode_unsigned_jwt({"username": "", "sub": "fallback", "client_id": 0, "exp": 0})
+
+        result = parse_jwt_token(token, now=NOW)
+
+        assert result["jwt.username"] == "fallback"
+        assert result["jwt.client_id"] == ""
+        assert result["jwt.exp"] == 0
+        assert result["jwt.expired"] is False
+
+    def test_expired_token(self):
+        """Test that an expired token is invalid."""
+        result = parse_jwt_token(encode_unsigned_jwt({"sub": "abc", "exp": NOW - 1}), now=NOW)
+
+        assert result["jwt.valid"] is False
+        assert result["jwt.expired"] is True
+        assert result["jwt.error"] == "Token expired"
+
+    def test_optional_claims(self):
+        """Test scope, roles (JSON.stringify) and is_using_rbac."""
+        token = encode_unsigned_jwt({"sub": "abc", "scope": "read", "roles": ["a", 1.5, None], "is_using_rbac": False})
+
+        result = parse_jwt_token(token, now=NOW)
+
+        assert result["jwt.scope"] == "read"
+        assert result["jwt.roles"] == '["a",1.5,null]'
+        assert result["jwt.is_using_rbac"] is False
+
+    def test_malformed_tokens(self):
+        """Test error messages for malformed tokens."""
+        assert parse_jwt_token(None)["jwt.error"] == "No token provided"
+        assert parse_jwt_token("a.b")["jwt.error"] == "Failed to parse JWT: Invalid JWT format"
+        assert parse_jwt_token("a.%%%.c")["jwt.error"] == "Failed to parse JWT: Invalid character"
+        null_payload = parse_jwt_token(encode_unsigned_jwt(None))
+        assert null_payload["jwt.error"] == "Failed to parse JWT: Cannot read properties of null (reading 'sub')"
+
+    def test_prints(self):
+        """Test that print() output is reproduced."""
+        prints = []
+        parse_jwt_token(encode_unsigned_jwt({"sub": "abc"}), now=NOW, prints=prints)
+
+        assert prints == ["[JWT] Parsed token for user: abc"]
+
+    def test_batch_reuses_duplicates(self):
+        """Test that duplicate tokens are parsed once."""
+        token = encode_unsigned_jwt({"sub": "abc"})
+
+        results = parse_jwt_batch([token, None, token], now=NOW)
+
+        assert results[0] is results[2]
+        assert results[1]["jwt.valid"] is False
+
+    def test_generated_inputs_reproducible(self):
+        """Test that a seed reproduces the generated tokens, signatures included."""
+        assert generate_jwt_inputs(200, seed=5, now=NOW) == generate_jwt_inputs(200, seed=5, now=NOW)
+        assert generate_jwt_inputs(200, seed=5, now=NOW) != generate_jwt_inputs(200, seed=6, now=NOW)
+
+
+class TestReplay:
+    """Test the token replay helpers."""
+
+    def test_extract_token(self):
+        """Test raw, Bearer and Authorization header lines."""
+        assert extract_token("abc.def.ghi\n") == "abc.def.ghi"
+        assert extract_token("Bearer abc.def.ghi") == "abc.def.ghi"
+        assert extract_token("Authorization: Bearer abc.def.ghi") == "abc.def.ghi"
+
+    def test_replay_summary(self):
+        """Test aggregate counts over a chunked replay."""
+        tokens = [
+            encode_unsigned_jwt({"username": "u1", "client_id": "c1", "exp": NOW + 60}),
+            encode_unsigned_jwt({"username": "u1", "exp": NOW - 60}),
+            "not-a-token",
+        ]
+
+        summary = replay(iter(tokens), now=NOW, chunk_size=2)
+
+        assert summary["tokens"] == 3
+        assert summary["valid"] == 1
+        assert summary["expired"] == 1
+        assert summary["errors"] == 1
+        assert summary["top_users"] == [("u1", 2)]
+
+
+@pytest.mark.skipif(not available_engines(), reason="No JavaScript engine available")
+class TestDifferential:
+    """Compare the reference with parse-jwt-token.js run through the harness."""
+
+    def test_matches_javascript(self):
+        """Test identical variables and prints over generated and edge-case tokens."""
+        inputs = generate_jwt_inputs(2000, seed=7, now=NOW)
+        for claims in ["abc", [1, 2], 5, True, {"exp": "17"}, {"exp": [1]},
+                       {"sub": 0, "username": ""}, {"roles": {"a": [1, None]}, "exp": 1e21}]:
+            inputs.append({"jwt.token": encode_unsigned_jwt(claims)})
+
+        with JSPolicyHarness() as harness:
+            name = harness.load(JSC_DIR / "parse-jwt-token.js")
+            results = harness.run_batch(name, inputs, now_ms=NOW * 1000)
+
+        for variables, result in zip(inputs, results):
+            prints = []
+            expected = parse_jwt_token(variables.get("jwt.token"), now=NOW, prints=prints)
+            assert result.error is None
+            assert _normalize(expected) == _normalize(result.variables), variables
+            if "jwt.error" not in expected or "expired" in expected["jwt.error"]:
+                assert prints == result.prints, variables
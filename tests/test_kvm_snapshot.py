@@ -0,0 +1,155 @@
+"""
+Test KVM Snapshot
+
+Checks the sorted snapshot writer, indexed lookups and stats, the paginated
+export from the management API emulator, and the snapshot as a KVM source
+for the local gateway, the rate-limit simulator and KVM sync.
+"""
+
+import sys
+import json
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from utils.kvm_snapshot import KvmSnapshot, SnapshotWriter, export_snapshot, is_snapshot, write_snapshot
+
+
+KVM = "user-rate-limits"
+TIERS = ["low-rate", "medium-rate", "high-rate", "readonly-low-rate"]
+
+
+def _entries(count):
+    return {f"user{i:04d}@syngenta.com": TIERS[i % len(TIERS)] for i in range(count)}
+
+
+class TestSnapshotWriter:
+    """Test building snapshots."""
+
+    def test_runs_are_merged_sorted_and_deduplicated(self, tmp_path):
+        """Test several spilled runs, out-of-order input and last-wins duplicates."""
+        path = tmp_path / "kvm.kvs"
+        with SnapshotWriter(str(path), kvm_name=KVM, run_size=7, block_size=4) as writer:
+            for i in reversed(range(30)):
+                writer.add(f"user{i:02d}", "low-rate")
+            writer.add("user05", "high-rate")
+        snapshot = writer.snapshot
+
+        assert len(snapshot) == 30
+        assert snapshot.meta["received"] == 31
+        assert list(snapshot) == [f"user{i:02d}" for i in range(30)]
+        assert snapshot["user05"] == "high-rate"
+        assert not list(tmp_path.glob(".kvs-runs-*"))
+        assert path.read_text().count("\n") == 30
+
+    def test_special_characters_round_trip(self, tmp_path):
+        """Test keys and values containing tabs, newlines and backslashes."""
+        entries = {"a\tb": "x\ny", "back\\slash": "v\\t", "plain": ""}
+        snapshot = write_snapshot(str(tmp_path / "kvm.kvs"), entries)
+
+        assert snapshot.to_dict() == entries
+        assert snapshot["a\tb"] == "x\ny"
+
+    def test_failed_export_leaves_no_snapshot(self, tmp_path):
+        """Test that an exception inside the writer discards the partial snapshot."""
+        path = tmp_path / "kvm.kvs"
+        with pytest.raises(RuntimeError):
+            with SnapshotWriter(str(path), run_size=2) as writer:
+                for i in range(5):
+                    writer.add(f"k{i}", "v")
+                raise RuntimeError("page failed")
+
+        assert not is_snapshot(str(path))
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestSnapshotReads:
+    """Test lookups, iteration and stats."""
+
+    @pytest.fixture
+    def snapshot(self, tmp_path):
+        with SnapshotWriter(str(tmp_path / "kvm.kvs"), kvm_name=KVM, env="dev", block_size=16) as writer:
+            for key, value in _entries(200).items():
+                writer.add(key, value)
+        return writer.snapshot
+
+    def test_point_lookups(self, snapshot):
+        """Test hits in every block and misses before, between and after keys."""
+        for key, value in _entries(200).items():
+            assert snapshot[key] == value
+        assert snapshot.get("aaa@syngenta.com") is None
+        assert snapshot.get("user0010@syngenta.co") is None
+        assert "zzz@syngenta.com" not in snapshot
+
+    def test_iter_items_from_start_key(self, snapshot):
+        """Test streaming in key order from an arbitrary start key."""
+        items = list(snapshot.iter_items(start="user0195"))
+
+        assert [key for key, _ in items] == [f"user{i:04d}@syngenta.com" for i in range(195, 200)]
+
+    def test_stats_from_index(self, snapshot):
+        """Test the tier distribution, optionally grouping readonly tiers."""
+        stats = snapshot.stats()
+        grouped = snapshot.stats(group_readonly=True)
+
+        assert stats["entries"] == 200
+        assert stats["values"]["readonly-low-rate"] == {"count": 50, "fraction": 0.25}
+        assert grouped["values"]["low-rate"] == {"count": 100, "fraction": 0.5}
+        assert "readonly-low-rate" not in grouped["values"]
+
+    def test_reopen_from_index_path(self, snapshot):
+        """Test opening by either file name."""
+        reopened = KvmSnapshot.open(str(snapshot.data_path) + ".idx")
+
+        assert reopened.kvm_name == KVM
+        assert reopened["user0003@syngenta.com"] == "readonly-low-rate"
+
+    def test_empty_snapshot(self, tmp_path):
+        """Test a snapshot with no entries."""
+        snapshot = write_snapshot(str(tmp_path / "empty.kvs"), {})
+
+        assert len(snapshot) == 0
+        assert snapshot.get("anyone") is None
+        assert snapshot.to_dict() == {}
+
+
+class TestSnapshotSources:
+    """Test exporting and consuming snapshots."""
+
+    def test_export_from_emulator(self, tmp_path):
+        """Test the paginated export streams every entry into the snapshot."""
+        pytest.importorskip("requests")
+        pytest.importorskip("google.auth")
+        from utils.apigee_client import ApigeeClient
+        from utils.apigee_emulator import ApigeeEmulator
+
+        entries = _entries(60)
+        progress = []
+        with ApigeeEmulator() as emu:
+            client = ApigeeClient("test-org", base_url=emu.base_url, token="test")
+            client.create_kvm("dev", KVM)
+            for key, value in entries.items():
+                client.create_kvm_entry("dev", KVM, key, value)
+            assert sum(1 for _ in client.iter_kvm_entries("dev", KVM, page_size=25)) == 60
+            snapshot = export_snapshot(client, "dev", KVM, str(tmp_path / "dev.kvs"), page_size=25, on_progress=progress.append)
+
+        assert snapshot.to_dict() == entries
+        assert snapshot.meta["org"] == "test-org"
+        assert progress == [25, 50, 60]
+
+    def test_gateway_simulator_and_sync_read_snapshots(self, tmp_path):
+        """Test load_kvm_store, load_tier_map and load_entries accept a snapshot."""
+        from utils.local_gateway import load_kvm_store
+        from utils.rate_limit_sim import load_tier_map
+
+        path = str(tmp_path / "dev.kvs")
+        write_snapshot(path, _entries(10), kvm_name=KVM)
+
+        store = load_kvm_store(path)
+        assert store[KVM]["user0002@syngenta.com"] == "high-rate"
+        assert load_tier_map(path, KVM) == _entries(10)
+
+        pytest.importorskip("requests")
+        from utils.kvm_sync import load_entries
+        assert load_entries(path, KVM) == _entries(10)
@@ -0,0 +1,164 @@
+"""
+Test KVM Sync
+
+Checks desired-state loading, diffing, and applying a sync against the
+management API emulator, including 429 back-off and checkpoint resume.
+"""
+
+import sys
+import json
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+pytest.importorskip("requests")
+pytest.importorskip("google.auth")
+
+from utils.apigee_client import ApigeeClient
+from utils.apigee_emulator import ApigeeEmulator, EmulatorSettings
+from utils.kvm_sync import KvmSync, SyncCheckpoint, diff_entries, fetch_entries, load_entries
+
+
+ORG = "test-org"
+KVM = "user-rate-limits"
+
+
+def _client(emulator, kvm_entries=None):
+    client = ApigeeClient(ORG, base_url=emulator.base_url, token="test")
+    client.create_kvm("dev", KVM)
+    for key, value in (kvm_entries or {}).items():
+        client.create_kvm_entry("dev", KVM, key, value)
+    return client
+
+
+class TestPlanning:
+    """Test desired-state files and diffs."""
+
+    def test_load_csv_and_json(self, tmp_path):
+        """Test CSV with a header and the JSON export formats."""
+        csv_file = tmp_path / "desired.csv"
+        csv_file.write_text("user,tier\na@x.com,high-rate\n\n# comment\nb@x.com, low-rate\n")
+        assert load_entries(str(csv_file)) == {"a@x.com": "high-rate", "b@x.com": "low-rate"}
+
+        json_file = tmp_path / "desired.json"
+        json_file.write_text(json.dumps({"keyValueEntries": [{"name": "a@x.com", "value": "high-rate"}]}))
+        assert load_entries(str(json_file)) == {"a@x.com": "high-rate"}
+        json_file.write_text(json.dumps({KVM: {"a@x.com": "high-rate"}, "other-map": {"x": "y"}}))
+        assert load_entries(str(json_file)) == {"a@x.com": "high-rate"}
+
+    def test_diff(self):
+        """Test creates, updates and deletes (only when pruning)."""
+        current = {"a": "low-rate", "b": "high-rate", "stale": "low-rate"}
+        desired = {"a": "low-rate", "b": "medium-rate", "c": "high-rate"}
+
+        ops = [(op.op, op.key) for op in diff_entries(current, desired)]
+        assert ops == [("update", "b"), ("create", "c")]
+        assert ("delete", "stale") in [(op.op, op.key) for op in diff_entries(current, desired, prune=True)]
+
+
+class TestApply:
+    """Test syncing against the emulator."""
+
+    def test_sync_with_pagination_and_prune(self):
+        """Test that a paginated map is brought to the desired state."""
+        current = {f"user{i:03d}@x.com": "low-rate" for i in range(120)}
+        desired = {f"user{i:03d}@x.com": "high-rate" if i % 2 else "low-rate" for i in range(30, 200)}
+
+        with ApigeeEmulator(EmulatorSettings(page_size=25)) as emu:
+            client = _client(emu, current)
+            sync = KvmSync(client, "dev", KVM, concurrency=8, max_rps=1000, batch_size=40)
+            operations = sync.plan(desired, prune=True, page_size=25)
+            result = sync.apply(operations)
+
+            assert fetch_entries(client, "dev", KVM, page_size=50) == desired
+
+        assert result.created == 80
+        assert result.updated == 45
+        assert result.deleted == 30
+        assert not result.failed
+
+    def test_backs_off_on_429(self):
+        """Test that quota errors slow the sync down instead of failing it."""
+        desired = {f"user{i}@x.com": "medium-rate" for i in range(60)}
+
+        with ApigeeEmulator(EmulatorSettings(rate_limit_per_s=40)) as emu:
+            client = _client(emu)
+            sync = KvmSync(client, "dev", KVM, concurrency=16, max_rps=500, batch_size=100)
+            result = sync.apply(sync.plan(desired))
+            assert fetch_entries(client, "dev", KVM) == desired
+
+        assert result.throttled > 0
+        assert result.final_rate < 500
+        assert not result.failed
+
+    def test_resume_from_checkpoint(self, tmp_path):
+        """Test that a re-run applies only what an interrupted run left over."""
+        desired = {f"user{i:02d}@x.com": "high-rate" for i in range(50)}
+        checkpoint = tmp_path / "checkpoint"
+
+        with ApigeeEmulator() as emu:
+            client = _client(emu)
+            first = KvmSync(client, "dev", KVM, batch_size=10, checkpoint_dir=str(checkpoint))
+            operations = first.plan(desired)
+            # Simulate an interruption after two batches
+            first.checkpoint.mark_done(operations[:20])
+            for op in operations[:20]:
+                client.create_kvm_entry("dev", KVM, op.key, op.value)
+
+            second = KvmSync(client, "dev", KVM, batch_size=10, checkpoint_dir=str(checkpoint))
+            remaining = second.plan(desired)
+            listed_before = emu.stats()["routes"].get(f"GET /v1/organizations/{{org}}/environments/dev/keyvaluemaps/{KVM}/entries", {}).get("count")
+            result = second.apply(remaining)
+
+            assert fetch_entries(client, "dev", KVM) == desired
+
+        assert second.resumed == 20
+        assert len(remaining) == 30
+        assert listed_before == 1  # the resumed run did not re-fetch the map
+        assert result.created == 30 and result.planned == 50
+        assert not checkpoint.exists()
+
+    def test_checkpoint_ignored_for_different_input(self, tmp_path):
+        """Test that a checkpoint for another desired state is not reused."""
+        checkpoint = SyncCheckpoint(str(tmp_path / "checkpoint"))
+        with ApigeeEmulator() as emu:
+            client = _client(emu)
+            KvmSync(client, "dev", KVM, checkpoint_dir=str(checkpoint.directory)).plan({"a": "low-rate"})
+            sync = KvmSync(client, "dev", KVM, checkpoint_dir=str(checkpoint.directory))
+            operations = sync.plan({"b": "high-rate"})
+
+        assert [op.key for op in operations] == ["b"]
+        assert sync.resumed == 0
+
+    def test_resumed_delete_of_missing_entry_is_done(self, tmp_path):
+        """Test that deletes applied before an interruption count as done and clear the checkpoint."""
+        current = {f"user{i}@x.com": "high-rate" for i in range(4)}
+        checkpoint = tmp_path / "checkpoint"
+
+        with ApigeeEmulator() as emu:
+            client = _client(emu, current)
+            first = KvmSync(client, "dev", KVM, checkpoint_dir=str(checkpoint))
+            operations = first.plan({}, prune=True)
+            # Interrupted mid-batch: two deletes reached the API but were never marked done
+            for op in operations[:2]:
+                client.delete_kvm_entry("dev", KVM, op.key)
+
+            second = KvmSync(client, "dev", KVM, checkpoint_dir=str(checkpoint))
+            result = second.apply(second.plan({}, prune=True))
+
+            assert fetch_entries(client, "dev", KVM) == {}
+        assert result.deleted == 4 and not result.failed
+        assert not checkpoint.exists()
+
+    def test_create_conflict_falls_back_to_update(self):
+        """Test that an entry created concurrently is updated instead of failing."""
+        with ApigeeEmulator() as emu:
+            client = _client(emu)
+            sync = KvmSync(client, "dev", KVM)
+            operations = sync.plan({"a@x.com": "high-rate"})
+            client.create_kvm_entry("dev", KVM, "a@x.com", "low-rate")
+            result = sync.apply(operations)
+
+            assert client.get_kvm_entry("dev", KVM, "a@x.com") == "high-rate"
+        assert result.updated == 1 and not result.failed
@@ -0,0 +1,269 @@
+"""
+Test Local Gateway
+
+Runs the repository's proxy bundle on the local gateway against an in-test
+backend and checks flow order, policy execution and target routing.
+"""
+
+import sys
+import json
+import time
+import multiprocessing
+import urllib.error
+import urllib.request
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from generate_proxy import ProxyGenerator
+from utils.asynchttp import BackgroundServer, Headers, Request, Response
+from utils.js_harness import available_engines, encode_unsigned_jwt
+from utils import local_gateway
+from utils.local_gateway import GatewaySettings, GatewayWorkers, LocalGateway, MessageContext, ProxyBundle
+
+
+BASE_DIR = Path(__file__).parent.parent
+BASE_PATH = "/cropwise-unified-platform"
+
+
+@pytest.fixture
+def backend():
+    """Echo backend recording the requests it receives."""
+    received = []
+
+    async def handler(request):
+        received.append(request)
+        body = json.dumps({"path": request.target}).encode('utf-8')
+        return Response(200, Headers([('Content-Type', 'application/json')]), body)
+
+    with BackgroundServer(handler) as server:
+        server.received = received
+        yield server
+
+
+def _serve(bundle_path, backend, **settings):
+    settings.setdefault('kvm_store', {"user-rate-limits": {"grower@syngenta.com": "high-rate"}})
+    gateway = LocalGateway(ProxyBundle.load(bundle_path), GatewaySettings(target_url=backend.url, **settings))
+    return gateway, BackgroundServer(gateway.handle)
+
+
+def _get(server, path, headers=None):
+    """Return (status, headers, body) from the gateway."""
+    request = urllib.request.Request(f"{server.url}{path}", headers=headers or {})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+def _bearer(**claims):
+    claims.setdefault("exp", int(time.time()) + 3600)
+    return {"Authorization": f"Bearer {encode_unsigned_jwt(claims)}"}
+
+
+class TestBundleLoading:
+    """Test parsing of bundles."""
+
+    def test_load_generated_zip(self, tmp_path):
+        """Test that a generated bundle loads with its endpoints and resources."""
+        bundle_zip = ProxyGenerator(base_dir=str(BASE_DIR), env="qa").generate(str(tmp_path))
+        bundle = ProxyBundle.load(bundle_zip)
+
+        assert bundle.proxy_endpoints["default"].base_path == BASE_PATH
+        assert "qa" in bundle.target_endpoints["default"].url
+        assert "RF-APINotFound" in bundle.policies
+        assert "parse-jwt-token.js" in bundle.resources
+        assert [f.name for f in bundle.proxy_endpoints["default"].flows][-1] == "not-found"
+
+
+class TestRequestFlow:
+    """Test requests through the repository bundle."""
+
+    def test_health_check_proxied(self, backend):
+        """Test that /health reaches the target with the path suffix."""
+        gateway, server = _serve(BASE_DIR / "apiproxy", backend)
+        with server:
+            status, _, body = _get(server, f"{BASE_PATH}/health?probe=1")
+
+        assert status == 200
+        assert json.loads(body) == {"path": "/health?probe=1"}
+        assert gateway.stats()["skipped_policies"] == {"FC-Syng-Logging": 1}
+
+    def test_rate_limit_from_kvm(self, backend):
+        """Test JWT parsing and the KVM lookup drive the rate-limit header."""
+        _, server = _serve(BASE_DIR / "apiproxy", backend)
+        with server:
+            _get(server, f"{BASE_PATH}/v2/accounts/me", _bearer(username="grower@syngenta.com", client_id="app"))
+            _get(server, f"{BASE_PATH}/v2/accounts/me", _bearer(username="other@syngenta.com", client_id="app"))
+
+        assert [r.headers.get("x-ratelimit-type") for r in backend.received] == ["high-rate", "medium-rate"]
+
+    def test_remote_sensing_rewrite(self, backend):
+        """Test that Set Path replaces the copied path suffix."""
+        _, server = _serve(BASE_DIR / "apiproxy", backend)
+        with server:
+            _get(server, f"{BASE_PATH}/remote-sensing/v1/imagery?tile=3")
+
+        assert backend.received[0].target == "/remote-sensing/api/remote-sensing/v1/imagery?tile=3"
+
+    def test_not_found_raises_fault(self, backend):
+        """Test the catch-all flow returns the RaiseFault payload without calling the target."""
+        gateway, server = _serve(BASE_DIR / "apiproxy", backend)
+        with server:
+            status, headers, body = _get(server, f"{BASE_PATH}/v9/unknown")
+            unknown_proxy = _get(server, "/elsewhere")[0]
+
+        payload = json.loads(body)
+        assert status == 404
+        assert headers["Content-Type"] == "application/json"
+        assert payload["path"] == f"{BASE_PATH}/v9/unknown"
+        assert payload["requestId"]
+        assert unknown_proxy == 404
+        assert backend.received == []
+        assert gateway.stats()["faults"] == 1
+
+    def test_timing_headers(self, backend):
+        """Test gateway-measured phase timings."""
+        _, server = _serve(BASE_DIR / "apiproxy", backend, timing_headers=True)
+        with server:
+            _, headers, _ = _get(server, f"{BASE_PATH}/health")
+
+        assert float(headers["X-Gateway-Target-Ms"]) > 0
+        assert "X-Gateway-Request-Processing-Ms" in headers
+
+
+class TestMessageTemplates:
+    """Test message template resolution."""
+
+    def _context(self):
+        gateway = LocalGateway(ProxyBundle.load(BASE_DIR / "apiproxy"))
+        request = Request("GET", f"{BASE_PATH}/a?x=1", Headers([("X-Debug-Performance", "true")]))
+        return MessageContext(gateway, gateway.bundle.proxy_endpoints["default"], request)
+
+    def test_variables_and_literals(self):
+        """Test references resolve, expressions are empty and JSON braces stay literal."""
+        context = self._context()
+        context.set("jwt.valid", True)
+
+        assert context.template("{proxy.pathsuffix}|{jwt.valid}|{missing}") == "/a|true|"
+        assert context.template("{a.end - a.start}") == ""
+        assert context.template('{"error": "x"}') == '{"error": "x"}'
+        assert context.get("request.header.x-debug-performance") == "true"
+        assert context.get("request.queryparam.x") == "1"
+
+
+@pytest.mark.skipif(not available_engines(), reason="No JavaScript engine available")
+class TestJavaScriptPolicies:
+    """Test JavaScript policies through the JS harness."""
+
+    def test_optimized_parser_uses_claims_cache(self, tmp_path, backend):
+        """Test the optimized parser and its LookupCache/PopulateCache steps."""
+        bundle_zip = ProxyGenerator(base_dir=str(BASE_DIR), env="dev", jwt_parser="optimized").generate(str(tmp_path))
+        gateway, server = _serve(bundle_zip, backend)
+        headers = _bearer(username="grower@syngenta.com", client_id="app")
+        try:
+            with server:
+                for _ in range(3):
+                    _get(server, f"{BASE_PATH}/health", headers)
+        finally:
+            gateway._harness.close()
+
+        assert [r.headers.get("x-ratelimit-type") for r in backend.received] == ["high-rate"] * 3
+        policies = gateway.stats()["policies"]
+        assert policies["LC-JWT-Claims"]["count"] == 3
+        assert policies["PC-JWT-Claims"]["count"] == 1
+        assert len(gateway.cache) == 1
+
+
+class TestLoadBalancing:
+    """Test load-balanced targets over TargetServers."""
+
+    def _bundle(self, tmp_path, algorithm, weights):
+        environments = json.loads((BASE_DIR / "config" / "environments.json").read_text())
+        environments["environments"]["dev"]["backend_servers"] = [
+            {"name": f"backend-{i}", "host": f"backend-{i}.internal", "weight": weight}
+            for i, weight in enumerate(weights, start=1)
+        ]
+        environments["environments"]["dev"]["load_balancer"] = {"algorithm": algorithm}
+        config_path = tmp_path / "environments.json"
+        config_path.write_text(json.dumps(environments))
+        return ProxyGenerator(
+            base_dir=str(BASE_DIR), env="dev", config_path=str(config_path), read_replica=True
+        ).generate(str(tmp_path))
+
+    def test_weighted_split(self, tmp_path):
+        """Test that Weighted sends each server its share of requests, interleaved."""
+        received = {}
+
+        def handler(name):
+            async def handle(request):
+                received.setdefault(name, []).append(request.target)
+                return Response(200, Headers([('Content-Type', 'application/json')]), b'{}')
+            return handle
+
+        bundle = ProxyBundle.load(self._bundle(tmp_path, "Weighted", [3, 1]))
+        with BackgroundServer(handler("backend-1")) as one, BackgroundServer(handler("backend-2")) as two:
+            gateway = LocalGateway(bundle, GatewaySettings(target_servers={"backend-1": one.url, "backend-2": two.url}))
+            with BackgroundServer(gateway.handle) as server:
+                statuses = [_get(server, f"{BASE_PATH}/health")[0] for _ in range(8)]
+                replica = _get(server, f"{BASE_PATH}/v1/users/42")[0]
+
+        assert statuses == [200] * 8 and replica == 200
+        assert len(received["backend-1"]) == 6 + 1
+        assert received["backend-2"] == ["/health", "/health"]
+        assert "/read-only/v1/users/42" in received["backend-1"]
+
+    def test_undefined_target_server(self, tmp_path):
+        """Test that a TargetServer without a URL answers 503 instead of failing the worker."""
+        bundle = ProxyBundle.load(self._bundle(tmp_path, "RoundRobin", [1, 1]))
+        with BackgroundServer(LocalGateway(bundle, GatewaySettings()).handle) as server:
+            status = _get(server, f"{BASE_PATH}/health")[0]
+
+        assert status == 503
+
+
+class TestWorkers:
+    """Test the multi-process gateway."""
+
+    def test_workers_share_port(self, backend):
+        """Test that requests are served by worker processes and stats are merged."""
+        settings = GatewaySettings(target_url=backend.url)
+        with GatewayWorkers(BASE_DIR / "apiproxy", settings, workers=2) as workers:
+            statuses = [_get(workers, f"{BASE_PATH}/health")[0] for _ in range(6)]
+            stats = workers.stop()
+
+        assert statuses == [200] * 6
+        assert stats["workers"] == 2
+        assert stats["requests"] == 6
+
+    def test_single_worker_in_process(self, backend):
+        """Test that one worker is served on a thread without starting a process."""
+        settings = GatewaySettings(target_url=backend.url)
+        with GatewayWorkers(BASE_DIR / "apiproxy", settings, workers=1) as workers:
+            status = _get(workers, f"{BASE_PATH}/health")[0]
+            children = multiprocessing.active_children()
+            stats = workers.stop()
+
+        assert workers.in_process and not children
+        assert status == 200
+        assert stats["workers"] == 1 and stats["requests"] == 1
+
+    def test_one_worker_without_reuse_port(self, monkeypatch):
+        """Test that platforms without SO_REUSEPORT run one in-process worker."""
+        monkeypatch.setattr(local_gateway, "REUSE_PORT", False)
+        workers = GatewayWorkers(BASE_DIR / "apiproxy", workers=4)
+
+        assert workers.workers == 1 and workers.in_process
+
+    def test_spawned_workers(self, backend, monkeypatch):
+        """Test that workers also start with spawn, the start method off Linux."""
+        monkeypatch.setattr(local_gateway, "server_process_context", lambda: multiprocessing.get_context("spawn"))
+        settings = GatewaySettings(target_url=backend.url)
+        with GatewayWorkers(BASE_DIR / "apiproxy", settings, workers=1, in_process=False) as workers:
+            status = _get(workers, f"{BASE_PATH}/health")[0]
+            stats = workers.stop()
+
+        assert status == 200
+        assert stats["requests"] == 1
@@ -0,0 +1,145 @@
+"""
+Test Log Replay
+
+Checks event timing from syslog timestamps, path mapping per replay mode and
+replaying a gzip log against a local server on the scaled schedule.
+"""
+
+import sys
+import gzip
+import time
+import asyncio
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from utils.asynchttp import BackgroundServer, Headers, Response
+from utils.log_replay import LogReplayer, ReplayEvent, iter_replay_events, parse_timestamp, replay_path
+from utils.syslog_sink import iter_log_lines
+
+
+BASE_PATH = "/cropwise-unified-platform"
+
+
+def _line(timestamp="2026-02-02T18:31:28Z", method="GET", path=f"{BASE_PATH}/v2/accounts/me",
+          user="grower@syngenta.com", status=200):
+    header = f"<134>1 {timestamp} apigee cropwise - - - " if timestamp else ""
+    return (f"{header}[CropwisePlatform][dev] RequestId=abc User={user} ClientIP=10.0.0.1 "
+            f"Method={method} Path={path} Status={status} Latency=42ms")
+
+
+class TestEvents:
+    """Test turning log lines into timed replay events."""
+
+    def test_offsets_from_timestamps(self):
+        """Test that offsets follow the syslog timestamps."""
+        lines = [
+            _line("2026-02-02T18:31:28.000Z"),
+            "unrelated message",
+            _line("2026-02-02T18:31:28.250Z", method="post", path=f"{BASE_PATH}/v1/data"),
+            _line("2026-02-02T18:31:30.250+00:00"),
+        ]
+        events = list(iter_replay_events(lines, methods=("GET", "POST")))
+
+        assert [e.offset_s for e in events] == pytest.approx([0.0, 0.25, 2.25])
+        assert events[1].method == "POST"
+        assert events[1].path == f"{BASE_PATH}/v1/data"
+        assert events[0].status == 200 and events[0].latency_ms == 42.0
+
+    def test_only_safe_methods_by_default(self):
+        """Test that writes are skipped unless asked for, without shifting later offsets."""
+        lines = [
+            _line("2026-02-02T18:31:28Z"),
+            _line("2026-02-02T18:31:29Z", method="DELETE"),
+            _line("2026-02-02T18:31:30Z", method="HEAD"),
+            _line("2026-02-02T18:31:31Z", method="PUT"),
+        ]
+        events = list(iter_replay_events(lines))
+
+        assert [(e.method, e.offset_s) for e in events] == [("GET", 0.0), ("HEAD", 2.0)]
+        assert [e.method for e in iter_replay_events(lines, methods=["get", "put"])] == ["GET", "PUT"]
+
+    def test_fallback_rate_and_gap_cap(self):
+        """Test lines without timestamps, out-of-order lines and max_gap_s."""
+        untimed = list(iter_replay_events([_line(None)] * 3, fallback_rate=4))
+        assert [e.offset_s for e in untimed] == pytest.approx([0.0, 0.25, 0.5])
+
+        lines = [_line("2026-02-02T18:00:00Z"), _line("2026-02-02T17:59:59Z"), _line("2026-02-02T23:00:00Z")]
+        events = list(iter_replay_events(lines, max_gap_s=5))
+        assert [e.offset_s for e in events] == pytest.approx([0.0, 0.0, 5.0])
+
+    def test_parse_timestamp(self):
+        """Test that only timestamps before the platform message count."""
+        assert parse_timestamp(_line("2026-02-02T18:31:28Z")) == pytest.approx(1770057088.0)
+        assert parse_timestamp(_line(None)) is None
+
+    def test_replay_path(self):
+        """Test base path stripping and target path rewrites."""
+        rewrites = {"/remote-sensing": "/remote-sensing/api", "/v2/accounts": "/api/v2/accounts"}
+
+        assert replay_path(f"{BASE_PATH}/v2/accounts/me?x=1", BASE_PATH) == "/v2/accounts/me?x=1"
+        assert replay_path(f"{BASE_PATH}/v2/accounts/me", BASE_PATH, rewrites) == "/api/v2/accounts/me"
+        assert replay_path(f"{BASE_PATH}/remote-sensing/v1/imagery", BASE_PATH, rewrites) == "/remote-sensing/api/v1/imagery"
+        assert replay_path(f"{BASE_PATH}/v2/accountsx", BASE_PATH, rewrites) == "/v2/accountsx"
+        assert replay_path("/health", BASE_PATH) == "/health"
+
+
+class TestReplay:
+    """Test replaying events against a local server."""
+
+    @staticmethod
+    def _recording_server():
+        arrivals = []
+
+        async def handler(request):
+            arrivals.append((time.perf_counter(), request.method, request.target, request.headers.get('Authorization')))
+            status = 404 if '/missing/' in request.path else 200
+            return Response(status, Headers([('Content-Type', 'application/json')]), b'{}')
+
+        return BackgroundServer(handler), arrivals
+
+    def test_scaled_timing_from_gzip(self, tmp_path):
+        """Test that a gzip log is replayed in order on the compressed schedule."""
+        log_file = tmp_path / "capture.log.gz"
+        with gzip.open(log_file, "wt") as f:
+            for i, ts in enumerate(["18:00:00.000", "18:00:00.200", "18:00:00.600"]):
+                f.write(_line(f"2026-02-02T{ts}Z", path=f"{BASE_PATH}/v1/users/{i}") + "\n")
+
+        server, arrivals = self._recording_server()
+        with server:
+            replayer = LogReplayer(server.url + BASE_PATH, speed=2, base_path=BASE_PATH,
+                                   token_for=lambda user: f"token-{user}")
+            events = iter_replay_events(iter_log_lines(str(log_file)))
+            stats = asyncio.run(replayer.run(events))
+
+        assert [a[2] for a in arrivals] == [f"{BASE_PATH}/v1/users/{i}" for i in range(3)]
+        assert arrivals[0][3] == "Bearer token-grower@syngenta.com"
+        gaps = [b[0] - a[0] for a, b in zip(arrivals, arrivals[1:])]
+        assert gaps[0] == pytest.approx(0.1, abs=0.04)
+        assert gaps[1] == pytest.approx(0.2, abs=0.04)
+
+        report = stats.report()
+        assert report["sent"] == report["completed"] == 3
+        assert report["statuses"] == {"200": 3}
+        assert report["paths"]["GET /v1/users/{id}"]["original_latency"]["count"] == 3
+
+    def test_unpaced_with_limits(self):
+        """Test speed 0, the in-flight cap, status mismatches and connection errors."""
+        events = [ReplayEvent(i * 10.0, "GET", f"{BASE_PATH}/missing/{i}", status=200) for i in range(20)]
+
+        server, arrivals = self._recording_server()
+        with server:
+            replayer = LogReplayer(server.url + BASE_PATH, speed=0, max_in_flight=4, base_path=BASE_PATH)
+            start = time.perf_counter()
+            report = asyncio.run(replayer.run(iter(events), limit=12)).report()
+
+        assert time.perf_counter() - start < 5
+        assert len(arrivals) == report["sent"] == 12
+        assert report["max_in_flight"] <= 4
+        assert report["status_mismatches"] == 12
+
+        unreachable = LogReplayer("http://127.0.0.1:9", base_path=BASE_PATH, timeout=2)
+        report = asyncio.run(unreachable.run([events[0]])).report()
+        assert report["completed"] == 0
+        assert sum(report["errors"].values()) == 1
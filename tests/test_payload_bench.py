@@ -0,0 +1,102 @@
+"""
+Test Payload Size Benchmark
+
+Checks size parsing, the payload stub and the sweep against a local stub
+process and against the bundle on a local gateway.
+"""
+
+import sys
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from utils.asynchttp import BackgroundServer, Headers, Response
+from utils.local_gateway import GatewaySettings, LocalGateway, ProxyBundle
+from utils.payload_bench import PayloadBackendProcess, PayloadBench, Transfer, format_size, parse_size, summarize
+
+
+BASE_DIR = Path(__file__).parent.parent
+MB = 1024 ** 2
+
+
+class TestSizes:
+    """Test parsing and formatting sweep sizes."""
+
+    def test_parse_size(self):
+        """Test binary units, decimals and bare byte counts."""
+        assert parse_size("512") == 512
+        assert parse_size("10KB") == 10 * 1024
+        assert parse_size("1.5mb") == int(1.5 * MB)
+        assert parse_size("5M") == 5 * MB
+        for spec in ("", "ten", "5TB", "-1KB"):
+            with pytest.raises(ValueError):
+                parse_size(spec)
+
+    def test_format_size(self):
+        """Test that sizes print in the largest exact unit."""
+        assert [format_size(n) for n in (1024, 50 * MB, 1500)] == ["1KB", "50MB", "1500B"]
+
+
+class TestSummary:
+    """Test reducing repeated transfers to one sweep point."""
+
+    def test_medians_and_statuses(self):
+        """Test medians over successes and status counts including errors."""
+        transfers = [
+            Transfer("buffered", "upload", MB, status=200, ttfb_ms=t, total_ms=t * 2, peak_memory_bytes=MB)
+            for t in (10, 30, 20)
+        ] + [Transfer("buffered", "upload", MB, error="ReadTimeout")]
+        summary = summarize(transfers)
+
+        assert summary["statuses"] == {"200": 3, "ReadTimeout": 1}
+        assert summary["ttfb_ms"] == 20
+        assert summary["total_ms"] == 40
+        assert summary["throughput_mbps"] == 25.0
+        assert summary["peak_memory_mb"] == 1.0
+
+
+class TestSweep:
+    """Test measuring transfers against local servers."""
+
+    def test_streaming_client_memory_stays_flat(self):
+        """Test that only the buffered client holds the whole body."""
+        with PayloadBackendProcess() as backend:
+            bench = PayloadBench(backend.url, {"buffered": "/a", "streaming": "/b"})
+            results = {(r["direction"], r["mode"]): r for r in bench.sweep([8 * MB], repeat=1)}
+            bench.close()
+
+        assert all(r["statuses"] == {"200": 1} for r in results.values())
+        for direction in ("download", "upload"):
+            assert results[(direction, "buffered")]["peak_memory_mb"] >= 8
+            assert results[(direction, "streaming")]["peak_memory_mb"] < 2
+
+    def test_rejections_are_reported(self):
+        """Test that a 413 is recorded as a status, not a failure to measure."""
+        async def handler(request):
+            return Response(413, Headers([('Content-Type', 'application/json')]), b'{"error": "too large"}')
+
+        with BackgroundServer(handler) as server:
+            bench = PayloadBench(server.url, {"buffered": "/", "streaming": "/"}, track_memory=False)
+            result = bench.sweep([1024], modes=["buffered"], directions=["upload"], repeat=2)[0]
+            bench.close()
+
+        assert result["statuses"] == {"413": 2}
+        assert "ttfb_ms" in result
+
+    def test_through_local_gateway(self):
+        """Test the sweep through the bundle on a local gateway."""
+        with PayloadBackendProcess() as backend:
+            bundle = ProxyBundle.load(str(BASE_DIR / "apiproxy"))
+            gateway = LocalGateway(bundle, GatewaySettings(target_url=backend.url))
+            with BackgroundServer(gateway.handle) as server:
+                bench = PayloadBench(
+                    server.url + bundle.proxy_endpoints["default"].base_path,
+                    {"buffered": "/v2/accounts/ids", "streaming": "/remote-sensing/v1/imagery"},
+                    track_memory=False
+                )
+                results = bench.sweep([1024, 256 * 1024], repeat=1)
+                bench.close()
+
+        assert len(results) == 8
+        assert all(r["statuses"] == {"200": 1} for r in results), results
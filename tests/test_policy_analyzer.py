@@ -0,0 +1,196 @@
+"""
+Test Policy Analyzer
+
+Unit tests for the condition parser and the static policy cost analyzer.
+"""
+
+import sys
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from utils.conditions import compile_condition, parse_condition, ConditionSyntaxError
+from utils.policy_analyzer import PolicyCostAnalyzer
+
+
+PROXY_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<ProxyEndpoint name="default">
+    <PreFlow name="PreFlow">
+        <Request>{steps}</Request>
+        <Response/>
+    </PreFlow>
+    <Flows>
+        <Flow name="catch-all">
+            <Request/>
+            <Response/>
+            <Condition>true</Condition>
+        </Flow>
+    </Flows>
+</ProxyEndpoint>
+"""
+
+TARGET = """<?xml version="1.0" encoding="UTF-8"?>
+<TargetEndpoint name="default"><PreFlow name="PreFlow"><Request/><Response/></PreFlow></TargetEndpoint>
+"""
+
+
+def _step(name, condition=None):
+    cond = f"<Condition>{condition}</Condition>" if condition else ""
+    return f"<Step><Name>{name}</Name>{cond}</Step>"
+
+
+def _assign_message(name):
+    return f'<AssignMessage name="{name}"><DisplayName>{name}</DisplayName></AssignMessage>'
+
+
+class TestConditions:
+    """Tests for Apigee condition parsing and evaluation."""
+    
+    def test_equality_and_null(self):
+        """Test equality against literals and null."""
+        check = compile_condition('(jwt.valid = true) and (user.rate.limit.type = null)')
+        assert check({'jwt.valid': True})
+        assert check({'jwt.valid': 'true'})
+        assert not check({'jwt.valid': True, 'user.rate.limit.type': 'high-rate'})
+    
+    def test_matches_path(self):
+        """Test MatchesPath single and multi segment wildcards."""
+        check = compile_condition('proxy.pathsuffix MatchesPath "/v2/accounts/**"')
+        assert check({'proxy.pathsuffix': '/v2/accounts/ids'})
+        assert check({'proxy.pathsuffix': '/v2/accounts/a/b'})
+        assert not check({'proxy.pathsuffix': '/v1/accounts'})
+        
+        single = compile_condition('proxy.pathsuffix MatchesPath "/v1/users/*"')
+        assert single({'proxy.pathsuffix': '/v1/users/42'})
+        assert not single({'proxy.pathsuffix': '/v1/users/42/roles'})
+    
+    def test_or_not_and_regex(self):
+        """Test boolean composition and JavaRegex."""
+        check = compile_condition('not (request.verb = "GET") or (proxy.pathsuffix ~~ "/health")')
+        assert check({'request.verb': 'POST'})
+        assert check({'request.verb': 'GET', 'proxy.pathsuffix': '/health'})
+        assert not check({'request.verb': 'GET', 'proxy.pathsuffix': '/healthz'})
+    
+    def test_string_literals(self):
+        """Test that non-ASCII text survives and only quotes and backslashes are unescaped."""
+        assert compile_condition('request.header.city = "café"')({'request.header.city': 'café'})
+        assert compile_condition(r'request.header.q = "say \"hi\""')({'request.header.q': 'say "hi"'})
+        digits = compile_condition(r'proxy.pathsuffix JavaRegex "/v1/users/\d+"')
+        assert digits({'proxy.pathsuffix': '/v1/users/42'})
+        assert not digits({'proxy.pathsuffix': '/v1/users/abc'})
+
+    def test_empty_condition_is_true(self):
+        """Test that a missing condition always matches."""
+        assert compile_condition(None)({})
+    
+    def test_syntax_error(self):
+        """Test that unbalanced expressions are rejected."""
+        with pytest.raises(ConditionSyntaxError):
+            parse_condition('(jwt.valid = true')
+
+
+class TestPolicyCostAnalyzer:
+    """Tests for the static policy cost analyzer."""
+    
+    @pytest.fixture
+    def make_apiproxy(self, tmp_path):
+        """Build a minimal apiproxy directory from policy XML and PreFlow steps."""
+        def _make(policies, steps):
+            for sub in ('policies', 'proxies', 'targets'):
+                (tmp_path / sub).mkdir(exist_ok=True)
+            for name, xml in policies.items():
+                (tmp_path / "policies" / f"{name}.xml").write_text(xml)
+            (tmp_path / "proxies" / "default.xml").write_text(
+                PROXY_TEMPLATE.format(steps="".join(steps))
+            )
+            (tmp_path / "targets" / "default.xml").write_text(TARGET)
+            return PolicyCostAnalyzer(tmp_path)
+        return _make
+    
+    def test_repository_proxy_flags_rate_header_steps(self):
+        """Test that the three rate-header steps are reported as mergeable."""
+        analyzer = PolicyCostAnalyzer(Path(__file__).parent.parent / "apiproxy")
+        report = analyzer.analyze()
+        
+        mergeable = [f for f in report.findings if 'mutually exclusive' in f.message]
+        assert len(mergeable) == 1
+        assert set(mergeable[0].steps) == {
+            'AM-Set-Low-Rate-Header', 'AM-Set-Medium-Rate-Header', 'AM-Set-High-Rate-Header'
+        }
+        assert not report.errors
+    
+    def test_classifies_cost(self, make_apiproxy):
+        """Test cost classification of JavaScript, KVM and async logging steps."""
+        analyzer = make_apiproxy(
+            {
+                'JS-A': '<Javascript name="JS-A"><DisplayName>JS-A</DisplayName></Javascript>',
+                'KVM-A': '<KeyValueMapOperations name="KVM-A"><DisplayName>KVM-A</DisplayName></KeyValueMapOperations>',
+                'ML-A': '<MessageLogging async="true" name="ML-A"><DisplayName>ML-A</DisplayName></MessageLogging>',
+            },
+            [_step('JS-A'), _step('KVM-A'), _step('ML-A')]
+        )
+        report = analyzer.analyze()
+        classes = {s.policy: s.cost_class for s in report.steps}
+        
+        assert classes == {
+            'JS-A': 'javascript', 'KVM-A': 'kvm-io', 'ML-A': 'messagelogging-async'
+        }
+        budget = report.budgets[0]
+        assert budget.always_ms == pytest.approx(5.0)
+        assert budget.deferred_ms == pytest.approx(0.5)
+    
+    def test_reports_undefined_policy(self, make_apiproxy):
+        """Test that a step referencing a missing policy is an error."""
+        analyzer = make_apiproxy({}, [_step('AM-Missing')])
+        report = analyzer.analyze()
+        
+        assert len(report.errors) == 1
+        assert 'AM-Missing' in report.errors[0].message
+    
+    def test_overlapping_selectors_not_mergeable(self, make_apiproxy):
+        """Test that steps sharing a selector value are not reported as exclusive."""
+        analyzer = make_apiproxy(
+            {'AM-A': _assign_message('AM-A'), 'AM-B': _assign_message('AM-B')},
+            [_step('AM-A', 'tier = "low"'), _step('AM-B', '(tier = "low") or (tier = "high")')]
+        )
+        report = analyzer.analyze()
+        
+        assert not [f for f in report.findings if 'mutually exclusive' in f.message]
+    
+    def test_debug_only_steps_excluded_from_budget(self, make_apiproxy):
+        """Test that X-Debug-Performance steps are budgeted separately."""
+        condition = 'request.header.X-Debug-Performance = "true"'
+        analyzer = make_apiproxy(
+            {'AM-T1': _assign_message('AM-T1'), 'AM-T2': _assign_message('AM-T2')},
+            [_step('AM-T1', condition), _step('AM-T2', condition)]
+        )
+        report = analyzer.analyze()
+        
+        assert report.budgets[0].debug_only_ms == pytest.approx(0.4)
+        assert report.budgets[0].always_ms == 0
+        assert any('debug-only' in f.message for f in report.findings)
+
+    def test_body_policy_on_streaming_route(self, make_apiproxy, tmp_path):
+        """Test that payload-reading policies are errors only on streaming routes."""
+        streaming = (
+            '<AssignMessage name="AM-Stream"><AssignVariable><Name>response.streaming.enabled</Name>'
+            '<Value>true</Value></AssignVariable></AssignMessage>'
+        )
+        extract = (
+            '<ExtractVariables name="EV-Body"><JSONPayload><Variable name="id">'
+            '<JSONPath>$.id</JSONPath></Variable></JSONPayload></ExtractVariables>'
+        )
+        analyzer = make_apiproxy({'AM-Stream': streaming, 'EV-Body': extract}, [_step('EV-Body')])
+        assert not analyzer.analyze().errors
+
+        proxy_file = tmp_path / "proxies" / "default.xml"
+        proxy_file.write_text(proxy_file.read_text().replace(
+            '<Flow name="catch-all">\n            <Request/>',
+            f'<Flow name="catch-all">\n            <Request>{_step("AM-Stream")}</Request>'
+        ))
+        errors = analyzer.analyze().errors
+
+        assert len(errors) == 1
+        assert errors[0].steps == ('EV-Body',)
+        assert "streaming route 'catch-all'" in errors[0].message
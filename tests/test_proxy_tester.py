@@ -0,0 +1,190 @@
+"""
+Test ProxyTester Runner
+
+Runs the test_proxy.py suites against a local HTTP server with slow
+endpoints to check concurrent execution, ordered reporting, per-test
+timeouts and connection reuse through the shared session.
+"""
+
+import sys
+import time
+import subprocess
+import threading
+import pytest
+from dataclasses import replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+pytest.importorskip("requests")
+pytest.importorskip("colorama")
+
+import test_proxy
+from test_proxy import ProxyTester
+
+# Aliased so pytest does not try to collect the enum as a test class
+Status = test_proxy.TestStatus
+
+
+# path: (status, delay seconds)
+ROUTES = {
+    "/health": (200, 0.3),
+    "/v1/users": (401, 0.3),
+    "/invalid/path/that/does/not/exist": (404, 0.3),
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    routes = ROUTES
+    clients = set()
+    requests = 0
+
+    def do_GET(self):
+        status, delay = self.routes.get(self.path, (404, 0))
+        self.clients.add(self.client_address[1])
+        type(self).requests += 1
+        time.sleep(delay)
+        body = b'{"message": "ok"}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-Apigee-Total-Time", "52")
+        self.send_header("X-Apigee-Target-Time", "50")
+        self.send_header("X-Apigee-JWT-Time", "{timing.jwt.duration}")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """Serve ROUTES on a free port; yields the handler class for inspection."""
+    handler = type("Handler", (_Handler,), {"routes": dict(ROUTES), "clients": set(), "requests": 0})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    handler.base_url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield handler
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _tester(server, **kwargs) -> ProxyTester:
+    tester = ProxyTester(env="dev", **kwargs)
+    tester.base_url = server.base_url
+    return tester
+
+
+class TestParallelRunner:
+    """Test concurrent suite execution."""
+
+    def test_suite_takes_about_its_slowest_test(self, server, capsys):
+        """Test that three 300ms tests finish together and print in suite order."""
+        tester = _tester(server, workers=8)
+        results = tester.run_smoke_tests()
+        tester.close()
+        out = capsys.readouterr().out
+
+        assert [r.status for r in results] == [Status.PASSED] * 3
+        assert tester.elapsed_ms < 750
+        names = ["Health Check", "Unauthorized Request", "Invalid Path Returns 404"]
+        assert [r.name for r in results] == names
+        positions = [out.index(name) for name in names]
+        assert positions == sorted(positions)
+
+    def test_sequential_reuses_one_connection(self, server):
+        """Test that workers=1 runs one at a time over a single pooled connection."""
+        tester = _tester(server, workers=1)
+        tester.run_smoke_tests()
+        tester.close()
+
+        assert tester.elapsed_ms >= 900
+        assert len(server.clients) == 1
+
+    def test_per_test_timeout(self, server):
+        """Test that a slow test is reported as an error without holding up the suite."""
+        server.routes["/health"] = (200, 2.0)
+        tester = _tester(server, workers=4, timeout=0.5)
+        start = time.perf_counter()
+        results = tester.run_smoke_tests()
+        elapsed = time.perf_counter() - start
+        tester.close()
+
+        assert results[0].status == Status.ERROR
+        assert "time" in results[0].message.lower()
+        assert [r.status for r in results[1:]] == [Status.PASSED] * 2
+        assert elapsed < 1.5
+
+    def test_exception_in_test_is_reported(self, server):
+        """Test that a test function raising is recorded as an error in place."""
+        tester = _tester(server)
+
+        def test_broken_token():
+            raise RuntimeError("no signing key")
+
+        health = next(case for case in tester.cases if case.name == "Health Check")
+        results = tester._run_tests([lambda: tester.run_case(health), test_broken_token])
+        tester.close()
+
+        assert results[0].status == Status.PASSED
+        assert results[1].name == "Broken Token"
+        assert results[1].status == Status.ERROR
+        assert "no signing key" in results[1].message
+
+class TestCatalogCases:
+    """Test running compiled catalog cases."""
+
+    def test_latency_budget(self, server):
+        """Test that a case slower than its latency budget fails."""
+        tester = _tester(server)
+        health = next(case for case in tester.cases if case.name == "Health Check")
+        result = tester.run_case(replace(health, latency_budget_ms=100))
+        tester.close()
+
+        assert result.status == Status.FAILED
+        assert result.over_budget
+        assert "over 100ms budget" in result.message
+
+    def test_p95_over_iterations_with_breakdown(self, server):
+        """Test warmup, p95 over the measured runs and the X-Apigee breakdown."""
+        server.routes["/health"] = (200, 0.05)
+        tester = _tester(server, iterations=5, warmup=2)
+        health = next(case for case in tester.cases if case.name == "Health Check")
+        passed = tester.run_case(health)
+        failed = tester.run_case(replace(health, latency_budget_ms=20))
+        tester.close()
+
+        assert server.requests == 14
+        assert passed.status == Status.PASSED and passed.iterations == 5
+        assert passed.duration_ms <= passed.p95_ms < 5000
+        assert failed.status == Status.FAILED
+        assert failed.breakdown == {"Total-Time": 52.0, "Target-Time": 50.0}
+        assert "Target-Time 50ms" in failed.message
+
+    def test_shard_runs_subset(self, server):
+        """Test that a sharded runner only runs its slice of the suite."""
+        tester = _tester(server, shard=(1, 3))
+        results = tester.run_smoke_tests()
+        tester.close()
+
+        assert [r.name for r in results] == ["Unauthorized Request"]
+
+
+class TestCommandLine:
+    """Test the script as CI runs it, in a fresh interpreter."""
+
+    def test_smoke_suite_cold_start(self, server):
+        """Test that requests and jwt, first used by the workers, load once and no test errors."""
+        proc = subprocess.run(
+            [sys.executable, str(Path(test_proxy.__file__)), "--env", "dev", "--test-suite", "smoke",
+             "--base-url", server.base_url],
+            capture_output=True, text=True, timeout=60
+        )
+
+        assert "has no attribute" not in proc.stdout
+        assert "Errors:  0" in proc.stdout, proc.stdout
+        assert proc.returncode == 0, proc.stdout
@@ -0,0 +1,114 @@
+"""
+Test Rate Limit Simulator
+
+Checks tier resolution against the proxy's KVM model, token-bucket and
+sliding-window limits, queueing delay and the tiers in policies.json.
+"""
+
+import sys
+import json
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from utils.log_replay import ReplayEvent
+from utils.rate_limit_sim import (
+    UNLIMITED, RateLimitSimulator, TierLimit, load_tier_map, parse_tier_limit, tier_limits_from_policies
+)
+
+
+BASE_DIR = Path(__file__).parent.parent
+
+LIMITS = {
+    "low-rate": TierLimit(rate_per_second=1, burst=2, window_seconds=10),
+    "medium-rate": TierLimit(rate_per_second=10, burst=10, window_seconds=10),
+}
+
+
+class TestTiers:
+    """Test tier configuration and user-to-tier resolution."""
+
+    def test_policies_json_tiers(self):
+        """Test that policies.json defines a limit for every rate type."""
+        with open(BASE_DIR / "config" / "policies.json") as f:
+            limits = tier_limits_from_policies(json.load(f)["policies"])
+
+        assert set(limits) == {"low-rate", "medium-rate", "high-rate"}
+        assert limits["low-rate"].rate_per_second < limits["medium-rate"].rate_per_second < limits["high-rate"].rate_per_second
+
+    def test_tier_resolution(self):
+        """Test KVM values, readonly variants, the default tier and unauthenticated requests."""
+        sim = RateLimitSimulator(LIMITS, {"a@x.com": "low-rate", "b@x.com": "readonly-low-rate", "c@x.com": "bogus"})
+
+        assert sim.limit_for(sim.tier_for("a@x.com")) is LIMITS["low-rate"]
+        assert sim.limit_for(sim.tier_for("b@x.com")) is LIMITS["low-rate"]
+        assert sim.limit_for(sim.tier_for("c@x.com")) is LIMITS["medium-rate"]
+        assert sim.tier_for("unknown@x.com") == "medium-rate"
+        assert sim.tier_for("") == UNLIMITED and sim.limit_for(UNLIMITED) is None
+
+    def test_parse_tier_limit(self):
+        """Test RATE[:BURST[:WINDOW]] specs."""
+        assert parse_tier_limit("5:20:30") == TierLimit(5, 20, 30)
+        assert parse_tier_limit("2.5").burst == 3
+        with pytest.raises(ValueError):
+            parse_tier_limit("0:1")
+        with pytest.raises(ValueError):
+            parse_tier_limit("fast")
+
+    def test_load_tier_map_formats(self, tmp_path):
+        """Test local KVM store, plain and Apigee entry exports."""
+        formats = {
+            "store.json": {"user-rate-limits": {"a@x.com": "high-rate"}},
+            "plain.json": {"a@x.com": "high-rate"},
+            "entries.json": {"keyValueEntries": [{"name": "a@x.com", "value": "high-rate"}]},
+        }
+        for name, data in formats.items():
+            (tmp_path / name).write_text(json.dumps(data))
+            assert load_tier_map(str(tmp_path / name)) == {"a@x.com": "high-rate"}
+
+
+class TestLimiters:
+    """Test admission, throttling and queueing per algorithm."""
+
+    def test_token_bucket_burst_then_rate(self):
+        """Test that a burst is admitted, then the refill rate applies."""
+        sim = RateLimitSimulator(LIMITS, {"a@x.com": "low-rate"})
+        results = [sim.offer("a@x.com", t) for t in (0.0, 0.0, 0.0, 0.5, 1.0, 2.0)]
+
+        assert results == [0.0, 0.0, None, None, 0.0, 0.0]
+        report = sim.report()["tiers"]["low-rate"]
+        assert report["throttled"] == 2
+        assert report["throttled_fraction"] == pytest.approx(2 / 6, abs=1e-4)
+        assert report["top_throttled_users"] == {"a@x.com": 2}
+
+    def test_sliding_window(self):
+        """Test that at most rate * window requests fit in any window."""
+        sim = RateLimitSimulator(LIMITS, {"a@x.com": "low-rate"}, algorithm="sliding-window")
+        admitted = [sim.offer("a@x.com", t * 0.5) is not None for t in range(30)]
+
+        assert admitted[:10] == [True] * 10
+        assert admitted[10:20] == [False] * 10
+        assert admitted[20] is True
+
+    def test_queueing_delay(self):
+        """Test that over-limit requests wait up to max_queue_s instead of failing."""
+        sim = RateLimitSimulator(LIMITS, {"a@x.com": "low-rate"}, max_queue_s=1.5)
+        delays = [sim.offer("a@x.com", 0.0) for _ in range(5)]
+
+        assert delays == [0.0, 0.0, pytest.approx(1.0), None, None]
+        assert sim.report()["tiers"]["low-rate"]["queue_delay"]["count"] == 1
+
+    def test_users_have_separate_quotas(self):
+        """Test per-user buckets and per-tier throughput over a trace."""
+        events = [ReplayEvent(i * 0.01, "GET", "/v1/data", user=f"u{i % 4}@x.com") for i in range(400)]
+        events += [ReplayEvent(0.0, "GET", "/health") for _ in range(50)]
+        report = RateLimitSimulator(LIMITS).run(events).report()
+
+        medium = report["tiers"]["medium-rate"]
+        assert medium["users"] == 4
+        assert medium["requests"] == 400
+        # 4 users x (10 burst + 10/s over ~4s)
+        assert 150 <= medium["admitted"] <= 210
+        assert report["tiers"][UNLIMITED]["throttled"] == 0
+        assert report["requests"] == 450
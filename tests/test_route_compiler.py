@@ -0,0 +1,294 @@
+"""
+Test Route Compiler
+
+Checks merging and ordering of routes from endpoints.json, carrying and
+dropping hand-written flows, traffic loading, the read-replica RouteRule
+against handle-readonly-routes.js, and that a generated bundle routes and
+rewrites paths as the config says on a local gateway.
+"""
+
+import sys
+import json
+import shutil
+import zipfile
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from generate_proxy import ProxyGenerator
+from utils.asynchttp import BackgroundServer, Headers, Response
+from utils.conditions import compile_condition
+from utils.config_model import PathMapping, load_config
+from utils.js_harness import ROUTE_SAMPLES, JSPolicyHarness, available_engines, generate_route_inputs
+from utils.local_gateway import GatewaySettings, LocalGateway, ProxyBundle
+from utils.policy_templates import make_flow, make_step
+from utils.route_compiler import RouteCompiler, load_traffic, read_only_condition
+
+
+BASE_DIR = Path(__file__).parent.parent
+JSC_DIR = BASE_DIR / "apiproxy" / "resources" / "jsc"
+
+
+def _mappings(*paths, **options):
+    """PathMapping per path; options maps a path to extra PathMapping fields."""
+    return {
+        path: PathMapping(path=path, target="default", methods=("GET",), **options.get(path, {}))
+        for path in paths
+    }
+
+
+def _matches(flow, path, verb="GET"):
+    return compile_condition(flow.condition)({"proxy.pathsuffix": path, "request.verb": verb})
+
+
+class TestMerging:
+    """Test folding routes with the same steps into one flow."""
+
+    def test_child_merges_into_parent(self):
+        """Test that a child with its parent's steps needs no flow of its own."""
+        table = RouteCompiler(_mappings("/v2/accounts", "/v2/accounts/ids"), {"/v2/accounts": "/api/v2/accounts"}).compile()
+
+        assert [flow.name for flow in table.compiled] == ["v2-accounts"]
+        assert [route.path for route in table.compiled[0].routes] == ["/v2/accounts", "/v2/accounts/ids"]
+
+    def test_child_with_own_steps_is_kept(self):
+        """Test that a streaming child keeps its own flow and the parent's rewrite."""
+        mappings = _mappings("/remote-sensing", "/remote-sensing/v1/imagery",
+                             **{"/remote-sensing/v1/imagery": {"streaming": True}})
+        table = RouteCompiler(mappings, {"/remote-sensing": "/remote-sensing/api"}).compile()
+        flows = {flow.name: flow for flow in table.compiled}
+
+        assert [name for name, _ in flows["remote-sensing-v1-imagery"].roots[0].request] == [
+            "AM-Enable-Streaming", "EV-Rewrite-Remote-Sensing-Suffix", "AM-Rewrite-Remote-Sensing-URI"
+        ]
+        assert [name for name, _ in flows["remote-sensing"].roots[0].request] == [
+            "EV-Rewrite-Remote-Sensing-Suffix", "AM-Rewrite-Remote-Sensing-URI"
+        ]
+
+    def test_siblings_share_guarded_flow(self):
+        """Test that same-step siblings become one flow behind a StartsWith on their prefix."""
+        table = RouteCompiler(_mappings("/v1/users", "/v1/fields", "/v2/accounts"), {}).compile()
+        flows = {flow.name: flow for flow in table.compiled}
+
+        assert set(flows) == {"v1", "v2-accounts"}
+        assert flows["v1"].condition.startswith('(proxy.pathsuffix StartsWith "/v1/") and (')
+        assert _matches(flows["v1"], "/v1/users/42")
+        assert _matches(flows["v1"], "/v1/fields")
+        assert not _matches(flows["v1"], "/v1/seasons")
+
+
+class TestMethods:
+    """Test that compiled flows only take the methods their routes list."""
+
+    def test_unlisted_methods_fall_through(self):
+        """Test that each root checks its own methods and a parent only absorbs children it admits."""
+        mappings = _mappings("/v1/users", "/v1/users/me", "/v1/fields")
+        mappings["/v1/fields"] = PathMapping(path="/v1/fields", target="default", methods=("GET", "POST"))
+        table = RouteCompiler(mappings, {}).compile()
+        flow = table.compiled[0]
+
+        assert [route.path for route in flow.merged] == ["/v1/users/me"]
+        assert _matches(flow, "/v1/users/me") and _matches(flow, "/v1/fields", "POST")
+        assert not _matches(flow, "/v1/users/me", "DELETE")
+
+    def test_exact_handwritten_flow_stays_exact(self):
+        """Test that a route taken over from an exact-path flow keeps its path and verb checks."""
+        flows = [make_flow("health-check", '(proxy.pathsuffix MatchesPath "/health") and (request.verb = "GET")', [])]
+        table = RouteCompiler(_mappings("/health"), {}, flows=flows).compile()
+
+        assert table.compiled[0].condition == (
+            '(proxy.pathsuffix MatchesPath "/health") and (request.verb = "GET")'
+        )
+        assert table.dropped == ["health-check"]
+        assert not _matches(table.compiled[0], "/health", "POST")
+        assert not _matches(table.compiled[0], "/health/anything")
+
+
+class TestOrdering:
+    """Test the evaluation order of compiled flows."""
+
+    def test_specific_before_general(self):
+        """Test that without traffic deeper routes come first."""
+        mappings = _mappings("/a", "/a/b", "/c/d/e", **{"/a/b": {"streaming": True}})
+        table = RouteCompiler(mappings, {}).compile()
+
+        assert [flow.name for flow in table.compiled] == ["c-d-e", "a-b", "a"]
+
+    def test_busiest_first_without_shadowing(self):
+        """Test that traffic orders flows but a parent never precedes its child."""
+        mappings = _mappings("/a", "/a/b", "/c/d/e", **{"/a/b": {"streaming": True}})
+        traffic = {"/a/x": 900, "/a/b/1": 50, "/c/d/e": 10}
+        table = RouteCompiler(mappings, {}, traffic=traffic).compile()
+
+        assert [flow.name for flow in table.compiled] == ["a-b", "a", "c-d-e"]
+        assert [flow.traffic for flow in table.compiled] == [50, 900, 10]
+        assert table.expected_conditions == (1 * 50 + 2 * 900 + 3 * 10) / 960
+
+
+class TestHandwrittenFlows:
+    """Test how flows already in proxies/default.xml are kept, dropped or carried over."""
+
+    def _flows(self):
+        return [
+            make_flow("protector", '(proxy.pathsuffix MatchesPath "/v2/accounts/**")',
+                      [make_step("AM-Protector-Alert")]),
+            make_flow("legacy", '(proxy.pathsuffix MatchesPath "/legacy/**")', [make_step("AM-Legacy")]),
+            make_flow("not-found", None, [make_step("RF-NotFound")]),
+        ]
+
+    def test_steps_carried_and_flows_dropped(self):
+        """Test that covered flows are replaced, others kept, and the catch-all stays last."""
+        table = RouteCompiler(_mappings("/v2/accounts"), {}, flows=self._flows()).compile()
+
+        assert table.dropped == ["protector"]
+        assert table.kept == ["legacy", "not-found"]
+        assert [flow.get("name") for flow in table.flows] == ["v2-accounts", "legacy", "not-found"]
+        assert table.compiled[0].roots[0].request == [("AM-Protector-Alert", None)]
+        assert table.compiled[0].roots[0].inherited == "protector"
+
+    def test_config_rewrite_replaces_handwritten_rewrite(self):
+        """Test that a hand-written rewrite is not carried into a route the config rewrites."""
+        flows = [make_flow("rs", '(proxy.pathsuffix MatchesPath "/rs/**")', [make_step("AM-Old-Rewrite")])]
+        table = RouteCompiler(_mappings("/rs"), {"/rs": "/rs/api"}, flows=flows,
+                              rewrite_policies={"AM-Old-Rewrite"}).compile()
+
+        assert [name for name, _ in table.compiled[0].roots[0].request] == [
+            "EV-Rewrite-Rs-Suffix", "AM-Rewrite-Rs-URI"
+        ]
+        assert table.compiled[0].roots[0].inherited is None
+        assert [policy.get("name") for policy in table.policies] == ["EV-Rewrite-Rs-Suffix", "AM-Rewrite-Rs-URI"]
+
+
+class TestTraffic:
+    """Test loading request counts."""
+
+    def test_json_counts_and_sink_report(self, tmp_path):
+        """Test plain counts and syslog_sink reports, with the base path removed."""
+        counts = tmp_path / "counts.json"
+        counts.write_text(json.dumps({"/cropwise-unified-platform/v1/users": 5, "/v1/data": 2}))
+        report = tmp_path / "report.json"
+        report.write_text(json.dumps({"paths": {
+            "GET /v1/users": {"count": 3}, "POST /v1/users": {"count": 4}
+        }}))
+
+        assert load_traffic(str(counts), "/cropwise-unified-platform") == {"/v1/users": 5, "/v1/data": 2}
+        assert load_traffic(str(report)) == {"/v1/users": 7}
+
+
+class TestReadOnlyRoutes:
+    """Test the read-replica RouteRule compiled from read_only_routes."""
+
+    @pytest.mark.skipif(not available_engines(), reason="No JavaScript engine available")
+    def test_matches_handle_readonly_routes(self):
+        """Test that the native condition classifies requests as the JavaScript policy does."""
+        matches = compile_condition(read_only_condition(load_config(BASE_DIR / "config").read_only_routes))
+        samples = [
+            {"proxy.pathsuffix": path.replace("{id}", "7"), "request.verb": verb}
+            for path in ROUTE_SAMPLES for verb in ("GET", "POST")
+        ] + generate_route_inputs(500, seed=3)
+
+        with JSPolicyHarness() as harness:
+            name = harness.load(JSC_DIR / "handle-readonly-routes.js")
+            results = harness.run_batch(name, samples)
+
+        mismatches = [
+            (sample, result.variables["is.readonly.request"])
+            for sample, result in zip(samples, results)
+            if matches(sample) is not result.variables["is.readonly.request"]
+        ]
+        assert mismatches == []
+
+    def test_condition_shape(self):
+        """Test that the verb check leads and regexes follow the path clauses."""
+        routes = load_config(BASE_DIR / "config").read_only_routes
+
+        assert read_only_condition(routes) == (
+            '(request.verb = "GET") and ((proxy.pathsuffix MatchesPath "/v1/users/*") or '
+            '(proxy.pathsuffix MatchesPath "/v1/data/*") or (proxy.pathsuffix MatchesPath "/v2/accounts/*") or '
+            '(proxy.pathsuffix JavaRegex "/remote-sensing/v1/imagery.*"))'
+        )
+
+
+class TestGeneratedBundle:
+    """Test the generated route table on a local gateway."""
+
+    def _route(self, tmp_path, base_dir=BASE_DIR):
+        """Generate a bundle and send a few requests through it; returns (generator, statuses, target paths)."""
+        requests = pytest.importorskip("requests")
+        generator = ProxyGenerator(base_dir=str(base_dir), env="dev")
+        with zipfile.ZipFile(generator.generate(str(tmp_path / "dist"))) as zf:
+            zf.extractall(tmp_path / "bundle")
+
+        seen = []
+
+        async def backend(request):
+            seen.append(request.path)
+            return Response(200, Headers([("Content-Type", "application/json")]), b"{}")
+
+        with BackgroundServer(backend) as target:
+            bundle = ProxyBundle.load(str(tmp_path / "bundle" / "apiproxy"))
+            gateway = LocalGateway(bundle, GatewaySettings(target_url=target.url))
+            with BackgroundServer(gateway.handle) as server:
+                base_url = server.url + bundle.proxy_endpoints["default"].base_path
+                statuses = {
+                    path: requests.get(base_url + path, timeout=10).status_code
+                    for path in ("/remote-sensing/v1/imagery/tile", "/v2/accounts/ids", "/v1/data", "/nowhere")
+                }
+                statuses["POST /health"] = requests.post(base_url + "/health", timeout=10).status_code
+                statuses["GET /health/x"] = requests.get(base_url + "/health/x", timeout=10).status_code
+
+        return generator, statuses, seen
+
+    def test_routes_keep_backend_paths(self, tmp_path):
+        """Test that configured routes reach the target on the paths the hand-written flows produced."""
+        generator, statuses, seen = self._route(tmp_path)
+
+        assert "remote-sensing" in generator.route_table.kept
+        assert statuses["/nowhere"] == statuses["POST /health"] == statuses["GET /health/x"] == 404
+        assert seen == ["/remote-sensing/api/remote-sensing/v1/imagery/tile", "/v2/accounts/ids", "/v1/data"]
+
+    def test_compiled_rewrites_opt_in(self, tmp_path):
+        """Test that compile_path_rewrites replaces each prefix as path_rewrites says."""
+        shutil.copytree(BASE_DIR / "apiproxy", tmp_path / "base" / "apiproxy")
+        shutil.copytree(BASE_DIR / "config", tmp_path / "base" / "config")
+        endpoints_file = tmp_path / "base" / "config" / "endpoints.json"
+        endpoints_file.write_text(json.dumps(dict(json.loads(endpoints_file.read_text()), compile_path_rewrites=True)))
+        generator, _, seen = self._route(tmp_path, tmp_path / "base")
+
+        assert set(generator.route_table.dropped) >= {"remote-sensing", "health-check"}
+        assert seen == ["/remote-sensing/api/v1/imagery/tile", "/api/v2/accounts/ids", "/v1/data"]
+
+    def test_reads_go_to_replica(self, tmp_path):
+        """Test that GETs on read-only routes reach the replica target and writes the primary."""
+        requests = pytest.importorskip("requests")
+        seen = []
+
+        async def backend(request):
+            seen.append((request.method, request.path))
+            return Response(200, Headers([("Content-Type", "application/json")]), b"{}")
+
+        with BackgroundServer(backend) as target:
+            environments = json.loads((BASE_DIR / "config" / "environments.json").read_text())
+            environments["environments"]["dev"].update(
+                backend_host="127.0.0.1", backend_port=int(target.url.rsplit(":", 1)[1]), backend_protocol="http"
+            )
+            config_path = tmp_path / "environments.json"
+            config_path.write_text(json.dumps(environments))
+            generator = ProxyGenerator(base_dir=str(BASE_DIR), env="dev", config_path=str(config_path), read_replica=True)
+            with zipfile.ZipFile(generator.generate(str(tmp_path / "dist"))) as zf:
+                zf.extractall(tmp_path / "bundle")
+
+            bundle = ProxyBundle.load(str(tmp_path / "bundle" / "apiproxy"))
+            with BackgroundServer(LocalGateway(bundle, GatewaySettings()).handle) as server:
+                base_url = server.url + bundle.proxy_endpoints["default"].base_path
+                for method, path in (("GET", "/v1/users/42"), ("POST", "/v1/users/42"),
+                                     ("GET", "/v1/users"), ("GET", "/v2/accounts/7")):
+                    requests.request(method, base_url + path, timeout=10)
+
+        assert seen == [
+            ("GET", "/read-only/v1/users/42"),
+            ("POST", "/v1/users/42"),
+            ("GET", "/v1/users"),
+            ("GET", "/read-only/v2/accounts/7"),
+        ]
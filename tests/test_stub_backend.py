@@ -0,0 +1,145 @@
+"""
+Test Stub Backend
+
+Checks latency models, the route table derived from config/endpoints.json
+and responses served over HTTP.
+"""
+
+import sys
+import json
+import time
+import random
+import statistics
+import urllib.error
+import urllib.request
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from utils.asynchttp import BackgroundServer
+from utils.stub_backend import (
+    FixedLatency, LognormalLatency, ReplayLatency, build_stub, parse_latency, routes_from_endpoints
+)
+
+
+BASE_DIR = Path(__file__).parent.parent
+LATENCY_RESULTS = BASE_DIR / "tests" / "latency-test" / "latency-results-20260202-183128.json"
+
+
+@pytest.fixture
+def endpoints():
+    with open(BASE_DIR / "config" / "endpoints.json") as f:
+        return json.load(f)
+
+
+def _request(server, method, path):
+    """Return (status, headers, body)."""
+    request = urllib.request.Request(f"{server.url}{path}", method=method)
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+class TestLatencyModels:
+    """Test latency spec parsing and sampling."""
+
+    def test_parse_specs(self):
+        """Test each spec kind."""
+        assert isinstance(parse_latency("fixed:25"), FixedLatency)
+        assert parse_latency(None).sample(random.Random()) == 0
+        assert isinstance(parse_latency("lognormal:median=100,sigma=0.3"), LognormalLatency)
+        with pytest.raises(ValueError):
+            parse_latency("lognormal:sigma=0.3")
+        with pytest.raises(ValueError):
+            parse_latency("uniform:1-2")
+
+    def test_lognormal_median(self):
+        """Test that lognormal samples center on the configured median."""
+        model = LognormalLatency(120, 0.5)
+        rng = random.Random(1)
+        samples = [model.sample(rng) for _ in range(20000)]
+
+        assert statistics.median(samples) == pytest.approx(120, rel=0.05)
+
+    def test_replay_recorded_samples(self, tmp_path):
+        """Test replay from latency-results JSON sections and plain files."""
+        recorded = json.loads(LATENCY_RESULTS.read_text())
+        target = {r["latency_ms"] for r in recorded["target"]["results"] if r["success"]}
+        model = parse_latency(f"replay:{LATENCY_RESULTS}")
+        rng = random.Random(0)
+
+        assert isinstance(model, ReplayLatency)
+        assert {model.sample(rng) for _ in range(200)} <= target
+        assert set(parse_latency(f"replay:{LATENCY_RESULTS}#proxy").samples) != target
+
+        lines = tmp_path / "samples.txt"
+        lines.write_text("10\n20.5\n")
+        assert parse_latency(f"replay:{lines}").samples == [10.0, 20.5]
+
+
+class TestRoutes:
+    """Test the route table from endpoints.json."""
+
+    def test_mappings_and_rewrites(self, endpoints):
+        """Test mapped paths, rewritten backend paths and methods."""
+        routes = {r.prefix: r.methods for r in routes_from_endpoints(endpoints)}
+
+        assert routes["/v1/data"] == ["GET", "POST"]
+        assert routes["/remote-sensing/api/v1/imagery"] == ["GET"]
+        assert routes["/api/v2/accounts/ids"] == ["GET"]
+        assert "/v2/accounts" in routes
+
+    def test_longest_prefix_wins(self, endpoints):
+        """Test route selection."""
+        stub = build_stub(endpoints, overrides={"/v2/accounts/me": {"size": 10}})
+
+        assert stub.route_for("/v2/accounts/me").prefix == "/v2/accounts/me"
+        assert stub.route_for("/v2/accounts/ids/1").prefix == "/v2/accounts/ids"
+        assert stub.route_for("/remote-sensing/api/v1/imagery/t").prefix == "/remote-sensing/api/v1/imagery"
+        assert stub.route_for("/nope") is None
+
+
+class TestStubServer:
+    """Test responses over HTTP."""
+
+    def test_size_latency_and_errors(self, endpoints):
+        """Test response size, injected latency header, 404 and 405."""
+        stub = build_stub(
+            endpoints,
+            latency="fixed:0",
+            size=4096,
+            overrides={"/v2/accounts": {"latency": "fixed:40", "size": 1000}},
+            seed=1
+        )
+        with BackgroundServer(stub.handle) as server:
+            start = time.perf_counter()
+            status, headers, body = _request(server, "GET", "/v2/accounts/me")
+            elapsed = time.perf_counter() - start
+            health = _request(server, "GET", "/health")
+            not_found = _request(server, "GET", "/unknown")[0]
+            not_allowed = _request(server, "DELETE", "/v1/data/1")
+
+        assert status == 200
+        assert len(body) == 1000
+        assert json.loads(body)["path"] == "/v2/accounts/me"
+        assert float(headers["X-Stub-Latency-Ms"]) == 40
+        assert elapsed >= 0.04
+        assert len(health[2]) == 4096
+        assert not_found == 404
+        assert not_allowed[0] == 405
+        assert not_allowed[1]["Allow"] == "GET, POST"
+        assert stub.stats()["/v2/accounts"]["count"] == 1
+
+    def test_error_rate_is_seeded(self, endpoints):
+        """Test that injected failures repeat for the same seed."""
+        def statuses(seed):
+            stub = build_stub(endpoints, error_rate=0.5, seed=seed)
+            with BackgroundServer(stub.handle) as server:
+                return [_request(server, "GET", "/health")[0] for _ in range(20)]
+
+        first = statuses(3)
+        assert first == statuses(3)
+        assert set(first) == {200, 503}
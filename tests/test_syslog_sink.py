@@ -0,0 +1,166 @@
+"""
+Test Syslog Sink
+
+Checks log line parsing, latency histograms, TCP/UDP framing and the local
+gateway's MessageLogging policy delivering to the sink.
+"""
+
+import sys
+import gzip
+import json
+import random
+import socket
+import asyncio
+import urllib.request
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from utils.asynchttp import BackgroundServer, Response
+from utils.local_gateway import GatewaySettings, LocalGateway, ProxyBundle
+from utils.syslog_sink import (
+    LatencyHistogram, SyslogSink, analyze_lines, iter_log_lines, normalize_path, parse_line
+)
+
+
+BASE_DIR = Path(__file__).parent.parent
+
+
+def _line(path="/cropwise-unified-platform/v2/accounts/me", status=200, latency="42"):
+    return (f"<134>1 2026-02-02T18:31:28Z apigee cropwise - - - [CropwisePlatform][dev] "
+            f"RequestId=abc User=grower@syngenta.com ClientIP=10.0.0.1 Method=GET "
+            f"Path={path} Status={status} Latency={latency}ms")
+
+
+class TestParsing:
+    """Test log line parsing and path grouping."""
+
+    def test_parse_line(self):
+        """Test the FC-Syng-Logging format with a syslog header."""
+        record = parse_line(_line())
+
+        assert record.env == "dev"
+        assert record.user == "grower@syngenta.com"
+        assert record.status == 200
+        assert record.latency_ms == 42.0
+        assert parse_line("unrelated message") is None
+
+    def test_unresolved_latency(self):
+        """Test that an empty latency (unresolved template) is kept as None."""
+        assert parse_line(_line(latency="")).latency_ms is None
+
+    def test_normalize_path(self):
+        """Test base path stripping and ID collapsing."""
+        base = "/cropwise-unified-platform"
+
+        assert normalize_path(f"{base}/v1/users/12345?x=1", base) == "/v1/users/{id}"
+        assert normalize_path(f"{base}/v1/users/a@b.com", base) == "/v1/users/{id}"
+        assert normalize_path(f"{base}/v2/accounts/me", base) == "/v2/accounts/me"
+
+
+class TestHistogram:
+    """Test the streaming latency histogram."""
+
+    def test_percentiles_within_bucket_error(self):
+        """Test that percentiles are within the bucket resolution."""
+        rng = random.Random(0)
+        values = sorted(rng.lognormvariate(5, 0.6) for _ in range(20000))
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+
+        for p in (50, 95, 99):
+            exact = values[int(p / 100 * len(values)) - 1]
+            assert histogram.percentile(p) == pytest.approx(exact, rel=0.04)
+
+    def test_merge(self):
+        """Test merging two histograms."""
+        a, b = LatencyHistogram(), LatencyHistogram()
+        a.record(10)
+        b.record(1000)
+        a.merge(b)
+
+        assert a.count == 2
+        assert a.max == 1000
+
+
+class TestFileAnalysis:
+    """Test offline analysis of captured logs."""
+
+    def test_gzip_file(self, tmp_path):
+        """Test per-path stats from a gzip log."""
+        log = tmp_path / "platform.log.gz"
+        with gzip.open(log, "wt") as f:
+            for i in range(10):
+                f.write(_line(f"/cropwise-unified-platform/v1/users/{i}", latency=str(10 + i)) + "\n")
+            f.write(_line(status=404, latency="") + "\n")
+            f.write("garbage\n")
+
+        report = analyze_lines(iter_log_lines(str(log)), "/cropwise-unified-platform").report()
+
+        assert report["records"] == 11
+        assert report["unparsed"] == 1
+        assert report["unresolved_latency"] == 1
+        assert report["statuses"] == {"200": 10, "404": 1}
+        assert report["paths"]["GET /v1/users/{id}"]["latency"]["max_ms"] == 19
+
+
+class TestNetworkSink:
+    """Test TCP and UDP ingestion."""
+
+    def test_tcp_framing_and_udp(self):
+        """Test octet-counted and newline frames on TCP, and UDP datagrams."""
+        async def scenario():
+            sink = SyslogSink()
+            await sink.start(tcp_port=0, udp_port=0)
+            reader, writer = await asyncio.open_connection("127.0.0.1", sink.tcp_port)
+            counted = _line(latency="7").encode()
+            writer.write(f"{len(counted)} ".encode() + counted)
+            writer.write(_line(latency="8").encode() + b"\n")
+            writer.write(f"{len(counted)} ".encode() + counted)
+            await writer.drain()
+            writer.close()
+
+            udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            udp.sendto(_line(latency="9").encode(), ("127.0.0.1", sink.udp_port))
+            udp.close()
+            for _ in range(100):
+                if sink.aggregator.records >= 4:
+                    break
+                await asyncio.sleep(0.01)
+            await sink.close()
+            return sink.aggregator.report()
+
+        report = asyncio.run(scenario())
+
+        assert report["records"] == 4
+        assert report["unparsed"] == 0
+        assert report["latency"]["min_ms"] == 7
+
+    def test_gateway_message_logging(self):
+        """Test the gateway's MessageLogging policy sends to the sink."""
+        sink = SyslogSink()
+
+        async def backend(request):
+            return Response(200, body=b"ok")
+
+        with BackgroundServer(backend) as target:
+            with BackgroundServer(lambda request: gateway.handle(request)) as server:
+                server.call(sink.start(tcp_port=0))
+                gateway = LocalGateway(
+                    ProxyBundle.load(BASE_DIR / "apiproxy"),
+                    GatewaySettings(target_url=target.url, syslog=f"127.0.0.1:{sink.tcp_port}")
+                )
+                for _ in range(3):
+                    urllib.request.urlopen(f"{server.url}/cropwise-unified-platform/health").read()
+                server.call(asyncio.sleep(0.1))
+                server.call(sink.close())
+
+        report = sink.aggregator.report()
+        assert report["records"] == 3
+        assert report["environments"] == {"dev": 3}
+        assert list(report["paths"]) == ["GET /cropwise-unified-platform/health"]
+        # Apigee templates do not evaluate arithmetic, so the policy's Latency is empty
+        assert report["unresolved_latency"] == 3
+        assert gateway.stats()["syslog_sent"] == 3
@@ -0,0 +1,138 @@
+"""
+Test JWT Token Pool
+
+Tests stdlib HS256 signing, synthetic users from the token fixtures,
+round-robin handout across threads and background rotation before expiry.
+"""
+
+import sys
+import time
+import threading
+import pytest
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from utils.case_catalog import load_token_fixtures
+from utils.jwt_reference import parse_jwt_token
+from utils.token_pool import PoolUser, TokenPool, sign_hs256, synthetic_users
+
+
+TOKENS = Path(__file__).parent / "fixtures" / "test_tokens.json"
+SECRET = "test-secret-key-for-jwt-signing"
+
+
+class TestSigning:
+    """Test HS256 signing without PyJWT."""
+
+    def test_verifies_with_pyjwt(self):
+        """Test that tokens are standard HS256 JWTs."""
+        jwt = pytest.importorskip("jwt")
+        token = sign_hs256({"sub": "a@syngenta.com", "exp": int(time.time()) + 60}, SECRET)
+
+        assert jwt.decode(token, SECRET, algorithms=["HS256"])["sub"] == "a@syngenta.com"
+        with pytest.raises(jwt.InvalidSignatureError):
+            jwt.decode(token, "wrong-secret", algorithms=["HS256"])
+
+    def test_parsed_by_proxy_script(self):
+        """Test that parse-jwt-token.js (reference) reads the pool claims."""
+        pool = TokenPool([PoolUser("a@syngenta.com", "strider-ui")], SECRET)
+        variables = parse_jwt_token(pool.get())
+
+        assert variables["jwt.valid"] is True
+        assert variables["jwt.username"] == "a@syngenta.com"
+        assert variables["jwt.client_id"] == "strider-ui"
+        assert variables["jwt.expired"] is False
+
+
+class TestSyntheticUsers:
+    """Test deriving users from the token fixtures."""
+
+    def test_users_per_fixture(self):
+        """Test user+N@domain names, tiers and the skipped expired fixture."""
+        users = synthetic_users(load_token_fixtures(str(TOKENS)), per_fixture=3)
+        names = [u.username for u in users]
+
+        assert len(users) == 12
+        assert len(set(names)) == 12
+        assert "high.rate.user+2@syngenta.com" in names
+        assert not any(name.startswith("expired.user") for name in names)
+        assert Counter(u.tier for u in users) == {None: 6, "high-rate": 3, "low-rate": 3}
+
+    def test_fixture_claims_kept(self):
+        """Test that extra fixture claims are signed into the pool tokens."""
+        pool = TokenPool.from_fixtures(str(TOKENS))
+        variables = parse_jwt_token(pool.token_for("test.user@syngenta.com"))
+
+        assert variables["jwt.client_id"] == "strider-ui"
+        assert variables["jwt.scope"] == "read write"
+
+
+class TestHandout:
+    """Test handing out tokens."""
+
+    def test_round_robin_by_tier(self):
+        """Test cycling through all users or one tier."""
+        pool = TokenPool.from_fixtures(str(TOKENS), per_fixture=2)
+        users = [parse_jwt_token(pool.get("low-rate"))["jwt.username"] for _ in range(4)]
+
+        assert users == ["low.rate.user@syngenta.com", "low.rate.user+1@syngenta.com"] * 2
+        assert len({pool.get() for _ in range(8)}) == 8
+        with pytest.raises(KeyError, match="medium-rate"):
+            pool.get("medium-rate")
+
+    def test_token_for_unknown_user_is_stable(self):
+        """Test that logged users map to the same pool user every time."""
+        pool = TokenPool.from_fixtures(str(TOKENS), per_fixture=50)
+
+        assert pool.token_for("someone@example.com") == pool.token_for("someone@example.com")
+        assert len({pool.token_for(f"user{i}@example.com") for i in range(100)}) > 50
+
+    def test_concurrent_handout_is_even(self):
+        """Test that workers sharing the pool spread evenly over the users."""
+        users = [PoolUser(f"u{i}@syngenta.com") for i in range(10)]
+        pool = TokenPool(users, SECRET)
+        seen = Counter()
+        lock = threading.Lock()
+
+        def worker():
+            local = Counter(pool.get() for _ in range(1000))
+            with lock:
+                seen.update(local)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(seen.values()) == [800] * 10
+
+
+class TestRotation:
+    """Test re-signing before expiry."""
+
+    def test_refresh_before_must_be_below_ttl(self):
+        """Test that a rotation window as long as the token lifetime is rejected."""
+        with pytest.raises(ValueError, match="refresh_before"):
+            TokenPool([PoolUser("a@syngenta.com")], SECRET, ttl=60, refresh_before=60)
+
+    def test_rotates_in_background(self):
+        """Test that tokens are re-signed once the clock enters the refresh window."""
+        now = [1_000_000.0]
+        pool = TokenPool([PoolUser("a@syngenta.com")], SECRET, ttl=60, refresh_before=10,
+                         clock=lambda: now[0], poll_interval=0.01)
+        first = pool.get()
+
+        with pool:
+            time.sleep(0.05)
+            assert pool.generation == 1
+            now[0] += 55
+            deadline = time.monotonic() + 2
+            while pool.generation == 1 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        assert pool.generation == 2
+        assert pool.get() != first
+        assert parse_jwt_token(pool.get(), now=now[0])["jwt.expired"] is False
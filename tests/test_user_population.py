@@ -0,0 +1,136 @@
+"""
+Test Synthetic User Population
+
+Checks tier distributions, the KVM desired-state file, Zipf sampling, the
+rate-limit cache model and driving load against a local server that
+simulates a cached KVM lookup.
+"""
+
+import sys
+import asyncio
+import pytest
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from utils.asynchttp import BackgroundServer, Headers, Response
+from utils.jwt_reference import parse_jwt_token
+from utils.kvm_sync import load_entries
+from utils.token_pool import PoolUser, TokenPool
+from utils.user_population import (
+    KvmCacheModel, PopulationLoad, ZipfSampler, expected_hit_rate, generate_population,
+    parse_tier_distribution, tier_counts, write_desired_state
+)
+
+
+SECRET = "test-secret-key-for-jwt-signing"
+
+
+class TestPopulation:
+    """Test generating users and their KVM entries."""
+
+    def test_parse_tier_distribution(self):
+        """Test that weights are normalized and malformed specs rejected."""
+        assert parse_tier_distribution("high-rate=1, low-rate=3") == {"high-rate": 0.25, "low-rate": 0.75}
+        for spec in ("high-rate", "high-rate=-1", "x=abc", "a=0"):
+            with pytest.raises(ValueError):
+                parse_tier_distribution(spec)
+
+    def test_exact_tier_counts(self):
+        """Test that tier counts sum to the population size."""
+        counts = tier_counts(10, {"a": 1 / 3, "b": 1 / 3, "c": 1 / 3})
+
+        assert sum(counts.values()) == 10
+        assert sorted(counts.values()) == [3, 3, 4]
+
+    def test_population_and_desired_state(self, tmp_path):
+        """Test that only non-default users get KVM entries, in both file formats."""
+        users = generate_population(1000, parse_tier_distribution("high-rate=10,low-rate=40,default=50"), seed=7)
+        tiers = Counter(u.tier for u in users)
+
+        assert len({u.username for u in users}) == 1000
+        assert tiers == {None: 500, "low-rate": 400, "high-rate": 100}
+        assert generate_population(1000, {"a": 1.0}, seed=7)[0].username == users[0].username
+
+        for name in ("kvm.json", "kvm.csv"):
+            assert write_desired_state(users, str(tmp_path / name)) == 500
+            entries = load_entries(str(tmp_path / name))
+            assert len(entries) == 500
+            assert Counter(entries.values()) == {"low-rate": 400, "high-rate": 100}
+
+    def test_population_tokens(self):
+        """Test that each user's pooled token carries its username."""
+        users = generate_population(20, {"medium-rate": 1.0})
+        pool = TokenPool(users, SECRET)
+
+        assert parse_jwt_token(pool.token_for(users[5].username))["jwt.username"] == users[5].username
+
+
+class TestZipf:
+    """Test skewed user sampling."""
+
+    def test_uniform_and_skewed(self):
+        """Test that s=0 is flat and s>1 concentrates on few users."""
+        uniform = Counter(ZipfSampler(10, s=0, seed=1).samples(20000))
+        skewed = ZipfSampler(1000, s=1.2, seed=1)
+        counts = Counter(skewed.samples(20000))
+
+        assert max(uniform.values()) / min(uniform.values()) < 1.2
+        top = sum(n for _, n in counts.most_common(10)) / 20000
+        assert top == pytest.approx(skewed.top_share(0.01), abs=0.03)
+        assert top > 0.5
+
+    def test_seeded(self):
+        """Test that the same seed draws the same users."""
+        assert ZipfSampler(100, seed=3).samples(50) == ZipfSampler(100, seed=3).samples(50)
+
+
+class TestCacheModel:
+    """Test the rate-limit cache hit model."""
+
+    def test_ttl_and_uncached_users(self):
+        """Test expiry from populate time and that users without an entry always miss."""
+        model = KvmCacheModel(ttl_seconds=10)
+        known, unknown = PoolUser("a@x", tier="low-rate"), PoolUser("b@x")
+
+        assert [model.lookup(known, t) for t in (0, 5, 9.9, 10, 15)] == [False, True, True, False, True]
+        assert [model.lookup(unknown, t) for t in (0, 1)] == [False, False]
+        assert model.hit_rate == pytest.approx(3 / 7)
+
+    def test_cardinality_lowers_hit_rate(self):
+        """Test that more distinct users at the same rate means fewer hits."""
+        def rate(count):
+            users = generate_population(count, {"medium-rate": 1.0})
+            return expected_hit_rate(users, ZipfSampler(count, 1.0), 5000, 100, ttl_seconds=30)["hit_rate"]
+
+        assert rate(50) > 0.9
+        assert rate(50) > rate(5000)
+
+
+class TestLoad:
+    """Test driving load against a local server."""
+
+    def test_load_reports_hits_and_misses(self):
+        """Test that modeled misses line up with the server's KVM reads."""
+        cache = {}
+
+        async def handler(request):
+            # Cached KVM lookup keyed by username, as the rate-limit cache does
+            user = parse_jwt_token(request.headers.get('Authorization')[len("Bearer "):])["jwt.username"]
+            kvm_ms = 0.2 if user in cache else 8.0
+            cache[user] = True
+            return Response(200, Headers([('X-Apigee-KVM-Time', str(kvm_ms))]), b'{}')
+
+        users = generate_population(30, {"high-rate": 1.0})
+        with BackgroundServer(handler) as server:
+            load = PopulationLoad(server.url, users, TokenPool(users, SECRET), ZipfSampler(30, 1.0, seed=2),
+                                  rate_per_s=0, max_in_flight=1, cache_ttl_seconds=3600)
+            report = asyncio.run(load.run(300))
+
+        assert report["sent"] == 300
+        assert report["statuses"] == {"200": 300}
+        assert report["latency"]["miss"]["count"] == len(cache) == report["distinct_users"]
+        assert report["kvm_time"]["miss"]["min_ms"] == 8.0
+        assert report["kvm_time"]["hit"]["max_ms"] == 0.2
+        assert report["modeled_hit_rate"] == pytest.approx(1 - len(cache) / 300, abs=1e-4)